@@ -1,11 +1,11 @@
 import os
 import pandas as pd
 import numpy as np
-import requests
 import base64
 import io
 import json
 import time
+import threading
 from datetime import datetime, timedelta, timezone
 import pytz  # For timezone handling
 import dash
@@ -16,18 +16,23 @@ from dash.exceptions import PreventUpdate
 import flask
 import plotly.graph_objs as go
 import plotly.express as px
-import yfinance as yf
 import logging
 from functools import lru_cache
+from filelock import FileLock
+
+# Heavy modules that only a few callbacks need are imported on first use
+from lazy_import import lazy_import
+yf = lazy_import("yfinance")
 
 # Import API keys from the separate file
 from api_keys import FRED_API_KEY, BEA_API_KEY, BLS_API_KEY
 
 # Import document analysis functionality
-import document_analysis
+document_analysis = lazy_import("document_analysis")
 
 # Import sector sentiment scoring
 import sentiment_engine
+from incremental_scorer import IncrementalSectorScorer
 
 # Import pulse score reader
 from read_authentic_pulse import read_pulse_score, calculate_pulse_from_sectors
@@ -50,13 +55,30 @@ from market_insights import create_insights_panel
 
 
 # Import data cache for fast data access
-from data_cache import get_data, get_all_data
+from data_cache import get_data, get_all_data, set_data, update_cache, stale_data_types
+
+# Memoize chart callbacks on the version of their input data
+from figure_cache import memoize_on_data
+
+# Precomputed startup snapshot (series, sector scores, Pulse history)
+import dashboard_snapshot
+from config import STARTUP_REFRESH_INTERVAL_SECONDS, STARTUP_REFRESH_LOCK_FILE
+
+# Shared HTTP client (FRED, BLS and BEA requests)
+import http_client
+
+# Incremental FRED fetches into the per-series observation store
+import fred_store
+from config import FRED_INCREMENTAL, FRED_HISTORY_YEARS
+
+# Shared EMA kernel (NASDAQ ema20, VIX ema14)
+from ema_kernel import ema_series
 
 # Import historical sector score generation
-import historical_sector_scores
+historical_sector_scores = lazy_import("historical_sector_scores")
 
 # Import authentic sector history for trend charts
-import authentic_sector_history
+authentic_sector_history = lazy_import("authentic_sector_history")
 import predefined_sector_data
 
 # Data reader for efficient file operations is already imported
@@ -68,14 +90,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Lazy import mode: defer network fetches to the first request (set by wsgi.py)
+LAZY_IMPORT = os.environ.get("T2D_LAZY_IMPORT") == "1"
+
 # Global data caching for expensive operations
+# Memory-map the dashboard snapshot, if a recent one exists, so that worker
+# start-up needs no CSV parsing or network access
+STARTUP_SNAPSHOT = dashboard_snapshot.load_snapshot()
+if STARTUP_SNAPSHOT is not None:
+    logger.info(f"Loaded dashboard snapshot built at {datetime.fromtimestamp(STARTUP_SNAPSHOT.built_at)}")
+
 # Load T2D Pulse history once at startup
-T2D_PULSE_HISTORY = None
+T2D_PULSE_HISTORY = STARTUP_SNAPSHOT.pulse_history if STARTUP_SNAPSHOT is not None else None
 try:
     history_file = "data/t2d_pulse_history.csv"
     parquet_history_file = "data/t2d_pulse_history.parquet"
     
-    if os.path.exists(parquet_history_file):
+    if T2D_PULSE_HISTORY is not None:
+        logger.info("Using T2D Pulse history from the dashboard snapshot")
+    elif os.path.exists(parquet_history_file):
         logger.info(f"Loading T2D Pulse history from Parquet file: {parquet_history_file}")
         T2D_PULSE_HISTORY = pd.read_parquet(parquet_history_file)
     elif os.path.exists(history_file):
@@ -198,8 +231,49 @@ def download_sector_marketcap_excel():
 app.title = "T2D Pulse"
 
 # Function to fetch data from FRED
-def fetch_fred_data(series_id, start_date=None, end_date=None):
+def fetch_fred_data(series_id, start_date=None, end_date=None, incremental=None):
     """Fetch data from FRED API for a given series"""
+    return http_client.run(fetch_fred_data_async(series_id, start_date, end_date, incremental))
+
+def fetch_fred_series(series_ids, start_date=None, end_date=None, incremental=None):
+    """Fetch several FRED series concurrently, returning {series_id: DataFrame}"""
+    results = http_client.run(http_client.gather(
+        *(fetch_fred_data_async(series_id, start_date, end_date, incremental) for series_id in series_ids)))
+    return {series_id: result if isinstance(result, pd.DataFrame) else pd.DataFrame()
+            for series_id, result in zip(series_ids, results)}
+
+async def fetch_fred_data_async(series_id, start_date=None, end_date=None, incremental=None):
+    """
+    Fetch data from FRED API for a given series (through the shared FRED client).
+
+    Without explicit dates, and unless incremental is False (default
+    config.FRED_INCREMENTAL), only the observations from the last few stored
+    ones onwards are requested and merged into the series' store (see
+    fred_store.py). The last FRED_HISTORY_YEARS years are then returned from
+    the store, in the same shape as a full download.
+    """
+    incremental = FRED_INCREMENTAL if incremental is None else incremental
+    if not incremental or start_date or end_date:
+        return await _fetch_fred_observations(series_id, start_date, end_date)
+
+    # Nothing stored yet: the first fetch downloads the full history
+    observation_start = fred_store.incremental_start(series_id)
+    # The store is the fallback here, so a failed request must not return the cached CSV
+    df = await _fetch_fred_observations(series_id, observation_start, use_cached_csv=False)
+    if df.empty:
+        if observation_start is None:
+            return df
+        print(f"No new FRED data for {series_id}, using stored observations")
+    else:
+        counts = fred_store.merge_observations(series_id, df)
+        print(f"FRED {series_id}: {counts['added']} new and {counts['revised']} revised observations stored")
+
+    today = datetime.now(pytz.timezone('US/Eastern')).date()
+    history_start = today - timedelta(days=FRED_HISTORY_YEARS * 365)
+    return fred_store.to_fred_frame(fred_store.read_series(series_id, start=history_start))
+
+async def _fetch_fred_observations(series_id, start_date=None, end_date=None, use_cached_csv=True):
+    """Download FRED observations for a series (default: the last 5 years)"""
     logger.info(f"Fetching FRED data for series {series_id}")
     
     if not FRED_API_KEY:
@@ -221,8 +295,8 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d') if isinstance(end_date, str) else end_date
         start_date = (end_date_obj - timedelta(days=5*365)).strftime('%Y-%m-%d')
     
-    # Build API URL
-    url = f"https://api.stlouisfed.org/fred/series/observations"
+    # API path (the shared client adds the base URL, rate limit and retries)
+    url = "/fred/series/observations"
     
     # Use current dates for most recent data
     params = {
@@ -238,7 +312,7 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
     
     try:
         # Make API request with current dates
-        response = requests.get(url, params=params)
+        response = await http_client.get_client("fred").get(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -272,7 +346,7 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
             
             try:
                 # Make second API request with simplified parameters
-                response = requests.get(url, params=params)
+                response = await http_client.get_client("fred").get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -305,7 +379,7 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
                             filename = fname
                             break
                     
-                    if filename and os.path.exists(filename):
+                    if use_cached_csv and filename and os.path.exists(filename):
                         print(f"Loading cached data from {filename} as fallback")
                         cached_df = pd.read_csv(filename)
                         cached_df['date'] = pd.to_datetime(cached_df['date'])
@@ -385,7 +459,7 @@ def fetch_bea_data(table_name, frequency, start_year, end_year):
         print("Cannot fetch BEA data: No API key provided")
         return pd.DataFrame()
     
-    url = "https://apps.bea.gov/api/data"
+    url = "/api/data"
     params = {
         "UserID": BEA_API_KEY,
         "method": "GetData",
@@ -397,7 +471,7 @@ def fetch_bea_data(table_name, frequency, start_year, end_year):
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get_client("bea").get_sync(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -563,7 +637,7 @@ def fetch_nasdaq_with_ema():
             return pd.DataFrame()
         
         # Calculate 20-day EMA
-        data['ema20'] = data['Close'].ewm(span=20, adjust=False).mean()
+        data['ema20'] = ema_series(data['Close'], span=20)
         
         # Calculate gap percentage (current price vs EMA)
         data['gap_pct'] = (data['Close'] / data['ema20'] - 1) * 100
@@ -743,7 +817,7 @@ def fetch_bls_data(series_id, start_year, end_year):
         logger.error("Cannot fetch BLS data: No API key provided")
         return pd.DataFrame()
     
-    url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+    url = "/publicAPI/v2/timeseries/data/"
     headers = {'Content-Type': 'application/json'}
     data = {
         "seriesid": [series_id],
@@ -753,7 +827,7 @@ def fetch_bls_data(series_id, start_year, end_year):
     }
     
     try:
-        response = requests.post(url, json=data, headers=headers)
+        response = http_client.get_client("bls").post_sync(url, json=data, headers=headers)
         
         if response.status_code == 200:
             result = response.json()
@@ -869,6 +943,9 @@ def generate_sector_tickers():
         "Hardware / Devices": ["AAPL", "DELL", "SMCI"]
     }
 
+# Incremental sector scorer, seeded by the first calculate_sector_sentiment() call
+sector_scorer = None
+
 def calculate_sector_sentiment():
     """Calculate sentiment scores for each technology sector using the latest data"""
     logger.info("Starting calculate_sector_sentiment function")
@@ -986,29 +1063,26 @@ def calculate_sector_sentiment():
         return []
     
     try:
-        # Calculate sector scores - each sector using its own EMA factor
-        all_sector_scores = []
-        
-        for sector in sentiment_engine.SECTORS:
-            # Create a copy of the base macros to customize for this sector
-            sector_macros = macros.copy()
-            
-            # Use the sector-specific EMA factor if available, otherwise use default
-            if ema_factors and sector in ema_factors:
-                sector_macros["Sector_EMA_Factor"] = ema_factors[sector]
-                logger.info(f"Using sector-specific EMA factor for {sector}: {ema_factors[sector]:.3f}")
-            
-            # Calculate scores using this sector's own EMA factor
-            sector_result = sentiment_engine.score_sectors(sector_macros)
-            
-            # Find this specific sector's score
-            for data in sector_result:
-                if data["sector"] == sector:
-                    all_sector_scores.append(data)
-                    break
-        
-        # Use these sector-specific scores
-        sector_scores = all_sector_scores
+        # Calculate sector scores - each sector using its own EMA factor.
+        # The EMA factor is passed per sector, so all 14 sectors are scored together.
+        sector_macros = macros.copy()
+        if "Sector_EMA_Factor" in macros:
+            default_factor = macros["Sector_EMA_Factor"]
+            sector_macros["Sector_EMA_Factor"] = {
+                sector: ema_factors.get(sector, default_factor) for sector in sentiment_engine.SECTORS
+            }
+            for sector in sentiment_engine.SECTORS:
+                if sector in ema_factors:
+                    logger.info(f"Using sector-specific EMA factor for {sector}: {ema_factors[sector]:.3f}")
+        
+        # Only indicators whose latest value moved since the last call are re-scored
+        global sector_scorer
+        if sector_scorer is None:
+            sector_scorer = IncrementalSectorScorer(sector_macros)
+        else:
+            changed = sector_scorer.update_many(sector_macros, replace=True)
+            logger.info(f"Re-scored sectors for {len(changed)} changed indicators: {changed}")
+        sector_scores = sector_scorer.scores()
         logger.info(f"Successfully calculated sentiment scores for {len(sector_scores)} sectors with sector-specific EMA factors")
         
         # Get driver factors and tickers for each sector
@@ -1083,17 +1157,12 @@ def calculate_t2d_pulse_from_sectors(sector_scores, sector_weights=None):
             sector_dict.update(item)
         sector_scores = sector_dict
     
-    # Try to get authentic market cap weights
-    try:
-        from authentic_marketcap_reader import get_sector_weightings
-        authentic_weights = get_sector_weightings()
-        
-        # If we have authentic weights and no custom weights specified, use the authentic weights
-        if authentic_weights and not sector_weights:
+    # If no custom weights are specified, use the authentic market cap weights
+    if not sector_weights:
+        authentic_weights = get_authentic_sector_weights()
+        if authentic_weights:
             logging.info("Using authentic market cap weights for T2D Pulse calculation")
             sector_weights = authentic_weights
-    except (ImportError, Exception) as e:
-        logging.warning(f"Could not load authentic market cap weights: {e}")
     
     # If no weights are provided, use equal weighting
     if not sector_weights:
@@ -1123,6 +1192,43 @@ def calculate_t2d_pulse_from_sectors(sector_scores, sector_weights=None):
     pulse_score = weighted_sum / total_applied_weight
     return round(pulse_score, 1)
 
+def get_authentic_sector_weights():
+    """Return the authentic market cap weights by sector, or None if they can't be loaded"""
+    try:
+        from authentic_marketcap_reader import get_sector_weightings
+        return get_sector_weightings() or None
+    except (ImportError, Exception) as e:
+        logging.warning(f"Could not load authentic market cap weights: {e}")
+        return None
+
+# Pulse weights last set on sector_scorer (None = equal weights)
+_scorer_pulse_weights = None
+
+def calculate_t2d_pulse_from_scorer(sector_weights=None):
+    """Calculate the T2D Pulse score from the incremental sector scorer
+    
+    The same weighted average as calculate_t2d_pulse_from_sectors, over the sector
+    scores from the last calculate_sector_sentiment() call. The scorer keeps the
+    weighted sum up to date as indicators move, so only a change of weights
+    re-averages every sector.
+    
+    Args:
+        sector_weights (dict, optional): Dictionary with custom weights for each sector
+        
+    Returns:
+        float: The weighted average T2D Pulse score (0-100 scale), or None if no
+            sectors have been scored yet
+    """
+    global _scorer_pulse_weights
+    if sector_scorer is None:
+        return None
+    if not sector_weights:
+        sector_weights = get_authentic_sector_weights()
+    if sector_weights != _scorer_pulse_weights:
+        sector_scorer.set_sector_weights(sector_weights)
+        _scorer_pulse_weights = dict(sector_weights) if sector_weights else None
+    return sector_scorer.pulse
+
 def calculate_sentiment_index(custom_weights=None, proprietary_data=None, document_data=None):
     """Calculate economic sentiment index from available indicators
     
@@ -1609,406 +1715,527 @@ def apply_market_cap_calibration(sector_data):
     except Exception as e:
         print(f"Error applying calibration factors: {e}")
         return sector_data
-# Pre-load all data at startup
+# Pre-load all data at startup. When the snapshot holds every series the
+# frames come from it and the stale-data refreshes below are left to the
+# background auto-refresh.
+STARTUP_FROM_SNAPSHOT = (STARTUP_SNAPSHOT is not None and
+                         STARTUP_SNAPSHOT.has_series(dashboard_snapshot.SERIES_FILES))
+
+def load_startup_series(data_type):
+    """Load a series at startup from the snapshot, or from its CSV file"""
+    if STARTUP_FROM_SNAPSHOT:
+        return STARTUP_SNAPSHOT.series[data_type]
+    return load_data_from_csv(dashboard_snapshot.SERIES_FILES[data_type])
+
 print("Loading economic data...")
-gdp_data = load_data_from_csv('gdp_data.csv')
-pce_data = load_data_from_csv('pce_data.csv')
-unemployment_data = load_data_from_csv('unemployment_data.csv')
-inflation_data = load_data_from_csv('inflation_data.csv')
-interest_rate_data = load_data_from_csv('interest_rate_data.csv')
-treasury_yield_data = load_data_from_csv('treasury_yield_data.csv')
+gdp_data = load_startup_series('gdp')
+pce_data = load_startup_series('pce')
+unemployment_data = load_startup_series('unemployment')
+inflation_data = load_startup_series('cpi')
+interest_rate_data = load_startup_series('interest_rate')
+treasury_yield_data = load_startup_series('treasury_yield')
 
 # Add NASDAQ Composite data from FRED (NASDAQCOM)
-nasdaq_data = load_data_from_csv('nasdaq_data.csv')
+nasdaq_data = load_startup_series('nasdaq')
 
 # Add Consumer Sentiment data (USACSCICP02STSAM)
-consumer_sentiment_data = load_data_from_csv('consumer_sentiment_data.csv')
+consumer_sentiment_data = load_startup_series('consumer_sentiment')
 
 # Add Software Job Postings from FRED (IHLIDXUSTPSOFTDEVE)
-job_postings_data = load_data_from_csv('job_postings_data.csv')
-
-# If no existing data or data is old, fetch NASDAQ data with EMA calculation
-if nasdaq_data.empty or (datetime.now() - pd.to_datetime(nasdaq_data['date'].max())).days > 1:
-    # Try to get real-time data with EMA first
-    new_nasdaq_data = fetch_nasdaq_with_ema()
-    
-    if not new_nasdaq_data.empty and 'gap_pct' in new_nasdaq_data.columns:
-        nasdaq_data = new_nasdaq_data
-        save_data_to_csv(nasdaq_data, 'nasdaq_data.csv')
-        print(f"NASDAQ data updated with real-time EMA calculation, {len(nasdaq_data)} observations")
-    else:
-        # Fall back to FRED data if real-time fails
-        print("Falling back to FRED for NASDAQ data")
-        fred_nasdaq_data = fetch_fred_data('NASDAQCOM')
-        
-        if not fred_nasdaq_data.empty:
-            # Calculate percent change
-            fred_nasdaq_data = fred_nasdaq_data.sort_values('date')
-            fred_nasdaq_data['pct_change'] = fred_nasdaq_data['value'].pct_change() * 100
-            
-            nasdaq_data = fred_nasdaq_data
-            save_data_to_csv(nasdaq_data, 'nasdaq_data.csv')
-            print(f"NASDAQ data updated from FRED with {len(nasdaq_data)} observations")
-        else:
-            print("Failed to fetch NASDAQ data from any source")
+job_postings_data = load_startup_series('job_postings')
 
 # Add Producer Price Index for Software Publishers from FRED (PCU511210511210)
-software_ppi_data = load_data_from_csv('software_ppi_data.csv')
-
-# If no existing data or data is old, fetch new data
-if software_ppi_data.empty or (datetime.now() - pd.to_datetime(software_ppi_data['date'].max())).days > 30:
-    software_ppi_data = fetch_fred_data('PCU511210511210')
-    
-    if not software_ppi_data.empty:
-        # Calculate year-over-year percent change
-        software_ppi_data = software_ppi_data.sort_values('date')
-        
-        # Create a dataframe shifted by 12 months to calculate YoY change
-        software_ppi_yoy = software_ppi_data.copy()
-        software_ppi_yoy['date'] = software_ppi_yoy['date'] + pd.DateOffset(years=1)
-        software_ppi_yoy = software_ppi_yoy.rename(columns={'value': 'year_ago_value'})
-        
-        # Merge current and year-ago values
-        software_ppi_data = pd.merge(
-            software_ppi_data, 
-            software_ppi_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
-        
-        # Calculate YoY percent change
-        software_ppi_data['yoy_pct_change'] = ((software_ppi_data['value'] - software_ppi_data['year_ago_value']) / 
-                                              software_ppi_data['year_ago_value'] * 100)
-        
-        # Save data
-        save_data_to_csv(software_ppi_data, 'software_ppi_data.csv')
-        
-        print(f"Software PPI data updated with {len(software_ppi_data)} observations")
-    else:
-        print("Failed to fetch Software PPI data")
+software_ppi_data = load_startup_series('software_ppi')
 
 # Add Producer Price Index for Data Processing Services from FRED (PCU5112105112105)
-data_processing_ppi_data = load_data_from_csv('data_processing_ppi_data.csv')
+data_processing_ppi_data = load_startup_series('data_ppi')
 
-# If no existing data or data is old, fetch new data
-if data_processing_ppi_data.empty or (datetime.now() - pd.to_datetime(data_processing_ppi_data['date'].max())).days > 30:
-    data_processing_ppi_data = fetch_fred_data('PCU5112105112105')
-    
-    if not data_processing_ppi_data.empty:
-        # Calculate year-over-year percent change
-        data_processing_ppi_data = data_processing_ppi_data.sort_values('date')
+# Add PCEPI (Personal Consumption Expenditures: Chain-type Price Index) data
+pcepi_data = load_startup_series('pcepi')
+
+# Add VIX volatility index data
+vix_data = load_startup_series('vix')
+
+# Re-fetch stale series. Runs at import in the default mode, and on the first
+# request (see refresh_dashboard_data) when importing lazily or from the snapshot.
+def refresh_stale_data():
+    """Fetch every startup series that is missing or older than its update interval"""
+    global gdp_data, pce_data, unemployment_data, inflation_data, interest_rate_data
+    global treasury_yield_data, nasdaq_data, consumer_sentiment_data, job_postings_data
+    global software_ppi_data, data_processing_ppi_data, pcepi_data, vix_data
+
+    # If no existing data or data is old, fetch NASDAQ data with EMA calculation
+    if nasdaq_data.empty or (datetime.now() - pd.to_datetime(nasdaq_data['date'].max())).days > 1:
+        # Try to get real-time data with EMA first
+        new_nasdaq_data = fetch_nasdaq_with_ema()
+    
+        if not new_nasdaq_data.empty and 'gap_pct' in new_nasdaq_data.columns:
+            nasdaq_data = new_nasdaq_data
+            save_data_to_csv(nasdaq_data, 'nasdaq_data.csv')
+            print(f"NASDAQ data updated with real-time EMA calculation, {len(nasdaq_data)} observations")
+        else:
+            # Fall back to FRED data if real-time fails
+            print("Falling back to FRED for NASDAQ data")
+            fred_nasdaq_data = fetch_fred_data('NASDAQCOM')
+        
+            if not fred_nasdaq_data.empty:
+                # Calculate percent change
+                fred_nasdaq_data = fred_nasdaq_data.sort_values('date')
+                fred_nasdaq_data['pct_change'] = fred_nasdaq_data['value'].pct_change() * 100
+            
+                nasdaq_data = fred_nasdaq_data
+                save_data_to_csv(nasdaq_data, 'nasdaq_data.csv')
+                print(f"NASDAQ data updated from FRED with {len(nasdaq_data)} observations")
+            else:
+                print("Failed to fetch NASDAQ data from any source")
+
+    # If no existing data or data is old, fetch new data
+    if software_ppi_data.empty or (datetime.now() - pd.to_datetime(software_ppi_data['date'].max())).days > 30:
+        software_ppi_data = fetch_fred_data('PCU511210511210')
+    
+        if not software_ppi_data.empty:
+            # Calculate year-over-year percent change
+            software_ppi_data = software_ppi_data.sort_values('date')
+        
+            # Create a dataframe shifted by 12 months to calculate YoY change
+            software_ppi_yoy = software_ppi_data.copy()
+            software_ppi_yoy['date'] = software_ppi_yoy['date'] + pd.DateOffset(years=1)
+            software_ppi_yoy = software_ppi_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            software_ppi_data = pd.merge(
+                software_ppi_data, 
+                software_ppi_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        # Create a dataframe shifted by 12 months to calculate YoY change
-        data_ppi_yoy = data_processing_ppi_data.copy()
-        data_ppi_yoy['date'] = data_ppi_yoy['date'] + pd.DateOffset(years=1)
-        data_ppi_yoy = data_ppi_yoy.rename(columns={'value': 'year_ago_value'})
+            # Calculate YoY percent change
+            software_ppi_data['yoy_pct_change'] = ((software_ppi_data['value'] - software_ppi_data['year_ago_value']) / 
+                                                  software_ppi_data['year_ago_value'] * 100)
         
-        # Merge current and year-ago values
-        data_processing_ppi_data = pd.merge(
-            data_processing_ppi_data, 
-            data_ppi_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
+            # Save data
+            save_data_to_csv(software_ppi_data, 'software_ppi_data.csv')
         
-        # Calculate YoY percent change
-        data_processing_ppi_data['yoy_pct_change'] = ((data_processing_ppi_data['value'] - data_processing_ppi_data['year_ago_value']) / 
-                                                     data_processing_ppi_data['year_ago_value'] * 100)
-        
-        # Save data
-        save_data_to_csv(data_processing_ppi_data, 'data_processing_ppi_data.csv')
+            print(f"Software PPI data updated with {len(software_ppi_data)} observations")
+        else:
+            print("Failed to fetch Software PPI data")
+
+    # If no existing data or data is old, fetch new data
+    if data_processing_ppi_data.empty or (datetime.now() - pd.to_datetime(data_processing_ppi_data['date'].max())).days > 30:
+        data_processing_ppi_data = fetch_fred_data('PCU5112105112105')
+    
+        if not data_processing_ppi_data.empty:
+            # Calculate year-over-year percent change
+            data_processing_ppi_data = data_processing_ppi_data.sort_values('date')
+        
+            # Create a dataframe shifted by 12 months to calculate YoY change
+            data_ppi_yoy = data_processing_ppi_data.copy()
+            data_ppi_yoy['date'] = data_ppi_yoy['date'] + pd.DateOffset(years=1)
+            data_ppi_yoy = data_ppi_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            data_processing_ppi_data = pd.merge(
+                data_processing_ppi_data, 
+                data_ppi_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        print(f"Data Processing PPI data updated with {len(data_processing_ppi_data)} observations")
-    else:
-        print("Failed to fetch Data Processing PPI data")
-
-# Fetch GDP data if needed
-if gdp_data.empty or (datetime.now() - pd.to_datetime(gdp_data['date'].max())).days > 90:
-    # Fetch real GDP (GDPC1)
-    gdp_temp = fetch_fred_data('GDPC1')
-    
-    if not gdp_temp.empty:
-        # Calculate year-over-year growth
-        gdp_temp = gdp_temp.sort_values('date')
+            # Calculate YoY percent change
+            data_processing_ppi_data['yoy_pct_change'] = ((data_processing_ppi_data['value'] - data_processing_ppi_data['year_ago_value']) / 
+                                                         data_processing_ppi_data['year_ago_value'] * 100)
         
-        # Create a dataframe shifted by 4 quarters to calculate YoY change (GDP is quarterly)
-        gdp_yoy = gdp_temp.copy()
-        gdp_yoy['date'] = gdp_yoy['date'] + pd.DateOffset(months=12)
-        gdp_yoy = gdp_yoy.rename(columns={'value': 'year_ago_value'})
+            # Save data
+            save_data_to_csv(data_processing_ppi_data, 'data_processing_ppi_data.csv')
         
-        # Merge current and year-ago values
-        gdp_data = pd.merge(
-            gdp_temp, 
-            gdp_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
-        
-        # Calculate YoY growth
-        gdp_data['yoy_growth'] = ((gdp_data['value'] - gdp_data['year_ago_value']) / 
-                                 gdp_data['year_ago_value'] * 100)
+            print(f"Data Processing PPI data updated with {len(data_processing_ppi_data)} observations")
+        else:
+            print("Failed to fetch Data Processing PPI data")
+
+    # Fetch GDP data if needed
+    if gdp_data.empty or (datetime.now() - pd.to_datetime(gdp_data['date'].max())).days > 90:
+        # Fetch real GDP (GDPC1)
+        gdp_temp = fetch_fred_data('GDPC1')
+    
+        if not gdp_temp.empty:
+            # Calculate year-over-year growth
+            gdp_temp = gdp_temp.sort_values('date')
+        
+            # Create a dataframe shifted by 4 quarters to calculate YoY change (GDP is quarterly)
+            gdp_yoy = gdp_temp.copy()
+            gdp_yoy['date'] = gdp_yoy['date'] + pd.DateOffset(months=12)
+            gdp_yoy = gdp_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            gdp_data = pd.merge(
+                gdp_temp, 
+                gdp_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        # Save data
-        save_data_to_csv(gdp_data, 'gdp_data.csv')
+            # Calculate YoY growth
+            gdp_data['yoy_growth'] = ((gdp_data['value'] - gdp_data['year_ago_value']) / 
+                                     gdp_data['year_ago_value'] * 100)
         
-        print(f"GDP data updated with {len(gdp_data)} observations")
-    else:
-        print("Failed to fetch GDP data")
-
-# Fetch unemployment data if needed
-if unemployment_data.empty or (datetime.now() - pd.to_datetime(unemployment_data['date'].max())).days > 30:
-    # Fetch unemployment rate (UNRATE)
-    unemployment_data = fetch_fred_data('UNRATE')
-    
-    if not unemployment_data.empty:
-        # Save data
-        save_data_to_csv(unemployment_data, 'unemployment_data.csv')
+            # Save data
+            save_data_to_csv(gdp_data, 'gdp_data.csv')
         
-        print(f"Unemployment data updated with {len(unemployment_data)} observations")
-    else:
-        print("Failed to fetch unemployment data")
+            print(f"GDP data updated with {len(gdp_data)} observations")
+        else:
+            print("Failed to fetch GDP data")
 
-# Fetch inflation data if needed
-if inflation_data.empty or (datetime.now() - pd.to_datetime(inflation_data['date'].max())).days > 30:
-    # Fetch CPI (CPIAUCSL)
-    cpi_temp = fetch_fred_data('CPIAUCSL')
+    # Fetch unemployment data if needed
+    if unemployment_data.empty or (datetime.now() - pd.to_datetime(unemployment_data['date'].max())).days > 30:
+        # Fetch unemployment rate (UNRATE)
+        unemployment_data = fetch_fred_data('UNRATE')
     
-    if not cpi_temp.empty:
-        # Calculate year-over-year inflation
-        cpi_temp = cpi_temp.sort_values('date')
-        
-        # Create a dataframe shifted by 12 months to calculate YoY change
-        cpi_yoy = cpi_temp.copy()
-        cpi_yoy['date'] = cpi_yoy['date'] + pd.DateOffset(months=12)
-        cpi_yoy = cpi_yoy.rename(columns={'value': 'year_ago_value'})
-        
-        # Merge current and year-ago values
-        inflation_data = pd.merge(
-            cpi_temp, 
-            cpi_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
+        if not unemployment_data.empty:
+            # Save data
+            save_data_to_csv(unemployment_data, 'unemployment_data.csv')
         
-        # Calculate YoY inflation
-        inflation_data['inflation'] = ((inflation_data['value'] - inflation_data['year_ago_value']) / 
-                                      inflation_data['year_ago_value'] * 100)
+            print(f"Unemployment data updated with {len(unemployment_data)} observations")
+        else:
+            print("Failed to fetch unemployment data")
+
+    # Fetch inflation data if needed
+    if inflation_data.empty or (datetime.now() - pd.to_datetime(inflation_data['date'].max())).days > 30:
+        # Fetch CPI (CPIAUCSL)
+        cpi_temp = fetch_fred_data('CPIAUCSL')
+    
+        if not cpi_temp.empty:
+            # Calculate year-over-year inflation
+            cpi_temp = cpi_temp.sort_values('date')
+        
+            # Create a dataframe shifted by 12 months to calculate YoY change
+            cpi_yoy = cpi_temp.copy()
+            cpi_yoy['date'] = cpi_yoy['date'] + pd.DateOffset(months=12)
+            cpi_yoy = cpi_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            inflation_data = pd.merge(
+                cpi_temp, 
+                cpi_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        # Save data
-        save_data_to_csv(inflation_data, 'inflation_data.csv')
+            # Calculate YoY inflation
+            inflation_data['inflation'] = ((inflation_data['value'] - inflation_data['year_ago_value']) / 
+                                          inflation_data['year_ago_value'] * 100)
         
-        print(f"Inflation data updated with {len(inflation_data)} observations")
-    else:
-        print("Failed to fetch inflation data")
-
-# Fetch interest rate data if needed
-if interest_rate_data.empty or (datetime.now() - pd.to_datetime(interest_rate_data['date'].max())).days > 7:
-    # Fetch Federal Funds Rate (FEDFUNDS)
-    interest_rate_data = fetch_fred_data('FEDFUNDS')
-    
-    if not interest_rate_data.empty:
-        # Save data
-        save_data_to_csv(interest_rate_data, 'interest_rate_data.csv')
+            # Save data
+            save_data_to_csv(inflation_data, 'inflation_data.csv')
         
-        print(f"Interest rate data updated with {len(interest_rate_data)} observations")
-    else:
-        print("Failed to fetch interest rate data")
+            print(f"Inflation data updated with {len(inflation_data)} observations")
+        else:
+            print("Failed to fetch inflation data")
 
-# Fetch 10-Year Treasury yield data if needed
-if treasury_yield_data.empty or (datetime.now() - pd.to_datetime(treasury_yield_data['date'].max())).days > 7:
-    # Fetch 10-Year Treasury Constant Maturity Rate (DGS10)
-    treasury_yield_data = fetch_fred_data('DGS10')
+    # Fetch interest rate data if needed
+    if interest_rate_data.empty or (datetime.now() - pd.to_datetime(interest_rate_data['date'].max())).days > 7:
+        # Fetch Federal Funds Rate (FEDFUNDS)
+        interest_rate_data = fetch_fred_data('FEDFUNDS')
     
-    if not treasury_yield_data.empty:
-        # Save data
-        save_data_to_csv(treasury_yield_data, 'treasury_yield_data.csv')
+        if not interest_rate_data.empty:
+            # Save data
+            save_data_to_csv(interest_rate_data, 'interest_rate_data.csv')
         
-        print(f"Treasury yield data updated with {len(treasury_yield_data)} observations")
-    else:
-        print("Failed to fetch treasury yield data")
+            print(f"Interest rate data updated with {len(interest_rate_data)} observations")
+        else:
+            print("Failed to fetch interest rate data")
 
-# Add Personal Consumption Expenditures (PCE) data
-if pce_data.empty or (datetime.now() - pd.to_datetime(pce_data['date'].max() if not pce_data.empty else '2000-01-01')).days > 30:
-    # Fetch PCE data (PCE)
-    pce_temp = fetch_fred_data('PCE')
+    # Fetch 10-Year Treasury yield data if needed
+    if treasury_yield_data.empty or (datetime.now() - pd.to_datetime(treasury_yield_data['date'].max())).days > 7:
+        # Fetch 10-Year Treasury Constant Maturity Rate (DGS10)
+        treasury_yield_data = fetch_fred_data('DGS10')
     
-    if not pce_temp.empty:
-        # Calculate year-over-year growth
-        pce_temp = pce_temp.sort_values('date')
-        
-        # Create a dataframe shifted by 12 months to calculate YoY change
-        pce_yoy = pce_temp.copy()
-        pce_yoy['date'] = pce_yoy['date'] + pd.DateOffset(months=12)
-        pce_yoy = pce_yoy.rename(columns={'value': 'year_ago_value'})
-        
-        # Merge current and year-ago values
-        pce_data = pd.merge(
-            pce_temp, 
-            pce_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
-        
-        # Calculate YoY growth
-        pce_data['yoy_growth'] = ((pce_data['value'] - pce_data['year_ago_value']) / 
-                               pce_data['year_ago_value'] * 100)
+        if not treasury_yield_data.empty:
+            # Save data
+            save_data_to_csv(treasury_yield_data, 'treasury_yield_data.csv')
         
-        # Save data
-        save_data_to_csv(pce_data, 'pce_data.csv')
+            print(f"Treasury yield data updated with {len(treasury_yield_data)} observations")
+        else:
+            print("Failed to fetch treasury yield data")
+
+    # Add Personal Consumption Expenditures (PCE) data
+    if pce_data.empty or (datetime.now() - pd.to_datetime(pce_data['date'].max() if not pce_data.empty else '2000-01-01')).days > 30:
+        # Fetch PCE data (PCE)
+        pce_temp = fetch_fred_data('PCE')
+    
+        if not pce_temp.empty:
+            # Calculate year-over-year growth
+            pce_temp = pce_temp.sort_values('date')
+        
+            # Create a dataframe shifted by 12 months to calculate YoY change
+            pce_yoy = pce_temp.copy()
+            pce_yoy['date'] = pce_yoy['date'] + pd.DateOffset(months=12)
+            pce_yoy = pce_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            pce_data = pd.merge(
+                pce_temp, 
+                pce_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        print(f"PCE data updated with {len(pce_data)} observations")
-    else:
-        print("Failed to fetch PCE data")
-
-# Add PCEPI (Personal Consumption Expenditures: Chain-type Price Index) data
-pcepi_data = load_data_from_csv('pcepi_data.csv')
-
-# If no existing data or data is old, fetch new data
-if pcepi_data.empty or (datetime.now() - pd.to_datetime(pcepi_data['date'].max() if not pcepi_data.empty else '2000-01-01')).days > 30:
-    # Fetch PCEPI data (PCEPI)
-    pcepi_temp = fetch_fred_data('PCEPI')
-    
-    if not pcepi_temp.empty:
-        # Calculate year-over-year growth
-        pcepi_temp = pcepi_temp.sort_values('date')
+            # Calculate YoY growth
+            pce_data['yoy_growth'] = ((pce_data['value'] - pce_data['year_ago_value']) / 
+                                   pce_data['year_ago_value'] * 100)
         
-        # Create a dataframe shifted by 12 months to calculate YoY change
-        pcepi_yoy = pcepi_temp.copy()
-        pcepi_yoy['date'] = pcepi_yoy['date'] + pd.DateOffset(months=12)
-        pcepi_yoy = pcepi_yoy.rename(columns={'value': 'year_ago_value'})
+            # Save data
+            save_data_to_csv(pce_data, 'pce_data.csv')
         
-        # Merge current and year-ago values
-        pcepi_data = pd.merge(
-            pcepi_temp, 
-            pcepi_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
+            print(f"PCE data updated with {len(pce_data)} observations")
+        else:
+            print("Failed to fetch PCE data")
+
+    # If no existing data or data is old, fetch new data
+    if pcepi_data.empty or (datetime.now() - pd.to_datetime(pcepi_data['date'].max() if not pcepi_data.empty else '2000-01-01')).days > 30:
+        # Fetch PCEPI data (PCEPI)
+        pcepi_temp = fetch_fred_data('PCEPI')
+    
+        if not pcepi_temp.empty:
+            # Calculate year-over-year growth
+            pcepi_temp = pcepi_temp.sort_values('date')
+        
+            # Create a dataframe shifted by 12 months to calculate YoY change
+            pcepi_yoy = pcepi_temp.copy()
+            pcepi_yoy['date'] = pcepi_yoy['date'] + pd.DateOffset(months=12)
+            pcepi_yoy = pcepi_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            pcepi_data = pd.merge(
+                pcepi_temp, 
+                pcepi_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        # Calculate YoY growth
-        pcepi_data['yoy_growth'] = ((pcepi_data['value'] - pcepi_data['year_ago_value']) / 
-                                  pcepi_data['year_ago_value'] * 100)
+            # Calculate YoY growth
+            pcepi_data['yoy_growth'] = ((pcepi_data['value'] - pcepi_data['year_ago_value']) / 
+                                      pcepi_data['year_ago_value'] * 100)
         
-        # Save data
-        save_data_to_csv(pcepi_data, 'pcepi_data.csv')
+            # Save data
+            save_data_to_csv(pcepi_data, 'pcepi_data.csv')
         
-        print(f"PCEPI data updated with {len(pcepi_data)} observations")
-    else:
-        print("Failed to fetch PCEPI data")
-
-# Add VIX volatility index data
-vix_data = load_data_from_csv('vix_data.csv')
+            print(f"PCEPI data updated with {len(pcepi_data)} observations")
+        else:
+            print("Failed to fetch PCEPI data")
 
-# Try to get recent data from Yahoo Finance first
-yahoo_vix_data = fetch_vix_from_yahoo()
+    # Try to get recent data from Yahoo Finance first
+    yahoo_vix_data = fetch_vix_from_yahoo()
 
-if not yahoo_vix_data.empty:
-    # If Yahoo Finance data is available, use it
-    logger.info("Using Yahoo Finance for recent VIX data")
+    if not yahoo_vix_data.empty:
+        # If Yahoo Finance data is available, use it
+        logger.info("Using Yahoo Finance for recent VIX data")
     
-    # If we already have some historical data from FRED, keep it and append the new data
-    if not vix_data.empty:
-        # Find the latest date in the Yahoo data we want to use
-        yahoo_latest_date = yahoo_vix_data['date'].max()
+        # If we already have some historical data from FRED, keep it and append the new data
+        if not vix_data.empty:
+            # Find the latest date in the Yahoo data we want to use
+            yahoo_latest_date = yahoo_vix_data['date'].max()
         
-        # Keep only FRED data older than our Yahoo data to avoid duplicates
-        vix_data = vix_data[vix_data['date'] < yahoo_latest_date - timedelta(days=1)]
+            # Keep only FRED data older than our Yahoo data to avoid duplicates
+            vix_data = vix_data[vix_data['date'] < yahoo_latest_date - timedelta(days=1)]
         
-        # Combine the datasets
-        combined_vix_data = pd.concat([vix_data, yahoo_vix_data])
-        vix_data = combined_vix_data
-    else:
-        # If no historical data, just use Yahoo data
-        vix_data = yahoo_vix_data
+            # Combine the datasets
+            combined_vix_data = pd.concat([vix_data, yahoo_vix_data])
+            vix_data = combined_vix_data
+        else:
+            # If no historical data, just use Yahoo data
+            vix_data = yahoo_vix_data
     
-    # Sort and save the combined data
-    vix_data = vix_data.sort_values('date')
-    save_data_to_csv(vix_data, 'vix_data.csv')
-    logger.info(f"VIX data updated with {len(vix_data)} observations combining Yahoo Finance and historical data")
+        # Sort and save the combined data
+        vix_data = vix_data.sort_values('date')
+        save_data_to_csv(vix_data, 'vix_data.csv')
+        logger.info(f"VIX data updated with {len(vix_data)} observations combining Yahoo Finance and historical data")
     
-elif vix_data.empty or (datetime.now() - pd.to_datetime(vix_data['date'].max())).days > 7:
-    # If Yahoo Finance failed and we have no data or old data, fall back to FRED
-    logger.info("Yahoo Finance VIX data retrieval failed, falling back to FRED data")
-    fred_vix_data = fetch_fred_data('VIXCLS')
+    elif vix_data.empty or (datetime.now() - pd.to_datetime(vix_data['date'].max())).days > 7:
+        # If Yahoo Finance failed and we have no data or old data, fall back to FRED
+        logger.info("Yahoo Finance VIX data retrieval failed, falling back to FRED data")
+        fred_vix_data = fetch_fred_data('VIXCLS')
     
-    if not fred_vix_data.empty:
-        # Save data
-        vix_data = fred_vix_data
-        save_data_to_csv(vix_data, 'vix_data.csv')
+        if not fred_vix_data.empty:
+            # Save data
+            vix_data = fred_vix_data
+            save_data_to_csv(vix_data, 'vix_data.csv')
         
-        logger.info(f"VIX data updated with {len(vix_data)} observations from FRED")
-    else:
-        logger.error("Failed to fetch VIX data from both Yahoo Finance and FRED")
+            logger.info(f"VIX data updated with {len(vix_data)} observations from FRED")
+        else:
+            logger.error("Failed to fetch VIX data from both Yahoo Finance and FRED")
 
-# Calculate 14-day EMA for VIX if we have data
-if not vix_data.empty and 'date' in vix_data.columns and 'value' in vix_data.columns:
-    # Sort data by date ascending (oldest to newest) for correct EMA calculation
-    vix_data = vix_data.sort_values('date')
-    
-    # Calculate 14-day EMA
-    vix_data['vix_ema14'] = vix_data['value'].ewm(span=14, adjust=False).mean()
+    # Calculate 14-day EMA for VIX if we have data
+    if not vix_data.empty and 'date' in vix_data.columns and 'value' in vix_data.columns:
+        # Sort data by date ascending (oldest to newest) for correct EMA calculation
+        vix_data = vix_data.sort_values('date')
     
-    # Sort back to newest first for reporting
-    vix_data = vix_data.sort_values('date', ascending=False)
+        # Calculate 14-day EMA
+        vix_data['vix_ema14'] = ema_series(vix_data['value'], span=14)
     
-    # Print the latest values
-    if len(vix_data) > 0:
-        latest_date = vix_data.iloc[0]['date']
-        latest_vix = vix_data.iloc[0]['value']
-        latest_ema = vix_data.iloc[0]['vix_ema14']
-        logger.info(f"VIX: {latest_vix:.2f} on {latest_date}, 14-day EMA: {latest_ema:.2f}")
+        # Sort back to newest first for reporting
+        vix_data = vix_data.sort_values('date', ascending=False)
     
-    # Save updated data with EMA
-    save_data_to_csv(vix_data, 'vix_data.csv')
-
-# Add Consumer Sentiment data
-if consumer_sentiment_data.empty or (datetime.now() - pd.to_datetime(consumer_sentiment_data['date'].max() if not consumer_sentiment_data.empty else '2000-01-01')).days > 30:
-    # Fetch Consumer Confidence Composite Index (USACSCICP02STSAM)
-    consumer_sentiment_temp = fetch_consumer_sentiment_data()
+        # Print the latest values
+        if len(vix_data) > 0:
+            latest_date = vix_data.iloc[0]['date']
+            latest_vix = vix_data.iloc[0]['value']
+            latest_ema = vix_data.iloc[0]['vix_ema14']
+            logger.info(f"VIX: {latest_vix:.2f} on {latest_date}, 14-day EMA: {latest_ema:.2f}")
     
-    if not consumer_sentiment_temp.empty:
-        consumer_sentiment_data = consumer_sentiment_temp
-        # Save data
-        save_data_to_csv(consumer_sentiment_data, 'consumer_sentiment_data.csv')
-        
-        logger.info(f"Consumer Sentiment data updated with {len(consumer_sentiment_data)} observations")
-    else:
-        logger.error("Failed to fetch Consumer Sentiment data")
+        # Save updated data with EMA
+        save_data_to_csv(vix_data, 'vix_data.csv')
 
-# Add Software Job Postings data
-if job_postings_data.empty or (datetime.now() - pd.to_datetime(job_postings_data['date'].max() if not job_postings_data.empty else '2000-01-01')).days > 7:
-    # Force a refresh to get the most recent data (should update more frequently than 30 days)
-    logger.info("Refreshing Software Job Postings data to get latest observations...")
-    # Fetch U.S. Software Job Postings on Indeed (IHLIDXUSTPSOFTDEVE)
-    job_postings_temp = fetch_fred_data('IHLIDXUSTPSOFTDEVE')
+    # Add Consumer Sentiment data
+    if consumer_sentiment_data.empty or (datetime.now() - pd.to_datetime(consumer_sentiment_data['date'].max() if not consumer_sentiment_data.empty else '2000-01-01')).days > 30:
+        # Fetch Consumer Confidence Composite Index (USACSCICP02STSAM)
+        consumer_sentiment_temp = fetch_consumer_sentiment_data()
     
-    if not job_postings_temp.empty:
-        # Calculate year-over-year growth
-        job_postings_temp = job_postings_temp.sort_values('date')
-        
-        # Create a dataframe shifted by 12 months to calculate YoY change
-        postings_yoy = job_postings_temp.copy()
-        postings_yoy['date'] = postings_yoy['date'] + pd.DateOffset(months=12)
-        postings_yoy = postings_yoy.rename(columns={'value': 'year_ago_value'})
+        if not consumer_sentiment_temp.empty:
+            consumer_sentiment_data = consumer_sentiment_temp
+            # Save data
+            save_data_to_csv(consumer_sentiment_data, 'consumer_sentiment_data.csv')
         
-        # Merge current and year-ago values
-        job_postings_data = pd.merge(
-            job_postings_temp, 
-            postings_yoy[['date', 'year_ago_value']], 
-            on='date', 
-            how='left'
-        )
+            logger.info(f"Consumer Sentiment data updated with {len(consumer_sentiment_data)} observations")
+        else:
+            logger.error("Failed to fetch Consumer Sentiment data")
+
+    # Add Software Job Postings data
+    if job_postings_data.empty or (datetime.now() - pd.to_datetime(job_postings_data['date'].max() if not job_postings_data.empty else '2000-01-01')).days > 7:
+        # Force a refresh to get the most recent data (should update more frequently than 30 days)
+        logger.info("Refreshing Software Job Postings data to get latest observations...")
+        # Fetch U.S. Software Job Postings on Indeed (IHLIDXUSTPSOFTDEVE)
+        job_postings_temp = fetch_fred_data('IHLIDXUSTPSOFTDEVE')
+    
+        if not job_postings_temp.empty:
+            # Calculate year-over-year growth
+            job_postings_temp = job_postings_temp.sort_values('date')
+        
+            # Create a dataframe shifted by 12 months to calculate YoY change
+            postings_yoy = job_postings_temp.copy()
+            postings_yoy['date'] = postings_yoy['date'] + pd.DateOffset(months=12)
+            postings_yoy = postings_yoy.rename(columns={'value': 'year_ago_value'})
+        
+            # Merge current and year-ago values
+            job_postings_data = pd.merge(
+                job_postings_temp, 
+                postings_yoy[['date', 'year_ago_value']], 
+                on='date', 
+                how='left'
+            )
         
-        # Calculate YoY growth
-        job_postings_data['yoy_growth'] = ((job_postings_data['value'] - job_postings_data['year_ago_value']) / 
-                              job_postings_data['year_ago_value'] * 100)
+            # Calculate YoY growth
+            job_postings_data['yoy_growth'] = ((job_postings_data['value'] - job_postings_data['year_ago_value']) / 
+                                  job_postings_data['year_ago_value'] * 100)
         
-        # Save data
-        save_data_to_csv(job_postings_data, 'job_postings_data.csv')
+            # Save data
+            save_data_to_csv(job_postings_data, 'job_postings_data.csv')
         
-        logger.info(f"Software Job Postings data updated with {len(job_postings_data)} observations")
-    else:
-        logger.error("Failed to fetch Software Job Postings data")
+            logger.info(f"Software Job Postings data updated with {len(job_postings_data)} observations")
+        else:
+            logger.error("Failed to fetch Software Job Postings data")
+
+# Publish the dashboard's data to the shared cache so chart callbacks can be
+# memoized on each dataset's version (republishing an unchanged frame is a no-op)
+def publish_dashboard_data():
+    """Push the current module-level data frames into data_cache"""
+    update_cache({
+        "gdp": gdp_data,
+        "pce": pce_data,
+        "unemployment": unemployment_data,
+        "job_postings": job_postings_data,
+        "cpi": inflation_data,
+        "pcepi": pcepi_data,
+        "nasdaq": nasdaq_data,
+        "software_ppi": software_ppi_data,
+        "data_ppi": data_processing_ppi_data,
+        "interest_rate": interest_rate_data,
+        "treasury_yield": treasury_yield_data,
+        "vix": vix_data,
+        "consumer_sentiment": consumer_sentiment_data
+    })
+
+# Rewrite the startup snapshot from the current frames so the next worker
+# can start from it
+def save_dashboard_snapshot():
+    """Write the module-level data frames, sector scores and Pulse history to the snapshot"""
+    series = {data_type: get_data(data_type) for data_type in dashboard_snapshot.SERIES_FILES}
+    sector_scores = sector_scorer.normalized_scores() if sector_scorer is not None else None
+    return dashboard_snapshot.write_snapshot(series, T2D_PULSE_HISTORY, sector_scores)
+
+# Set a frame from each series in a snapshot as the current module-level data
+def adopt_snapshot(snapshot):
+    """Replace the module-level data frames with the series from `snapshot`"""
+    global gdp_data, pce_data, unemployment_data, inflation_data, interest_rate_data
+    global treasury_yield_data, nasdaq_data, consumer_sentiment_data, job_postings_data
+    global software_ppi_data, data_processing_ppi_data, pcepi_data, vix_data
+    series = snapshot.series
+    gdp_data, pce_data = series['gdp'], series['pce']
+    unemployment_data, inflation_data = series['unemployment'], series['cpi']
+    interest_rate_data, treasury_yield_data = series['interest_rate'], series['treasury_yield']
+    nasdaq_data, consumer_sentiment_data = series['nasdaq'], series['consumer_sentiment']
+    job_postings_data, software_ppi_data = series['job_postings'], series['software_ppi']
+    data_processing_ppi_data, pcepi_data = series['data_ppi'], series['pcepi']
+    vix_data = series['vix']
+
+def refresh_dashboard_data():
+    """
+    Bring the startup series up to date, sharing the work between workers.
+
+    Workers take a file lock in turn. The first one re-fetches stale series and
+    rewrites the snapshot; the others find a snapshot refreshed within
+    STARTUP_REFRESH_INTERVAL_SECONDS and adopt it instead of calling the
+    upstream APIs again.
+    """
+    try:
+        with FileLock(STARTUP_REFRESH_LOCK_FILE):
+            snapshot = dashboard_snapshot.load_snapshot(max_age=STARTUP_REFRESH_INTERVAL_SECONDS)
+            if snapshot is not None and snapshot.has_series(dashboard_snapshot.SERIES_FILES):
+                logger.info("Using dashboard data refreshed by another worker")
+                adopt_snapshot(snapshot)
+                publish_dashboard_data()
+            else:
+                refresh_stale_data()
+                publish_dashboard_data()
+                save_dashboard_snapshot()
+    except Exception as e:
+        logger.error(f"Error refreshing dashboard data: {e}")
+
+_deferred_refresh_started = False
+_deferred_refresh_lock = threading.Lock()
+
+def _run_deferred_refresh():
+    try:
+        refresh_dashboard_data()
+    finally:
+        _deferred_refresh_lock.release()
+
+def start_deferred_refresh():
+    """
+    Run refresh_dashboard_data() in the background on the first request, and
+    again whenever a cached series has outlived its TTL (see data_cache.is_stale).
+    At most one refresh runs at a time.
+    """
+    global _deferred_refresh_started
+    if _deferred_refresh_started and not stale_data_types():
+        return
+    if not _deferred_refresh_lock.acquire(blocking=False):
+        return
+    _deferred_refresh_started = True
+    threading.Thread(target=_run_deferred_refresh, daemon=True).start()
+
+# In lazy mode (gunicorn workers, see wsgi.py) or when the data came from the
+# snapshot, importing the app makes no network calls: stale series are
+# refreshed in the background once the worker serves its first request.
+# Either way, series that go stale later are refreshed on the next request.
+server.before_request(start_deferred_refresh)
+if LAZY_IMPORT or STARTUP_FROM_SNAPSHOT:
+    publish_dashboard_data()
+else:
+    refresh_stale_data()
+    publish_dashboard_data()
+    save_dashboard_snapshot()
+    _deferred_refresh_started = True
 
 # Calculate initial sentiment index
 sentiment_index = calculate_sentiment_index()
@@ -3505,6 +3732,7 @@ def update_indicator_trends(n):
 
 # Update GDP Graph function (generates figure only)
 
+@memoize_on_data("gdp")
 def update_gdp_graph(n):
     """Generate the GDP chart figure"""
     if gdp_data.empty or 'yoy_growth' not in gdp_data.columns:
@@ -3615,6 +3843,7 @@ def update_gdp_graph(n):
     Output("gdp-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("gdp")
 def update_gdp_container(n):
     """Update the GDP container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3639,6 +3868,7 @@ def update_gdp_graph_callback(n):
 
 # Update PCE Graph (generates figure only)
 
+@memoize_on_data("pce")
 def update_pce_graph(n):
     """Generate the PCE chart figure"""
     if pce_data.empty or 'yoy_growth' not in pce_data.columns:
@@ -3742,6 +3972,7 @@ def update_pce_graph(n):
     Output("pce-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("pce")
 def update_pce_container(n):
     """Update the PCE container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3765,6 +3996,7 @@ def update_pce_graph_callback(n):
     return update_pce_graph(n)
 
 # Update Unemployment Graph (Figure only function)
+@memoize_on_data("unemployment")
 def update_unemployment_graph(n):
     """Generate the Unemployment Rate chart figure"""
     if unemployment_data.empty:
@@ -3833,6 +4065,7 @@ def update_unemployment_graph(n):
     Output("unemployment-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("unemployment")
 def update_unemployment_container(n):
     """Update the Unemployment container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3875,6 +4108,7 @@ def update_unemployment_container(n):
 
 # Software Job Postings Graph (Figure only function)
 
+@memoize_on_data("job_postings")
 def update_job_postings_graph(n):
     """Generate the Software Job Postings chart figure"""
     if job_postings_data.empty or 'yoy_growth' not in job_postings_data.columns:
@@ -4024,6 +4258,7 @@ def update_job_postings_graph(n):
     Output("job-postings-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("job_postings")
 def update_job_postings_container(n):
     """Update the Job Postings container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4065,6 +4300,7 @@ def update_job_postings_container(n):
         return [dcc.Graph(id="job-postings-graph", figure=figure)]
 
 # Update Inflation Graph (generates figure only)
+@memoize_on_data("cpi")
 def update_inflation_graph(n):
     """Generate the CPI inflation chart figure"""
     if inflation_data.empty or 'inflation' not in inflation_data.columns:
@@ -4156,6 +4392,7 @@ def update_inflation_graph(n):
     Output("inflation-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("cpi")
 def update_inflation_container(n):
     """Update the inflation container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4197,6 +4434,7 @@ def update_inflation_container(n):
         return [dcc.Graph(id="inflation-graph", figure=figure)]
 
 # Update PCEPI Graph (generates figure only)
+@memoize_on_data("pcepi")
 def update_pcepi_graph(n):
     """Generate the PCEPI inflation chart figure"""
     if pcepi_data.empty or 'yoy_growth' not in pcepi_data.columns:
@@ -4288,6 +4526,7 @@ def update_pcepi_graph(n):
     Output("pcepi-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("pcepi")
 def update_pcepi_container(n):
     """Update the PCEPI container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4329,6 +4568,7 @@ def update_pcepi_container(n):
         return [dcc.Graph(id="pcepi-graph", figure=figure)]
 
 # Update NASDAQ Graph (This function now only generates the figure)
+@memoize_on_data("nasdaq")
 def update_nasdaq_graph(n):
     """Generate the NASDAQ Composite chart figure"""
     if nasdaq_data.empty:
@@ -4439,6 +4679,7 @@ def update_nasdaq_graph(n):
     Output("nasdaq-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("nasdaq")
 def update_nasdaq_container(n):
     """Update the NASDAQ container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4480,6 +4721,7 @@ def update_nasdaq_container(n):
         return [dcc.Graph(id="nasdaq-graph", figure=figure)]
 
 # Update Software PPI Graph (Figure only function)
+@memoize_on_data("software_ppi")
 def update_software_ppi_graph(n):
     """Generate the Software Publishers PPI chart figure"""
     if software_ppi_data.empty or 'yoy_pct_change' not in software_ppi_data.columns:
@@ -4548,6 +4790,7 @@ def update_software_ppi_graph(n):
     Output("software-ppi-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("software_ppi")
 def update_software_ppi_container(n):
     """Update the Software PPI container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4589,6 +4832,7 @@ def update_software_ppi_container(n):
         return [dcc.Graph(id="software-ppi-graph", figure=figure)]
 
 # Update Data Processing PPI Graph (Figure only function)
+@memoize_on_data("data_ppi")
 def update_data_ppi_graph(n):
     """Generate the Data Processing Services PPI chart figure"""
     if data_processing_ppi_data.empty or 'yoy_pct_change' not in data_processing_ppi_data.columns:
@@ -4657,6 +4901,7 @@ def update_data_ppi_graph(n):
     Output("data-ppi-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("data_ppi")
 def update_data_ppi_container(n):
     """Update the Data Processing PPI container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4700,6 +4945,7 @@ def update_data_ppi_container(n):
         return [dcc.Graph(id="data-ppi-graph", figure=figure)]
 
 # Update Interest Rate Graph (generates figure only)
+@memoize_on_data("interest_rate")
 def update_interest_rate_graph(n):
     """Generate the Federal Funds Rate chart figure"""
     if interest_rate_data.empty:
@@ -4803,6 +5049,7 @@ def update_interest_rate_graph(n):
     Output("interest-rate-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("interest_rate")
 def update_interest_rate_container(n):
     """Update the Federal Funds Rate container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4848,6 +5095,7 @@ def update_interest_rate_container(n):
     Output("treasury-yield-graph", "figure"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("treasury_yield")
 def update_treasury_yield_graph(n):
     if treasury_yield_data.empty:
         return go.Figure().update_layout(
@@ -5007,6 +5255,7 @@ def update_treasury_yield_graph(n):
     Output("treasury-yield-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("treasury_yield")
 def update_treasury_yield_container(n):
     """Update the Treasury Yield container to include both the graph and insights panel"""
     # Get the chart figure
@@ -5263,12 +5512,14 @@ def apply_proprietary_data(n_clicks, weight, value, custom_weights, document_dat
     Output("consumer-sentiment-graph", "figure"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("consumer_sentiment")
 def update_consumer_sentiment_graph(n):
     """Generate the Consumer Sentiment chart figure"""
     # Create graph using the imported function
     global consumer_sentiment_data
     if consumer_sentiment_data is None or consumer_sentiment_data.empty:
         consumer_sentiment_data = load_data_from_csv('consumer_sentiment_data.csv')
+        set_data("consumer_sentiment", consumer_sentiment_data)
     return create_consumer_sentiment_graph(consumer_sentiment_data)
 
 # Consumer Sentiment Container
@@ -5276,11 +5527,13 @@ def update_consumer_sentiment_graph(n):
     Output("consumer-sentiment-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("consumer_sentiment")
 def update_consumer_sentiment_container(n):
     """Update the Consumer Sentiment container to include both the graph and insights panel"""
     global consumer_sentiment_data
     if consumer_sentiment_data is None or consumer_sentiment_data.empty:
         consumer_sentiment_data = load_data_from_csv('consumer_sentiment_data.csv')
+        set_data("consumer_sentiment", consumer_sentiment_data)
     
     # Create the graph
     graph = dcc.Graph(
@@ -5520,6 +5773,23 @@ def initialize_sentiment_index(_, custom_weights, document_data):
         else:
             category = "Bearish"
         return f"{authentic_score:.1f}", category
+
+    # PRIORITY 2: Until this worker has scored the sectors itself, use the
+    # latest sector scores saved in the startup snapshot
+    if sector_scorer is None and STARTUP_SNAPSHOT is not None and STARTUP_SNAPSHOT.sector_scores:
+        sector_scores_dict = STARTUP_SNAPSHOT.sector_scores
+        # Equal weights, as for freshly calculated sector scores below
+        equal_weight = 100.0 / len(sector_scores_dict)
+        sector_weights = {sector: equal_weight for sector in sector_scores_dict}
+        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, sector_weights)
+        print(f"INITIALIZATION: USING {len(sector_scores_dict)} SECTOR SCORES FROM THE STARTUP SNAPSHOT: {pulse_score}")
+        if pulse_score >= 60:
+            category = "Bullish"
+        elif pulse_score >= 30:
+            category = "Neutral"
+        else:
+            category = "Bearish"
+        return f"{pulse_score:.1f}", category
     
     # Check if it's a weekend to use the most recent market session data
     import pytz
@@ -5620,7 +5890,7 @@ def initialize_sentiment_index(_, custom_weights, document_data):
             sector_weights = {s['sector']: equal_weight for s in sector_scores}
         
         # Calculate the T2D Pulse score as weighted average of sector scores
-        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, sector_weights)
+        pulse_score = calculate_t2d_pulse_from_scorer(sector_weights)
         
         # Log what's happening
         print(f"Calculating T2D Pulse score from {len(sector_scores)} sector scores")
@@ -6108,6 +6378,7 @@ def apply_document_analysis(n_clicks, weight, contents, filename, custom_weights
         return None, error_message, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
 # Update VIX Graph (This function now only generates the figure)
+@memoize_on_data("vix")
 def update_vix_graph(n):
     """Generate the VIX chart figure"""
     if vix_data.empty:
@@ -6911,6 +7182,7 @@ def update_sector_sentiment_container(n):
     Output("vix-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("vix")
 def update_vix_container(n):
     """Update the VIX container to include both the graph and insights panel"""
     # Get the chart figure
@@ -7201,11 +7473,8 @@ def update_t2d_pulse_score(weights_json):
         if not sector_scores:
             return update_sentiment_gauge(50.0)
         
-        # Create a dictionary of sector scores for the pulse calculation
-        sector_scores_dict = {s['sector']: s['normalized_score'] for s in sector_scores}
-        
         # Calculate the T2D Pulse score 
-        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, weights)
+        pulse_score = calculate_t2d_pulse_from_scorer(weights)
         
         print(f"Updated T2D Pulse score to {pulse_score} based on weight changes")
         
@@ -7431,11 +7700,8 @@ def reset_weights(n_clicks):
     # Regular calculation for weekdays or as fallback
     sector_scores = calculate_sector_sentiment()
     if sector_scores:
-        # Create a dictionary of sector scores for the pulse calculation
-        sector_scores_dict = {s['sector']: s['normalized_score'] for s in sector_scores}
-        
         # Calculate the fresh T2D Pulse score with equal weights
-        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, equal_weights)
+        pulse_score = calculate_t2d_pulse_from_scorer(equal_weights)
         print(f"Reset T2D Pulse score to {pulse_score} with equal weights")
     else:
         # Default score if sector data isn't available
@@ -8189,16 +8455,19 @@ def auto_refresh_data():
             global interest_rate_data, pce_data, consumer_sentiment_data
             global software_ppi_data, data_ppi_data
             
-            # Get data from FRED API
-            gdp_data = fetch_fred_data(FRED_SERIES["gdp"])
-            unemployment_data = fetch_fred_data(FRED_SERIES["unemployment"])
-            inflation_data = fetch_fred_data(FRED_SERIES["cpi"])
-            pcepi_data = fetch_fred_data(FRED_SERIES["pcepi"])
-            interest_rate_data = fetch_fred_data(FRED_SERIES["interest_rate"])
-            pce_data = fetch_fred_data(FRED_SERIES["pce"])
-            software_ppi_data = fetch_fred_data(FRED_SERIES["software_ppi"])
-            data_ppi_data = fetch_fred_data(FRED_SERIES["data_ppi"])
-            consumer_sentiment_data = fetch_fred_data(FRED_SERIES["consumer_sentiment"])
+            # Get data from FRED API (all series requested concurrently)
+            fred = fetch_fred_series([FRED_SERIES[key] for key in (
+                "gdp", "unemployment", "cpi", "pcepi", "interest_rate", "pce",
+                "software_ppi", "data_ppi", "consumer_sentiment")])
+            gdp_data = fred[FRED_SERIES["gdp"]]
+            unemployment_data = fred[FRED_SERIES["unemployment"]]
+            inflation_data = fred[FRED_SERIES["cpi"]]
+            pcepi_data = fred[FRED_SERIES["pcepi"]]
+            interest_rate_data = fred[FRED_SERIES["interest_rate"]]
+            pce_data = fred[FRED_SERIES["pce"]]
+            software_ppi_data = fred[FRED_SERIES["software_ppi"]]
+            data_ppi_data = fred[FRED_SERIES["data_ppi"]]
+            consumer_sentiment_data = fred[FRED_SERIES["consumer_sentiment"]]
             
             # Get data from Yahoo Finance
             global treasury_yield_data, vix_data, nasdaq_data
@@ -8208,6 +8477,8 @@ def auto_refresh_data():
         
         # Fetch economic data from APIs
         fetch_economic_data()
+        publish_dashboard_data()
+        save_dashboard_snapshot()
         
         # Run daily sector data collection using Finnhub API
         try:
@@ -8227,8 +8498,7 @@ def auto_refresh_data():
         # Update T2D Pulse score
         if sector_scores:
             # Calculate the pulse score with current weights
-            sector_scores_dict = {s['sector']: s['normalized_score'] for s in sector_scores}
-            pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict)
+            pulse_score = calculate_t2d_pulse_from_scorer()
             logger.info(f"Auto-refresh: Updated T2D Pulse score to {pulse_score} on {eastern_date}")
             
             # Save the authentic pulse score to a file for future reference
@@ -0,0 +1,170 @@
+# asof_index.py
+# -----------------------------------------------------------
+# Shared point-in-time index for "value as of date D" lookups
+# -----------------------------------------------------------
+#
+# Each indicator is held as a date-sorted frame plus a numpy datetime64 array,
+# so the latest row on or before a date is one binary search instead of a
+# filter-and-sort over the whole DataFrame. Tables are immutable once built;
+# updates swap in a new table under the lock, so readers never block.
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+class AsOfTable:
+    """Date-sorted frame supporting O(log n) as-of lookups"""
+
+    def __init__(self, df, date_col='date'):
+        frame = df.copy()
+        frame[date_col] = pd.to_datetime(frame[date_col])
+        frame = frame.dropna(subset=[date_col])
+        # Stable sort so that, for duplicate dates, the last row wins
+        frame = frame.sort_values(date_col, kind='mergesort')
+        frame = frame.drop_duplicates(subset=[date_col], keep='last').reset_index(drop=True)
+
+        self.frame = frame
+        self.date_col = date_col
+        self.dates = frame[date_col].values.astype('datetime64[ns]')
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def columns(self):
+        return self.frame.columns
+
+    def position(self, date):
+        """Return the row position of the latest date on or before `date` (-1 if none)"""
+        target = np.datetime64(_naive(date), 'ns')
+        return int(np.searchsorted(self.dates, target, side='right')) - 1
+
+    def row(self, date):
+        """Return the latest row on or before `date`, or None"""
+        pos = self.position(date)
+        if pos < 0:
+            return None
+        return self.frame.iloc[pos]
+
+    def value(self, date, column='value'):
+        """Return `column` as of `date`, or None if there is no earlier observation"""
+        if column not in self.frame.columns:
+            return None
+        pos = self.position(date)
+        if pos < 0:
+            return None
+        return self.frame[column].iat[pos]
+
+    def positions(self, dates):
+        """Vectorised position(): row position as of each date (-1 if none)"""
+        targets = pd.DatetimeIndex([_naive(d) for d in dates]).values.astype('datetime64[ns]')
+        return np.searchsorted(self.dates, targets, side='right') - 1
+
+    def values(self, dates, column='value'):
+        """Vectorised value(): as-of values of `column` for each date (NaN if none)"""
+        pos = self.positions(dates)
+        col = self.frame[column].to_numpy(dtype=float)
+        if not len(col):
+            return np.full(len(pos), np.nan)
+        return np.where(pos >= 0, col[np.clip(pos, 0, None)], np.nan)
+
+    def series(self, column='value'):
+        """Return `column` as a pd.Series indexed by date"""
+        return pd.Series(self.frame[column].to_numpy(dtype=float),
+                         index=pd.DatetimeIndex(self.dates))
+
+def _naive(date):
+    """Return a tz-naive Timestamp for `date`"""
+    ts = pd.Timestamp(date)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts
+
+# ---------- Shared registry ----------
+# Entries are keyed by source as well as name: ('frame', name) for tables built
+# from in-memory DataFrames, ('csv', name, path) for CSV-backed ones. A frame
+# and a CSV published under the same indicator name never evict each other.
+_tables = {}   # key -> AsOfTable
+_sources = {}  # key -> source DataFrame, or (path, mtime) for CSV-backed tables
+_index_lock = threading.Lock()
+
+def _key(name, path=None):
+    if path is None:
+        return ('frame', name)
+    return ('csv', name, os.path.normpath(path))
+
+def update(name, df, date_col='date', path=None):
+    """Build and publish the table for `name` from a DataFrame
+
+    Pass `path` when `df` has just been saved to that CSV, so that later
+    from_csv() lookups treat the published table as current.
+    """
+    if df is None or df.empty or date_col not in df.columns:
+        return None
+    table = AsOfTable(df, date_col)
+    with _index_lock:
+        _tables[_key(name)] = table
+        _sources[_key(name)] = df
+        if path is not None and os.path.exists(path):
+            _tables[_key(name, path)] = table
+            _sources[_key(name, path)] = (path, os.path.getmtime(path))
+    return table
+
+def update_many(data_dict, names=None, paths=None, date_col='date'):
+    """Publish several frames at once, optionally renaming keys through `names`"""
+    for key, df in data_dict.items():
+        name = names.get(key, key) if names else key
+        path = paths.get(key) if paths else None
+        update(name, df, date_col, path)
+
+def get(name, path=None):
+    """Return the current table for `name` (the CSV-backed one when `path` is given), or None"""
+    return _tables.get(_key(name, path))
+
+def from_frame(name, df, date_col='date'):
+    """Return the table for `name`, rebuilding only if `df` is a different object"""
+    key = _key(name)
+    table = _tables.get(key)
+    if table is not None and _sources.get(key) is df:
+        return table
+    return update(name, df, date_col)
+
+def from_csv(name, path, date_col='date'):
+    """Return the table for `name` backed by a CSV, reloading when the file changes"""
+    key = _key(name, path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _tables.get(key)
+
+    if _sources.get(key) == (path, mtime) and key in _tables:
+        return _tables[key]
+
+    df = pd.read_csv(path)
+    if date_col not in df.columns:
+        return None
+    table = AsOfTable(df, date_col)
+    with _index_lock:
+        _tables[key] = table
+        _sources[key] = (path, mtime)
+    return table
+
+def value_as_of(name, date, column='value', path=None):
+    """Return `column` of indicator `name` as of `date`, or None"""
+    table = get(name, path)
+    if table is None:
+        return None
+    return table.value(date, column)
+
+def invalidate(name=None):
+    """Drop one indicator's tables (or all tables) so the next lookup reloads them"""
+    with _index_lock:
+        if name is None:
+            _tables.clear()
+            _sources.clear()
+        else:
+            for key in [key for key in _tables if key[1] == name]:
+                _tables.pop(key, None)
+                _sources.pop(key, None)
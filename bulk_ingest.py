@@ -0,0 +1,167 @@
+# bulk_ingest.py
+# -----------------------------------------------------------
+# Bulk DataFrame writers for the Postgres history tables
+# -----------------------------------------------------------
+#
+# Rows are streamed into a temporary staging table with COPY FROM STDIN (one
+# round trip for the whole frame, encoded in chunks so large frames are never
+# materialised as a single CSV string), then merged into the target table
+# with INSERT ... SELECT ... ON CONFLICT. This replaces row-at-a-time INSERTs,
+# executemany() and DataFrame.to_sql for history rebuilds.
+#
+# Functions accept a psycopg2 connection or a SQLAlchemy Connection (the
+# underlying DBAPI connection is used) and run inside the caller's transaction.
+
+import io
+import itertools
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_ROWS = 50000  # Rows encoded per chunk while streaming to COPY
+
+_staging_names = itertools.count(1)
+
+class DataFrameCSVStream(io.TextIOBase):
+    """Read-only file object that yields a DataFrame as CSV, chunk by chunk"""
+
+    def __init__(self, df, chunk_rows=COPY_CHUNK_ROWS):
+        self._df = df
+        self._chunk_rows = chunk_rows
+        self._offset = 0
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def _next_chunk(self):
+        if self._offset >= len(self._df):
+            return ""
+        chunk = self._df.iloc[self._offset:self._offset + self._chunk_rows]
+        self._offset += self._chunk_rows
+        return chunk.to_csv(index=False, header=False, na_rep="")
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self._buffer]
+            while True:
+                chunk = self._next_chunk()
+                if not chunk:
+                    break
+                parts.append(chunk)
+            self._buffer = ""
+            return "".join(parts)
+
+        while len(self._buffer) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        while "\n" not in self._buffer:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buffer += chunk
+        end = self._buffer.find("\n") + 1 or len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        return line
+
+def _dbapi_connection(conn):
+    """Return the DBAPI connection behind a SQLAlchemy Connection (or `conn` itself)"""
+    if hasattr(conn, "cursor"):
+        return conn
+    return conn.connection
+
+def _quote(name):
+    """Quote an SQL identifier"""
+    return '"' + name.replace('"', '""') + '"'
+
+def stage_dataframe(cursor, df, like_table=None, column_types=None, chunk_rows=COPY_CHUNK_ROWS):
+    """
+    COPY a DataFrame into a new temporary staging table.
+
+    The table is dropped at the end of the transaction.
+
+    Args:
+        cursor: psycopg2 cursor
+        df (pd.DataFrame): Rows to stage; column names are used as-is
+        like_table (str, optional): Copy column definitions from this table
+        column_types (dict, optional): {column: SQL type}, required if like_table is omitted
+        chunk_rows (int): Rows encoded per chunk
+
+    Returns:
+        str: Name of the staging table
+    """
+    staging = f"_staging_{next(_staging_names)}"
+    if like_table is not None:
+        cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {like_table} INCLUDING DEFAULTS) ON COMMIT DROP")
+    else:
+        columns_sql = ", ".join(f"{_quote(col)} {column_types[col]}" for col in df.columns)
+        cursor.execute(f"CREATE TEMP TABLE {staging} ({columns_sql}) ON COMMIT DROP")
+
+    columns_sql = ", ".join(_quote(col) for col in df.columns)
+    cursor.copy_expert(
+        f"COPY {staging} ({columns_sql}) FROM STDIN WITH (FORMAT csv)",
+        DataFrameCSVStream(df, chunk_rows),
+    )
+    return staging
+
+def copy_upsert(conn, df, table, key_columns=None, update_columns=None, chunk_rows=COPY_CHUNK_ROWS):
+    """
+    Bulk insert or update a DataFrame into `table`.
+
+    Args:
+        conn: psycopg2 connection or SQLAlchemy Connection
+        df (pd.DataFrame): Rows to write; columns must match the table's
+        table (str): Target table
+        key_columns (list, optional): Conflict target (a unique/primary key).
+            Without it rows are appended with a plain COPY.
+        update_columns (list, optional): Columns to overwrite on conflict
+            (default: every non-key column; empty list means DO NOTHING)
+        chunk_rows (int): Rows encoded per chunk
+
+    Returns:
+        int: Number of rows inserted or updated
+    """
+    if df is None or df.empty:
+        return 0
+
+    columns = list(df.columns)
+    columns_sql = ", ".join(_quote(col) for col in columns)
+    raw = _dbapi_connection(conn)
+    with raw.cursor() as cursor:
+        if not key_columns:
+            cursor.copy_expert(
+                f"COPY {table} ({columns_sql}) FROM STDIN WITH (FORMAT csv)",
+                DataFrameCSVStream(df, chunk_rows),
+            )
+            logger.info(f"Copied {len(df)} rows into {table}")
+            return len(df)
+
+        # ON CONFLICT cannot touch the same row twice in one statement
+        df = df.drop_duplicates(subset=key_columns, keep="last")
+        staging = stage_dataframe(cursor, df, like_table=table, chunk_rows=chunk_rows)
+
+        if update_columns is None:
+            update_columns = [col for col in columns if col not in key_columns]
+        if update_columns:
+            action = "DO UPDATE SET " + ", ".join(
+                f"{_quote(col)} = EXCLUDED.{_quote(col)}" for col in update_columns)
+        else:
+            action = "DO NOTHING"
+
+        cursor.execute(
+            f"INSERT INTO {table} ({columns_sql}) SELECT {columns_sql} FROM {staging} "
+            f"ON CONFLICT ({', '.join(_quote(col) for col in key_columns)}) {action}"
+        )
+        merged = cursor.rowcount
+    logger.info(f"Merged {merged} rows into {table}")
+    return merged
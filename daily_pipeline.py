@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# daily_pipeline.py
+# -----------------------------------------------------------
+# The 17:00 daily refresh as one dependency graph (see pipeline.py)
+# -----------------------------------------------------------
+#
+#   macro_<series> (x10) ─────────────────────────────────────┬──> sector_scores ──> pulse
+#   ticker_prices ──> market_caps ──> sector_caps ──> ema_factors ┘                      │
+#                                          └──> export_market_caps                       v
+#   macro_<series> + pulse ──────────────────────────────────────────────> dashboard_snapshot
+#
+# Node outputs carry the market date where they describe one, so a new
+# day's rows always reach the nodes that export them.
+#
+# The macro series and the ticker branch run in parallel. The macro fetchers
+# and ticker_prices run every time (the macro fetchers skip series with no
+# release due, see release_calendar.py); every other node reruns only if
+# what it depends on changed, so e.g. a day where only VIX moved rescores the
+# sectors without recomputing market caps.
+
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+import calculate_authentic_pulse
+import dashboard_snapshot
+import market_cap_ingest
+import parallel_data_fetcher
+import sentiment_engine
+import update_sector_history
+from config import EMA_SPAN, EMA_NORMALIZATION_FACTOR, SECTOR_NAME_MAP, DASHBOARD_SNAPSHOT_PATH
+from ema_kernel import ema_frame
+from pipeline import Pipeline
+
+# --- Nodes ---
+
+def collect_ticker_prices(date):
+    """Polygon closing prices on `date` and share counts for every tracked ticker"""
+    tickers = sorted({ticker for tickers in market_cap_ingest.load_sectors().values() for ticker in tickers})
+    share_counts = market_cap_ingest.ensure_share_counts(tickers, market_cap_ingest.load_share_counts())
+    market_cap_ingest.collect_prices(tickers, date)
+    rows = market_cap_ingest.query("SELECT ticker, price FROM ticker_prices WHERE date = ?", (date,))
+    return {
+        "date": date,
+        "prices": {row["ticker"]: row["price"] for row in rows},
+        "share_counts": {ticker: share_counts.get(ticker) for ticker in tickers},
+    }
+
+def _by_date(rows, key, date):
+    """Query rows as a Series of market caps named by their date"""
+    return pd.Series({row[key]: row["market_cap"] for row in rows}, name=date, dtype=float)
+
+def compute_market_caps(ticker_prices, date):
+    """Market cap of every ticker with a price on `date`"""
+    market_cap_ingest.calculate_market_caps(date)
+    rows = market_cap_ingest.query("SELECT ticker, market_cap FROM ticker_market_caps WHERE date = ?", (date,))
+    return _by_date(rows, "ticker", date)
+
+def compute_sector_caps(market_caps, date):
+    """Total market cap of every sector on `date`"""
+    market_cap_ingest.calculate_sector_market_caps(date)
+    rows = market_cap_ingest.query("SELECT sector, market_cap FROM sector_market_caps WHERE date = ?", (date,))
+    return _by_date(rows, "sector", date)
+
+def compute_ema_factors(sector_caps, date, span=EMA_SPAN):
+    """
+    Sector EMA factors from the sector market cap history up to `date`.
+
+    The factor is the day-on-day change of each sector's EMA, with
+    +/- EMA_NORMALIZATION_FACTOR percent mapped to +/- 1 (as in
+    sector_ema_integration.get_sector_ema_factors).
+
+    Returns:
+        dict: {sector: factor in [-1, 1]}
+    """
+    rows = market_cap_ingest.query(
+        "SELECT sector, date, market_cap FROM sector_market_caps WHERE date <= ? ORDER BY date", (date,))
+    if not rows:
+        return {}
+    history = pd.DataFrame([dict(row) for row in rows]).pivot(index="date", columns="sector", values="market_cap")
+    if len(history) < 2:
+        return {}
+    emas = ema_frame(history.sort_index(), span, ignore_na=True)
+    percent_change = (emas.iloc[-1] / emas.iloc[-2] - 1) * 100
+    factors = (percent_change / EMA_NORMALIZATION_FACTOR).clip(-1, 1).dropna()
+    return {SECTOR_NAME_MAP.get(sector, sector): float(factor) for sector, factor in factors.items()}
+
+def score_sectors(ema_factors, date, **macro):
+    """
+    Score every sector from the latest macro indicators and its EMA factor,
+    and record the scores in the authentic sector history for `date`.
+
+    The macro series are read through sentiment_engine's indicator files
+    (the macro_* nodes write them), so **macro only carries the dependency.
+
+    Returns:
+        dict: {sector: raw score in [-1, 1]}
+    """
+    day = pd.Timestamp(date)
+    macros = {}
+    for indicator, series in sentiment_engine.load_indicator_history().items():
+        series = series[series.index <= day].dropna()
+        if not series.empty:
+            macros[indicator] = float(series.iloc[-1])
+    # Sectors without market cap history get the usual small positive bias
+    macros["Sector_EMA_Factor"] = [[ema_factors.get(sector, 0.05) for sector in sentiment_engine.SECTORS]]
+
+    raw_scores = sentiment_engine.score_sectors_matrix(macros)[0]
+    scores = [{"sector": sector, "score": float(score)} for sector, score in zip(sentiment_engine.SECTORS, raw_scores)]
+    if not update_sector_history.update_authentic_sector_history(scores, force_date=date):
+        raise RuntimeError(f"Could not update the authentic sector history for {date}")
+    return {score["sector"]: score["score"] for score in scores}
+
+def compute_pulse(sector_scores):
+    """Recalculate the T2D Pulse history and current score from the sector history"""
+    pulse_df = calculate_authentic_pulse.calculate_pulse_scores_from_sectors()
+    if pulse_df is None or calculate_authentic_pulse.save_authentic_current_score() is None:
+        raise RuntimeError("Could not calculate the T2D Pulse score")
+    return pulse_df
+
+def export_market_caps(sector_caps):
+    """Write data/sector_market_caps.csv for the dashboard"""
+    market_cap_ingest.export_to_csv()
+
+def export_dashboard_snapshot(pulse, **macro):
+    """Rebuild the dashboard's startup snapshot"""
+    if not dashboard_snapshot.build_snapshot():
+        raise RuntimeError("Could not write the dashboard snapshot")
+
+# --- Graph ---
+
+def build_pipeline(date=None, cache_dir=None, max_workers=None):
+    """
+    The daily refresh graph for one market date.
+
+    Args:
+        date (str): Market date 'YYYY-MM-DD' (default: today in US/Eastern)
+        cache_dir (str): Pipeline cache root (default config.PIPELINE_CACHE_DIR)
+        max_workers (int): Nodes run at once (default config.PIPELINE_MAX_WORKERS)
+
+    Returns:
+        Pipeline
+    """
+    date = date or datetime.now(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d')
+    pipeline = Pipeline("daily", cache_dir=cache_dir, max_workers=max_workers)
+
+    macro_nodes = []
+    for data_type, fetch in parallel_data_fetcher.FETCH_FUNCTIONS.items():
+        name = f"macro_{data_type}"
+        pipeline.add(name, fetch, outputs=[parallel_data_fetcher.DATA_FILES[data_type]], always=True)
+        macro_nodes.append(name)
+    # Indicator files the scores read that no macro node writes (job postings, PPI)
+    other_indicator_files = sorted(set(sentiment_engine.HISTORICAL_FILES.values())
+                                   - set(parallel_data_fetcher.DATA_FILES.values()))
+
+    pipeline.add("ticker_prices", collect_ticker_prices, params={"date": date}, always=True)
+    pipeline.add("market_caps", compute_market_caps, deps=["ticker_prices"], params={"date": date})
+    pipeline.add("sector_caps", compute_sector_caps, deps=["market_caps"], params={"date": date})
+    pipeline.add("ema_factors", compute_ema_factors, deps=["sector_caps"], params={"date": date})
+    pipeline.add("sector_scores", score_sectors, deps=macro_nodes + ["ema_factors"], params={"date": date},
+                 files=other_indicator_files, outputs=[calculate_authentic_pulse.SECTOR_HISTORY_PATH])
+    pipeline.add("pulse", compute_pulse, deps=["sector_scores"],
+                 outputs=["data/t2d_pulse_history.csv", "data/current_pulse_score.txt"])
+    pipeline.add("export_market_caps", export_market_caps, deps=["sector_caps"],
+                 outputs=["data/sector_market_caps.csv"])
+    pipeline.add("dashboard_snapshot", export_dashboard_snapshot, deps=macro_nodes + ["pulse"],
+                 outputs=[DASHBOARD_SNAPSHOT_PATH])
+    return pipeline
+
+def main():
+    """Run the daily refresh pipeline"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the daily refresh as a dependency graph')
+    parser.add_argument('--date', help='Market date to collect (YYYY-MM-DD, default: today in US/Eastern)')
+    parser.add_argument('--only', nargs='+', metavar='NODE', help='Only bring these nodes (and what they depend on) up to date')
+    parser.add_argument('--force', nargs='+', default=[], metavar='NODE', help='Rerun these nodes even if their inputs are unchanged')
+    parser.add_argument('--workers', type=int, help='Nodes run at once')
+    args = parser.parse_args()
+
+    market_cap_ingest.migrate()
+    pipeline = build_pipeline(args.date, max_workers=args.workers)
+    results = pipeline.run(args.only, force=args.force)
+    for name, result in results.items():
+        print(f"  {name:<28} {result.status:<8} {result.seconds:.2f}s")
+    return all(result.status in ("ran", "cached") for result in results.values())
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
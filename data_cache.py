@@ -1,31 +1,155 @@
 import pandas as pd
 import threading
+import time
+import itertools
+from collections import namedtuple
+from types import MappingProxyType
 
-# Global data cache dictionary with thread lock for thread safety
-_data_cache = {}
+from config import (UPDATE_FREQUENCIES, CACHE_TTL_SECONDS, CACHE_DEFAULT_TTL_SECONDS,
+                    CACHE_MEMORY_BUDGET_MB, CACHE_PINNED_DATA_TYPES)
+
+# One cached dataset: the data plus its version, fetch time, frequency and size
+CacheEntry = namedtuple('CacheEntry', ['data', 'version', 'fetched_at', 'frequency', 'nbytes'])
+
+# Entries live in an immutable mapping that writers replace wholesale under the
+# lock (copy-on-write). Readers just grab the current reference, so they never
+# take the lock and always see a consistent snapshot.
+_entries = MappingProxyType({})
+_last_access = {}
 _cache_lock = threading.Lock()
+_versions = itertools.count(1)
+_cache_version = 0
+
+def _estimate_nbytes(data):
+    """Approximate the in-memory size of a cached object"""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        try:
+            return int(data.memory_usage(deep=True).sum())
+        except Exception:
+            return 0
+    return 0
+
+def _ttl_for(frequency):
+    """Return the TTL in seconds for a dataset frequency"""
+    return CACHE_TTL_SECONDS.get(frequency, CACHE_DEFAULT_TTL_SECONDS)
+
+def _evict(entries, keep=()):
+    """Drop least recently used datasets until the cache fits the memory budget
+
+    Datasets in `keep` and the pinned primary series (CACHE_PINNED_DATA_TYPES)
+    are never dropped, since nothing would fetch them again on a miss.
+    """
+    budget = CACHE_MEMORY_BUDGET_MB * 1024 * 1024
+    total = sum(entry.nbytes for entry in entries.values())
+    if total <= budget:
+        return entries
+    candidates = [k for k in entries if k not in keep and k not in CACHE_PINNED_DATA_TYPES]
+    for data_type in sorted(candidates, key=lambda k: _last_access.get(k, 0)):
+        if total <= budget:
+            break
+        total -= entries[data_type].nbytes
+        del entries[data_type]
+        _last_access.pop(data_type, None)
+    return entries
+
+def _store(updates, frequency=None, fetched_at=None):
+    """Publish new entries for every dataset in `updates` (caller holds the lock)"""
+    global _entries, _cache_version
+    now = time.time()
+    entries = dict(_entries)
+    for data_type, data in updates.items():
+        current = entries.get(data_type)
+        if current is not None and current.data is data:
+            # Same object republished: the data was re-checked and is current, so
+            # restart its TTL but keep its version so dependants stay cached
+            entries[data_type] = current._replace(
+                fetched_at=fetched_at if fetched_at is not None else now)
+            _last_access[data_type] = now
+            continue
+        version = next(_versions)
+        entries[data_type] = CacheEntry(
+            data=data,
+            version=version,
+            fetched_at=fetched_at if fetched_at is not None else now,
+            frequency=frequency or UPDATE_FREQUENCIES.get(data_type),
+            nbytes=_estimate_nbytes(data),
+        )
+        _last_access[data_type] = now
+        _cache_version = version
+    _entries = MappingProxyType(_evict(entries, keep=updates.keys()))
 
 # Function to get data from the cache
 def get_data(data_type):
     """Get data from the cache for a specific data type"""
-    with _cache_lock:
-        return _data_cache.get(data_type, pd.DataFrame())
+    entry = _entries.get(data_type)
+    if entry is None:
+        return pd.DataFrame()
+    _last_access[data_type] = time.time()
+    return entry.data
 
 # Function to set data in the cache
-def set_data(data_type, data):
-    """Set data in the cache for a specific data type"""
+def set_data(data_type, data, frequency=None, fetched_at=None):
+    """Set data in the cache for a specific data type, bumping its version"""
     with _cache_lock:
-        _data_cache[data_type] = data
+        _store({data_type: data}, frequency, fetched_at)
 
 # Function to get all data from the cache
 def get_all_data():
     """Get all data from the cache"""
-    with _cache_lock:
-        return _data_cache.copy()
+    return {data_type: entry.data for data_type, entry in _entries.items()}
 
 # Function to update the cache with multiple datasets
 def update_cache(data_dict):
     """Update the cache with multiple datasets"""
     with _cache_lock:
-        for data_type, data in data_dict.items():
-            _data_cache[data_type] = data
+        _store(data_dict)
+
+# Function to get a consistent, read-only view of every cache entry
+def snapshot():
+    """Return a read-only {data_type: CacheEntry} mapping without taking the lock"""
+    return _entries
+
+# Functions to check whether cached data has changed or gone stale
+def get_entry(data_type):
+    """Get the CacheEntry for a data type, or None"""
+    return _entries.get(data_type)
+
+def get_version(data_type=None):
+    """Get the version of one dataset, or of the cache as a whole (0 if never set)
+
+    Versions only increase, so callers can skip work when the version they
+    last saw is unchanged.
+    """
+    if data_type is None:
+        return _cache_version
+    entry = _entries.get(data_type)
+    return entry.version if entry is not None else 0
+
+def is_stale(data_type, now=None):
+    """Check whether a dataset is missing or older than its frequency's TTL"""
+    entry = _entries.get(data_type)
+    if entry is None:
+        return True
+    now = now if now is not None else time.time()
+    return now - entry.fetched_at > _ttl_for(entry.frequency)
+
+def stale_data_types(now=None):
+    """List cached data types whose TTL has expired, and pinned data types that are missing"""
+    entries = _entries
+    missing = [data_type for data_type in CACHE_PINNED_DATA_TYPES if data_type not in entries]
+    return [data_type for data_type in entries if is_stale(data_type, now)] + missing
+
+# Function to remove datasets from the cache
+def invalidate(data_type=None):
+    """Remove one dataset (or everything) from the cache"""
+    global _entries, _cache_version
+    with _cache_lock:
+        _cache_version = next(_versions)
+        if data_type is None:
+            _entries = MappingProxyType({})
+            _last_access.clear()
+        else:
+            entries = dict(_entries)
+            entries.pop(data_type, None)
+            _last_access.pop(data_type, None)
+            _entries = MappingProxyType(entries)
@@ -10,6 +10,8 @@ import pyarrow.parquet as pq
 from datetime import datetime
 import logging
 
+import ticker_dataset
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -154,31 +156,11 @@ def convert_market_data():
                 how='outer'
             )
             
-            # Get the last date with data for each ticker
-            latest_data = merged_df.groupby('ticker')['date'].max().reset_index()
-            latest_data = latest_data.rename(columns={'date': 'latest_date'})
-            
-            # Merge the latest date information back
-            merged_df = pd.merge(merged_df, latest_data, on='ticker', how='left')
-            
-            # Flag rows that have the latest data for each ticker
-            merged_df['is_latest'] = merged_df['date'] == merged_df['latest_date']
-            
-            # Remove the latest_date column
-            merged_df = merged_df.drop(columns=['latest_date'])
-            
-            # Convert to PyArrow table
-            table = pa.Table.from_pandas(merged_df)
-            
-            # Add schema version metadata
-            table = add_schema_version(table)
-            
-            # Write to Parquet, partitioned by ticker for efficient queries
-            pq.write_to_dataset(
-                table, 
-                root_path=os.path.join(MARKET_DIR, "ticker_data"), 
-                partition_cols=['ticker']
-            )
+            # Append to the per-ticker dataset, then merge each partition into one file
+            # (dedupes dates across runs and recomputes is_latest)
+            root = os.path.join(MARKET_DIR, "ticker_data")
+            ticker_dataset.append_rows(merged_df, root=root, compact_after=None)
+            ticker_dataset.compact(root, tickers=all_tickers)
             
             logging.info(f"Converted historical ticker data to Parquet dataset with {len(merged_df)} rows across {len(all_tickers)} tickers")
             return  # Early return since we successfully converted the data
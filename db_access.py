@@ -5,13 +5,20 @@ This module provides a standardized interface for accessing ticker, sector, and
 from the PostgreSQL database.
 """
 import os
+import time
+import threading
+import itertools
+from contextlib import contextmanager
 import pandas as pd
 import psycopg2
+from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 import logging
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterator
 from datetime import datetime, date, timedelta
 
+from bulk_ingest import stage_dataframe
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,8 +29,27 @@ logger = logging.getLogger(__name__)
 # Get database connection information from environment variables
 DB_URL = os.environ.get('DATABASE_URL')
 
+# Connection pool settings
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '10'))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '30000'))
+DB_POOL_WAIT_SECONDS = float(os.environ.get('DB_POOL_WAIT_SECONDS', '30'))  # Wait for a free connection
+DB_HEALTH_CHECK_SECONDS = 30      # Ping connections that have been idle longer than this
+STREAM_CHUNK_SIZE = 50000         # Rows per chunk for server-side cursor streaming
+
+_pool = None
+_pool_lock = threading.Lock()
+_last_used = {}                   # id(connection) -> time it was returned to the pool
+_cursor_names = itertools.count(1)
+# ThreadedConnectionPool.getconn() raises PoolError when every connection is
+# checked out; callers wait on this semaphore for one to be returned instead
+_checkouts = threading.BoundedSemaphore(DB_POOL_MAX)
+
 def get_db_connection():
-    """Get a connection to the PostgreSQL database"""
+    """Get a new (unpooled) connection to the PostgreSQL database
+
+    The caller owns the connection and must close it. Prefer db_connection().
+    """
     try:
         conn = psycopg2.connect(DB_URL)
         return conn
@@ -31,19 +57,104 @@ def get_db_connection():
         logger.error(f"Error connecting to database: {e}")
         raise
 
+def get_pool() -> pool.ThreadedConnectionPool:
+    """Get the shared threaded connection pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = pool.ThreadedConnectionPool(
+                DB_POOL_MIN, DB_POOL_MAX, DB_URL,
+                options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+                keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3,
+            )
+            logger.info(f"Created database connection pool ({DB_POOL_MIN}-{DB_POOL_MAX} connections)")
+        return _pool
+
+def close_pool():
+    """Close every pooled connection (e.g. before forking worker processes)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+        _last_used.clear()
+
+def _is_healthy(conn) -> bool:
+    """Check a pooled connection before handing it out"""
+    if conn.closed:
+        return False
+    if time.time() - _last_used.get(id(conn), 0) < DB_HEALTH_CHECK_SECONDS:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def _checkout(connection_pool):
+    """Get a healthy connection from the pool, discarding broken ones"""
+    for _ in range(DB_POOL_MAX):
+        conn = connection_pool.getconn()
+        if _is_healthy(conn):
+            return conn
+        logger.warning("Discarding broken pooled database connection")
+        _last_used.pop(id(conn), None)
+        connection_pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError(f"No healthy database connection after {DB_POOL_MAX} attempts")
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a connection from the pool for the duration of a `with` block.
+
+    The block runs as one transaction: it is committed on success and rolled
+    back on error. Broken connections are discarded instead of being returned.
+    When DB_POOL_MAX connections are already checked out, waits up to
+    DB_POOL_WAIT_SECONDS for one to be returned.
+    """
+    connection_pool = get_pool()
+    if not _checkouts.acquire(timeout=DB_POOL_WAIT_SECONDS):
+        raise pool.PoolError(f"No database connection free after {DB_POOL_WAIT_SECONDS:g}s "
+                             f"({DB_POOL_MAX} checked out)")
+    try:
+        conn = _checkout(connection_pool)
+    except BaseException:
+        _checkouts.release()
+        raise
+
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except BaseException as e:
+        broken = conn.closed or isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        if broken:
+            _last_used.pop(id(conn), None)
+        else:
+            _last_used[id(conn)] = time.time()
+        try:
+            connection_pool.putconn(conn, close=bool(broken))
+        finally:
+            _checkouts.release()
+
 def get_sectors() -> List[Dict[str, Any]]:
     """Get all sectors from the database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("SELECT id, name, description FROM sectors ORDER BY name")
-        sectors = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return sectors
+        with db_connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            
+            cursor.execute("SELECT id, name, description FROM sectors ORDER BY name")
+            sectors = cursor.fetchall()
+            
+            cursor.close()
+            
+            return sectors
     except Exception as e:
         logger.error(f"Error getting sectors: {e}")
         return []
@@ -51,16 +162,15 @@ def get_sectors() -> List[Dict[str, Any]]:
 def get_tickers() -> List[Dict[str, Any]]:
     """Get all tickers from the database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("SELECT id, symbol, name FROM tickers ORDER BY symbol")
-        tickers = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return tickers
+        with db_connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            
+            cursor.execute("SELECT id, symbol, name FROM tickers ORDER BY symbol")
+            tickers = cursor.fetchall()
+            
+            cursor.close()
+            
+            return tickers
     except Exception as e:
         logger.error(f"Error getting tickers: {e}")
         return []
@@ -76,37 +186,64 @@ def get_sector_tickers(sector_id: Optional[int] = None) -> List[Dict[str, Any]]:
         List of dictionaries with sector_id, ticker_id, sector_name, ticker_symbol
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        if sector_id is not None:
-            cursor.execute("""
-                SELECT ts.sector_id, ts.ticker_id, s.name as sector_name, t.symbol as ticker_symbol
-                FROM ticker_sectors ts
-                JOIN sectors s ON ts.sector_id = s.id
-                JOIN tickers t ON ts.ticker_id = t.id
-                WHERE ts.sector_id = %s
-                ORDER BY t.symbol
-            """, (sector_id,))
-        else:
-            cursor.execute("""
-                SELECT ts.sector_id, ts.ticker_id, s.name as sector_name, t.symbol as ticker_symbol
-                FROM ticker_sectors ts
-                JOIN sectors s ON ts.sector_id = s.id
-                JOIN tickers t ON ts.ticker_id = t.id
-                ORDER BY s.name, t.symbol
-            """)
-        
-        sector_tickers = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return sector_tickers
+        with db_connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            
+            if sector_id is not None:
+                cursor.execute("""
+                    SELECT ts.sector_id, ts.ticker_id, s.name as sector_name, t.symbol as ticker_symbol
+                    FROM ticker_sectors ts
+                    JOIN sectors s ON ts.sector_id = s.id
+                    JOIN tickers t ON ts.ticker_id = t.id
+                    WHERE ts.sector_id = %s
+                    ORDER BY t.symbol
+                """, (sector_id,))
+            else:
+                cursor.execute("""
+                    SELECT ts.sector_id, ts.ticker_id, s.name as sector_name, t.symbol as ticker_symbol
+                    FROM ticker_sectors ts
+                    JOIN sectors s ON ts.sector_id = s.id
+                    JOIN tickers t ON ts.ticker_id = t.id
+                    ORDER BY s.name, t.symbol
+                """)
+            
+            sector_tickers = cursor.fetchall()
+            
+            cursor.close()
+            
+            return sector_tickers
     except Exception as e:
         logger.error(f"Error getting sector tickers: {e}")
         return []
 
+def _ticker_market_caps_query(ticker_symbols: Optional[List[str]] = None,
+                              start_date: Optional[str] = None,
+                              end_date: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """Build the ticker market cap range query and its parameters"""
+    query = """
+        SELECT t.symbol as ticker_symbol, tmc.date, tmc.market_cap
+        FROM ticker_market_caps tmc
+        JOIN tickers t ON tmc.ticker_id = t.id
+        WHERE 1=1
+    """
+    params = []
+    
+    if ticker_symbols:
+        placeholders = ', '.join(['%s'] * len(ticker_symbols))
+        query += f" AND t.symbol IN ({placeholders})"
+        params.extend(ticker_symbols)
+    
+    if start_date:
+        query += " AND tmc.date >= %s"
+        params.append(start_date)
+    
+    if end_date:
+        query += " AND tmc.date <= %s"
+        params.append(end_date)
+    
+    query += " ORDER BY t.symbol, tmc.date"
+    return query, params
+
 def get_ticker_market_caps(ticker_symbols: Optional[List[str]] = None, 
                           start_date: Optional[str] = None,
                           end_date: Optional[str] = None) -> pd.DataFrame:
@@ -122,41 +259,46 @@ def get_ticker_market_caps(ticker_symbols: Optional[List[str]] = None,
         DataFrame with ticker_symbol, date, market_cap columns
     """
     try:
-        conn = get_db_connection()
-        
-        # Build the query with optional filters
-        query = """
-            SELECT t.symbol as ticker_symbol, tmc.date, tmc.market_cap
-            FROM ticker_market_caps tmc
-            JOIN tickers t ON tmc.ticker_id = t.id
-            WHERE 1=1
-        """
-        params = []
-        
-        if ticker_symbols:
-            placeholders = ', '.join(['%s'] * len(ticker_symbols))
-            query += f" AND t.symbol IN ({placeholders})"
-            params.extend(ticker_symbols)
-        
-        if start_date:
-            query += " AND tmc.date >= %s"
-            params.append(start_date)
-        
-        if end_date:
-            query += " AND tmc.date <= %s"
-            params.append(end_date)
-        
-        query += " ORDER BY t.symbol, tmc.date"
-        
-        # Execute the query and get results as a DataFrame
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        
-        return df
+        query, params = _ticker_market_caps_query(ticker_symbols, start_date, end_date)
+        with db_connection() as conn:
+            # Execute the query and get results as a DataFrame
+            return pd.read_sql_query(query, conn, params=params)
     except Exception as e:
         logger.error(f"Error getting ticker market caps: {e}")
         return pd.DataFrame()
 
+def iter_ticker_market_caps(ticker_symbols: Optional[List[str]] = None,
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream market cap data for large ticker/date ranges in chunks.
+
+    Uses a server-side (named) cursor, so only `chunk_size` rows are held in
+    memory at a time. The pooled connection is held until the iterator is
+    exhausted or closed.
+
+    Args:
+        ticker_symbols: Optional list of ticker symbols to filter by
+        start_date: Optional start date in YYYY-MM-DD format
+        end_date: Optional end date in YYYY-MM-DD format
+        chunk_size: Rows per DataFrame chunk
+
+    Yields:
+        DataFrames with ticker_symbol, date, market_cap columns
+    """
+    query, params = _ticker_market_caps_query(ticker_symbols, start_date, end_date)
+    columns = ['ticker_symbol', 'date', 'market_cap']
+    with db_connection() as conn:
+        with conn.cursor(name=f"ticker_market_caps_{next(_cursor_names)}") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=columns)
+
 def get_sector_market_caps(sector_names: Optional[List[str]] = None,
                           start_date: Optional[str] = None,
                           end_date: Optional[str] = None) -> pd.DataFrame:
@@ -172,37 +314,36 @@ def get_sector_market_caps(sector_names: Optional[List[str]] = None,
         DataFrame with sector_name, date, market_cap columns
     """
     try:
-        conn = get_db_connection()
-        
-        # Build the query with optional filters
-        query = """
-            SELECT s.name as sector_name, smc.date, smc.market_cap
-            FROM sector_market_caps smc
-            JOIN sectors s ON smc.sector_id = s.id
-            WHERE 1=1
-        """
-        params = []
-        
-        if sector_names:
-            placeholders = ', '.join(['%s'] * len(sector_names))
-            query += f" AND s.name IN ({placeholders})"
-            params.extend(sector_names)
-        
-        if start_date:
-            query += " AND smc.date >= %s"
-            params.append(start_date)
-        
-        if end_date:
-            query += " AND smc.date <= %s"
-            params.append(end_date)
-        
-        query += " ORDER BY s.name, smc.date"
-        
-        # Execute the query and get results as a DataFrame
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        
-        return df
+        with db_connection() as conn:
+            
+            # Build the query with optional filters
+            query = """
+                SELECT s.name as sector_name, smc.date, smc.market_cap
+                FROM sector_market_caps smc
+                JOIN sectors s ON smc.sector_id = s.id
+                WHERE 1=1
+            """
+            params = []
+            
+            if sector_names:
+                placeholders = ', '.join(['%s'] * len(sector_names))
+                query += f" AND s.name IN ({placeholders})"
+                params.extend(sector_names)
+            
+            if start_date:
+                query += " AND smc.date >= %s"
+                params.append(start_date)
+            
+            if end_date:
+                query += " AND smc.date <= %s"
+                params.append(end_date)
+            
+            query += " ORDER BY s.name, smc.date"
+            
+            # Execute the query and get results as a DataFrame
+            df = pd.read_sql_query(query, conn, params=params)
+            
+            return df
     except Exception as e:
         logger.error(f"Error getting sector market caps: {e}")
         return pd.DataFrame()
@@ -215,35 +356,34 @@ def get_latest_market_caps() -> Dict[str, float]:
         Dictionary mapping sector names to market cap values
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get the most recent date with data
-        cursor.execute("SELECT MAX(date) FROM sector_market_caps")
-        latest_date = cursor.fetchone()[0]
-        
-        if not latest_date:
-            logger.warning("No market cap data found in database")
-            return {}
-        
-        # Get all sector market caps for the latest date
-        cursor.execute("""
-            SELECT s.name, smc.market_cap
-            FROM sector_market_caps smc
-            JOIN sectors s ON smc.sector_id = s.id
-            WHERE smc.date = %s
-        """, (latest_date,))
-        
-        results = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        # Convert to dictionary
-        market_caps = {sector: market_cap for sector, market_cap in results}
-        
-        logger.info(f"Retrieved latest market caps from {latest_date}")
-        return market_caps
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get the most recent date with data
+            cursor.execute("SELECT MAX(date) FROM sector_market_caps")
+            latest_date = cursor.fetchone()[0]
+            
+            if not latest_date:
+                logger.warning("No market cap data found in database")
+                return {}
+            
+            # Get all sector market caps for the latest date
+            cursor.execute("""
+                SELECT s.name, smc.market_cap
+                FROM sector_market_caps smc
+                JOIN sectors s ON smc.sector_id = s.id
+                WHERE smc.date = %s
+            """, (latest_date,))
+            
+            results = cursor.fetchall()
+            
+            cursor.close()
+            
+            # Convert to dictionary
+            market_caps = {sector: market_cap for sector, market_cap in results}
+            
+            logger.info(f"Retrieved latest market caps from {latest_date}")
+            return market_caps
     except Exception as e:
         logger.error(f"Error getting latest market caps: {e}")
         return {}
@@ -256,31 +396,30 @@ def get_latest_sector_data() -> pd.DataFrame:
         DataFrame with sector_name, market_cap, sentiment_score columns
     """
     try:
-        conn = get_db_connection()
-        
-        # Get the most recent date with data
-        cursor = conn.cursor()
-        cursor.execute("SELECT MAX(date) FROM sector_market_caps")
-        latest_date = cursor.fetchone()[0]
-        
-        if not latest_date:
-            logger.warning("No market cap data found in database")
-            return pd.DataFrame()
-        
-        # Get all sector data for the latest date
-        query = """
-            SELECT s.name as sector_name, smc.market_cap, smc.sentiment_score
-            FROM sector_market_caps smc
-            JOIN sectors s ON smc.sector_id = s.id
-            WHERE smc.date = %s
-            ORDER BY s.name
-        """
-        
-        df = pd.read_sql_query(query, conn, params=(latest_date,))
-        conn.close()
-        
-        logger.info(f"Retrieved latest sector data from {latest_date}")
-        return df
+        with db_connection() as conn:
+            
+            # Get the most recent date with data
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(date) FROM sector_market_caps")
+            latest_date = cursor.fetchone()[0]
+            
+            if not latest_date:
+                logger.warning("No market cap data found in database")
+                return pd.DataFrame()
+            
+            # Get all sector data for the latest date
+            query = """
+                SELECT s.name as sector_name, smc.market_cap, smc.sentiment_score
+                FROM sector_market_caps smc
+                JOIN sectors s ON smc.sector_id = s.id
+                WHERE smc.date = %s
+                ORDER BY s.name
+            """
+            
+            df = pd.read_sql_query(query, conn, params=(latest_date,))
+            
+            logger.info(f"Retrieved latest sector data from {latest_date}")
+            return df
     except Exception as e:
         logger.error(f"Error getting latest sector data: {e}")
         return pd.DataFrame()
@@ -296,42 +435,41 @@ def get_sector_sparkline_data(days: int = 30) -> Dict[str, List[float]]:
         Dictionary mapping sector names to lists of market cap values
     """
     try:
-        conn = get_db_connection()
-        
-        # Calculate the start date
-        cursor = conn.cursor()
-        cursor.execute("SELECT MAX(date) FROM sector_market_caps")
-        latest_date = cursor.fetchone()[0]
-        
-        if not latest_date:
-            logger.warning("No market cap data found in database")
-            return {}
-        
-        start_date = latest_date - timedelta(days=days)
-        
-        # Get sector market caps for the date range
-        query = """
-            SELECT s.name as sector_name, smc.date, smc.market_cap
-            FROM sector_market_caps smc
-            JOIN sectors s ON smc.sector_id = s.id
-            WHERE smc.date BETWEEN %s AND %s
-            ORDER BY s.name, smc.date
-        """
-        
-        df = pd.read_sql_query(query, conn, params=(start_date, latest_date))
-        conn.close()
-        
-        if df.empty:
-            logger.warning(f"No sector market cap data found between {start_date} and {latest_date}")
-            return {}
-        
-        # Convert to dictionary of lists
-        sparkline_data = {}
-        for sector, group in df.groupby('sector_name'):
-            sparkline_data[sector] = group['market_cap'].tolist()
-        
-        logger.info(f"Retrieved sparkline data for {len(sparkline_data)} sectors")
-        return sparkline_data
+        with db_connection() as conn:
+            
+            # Calculate the start date
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(date) FROM sector_market_caps")
+            latest_date = cursor.fetchone()[0]
+            
+            if not latest_date:
+                logger.warning("No market cap data found in database")
+                return {}
+            
+            start_date = latest_date - timedelta(days=days)
+            
+            # Get sector market caps for the date range
+            query = """
+                SELECT s.name as sector_name, smc.date, smc.market_cap
+                FROM sector_market_caps smc
+                JOIN sectors s ON smc.sector_id = s.id
+                WHERE smc.date BETWEEN %s AND %s
+                ORDER BY s.name, smc.date
+            """
+            
+            df = pd.read_sql_query(query, conn, params=(start_date, latest_date))
+            
+            if df.empty:
+                logger.warning(f"No sector market cap data found between {start_date} and {latest_date}")
+                return {}
+            
+            # Convert to dictionary of lists
+            sparkline_data = {}
+            for sector, group in df.groupby('sector_name'):
+                sparkline_data[sector] = group['market_cap'].tolist()
+            
+            logger.info(f"Retrieved sparkline data for {len(sparkline_data)} sectors")
+            return sparkline_data
     except Exception as e:
         logger.error(f"Error getting sector sparkline data: {e}")
         return {}
@@ -349,33 +487,32 @@ def insert_ticker_market_cap(ticker_symbol: str, date_str: str, market_cap: floa
         True if successful, False otherwise
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get the ticker ID
-        cursor.execute("SELECT id FROM tickers WHERE symbol = %s", (ticker_symbol,))
-        result = cursor.fetchone()
-        
-        if not result:
-            logger.warning(f"Ticker {ticker_symbol} not found in database")
-            return False
-        
-        ticker_id = result[0]
-        
-        # Insert or update the market cap
-        cursor.execute("""
-            INSERT INTO ticker_market_caps (ticker_id, date, market_cap)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (ticker_id, date) 
-            DO UPDATE SET market_cap = EXCLUDED.market_cap
-        """, (ticker_id, date_str, market_cap))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        logger.info(f"Updated market cap for {ticker_symbol} on {date_str}: ${market_cap:,.2f}")
-        return True
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get the ticker ID
+            cursor.execute("SELECT id FROM tickers WHERE symbol = %s", (ticker_symbol,))
+            result = cursor.fetchone()
+            
+            if not result:
+                logger.warning(f"Ticker {ticker_symbol} not found in database")
+                return False
+            
+            ticker_id = result[0]
+            
+            # Insert or update the market cap
+            cursor.execute("""
+                INSERT INTO ticker_market_caps (ticker_id, date, market_cap)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (ticker_id, date) 
+                DO UPDATE SET market_cap = EXCLUDED.market_cap
+            """, (ticker_id, date_str, market_cap))
+            
+            conn.commit()
+            cursor.close()
+            
+            logger.info(f"Updated market cap for {ticker_symbol} on {date_str}: ${market_cap:,.2f}")
+            return True
     except Exception as e:
         logger.error(f"Error inserting ticker market cap: {e}")
         return False
@@ -395,44 +532,129 @@ def insert_sector_market_cap(sector_name: str, date_str: str, market_cap: float,
         True if successful, False otherwise
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get the sector ID
-        cursor.execute("SELECT id FROM sectors WHERE name = %s", (sector_name,))
-        result = cursor.fetchone()
-        
-        if not result:
-            logger.warning(f"Sector {sector_name} not found in database")
-            return False
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get the sector ID
+            cursor.execute("SELECT id FROM sectors WHERE name = %s", (sector_name,))
+            result = cursor.fetchone()
+            
+            if not result:
+                logger.warning(f"Sector {sector_name} not found in database")
+                return False
+            
+            sector_id = result[0]
+            
+            # Insert or update the market cap
+            if sentiment_score is not None:
+                cursor.execute("""
+                    INSERT INTO sector_market_caps (sector_id, date, market_cap, sentiment_score)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (sector_id, date) 
+                    DO UPDATE SET market_cap = EXCLUDED.market_cap, sentiment_score = EXCLUDED.sentiment_score
+                """, (sector_id, date_str, market_cap, sentiment_score))
+            else:
+                cursor.execute("""
+                    INSERT INTO sector_market_caps (sector_id, date, market_cap)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (sector_id, date) 
+                    DO UPDATE SET market_cap = EXCLUDED.market_cap
+                """, (sector_id, date_str, market_cap))
+            
+            conn.commit()
+            cursor.close()
+            
+            logger.info(f"Updated market cap for {sector_name} on {date_str}: ${market_cap:,.2f}")
+            return True
+    except Exception as e:
+        logger.error(f"Error inserting sector market cap: {e}")
+        return False
+
+def insert_ticker_market_caps(df: pd.DataFrame) -> int:
+    """
+    Bulk insert or update ticker market caps
+    
+    Args:
+        df: DataFrame with ticker_symbol, date, market_cap columns
         
-        sector_id = result[0]
+    Returns:
+        Number of rows written (rows for unknown tickers are skipped), or -1 on error
+    """
+    if df.empty:
+        return 0
+    try:
+        rows = df[['ticker_symbol', 'date', 'market_cap']].drop_duplicates(
+            subset=['ticker_symbol', 'date'], keep='last')
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                staging = stage_dataframe(cursor, rows, column_types={
+                    'ticker_symbol': 'TEXT', 'date': 'DATE', 'market_cap': 'DOUBLE PRECISION'})
+                cursor.execute(f"""
+                    INSERT INTO ticker_market_caps (ticker_id, date, market_cap)
+                    SELECT t.id, s.date, s.market_cap
+                    FROM {staging} s
+                    JOIN tickers t ON t.symbol = s.ticker_symbol
+                    ON CONFLICT (ticker_id, date) 
+                    DO UPDATE SET market_cap = EXCLUDED.market_cap
+                """)
+                written = cursor.rowcount
+        
+        if written < len(rows):
+            logger.warning(f"Skipped {len(rows) - written} market caps for tickers not in the database")
+        logger.info(f"Bulk updated {written} ticker market caps")
+        return written
+    except Exception as e:
+        logger.error(f"Error bulk inserting ticker market caps: {e}")
+        return -1
+
+def insert_sector_market_caps(df: pd.DataFrame) -> int:
+    """
+    Bulk insert or update sector market caps
+    
+    Args:
+        df: DataFrame with sector_name, date, market_cap and optional sentiment_score columns
         
-        # Insert or update the market cap
-        if sentiment_score is not None:
-            cursor.execute("""
-                INSERT INTO sector_market_caps (sector_id, date, market_cap, sentiment_score)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (sector_id, date) 
-                DO UPDATE SET market_cap = EXCLUDED.market_cap, sentiment_score = EXCLUDED.sentiment_score
-            """, (sector_id, date_str, market_cap, sentiment_score))
+    Returns:
+        Number of rows written (rows for unknown sectors are skipped), or -1 on error
+    """
+    if df.empty:
+        return 0
+    try:
+        has_sentiment = 'sentiment_score' in df.columns
+        columns = ['sector_name', 'date', 'market_cap'] + (['sentiment_score'] if has_sentiment else [])
+        rows = df[columns].drop_duplicates(subset=['sector_name', 'date'], keep='last')
+        column_types = {'sector_name': 'TEXT', 'date': 'DATE', 'market_cap': 'DOUBLE PRECISION',
+                        'sentiment_score': 'DOUBLE PRECISION'}
+        
+        if has_sentiment:
+            insert_columns = "sector_id, date, market_cap, sentiment_score"
+            select_columns = "sec.id, s.date, s.market_cap, s.sentiment_score"
+            updates = "market_cap = EXCLUDED.market_cap, sentiment_score = EXCLUDED.sentiment_score"
         else:
-            cursor.execute("""
-                INSERT INTO sector_market_caps (sector_id, date, market_cap)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (sector_id, date) 
-                DO UPDATE SET market_cap = EXCLUDED.market_cap
-            """, (sector_id, date_str, market_cap))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        logger.info(f"Updated market cap for {sector_name} on {date_str}: ${market_cap:,.2f}")
-        return True
+            insert_columns = "sector_id, date, market_cap"
+            select_columns = "sec.id, s.date, s.market_cap"
+            updates = "market_cap = EXCLUDED.market_cap"
+        
+        with db_connection() as conn:
+            with conn.cursor() as cursor:
+                staging = stage_dataframe(cursor, rows, column_types=column_types)
+                cursor.execute(f"""
+                    INSERT INTO sector_market_caps ({insert_columns})
+                    SELECT {select_columns}
+                    FROM {staging} s
+                    JOIN sectors sec ON sec.name = s.sector_name
+                    ON CONFLICT (sector_id, date) 
+                    DO UPDATE SET {updates}
+                """)
+                written = cursor.rowcount
+        
+        if written < len(rows):
+            logger.warning(f"Skipped {len(rows) - written} market caps for sectors not in the database")
+        logger.info(f"Bulk updated {written} sector market caps")
+        return written
     except Exception as e:
-        logger.error(f"Error inserting sector market cap: {e}")
-        return False
+        logger.error(f"Error bulk inserting sector market caps: {e}")
+        return -1
 
 def calculate_sector_market_caps(date_str: str) -> bool:
     """
@@ -445,62 +667,61 @@ def calculate_sector_market_caps(date_str: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = get_db_connection()
-        
-        # Get all sector-ticker relationships
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT s.id as sector_id, s.name as sector_name, t.id as ticker_id, t.symbol as ticker_symbol
-            FROM ticker_sectors ts
-            JOIN sectors s ON ts.sector_id = s.id
-            JOIN tickers t ON ts.ticker_id = t.id
-        """)
-        sector_tickers = cursor.fetchall()
-        
-        # Get all ticker market caps for the date
-        cursor.execute("""
-            SELECT ticker_id, market_cap
-            FROM ticker_market_caps
-            WHERE date = %s
-        """, (date_str,))
-        ticker_market_caps = {tid: mc for tid, mc in cursor.fetchall()}
-        
-        # Calculate sector market caps
-        sector_data = {}
-        for sector_id, sector_name, ticker_id, ticker_symbol in sector_tickers:
-            if sector_id not in sector_data:
-                sector_data[sector_id] = {
-                    'name': sector_name,
-                    'total_market_cap': 0,
-                    'tickers': []
-                }
-            
-            # Add the ticker market cap to the sector total
-            if ticker_id in ticker_market_caps:
-                market_cap = ticker_market_caps[ticker_id]
-                sector_data[sector_id]['total_market_cap'] += market_cap
-                sector_data[sector_id]['tickers'].append({
-                    'symbol': ticker_symbol,
-                    'market_cap': market_cap
-                })
-        
-        # Insert the sector market caps
-        success_count = 0
-        for sector_id, data in sector_data.items():
+        with db_connection() as conn:
+            
+            # Get all sector-ticker relationships
+            cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO sector_market_caps (sector_id, date, market_cap)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (sector_id, date) 
-                DO UPDATE SET market_cap = EXCLUDED.market_cap
-            """, (sector_id, date_str, data['total_market_cap']))
-            success_count += 1
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        logger.info(f"Calculated market caps for {success_count} sectors on {date_str}")
-        return True
+                SELECT s.id as sector_id, s.name as sector_name, t.id as ticker_id, t.symbol as ticker_symbol
+                FROM ticker_sectors ts
+                JOIN sectors s ON ts.sector_id = s.id
+                JOIN tickers t ON ts.ticker_id = t.id
+            """)
+            sector_tickers = cursor.fetchall()
+            
+            # Get all ticker market caps for the date
+            cursor.execute("""
+                SELECT ticker_id, market_cap
+                FROM ticker_market_caps
+                WHERE date = %s
+            """, (date_str,))
+            ticker_market_caps = {tid: mc for tid, mc in cursor.fetchall()}
+            
+            # Calculate sector market caps
+            sector_data = {}
+            for sector_id, sector_name, ticker_id, ticker_symbol in sector_tickers:
+                if sector_id not in sector_data:
+                    sector_data[sector_id] = {
+                        'name': sector_name,
+                        'total_market_cap': 0,
+                        'tickers': []
+                    }
+                
+                # Add the ticker market cap to the sector total
+                if ticker_id in ticker_market_caps:
+                    market_cap = ticker_market_caps[ticker_id]
+                    sector_data[sector_id]['total_market_cap'] += market_cap
+                    sector_data[sector_id]['tickers'].append({
+                        'symbol': ticker_symbol,
+                        'market_cap': market_cap
+                    })
+            
+            # Insert the sector market caps
+            success_count = 0
+            for sector_id, data in sector_data.items():
+                cursor.execute("""
+                    INSERT INTO sector_market_caps (sector_id, date, market_cap)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (sector_id, date) 
+                    DO UPDATE SET market_cap = EXCLUDED.market_cap
+                """, (sector_id, date_str, data['total_market_cap']))
+                success_count += 1
+            
+            conn.commit()
+            cursor.close()
+            
+            logger.info(f"Calculated market caps for {success_count} sectors on {date_str}")
+            return True
     except Exception as e:
         logger.error(f"Error calculating sector market caps: {e}")
         return False
@@ -513,31 +734,30 @@ def ensure_market_cap_consistency() -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get all dates with ticker market caps
-        cursor.execute("SELECT DISTINCT date FROM ticker_market_caps ORDER BY date")
-        dates = [row[0] for row in cursor.fetchall()]
-        
-        if not dates:
-            logger.warning("No ticker market cap data found")
-            return False
-        
-        # For each date, recalculate sector market caps
-        for date_str in dates:
-            # Check if we already have sector data for this date
-            cursor.execute("SELECT COUNT(*) FROM sector_market_caps WHERE date = %s", (date_str,))
-            count = cursor.fetchone()[0]
-            
-            # If we don't have sector data or we want to force recalculation
-            if count == 0:
-                logger.info(f"Calculating sector market caps for {date_str}")
-                calculate_sector_market_caps(date_str.strftime('%Y-%m-%d'))
-        
-        conn.close()
-        logger.info("Ensured market cap consistency for all dates")
-        return True
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get all dates with ticker market caps
+            cursor.execute("SELECT DISTINCT date FROM ticker_market_caps ORDER BY date")
+            dates = [row[0] for row in cursor.fetchall()]
+            
+            if not dates:
+                logger.warning("No ticker market cap data found")
+                return False
+            
+            # For each date, recalculate sector market caps
+            for date_str in dates:
+                # Check if we already have sector data for this date
+                cursor.execute("SELECT COUNT(*) FROM sector_market_caps WHERE date = %s", (date_str,))
+                count = cursor.fetchone()[0]
+                
+                # If we don't have sector data or we want to force recalculation
+                if count == 0:
+                    logger.info(f"Calculating sector market caps for {date_str}")
+                    calculate_sector_market_caps(date_str.strftime('%Y-%m-%d'))
+            
+            logger.info("Ensured market cap consistency for all dates")
+            return True
     except Exception as e:
         logger.error(f"Error ensuring market cap consistency: {e}")
         return False
\ No newline at end of file
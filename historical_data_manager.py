@@ -10,6 +10,7 @@ import json
 from datetime import datetime, timedelta
 import pytz
 import config
+import ticker_store
 from improved_finnhub_data_collector import (
     fetch_market_cap_finnhub,
     fetch_market_cap_yfinance,
@@ -25,6 +26,8 @@ DATA_DIR = 'data'
 HISTORICAL_PRICES_FILE = os.path.join(DATA_DIR, 'historical_ticker_prices.csv')
 HISTORICAL_MARKETCAP_FILE = os.path.join(DATA_DIR, 'historical_ticker_marketcap.csv')
 HISTORICAL_DATA_LOG = os.path.join(DATA_DIR, 'historical_data_log.json')
+HISTORICAL_CSV_SYNC_FILE = os.path.join(DATA_DIR, 'historical_csv_sync.json')  # CSV mtimes at the last merge
+TICKER_STORE_DIR = config.TICKER_STORE_DIR  # Canonical columnar store; the CSVs above are an optional export
 MIN_HISTORY_DAYS = 30
 
 # Ensure data directory exists
@@ -67,19 +70,106 @@ def initialize_historical_dataframes(all_tickers, start_date, end_date=None):
     # Create date range
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    # Create empty DataFrames with date index
-    price_df = pd.DataFrame(index=date_range.strftime('%Y-%m-%d'))
-    marketcap_df = pd.DataFrame(index=date_range.strftime('%Y-%m-%d'))
+    # Create empty DataFrames with date index and a column per ticker
+    index = pd.Index(date_range.strftime('%Y-%m-%d'), name='date')
+    price_df = pd.DataFrame(index=index, columns=all_tickers, dtype=float)
+    marketcap_df = pd.DataFrame(index=index, columns=all_tickers, dtype=float)
     
-    # Add columns for all tickers
-    for ticker in all_tickers:
-        price_df[ticker] = None
-        marketcap_df[ticker] = None
+    return price_df, marketcap_df
+
+def _csv_mtimes():
+    """Modification times of the legacy CSVs that exist"""
+    return {path: os.path.getmtime(path) for path in (HISTORICAL_PRICES_FILE, HISTORICAL_MARKETCAP_FILE)
+            if os.path.exists(path)}
+
+def _save_csv_sync_state():
+    """Remember the CSVs as merged"""
+    with open(HISTORICAL_CSV_SYNC_FILE, 'w') as f:
+        json.dump(_csv_mtimes(), f)
+
+def _read_wide_csv(path):
+    """Read a legacy wide CSV with 'YYYY-MM-DD' string dates as index, or None"""
+    if not os.path.exists(path):
+        return None
+    frame = pd.read_csv(path, index_col=0)
+    frame.index = pd.to_datetime(frame.index).strftime('%Y-%m-%d')
+    frame.index.name = 'date'
+    return frame.apply(pd.to_numeric, errors='coerce')
+
+def merge_legacy_csvs(price_df, marketcap_df):
+    """Merge values that other collectors wrote straight to the legacy CSVs into the store
+    
+    Several collectors still update historical_ticker_*.csv themselves. Whenever
+    the files changed since the last merge, every value they hold that the store
+    lacks is written to the store; values already in the store are kept.
     
+    Args:
+        price_df: Stored prices (dates × tickers)
+        marketcap_df: Stored market caps (dates × tickers)
+        
+    Returns:
+        tuple: (price_df, marketcap_df) including the merged values
+    """
+    mtimes = _csv_mtimes()
+    if not mtimes:
+        return price_df, marketcap_df
+    if os.path.exists(HISTORICAL_CSV_SYNC_FILE):
+        try:
+            with open(HISTORICAL_CSV_SYNC_FILE, 'r') as f:
+                if json.load(f) == mtimes:
+                    return price_df, marketcap_df
+        except (OSError, ValueError):
+            pass
+    
+    merged = []
+    new_values = []
+    for stored, path in ((price_df, HISTORICAL_PRICES_FILE), (marketcap_df, HISTORICAL_MARKETCAP_FILE)):
+        legacy = _read_wide_csv(path)
+        if legacy is None or legacy.empty:
+            merged.append(stored)
+            new_values.append(None)
+            continue
+        # Only cells the store has no value for
+        new_values.append(legacy.where(stored.reindex(index=legacy.index, columns=legacy.columns).isna()))
+        merged.append(stored.combine_first(legacy))
+    
+    written = ticker_store.write_rows(ticker_store.wide_to_long(*new_values), TICKER_STORE_DIR)
+    if written:
+        print(f"Merged {written} ticker-days from {HISTORICAL_PRICES_FILE} and {HISTORICAL_MARKETCAP_FILE} into {TICKER_STORE_DIR}")
+    _save_csv_sync_state()
+    return merged[0], merged[1]
+
+def read_historical_frames():
+    """Read the stored history as (price_df, marketcap_df) dates × tickers frames
+    
+    Legacy wide CSVs are imported into the columnar store the first time, and
+    values written to them since then are merged in (see merge_legacy_csvs).
+    
+    Returns:
+        tuple: (historical_price_df, historical_marketcap_df), or (None, None) if no data is stored
+    """
+    if ticker_store.is_empty(TICKER_STORE_DIR):
+        if not (os.path.exists(HISTORICAL_PRICES_FILE) and os.path.exists(HISTORICAL_MARKETCAP_FILE)):
+            return None, None
+        print(f"Importing {HISTORICAL_PRICES_FILE} and {HISTORICAL_MARKETCAP_FILE} into {TICKER_STORE_DIR}")
+        ticker_store.import_wide_csvs(HISTORICAL_PRICES_FILE, HISTORICAL_MARKETCAP_FILE, TICKER_STORE_DIR)
+        _save_csv_sync_state()
+    
+    price_df = ticker_store.read_wide('price', store_dir=TICKER_STORE_DIR)
+    marketcap_df = ticker_store.read_wide('market_cap', store_dir=TICKER_STORE_DIR)
+    price_df, marketcap_df = merge_legacy_csvs(price_df, marketcap_df)
+    
+    # Same dates in both frames, and a column for every stored or configured ticker
+    dates = price_df.index.union(marketcap_df.index)
+    stored = price_df.columns.union(marketcap_df.columns)
+    columns = list(stored) + [ticker for ticker in get_all_tickers() if ticker not in stored]
+    price_df = price_df.reindex(index=dates, columns=columns)
+    marketcap_df = marketcap_df.reindex(index=dates, columns=columns)
+    price_df.index.name = marketcap_df.index.name = 'date'
     return price_df, marketcap_df
 
 def load_historical_data():
-    """Load historical price and market cap data or create new if files don't exist
+    """Load historical price and market cap data or create new if no data is stored
     
     Returns:
         tuple: (historical_price_df, historical_marketcap_df, data_exists)
@@ -88,98 +178,75 @@ def load_historical_data():
     today = datetime.now()
     start_date = today - timedelta(days=MIN_HISTORY_DAYS)
     
-    # Check if files exist
-    price_exists = os.path.exists(HISTORICAL_PRICES_FILE)
-    marketcap_exists = os.path.exists(HISTORICAL_MARKETCAP_FILE)
+    try:
+        price_df, marketcap_df = read_historical_frames()
+    except Exception as e:
+        print(f"Error loading historical data: {e}")
+        # Create new dataframes if there was an error
+        price_df, marketcap_df = initialize_historical_dataframes(all_tickers, start_date)
+        return price_df, marketcap_df, False
     
-    if price_exists and marketcap_exists:
-        try:
-            # Load existing data
-            price_df = pd.read_csv(HISTORICAL_PRICES_FILE)
-            marketcap_df = pd.read_csv(HISTORICAL_MARKETCAP_FILE)
-            
-            # Ensure date column is present
-            if 'date' not in price_df.columns or 'date' not in marketcap_df.columns:
-                print("Error: Date column missing in historical data files")
-                price_df, marketcap_df = initialize_historical_dataframes(all_tickers, start_date)
-                return price_df, marketcap_df, False
-            
-            # Set date as index if it's not already
-            if price_df.index.name != 'date':
-                price_df.set_index('date', inplace=True)
-            
-            if marketcap_df.index.name != 'date':
-                marketcap_df.set_index('date', inplace=True)
-            
-            # Check for missing tickers and add them
-            for ticker in all_tickers:
-                if ticker not in price_df.columns:
-                    print(f"Adding new ticker {ticker} to historical price data")
-                    price_df[ticker] = None
-                
-                if ticker not in marketcap_df.columns:
-                    print(f"Adding new ticker {ticker} to historical market cap data")
-                    marketcap_df[ticker] = None
-            
-            # Check if we have at least MIN_HISTORY_DAYS of history
-            min_date = pd.to_datetime(price_df.index.min())
-            if min_date > start_date:
-                print(f"Historical data doesn't go back {MIN_HISTORY_DAYS} days, extending...")
-                # Create new dataframes with extended date range
-                new_price_df, new_marketcap_df = initialize_historical_dataframes(
-                    all_tickers, start_date, today
-                )
-                
-                # Merge existing data into new dataframes
-                for date in price_df.index:
-                    if date in new_price_df.index:
-                        for ticker in all_tickers:
-                            if ticker in price_df.columns:
-                                new_price_df.loc[date, ticker] = price_df.loc[date, ticker]
-                            if ticker in marketcap_df.columns:
-                                new_marketcap_df.loc[date, ticker] = marketcap_df.loc[date, ticker]
-                
-                price_df = new_price_df
-                marketcap_df = new_marketcap_df
-            
-            return price_df, marketcap_df, True
-            
-        except Exception as e:
-            print(f"Error loading historical data: {e}")
-            # Create new dataframes if there was an error
-            price_df, marketcap_df = initialize_historical_dataframes(all_tickers, start_date)
-            return price_df, marketcap_df, False
-    else:
-        # Create new dataframes if files don't exist
-        print("Historical data files not found, creating new ones...")
+    if price_df is None:
+        # Create new dataframes if nothing is stored yet
+        print("Historical data not found, creating new dataframes...")
         price_df, marketcap_df = initialize_historical_dataframes(all_tickers, start_date)
         return price_df, marketcap_df, False
+    
+    # Check if we have at least MIN_HISTORY_DAYS of history, extending with one reindex if not
+    if price_df.empty or pd.to_datetime(price_df.index.min()) > start_date:
+        print(f"Historical data doesn't go back {MIN_HISTORY_DAYS} days, extending...")
+        dates = price_df.index.union(pd.date_range(start=start_date, end=today, freq='D').strftime('%Y-%m-%d'))
+        price_df = price_df.reindex(dates)
+        marketcap_df = marketcap_df.reindex(dates)
+        price_df.index.name = marketcap_df.index.name = 'date'
+    
+    return price_df, marketcap_df, True
 
-def save_historical_data(price_df, marketcap_df):
-    """Save historical price and market cap data to CSV files
+def export_historical_csvs(price_df, marketcap_df):
+    """Write the legacy wide CSV files that older scripts still read
     
     Args:
         price_df: DataFrame with historical price data
         marketcap_df: DataFrame with historical market cap data
     """
+    price_df.to_csv(HISTORICAL_PRICES_FILE)
+    marketcap_df.to_csv(HISTORICAL_MARKETCAP_FILE)
+    _save_csv_sync_state()
+    print(f"Historical data exported to {HISTORICAL_PRICES_FILE} and {HISTORICAL_MARKETCAP_FILE}")
+
+def save_historical_data(price_df, marketcap_df, dates=None):
+    """Save historical price and market cap data to the columnar store
+    
+    Args:
+        price_df: DataFrame with historical price data
+        marketcap_df: DataFrame with historical market cap data
+        dates: Only store these dates (e.g. just today's); defaults to every date
+    """
     try:
         # Ensure the index is named 'date'
         price_df.index.name = 'date'
         marketcap_df.index.name = 'date'
         
-        # Save to CSV
-        price_df.to_csv(HISTORICAL_PRICES_FILE)
-        marketcap_df.to_csv(HISTORICAL_MARKETCAP_FILE)
+        if dates is not None:
+            dates = [date for date in dates if date in price_df.index or date in marketcap_df.index]
+            rows = ticker_store.wide_to_long(price_df.reindex(dates), marketcap_df.reindex(dates))
+        else:
+            rows = ticker_store.wide_to_long(price_df, marketcap_df)
+        written = ticker_store.write_rows(rows, TICKER_STORE_DIR)
+        
+        if config.HISTORICAL_CSV_EXPORT:
+            export_historical_csvs(price_df, marketcap_df)
         
         # Log the save
         log_data_update("Data saved successfully", {
+            "rows_written": written,
             "price_rows": len(price_df),
             "price_columns": len(price_df.columns),
             "marketcap_rows": len(marketcap_df),
             "marketcap_columns": len(marketcap_df.columns)
         })
         
-        print(f"Historical data saved to {HISTORICAL_PRICES_FILE} and {HISTORICAL_MARKETCAP_FILE}")
+        print(f"Historical data saved to {TICKER_STORE_DIR} ({written} ticker-days)")
     except Exception as e:
         print(f"Error saving historical data: {e}")
         log_data_update("Error saving data", {"error": str(e)})
@@ -288,8 +355,8 @@ def update_historical_data():
             updated_tickers["missing_market_cap"].append(ticker)
             print(f"Warning: No market cap data available for {ticker}")
     
-    # Save updated data
-    save_historical_data(price_df, marketcap_df)
+    # Save updated data (only today's rows are written to the store)
+    save_historical_data(price_df, marketcap_df, dates=[today])
     
     # Log results
     log_data_update("Data update completed", {
@@ -311,23 +378,14 @@ def verify_historical_data():
     
     # Load historical data
     try:
-        price_df = pd.read_csv(HISTORICAL_PRICES_FILE)
-        marketcap_df = pd.read_csv(HISTORICAL_MARKETCAP_FILE)
+        price_df, marketcap_df = read_historical_frames()
     except Exception as e:
-        issues.append(f"Error loading historical data files: {e}")
+        issues.append(f"Error loading historical data: {e}")
         return False, issues
     
-    # Check date column
-    if 'date' not in price_df.columns:
-        issues.append("Price data missing date column")
-    if 'date' not in marketcap_df.columns:
-        issues.append("Market cap data missing date column")
-    
-    # Set date as index if present
-    if 'date' in price_df.columns:
-        price_df.set_index('date', inplace=True)
-    if 'date' in marketcap_df.columns:
-        marketcap_df.set_index('date', inplace=True)
+    if price_df is None:
+        issues.append("No historical data stored")
+        return False, issues
     
     # Get all current tickers
     all_tickers = get_all_tickers()
@@ -341,6 +399,10 @@ def verify_historical_data():
     
     # Check for minimum history
     today = datetime.now()
+    if price_df.empty:
+        issues.append("Price data is empty")
+        return False, issues
+
     min_date = today - timedelta(days=MIN_HISTORY_DAYS)
     
     if pd.to_datetime(price_df.index.min()) > min_date:
@@ -415,11 +477,10 @@ def rebuild_historical_data():
     today = datetime.now()
     start_date = today - timedelta(days=MIN_HISTORY_DAYS)
     
-    # Initialize empty dataframes
+    # Start from an empty store, and empty legacy CSVs so they are not merged back in
+    ticker_store.clear(TICKER_STORE_DIR)
     price_df, marketcap_df = initialize_historical_dataframes(all_tickers, start_date)
-    
-    # Save empty dataframes
-    save_historical_data(price_df, marketcap_df)
+    export_historical_csvs(price_df, marketcap_df)
     
     # Update with current data
     update_historical_data()
@@ -437,14 +498,9 @@ def analyze_missing_data():
     """
     try:
         # Load historical data
-        price_df = pd.read_csv(HISTORICAL_PRICES_FILE)
-        marketcap_df = pd.read_csv(HISTORICAL_MARKETCAP_FILE)
-        
-        # Set date as index if needed
-        if 'date' in price_df.columns:
-            price_df.set_index('date', inplace=True)
-        if 'date' in marketcap_df.columns:
-            marketcap_df.set_index('date', inplace=True)
+        price_df, marketcap_df = read_historical_frames()
+        if price_df is None:
+            raise FileNotFoundError("No historical data stored")
         
         # Get all current tickers
         all_tickers = get_all_tickers()
@@ -593,7 +649,8 @@ def print_missing_data_summary():
 
 if __name__ == "__main__":
     # Check if historical data exists and is valid
-    if os.path.exists(HISTORICAL_PRICES_FILE) and os.path.exists(HISTORICAL_MARKETCAP_FILE):
+    if not ticker_store.is_empty(TICKER_STORE_DIR) or (
+            os.path.exists(HISTORICAL_PRICES_FILE) and os.path.exists(HISTORICAL_MARKETCAP_FILE)):
         is_valid, issues = verify_historical_data()
         
         if not is_valid:
@@ -612,7 +669,7 @@ if __name__ == "__main__":
             print("Historical data is valid. Updating with latest values...")
             update_historical_data()
     else:
-        print("Historical data files not found. Creating new ones...")
+        print("Historical data not found. Creating it...")
         update_historical_data()
     
     # Print missing data summary
@@ -11,13 +11,14 @@
 import os
 import requests
 import time
+import numpy as np
 import pandas as pd
 from pandas import DatetimeIndex
 import json
-import csv
 from datetime import datetime, timedelta
 import pytz
 import config
+from sector_universe import get_universe
 import yfinance as yf
 import random
 
@@ -472,6 +473,52 @@ def update_historical_data(all_tickers):
     
     return historical_price_data, historical_marketcap_data
 
+def calculate_ticker_momentum(historical_price_data, span=20):
+    """
+    Calculate each ticker's momentum: % difference between its latest price and its EMA
+    
+    Equivalent to calling calculate_ema on each ticker's non-NaN prices, but done for
+    all tickers at once.
+    
+    Args:
+        historical_price_data: DataFrame with dates as index and tickers as columns
+        span: EMA span
+        
+    Returns:
+        pd.Series: Momentum per ticker (NaN where it can't be calculated)
+    """
+    prices = historical_price_data.apply(pd.to_numeric, errors='coerce')
+    if prices.empty:
+        return pd.Series(np.nan, index=prices.columns)
+    
+    # ignore_na=True gives the same recursion as running the EMA over dropna() values
+    ema = prices.ewm(span=span, adjust=False, ignore_na=True).mean().ffill().iloc[-1]
+    # With fewer than `span` points, use a simple average (as calculate_ema does)
+    ema = ema.where(prices.count() >= span, prices.mean())
+    current_price = prices.ffill().iloc[-1]
+    
+    momentum = (current_price - ema) / ema * 100
+    return momentum.where(ema > 0)
+
+def refetch_missing_market_caps(tickers, historical_marketcap_data, today):
+    """
+    Try to fetch market caps for tickers that have none for today
+    
+    Args:
+        tickers: Tickers missing today's market cap
+        historical_marketcap_data: DataFrame with historical market cap data
+        today: Today's date string
+        
+    Returns:
+        dict: ticker -> market cap for the tickers that could be fetched
+    """
+    refetched = {}
+    for ticker in tickers:
+        market_cap = fetch_market_cap(ticker, historical_marketcap_data, today)
+        if market_cap is not None:
+            refetched[ticker] = market_cap
+    return refetched
+
 def process_sector_data(historical_price_data, historical_marketcap_data):
     """
     Process sector data using the updated historical data
@@ -486,7 +533,6 @@ def process_sector_data(historical_price_data, historical_marketcap_data):
     today = get_eastern_date()
     yesterday = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
     sectors_data = {}
-    sector_values = []
     
     # Track missing ticker data for notification purposes
     missing_ticker_data = {}
@@ -515,154 +561,83 @@ def process_sector_data(historical_price_data, historical_marketcap_data):
     
     print(f"Processing sector data for {today}...")
     
-    for sector, tickers in SECTORS.items():
-        print(f"Processing {sector} with {len(tickers)} tickers...")
-        total_market_cap = 0
-        weighted_momentum = 0
-        valid_momentum_count = 0
-        tickers_with_data = 0  # Count how many tickers have valid data
-        missing_tickers = []   # Track tickers with missing data for notifications
-        
-        for ticker in tickers:
-            # Get market cap for today
-            if ticker in historical_marketcap_data.columns:
-                market_cap = historical_marketcap_data.loc[today, ticker]
-                if pd.isna(market_cap) or market_cap is None:
-                    # Try one more time to get market cap if we don't have it
-                    market_cap = fetch_market_cap(ticker, historical_marketcap_data, today)
-                    if market_cap is not None:
-                        # Update our historical data
-                        historical_marketcap_data.loc[today, ticker] = market_cap
-            else:
-                # Should never happen since we ensure columns exist
-                market_cap = None
-            
-            # Track missing market cap data for notifications
-            if market_cap is None or pd.isna(market_cap):
-                print(f"WARNING: No market cap data for {ticker} in {sector}, skipping from sector total")
-                missing_tickers.append(ticker)
-                continue
-            
-            # We have valid data for this ticker
-            tickers_with_data += 1
-            
-            # Add to sector total
-            total_market_cap += market_cap
-            
-            # Calculate EMA and momentum if we have enough historical data
-            if ticker in historical_price_data.columns:
-                # Get all non-NaN price data for this ticker
-                ticker_data = historical_price_data[ticker].dropna()
-                
-                if not ticker_data.empty:
-                    # Current price is the latest available
-                    current_price = ticker_data.iloc[-1]
-                    
-                    # Calculate EMA using all available historical data
-                    ema = calculate_ema(ticker_data, span=EMA_SPAN)
-                    
-                    if ema is not None and ema > 0:
-                        # Calculate momentum as percentage difference
-                        momentum = ((current_price - ema) / ema) * 100
-                        weighted_momentum += momentum * market_cap  # Weight by market cap
-                        valid_momentum_count += 1
-        
-        # If we have missing tickers, add them to our tracking dictionary
+    universe = get_universe(SECTORS)
+    all_tickers = universe.tickers
+    
+    # Make sure today's row and every ticker column exist
+    for df in (historical_price_data, historical_marketcap_data):
+        if today not in df.index:
+            df.loc[today] = None
+        for ticker in all_tickers:
+            if ticker not in df.columns:
+                df[ticker] = None
+    
+    # Refetch every missing market cap up front, before any aggregation
+    todays_caps = pd.to_numeric(historical_marketcap_data.loc[today, all_tickers], errors='coerce')
+    refetched = refetch_missing_market_caps(todays_caps[todays_caps.isna()].index, historical_marketcap_data, today)
+    if refetched:
+        historical_marketcap_data.loc[today, list(refetched)] = list(refetched.values())
+        todays_caps = todays_caps.fillna(pd.Series(refetched, dtype=float))
+    
+    # Per-ticker momentum: % distance of the latest price from its EMA
+    momentum = calculate_ticker_momentum(historical_price_data.reindex(columns=all_tickers), span=EMA_SPAN)
+    
+    # Sector aggregates as sector × ticker matrix products
+    caps = todays_caps.to_numpy(dtype=float)
+    has_cap = ~np.isnan(caps)
+    has_momentum = has_cap & ~np.isnan(momentum.to_numpy(dtype=float))
+    caps = np.where(has_cap, caps, 0.0)
+    
+    total_market_caps = universe.weights @ caps
+    tickers_with_data = universe.membership @ has_cap.astype(float)
+    weighted_momentum = universe.weights @ np.where(has_momentum, momentum.to_numpy(dtype=float) * caps, 0.0)
+    valid_momentum_counts = universe.membership @ has_momentum.astype(float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_momentum = np.where((total_market_caps > 0) & (valid_momentum_counts > 0),
+                                weighted_momentum / total_market_caps, 0.0)
+    
+    # Never allow a sector market cap to be 0: sectors without any data get the $1M minimum
+    no_data = tickers_with_data == 0
+    avg_momentum[no_data] = 0
+    total_market_caps = np.where(total_market_caps > 0, total_market_caps, 1000000)
+    weights = total_market_caps / total_market_caps.sum()
+    
+    for i, (sector, tickers) in enumerate(SECTORS.items()):
+        missing_tickers = [ticker for ticker in tickers if np.isnan(todays_caps[ticker])]
+        for ticker in missing_tickers:
+            print(f"WARNING: No market cap data for {ticker} in {sector}, skipping from sector total")
         if missing_tickers:
             missing_ticker_data[sector] = missing_tickers
         
-        # If we didn't get data for ANY tickers in this sector, we have an API problem
-        if tickers_with_data == 0:
+        if no_data[i]:
+            # If we didn't get data for ANY tickers in this sector, we have an API problem
             print(f"ERROR: No tickers in {sector} returned valid market cap data!")
             print(f"This is likely due to API rate limits or connectivity issues.")
-            
-            # Check if we have historical authentic score for this sector
             if sector in previous_sector_scores:
                 print(f"Using previous authentic score for {sector}: {previous_sector_scores[sector]}")
-                # Use last known market cap (minimum 1M) and neutral momentum
-                total_market_cap = max(1000000, total_market_cap)  # At least $1M
-                avg_momentum = 0  # Neutral momentum
-                
-                # Make sure we pass the previous score to sentiment_engine.py
-                # Initialize sector data first if it doesn't exist
-                if sector not in sectors_data:
-                    sectors_data[sector] = {}
             else:
-                # No historical data either, use minimum fallback
                 print(f"No previous data available for {sector}, using minimum fallback values")
-                total_market_cap = 1000000  # $1M minimum
-                avg_momentum = 0  # Neutral momentum
-        else:
-            # Calculate market-cap weighted momentum
-            if total_market_cap > 0 and valid_momentum_count > 0:
-                avg_momentum = weighted_momentum / total_market_cap
-            else:
-                # If we have market cap but no valid momentum, use 0
-                # This is better than using None/NaN which would cause problems
-                avg_momentum = 0
-        
-        # Never allow total_market_cap to be 0 or None
-        if total_market_cap <= 0:
-            print(f"WARNING: {sector} has a zero or negative market cap ({total_market_cap})")
-            print(f"This should never happen with proper data - using minimum valid value")
-            # Use a small positive value instead of 0 to prevent calculation issues
-            # This is a last resort failsafe
-            total_market_cap = 1000000  # $1M minimum
         
         # Store sector data
         sectors_data[sector] = {
-            'market_cap': total_market_cap,
-            'momentum': avg_momentum,
-            'tickers_with_data': tickers_with_data,
+            'market_cap': float(total_market_caps[i]),
+            'momentum': float(avg_momentum[i]),
+            'weight': float(weights[i]),
+            'tickers_with_data': int(tickers_with_data[i]),
             'total_tickers': len(tickers),
             'previous_score': previous_sector_scores.get(sector, None)
         }
         
-        print(f"{sector}: {total_market_cap:.2f} USD | Momentum: {avg_momentum:.2f}% | Data: {tickers_with_data}/{len(tickers)} tickers")
-        
-        # Add to sector_values list for CSV export
-        sector_values.append({
-            'date': today,
-            'sector': sector,
-            'market_cap': total_market_cap,
-            'momentum': avg_momentum
-        })
+        print(f"{sector}: {total_market_caps[i]:.2f} USD | Momentum: {avg_momentum[i]:.2f}% | "
+              f"Data: {int(tickers_with_data[i])}/{len(tickers)} tickers")
     
     # Save to CSV in a format compatible with update_sector_history.py
+    # (date in the first column and one column per sector)
     csv_path = os.path.join('data', 'sector_values.csv')
-    
-    # First gather all unique dates
-    dates = sorted(set([row['date'] for row in sector_values]))
-    
-    # Create a dict to convert sector data to columns
-    sector_dict = {}
-    for date in dates:
-        sector_dict[date] = {'Date': date}
-        # Initialize with None values (will be converted by update_sector_history.py)
-        for sector in SECTORS.keys():
-            sector_dict[date][sector] = None
-    
-    # Fill in the market cap values
-    for row in sector_values:
-        date = row['date']
-        sector = row['sector']
-        market_cap = row['market_cap']
-        sector_dict[date][sector] = market_cap
-    
-    # Convert to rows for CSV
-    csv_rows = []
-    for date, data in sector_dict.items():
-        csv_rows.append(data)
-    
-    # Get all column names (Date + all sectors)
-    fieldnames = ['Date'] + list(SECTORS.keys())
-    
-    # Write CSV file with date in first column and sectors as other columns
-    with open(csv_path, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in csv_rows:
-            writer.writerow(row)
+    sector_values = pd.DataFrame([total_market_caps], columns=list(SECTORS.keys()))
+    sector_values.insert(0, 'Date', today)
+    sector_values.to_csv(csv_path, index=False)
     
     print(f"Sector values for {today} saved to {csv_path}")
     
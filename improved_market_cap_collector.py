@@ -23,6 +23,8 @@ import time
 from typing import Dict, List, Tuple, Optional, Any
 import pytz
 
+from sector_universe import get_universe
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -378,20 +380,16 @@ def calculate_sector_market_caps(sector_tickers: Dict[str, List[str]], market_ca
     Returns:
         Dict mapping sectors to their total market caps
     """
-    sector_market_caps = {}
+    # Sum market caps and count covered tickers for every sector at once
+    universe = get_universe(sector_tickers)
+    sector_totals = universe.aggregate(market_caps)
+    coverage = universe.coverage(market_caps)
     
-    for sector, tickers in sector_tickers.items():
-        # Sum market caps of all tickers in the sector
-        sector_total = sum(market_caps.get(ticker, 0) for ticker in tickers)
-        sector_market_caps[sector] = sector_total
-        
-        # Calculate coverage percentage
-        covered_tickers = [ticker for ticker in tickers if ticker in market_caps]
-        coverage_pct = len(covered_tickers) / len(tickers) * 100 if tickers else 0
-        
-        logger.info(f"Sector {sector}: {len(covered_tickers)}/{len(tickers)} tickers ({coverage_pct:.1f}%), Market Cap: ${sector_total/1e12:.2f}T")
+    # itertuples keeps the integer counts (iterrows would upcast the row to float)
+    for row in coverage.itertuples():
+        logger.info(f"Sector {row.Index}: {row.covered}/{row.total} tickers ({row.coverage_pct:.1f}%), Market Cap: ${sector_totals[row.Index]/1e12:.2f}T")
         
-    return sector_market_caps
+    return {sector: float(total) for sector, total in sector_totals.items()}
 
 def load_historical_market_caps() -> pd.DataFrame:
     """
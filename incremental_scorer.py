@@ -0,0 +1,181 @@
+# incremental_scorer.py
+# -----------------------------------------------------------
+# Incremental sector scoring for intraday refreshes
+# -----------------------------------------------------------
+#
+# Keeps each indicator's per-sector contribution (signal × IMPACT × IMPORTANCE)
+# from the sentiment_engine weight matrix. When one indicator's latest value
+# changes only its row is re-signalled, and the affected sector sums are
+# adjusted by the difference instead of re-running the pipeline. The T2D Pulse
+# is then the weighted average of the cached sector scores.
+
+import threading
+
+import numpy as np
+
+from sentiment_engine import SECTORS, INDICATORS, raw_signal_array, weight_matrix
+
+_INDICATOR_POS = {ind: i for i, ind in enumerate(INDICATORS)}
+
+class IncrementalSectorScorer:
+    """Sector scores that update in O(sectors) when a single indicator moves"""
+
+    def __init__(self, macros=None, sector_weights=None, importance=None):
+        """
+        Args:
+            macros (dict, optional): Initial indicator values. Values are scalars,
+                or for per-sector inputs (Sector_EMA_Factor) a {sector: value}
+                dict or an array in SECTORS order.
+            sector_weights (dict, optional): Pulse weights by sector (equal if omitted)
+            importance (dict, optional): Importance overrides, see sentiment_engine.weight_matrix
+        """
+        self._weights = weight_matrix(importance)
+        self._abs_weights = np.abs(self._weights)
+        n_ind, n_sec = self._weights.shape
+
+        self._values = {}
+        self._contrib = np.zeros((n_ind, n_sec))
+        self._masks = np.zeros((n_ind, n_sec), dtype=bool)
+        self._sector_sum = np.zeros(n_sec)
+        self._sector_weight = np.zeros(n_sec)
+        self._lock = threading.Lock()
+
+        self._pulse_weights = {}
+        self._normalized = np.zeros(n_sec)
+        self.set_sector_weights(sector_weights)
+
+        if macros:
+            self.update_many(macros)
+
+    # ---------- updates ----------
+    def update(self, indicator, value):
+        """
+        Set one indicator's latest value.
+
+        Returns:
+            bool: True if the value changed and scores were updated
+        """
+        if indicator not in _INDICATOR_POS:
+            return False
+        with self._lock:
+            return self._apply(indicator, value)
+
+    def update_many(self, macros, replace=False):
+        """
+        Apply several indicator values.
+
+        Args:
+            macros (dict): Indicator values, as for __init__
+            replace (bool): Also drop indicators that are missing from `macros`
+
+        Returns:
+            list: Names of indicators whose values changed
+        """
+        changed = []
+        with self._lock:
+            for indicator, value in macros.items():
+                if indicator in _INDICATOR_POS and self._apply(indicator, value):
+                    changed.append(indicator)
+            if replace:
+                for indicator in [ind for ind in self._values if ind not in macros]:
+                    self._remove(indicator)
+                    changed.append(indicator)
+        return changed
+
+    def remove(self, indicator):
+        """Drop an indicator from the scores"""
+        with self._lock:
+            if indicator in self._values:
+                self._remove(indicator)
+                return True
+        return False
+
+    def _signal_row(self, indicator, value):
+        """Per-sector signals for one indicator, NaN where missing"""
+        if isinstance(value, dict):
+            value = [value.get(sec, np.nan) for sec in SECTORS]
+        sig = raw_signal_array(indicator, value)
+        return np.broadcast_to(sig, (len(SECTORS),)).astype(float)
+
+    def _apply(self, indicator, value):
+        row = _INDICATOR_POS[indicator]
+        signal = self._signal_row(indicator, value)
+        present = ~np.isnan(signal)
+        contrib = np.where(present, signal, 0.0) * self._weights[row]
+        weight = np.where(present, self._abs_weights[row], 0.0)
+
+        old_contrib = self._contrib[row]
+        old_weight = np.where(self._masks[row], self._abs_weights[row], 0.0)
+        if (indicator in self._values and np.array_equal(contrib, old_contrib)
+                and np.array_equal(weight, old_weight)):
+            self._values[indicator] = value
+            return False
+
+        affected = (contrib != old_contrib) | (weight != old_weight)
+        self._sector_sum[affected] += contrib[affected] - old_contrib[affected]
+        self._sector_weight[affected] += weight[affected] - old_weight[affected]
+        self._contrib[row] = contrib
+        self._masks[row] = present
+        self._values[indicator] = value
+        self._refresh_pulse(affected)
+        return True
+
+    def _remove(self, indicator):
+        row = _INDICATOR_POS[indicator]
+        affected = self._masks[row].copy()
+        self._sector_sum -= self._contrib[row]
+        self._sector_weight -= np.where(affected, self._abs_weights[row], 0.0)
+        self._contrib[row] = 0.0
+        self._masks[row] = False
+        del self._values[indicator]
+        self._refresh_pulse(affected)
+
+    # ---------- scores ----------
+    def _raw_scores(self):
+        return np.round(self._sector_sum / np.maximum(self._sector_weight, 1.0), 2)
+
+    def scores(self):
+        """Return scores in the score_sectors format: [{'sector', 'score'}, ...]"""
+        return [{"sector": sec, "score": float(score)}
+                for sec, score in zip(SECTORS, self._raw_scores())]
+
+    def normalized_scores(self):
+        """Return {sector: score on the 0-100 scale}"""
+        return {sec: float(score) for sec, score in zip(SECTORS, self._normalized)}
+
+    @property
+    def values(self):
+        """Current indicator values"""
+        return dict(self._values)
+
+    # ---------- T2D Pulse ----------
+    def set_sector_weights(self, sector_weights=None):
+        """Set Pulse weights by sector; sectors missing from the mapping are excluded"""
+        if not sector_weights:
+            sector_weights = {sec: 100 / len(SECTORS) for sec in SECTORS}
+        # Normalized to sum to 100 with the same arithmetic as the app's
+        # calculate_t2d_pulse_from_sectors, so both round to the same Pulse
+        total = sum(sector_weights.values())
+        pulse_weights = {i: sector_weights[sec] * 100 / total
+                         for i, sec in enumerate(SECTORS) if sec in sector_weights} if total else {}
+        with self._lock:
+            self._pulse_weights = pulse_weights
+            self._normalized = np.round((self._raw_scores() + 1.0) / 2.0 * 100, 1)
+
+    def _refresh_pulse(self, affected):
+        if not affected.any():
+            return
+        self._normalized[affected] = np.round((self._raw_scores()[affected] + 1.0) / 2.0 * 100, 1)
+
+    @property
+    def pulse(self):
+        """T2D Pulse score (0-100): weighted average of normalized sector scores"""
+        normalized = self._normalized.tolist()
+        weighted_sum = 0
+        total_weight = 0
+        for i, weight in self._pulse_weights.items():
+            weighted_sum += normalized[i] * weight
+            total_weight += weight
+        if not total_weight:
+            return round(sum(normalized) / len(normalized), 1)
+        return round(weighted_sum / total_weight, 1)
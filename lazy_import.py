@@ -0,0 +1,43 @@
+# lazy_import.py
+# -----------------------------------------------------------
+# Defer importing heavy modules until they are first used
+# -----------------------------------------------------------
+#
+# lazy_import("yfinance") returns a module object straight away, but the
+# module's code only runs on the first attribute access. The dashboard uses
+# this for dependencies that are needed by a few callbacks but are slow to
+# import, so that gunicorn workers start quickly.
+
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+_import_lock = threading.Lock()
+
+def lazy_import(name):
+    """
+    Return module `name`, executing it only when an attribute is first accessed.
+
+    Modules that are already imported, or that cannot be located, are imported
+    normally (so a missing module still raises ImportError here).
+    """
+    with _import_lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            return importlib.import_module(name)
+
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
+
+def is_loaded(name):
+    """Check whether module `name` has actually been executed (not just lazily registered)"""
+    module = sys.modules.get(name)
+    return module is not None and type(module) is types.ModuleType
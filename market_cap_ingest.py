@@ -8,12 +8,17 @@ import os
 import json
 import sqlite3
 import logging
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
-from threading import Thread
+from functools import lru_cache
+from threading import Thread, local
 from typing import Dict, List, Tuple, Optional
 
+import http_client
+from sector_universe import get_universe
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,24 +33,83 @@ logger = logging.getLogger(__name__)
 # --- Configuration ---
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "t2d_pulse.db")
 POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY")
+POLYGON_BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
 SHARE_COUNT_CACHE = os.path.join(os.path.dirname(__file__), "data", "share_count_cache.json")
 
+# Polygon request budget: POLYGON_RATE_LIMIT, POLYGON_BURST and POLYGON_MAX_WORKERS
+# (see config.HTTP_PROVIDERS) size the shared client to the account's tier. The
+# default of 5 requests/second (burst 5) is for paid tiers, which are unlimited but
+# ask for < 100/s; the free tier allows 5 requests/minute, so set
+# POLYGON_RATE_LIMIT=0.083 and POLYGON_BURST=1 for a free key
+POLYGON_MAX_WORKERS = int(os.environ.get("POLYGON_MAX_WORKERS", "8"))    # concurrent requests
+
 # Ensure data directory exists
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
+# SQLite settings: WAL lets the dashboard and other readers keep reading while
+# the ingest writes, and busy_timeout makes writers wait instead of failing
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),   # Safe with WAL; fsync only at checkpoints
+    ("busy_timeout", 30000),     # milliseconds
+    ("cache_size", -20000),      # ~20 MB page cache
+    ("temp_store", "MEMORY"),
+)
+
 # --- DB Helpers ---
+_thread_local = local()
+
 def get_db():
-    """Get a database connection with Row factory"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Get this thread's persistent database connection (Row factory, WAL mode)
+
+    Connections are opened once per thread and reused, so callers must not close them.
+    """
+    conn = getattr(_thread_local, "conn", None)
+    if conn is None or _thread_local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH, timeout=30, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in SQLITE_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}={value}")
+        _thread_local.conn = conn
+        _thread_local.path = DB_PATH
     return conn
 
+def close_db():
+    """Close this thread's database connection, if it has one"""
+    conn = getattr(_thread_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _thread_local.conn = None
+
+@contextmanager
+def transaction():
+    """Run a block of statements in one transaction, committing on success"""
+    db = get_db()
+    with db:
+        yield db
+
+@lru_cache(maxsize=None)
+def _upsert_sql(table, columns):
+    """Build (once) the INSERT OR REPLACE statement for a table and column tuple
+
+    Reusing the identical SQL string lets sqlite3's per-connection statement
+    cache skip re-preparing it.
+    """
+    cols = ",".join(columns)
+    placeholders = ",".join("?" for _ in columns)
+    return f"INSERT OR REPLACE INTO {table} ({cols}) VALUES ({placeholders})"
+
 def migrate():
     """Set up the database schema if it doesn't exist"""
     logger.info("Running database migration")
-    db = get_db()
-    c = db.cursor()
-    
+    with transaction() as db:
+        _create_tables(db.cursor())
+    logger.info("Database migration completed")
+
+def _create_tables(c):
+    """Create every table used by the ingest"""
     # Table for ticker prices
     c.execute("""
       CREATE TABLE IF NOT EXISTS ticker_prices (
@@ -105,39 +169,20 @@ def migrate():
         message         TEXT
       )
     """)
-    
-    db.commit()
-    db.close()
-    logger.info("Database migration completed")
 
 def upsert(table, columns, values):
     """Insert or replace a record in the database"""
-    db = get_db()
-    cols = ",".join(columns)
-    placeholders = ",".join("?" for _ in values)
-    sql = f"INSERT OR REPLACE INTO {table} ({cols}) VALUES ({placeholders})"
-    db.execute(sql, values)
-    db.commit()
-    db.close()
+    with transaction() as db:
+        db.execute(_upsert_sql(table, tuple(columns)), values)
 
 def upsert_many(table, columns, values_list):
-    """Insert or replace multiple records in the database"""
-    db = get_db()
-    cols = ",".join(columns)
-    placeholders = ",".join("?" for _ in columns)
-    sql = f"INSERT OR REPLACE INTO {table} ({cols}) VALUES ({placeholders})"
-    db.executemany(sql, values_list)
-    db.commit()
-    db.close()
+    """Insert or replace multiple records in the database in one transaction"""
+    with transaction() as db:
+        db.executemany(_upsert_sql(table, tuple(columns)), values_list)
 
 def query(sql, params=()):
     """Execute a SQL query and return all results"""
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute(sql, params)
-    results = cursor.fetchall()
-    db.close()
-    return results
+    return get_db().execute(sql, params).fetchall()
 
 def get_business_days(start_date, end_date):
     """Get a list of business days between start_date and end_date (inclusive)"""
@@ -179,9 +224,10 @@ def load_sectors():
                 if sector not in sectors:
                     sectors[sector] = []
                 sectors[sector].append(ticker)
-                
-                # Add to database
-                upsert("sector_tickers", ["sector", "ticker"], [sector, ticker])
+            
+            # Add to database
+            upsert_many("sector_tickers", ["sector", "ticker"],
+                        [(sector, ticker) for sector, tickers in sectors.items() for ticker in tickers])
             
             logger.info(f"Loaded {len(sectors)} sectors with {sum(len(tickers) for tickers in sectors.values())} tickers")
         except Exception as e:
@@ -193,9 +239,8 @@ def load_sectors():
                     sectors = json.load(f)
                 
                 # Add to database
-                for sector, tickers in sectors.items():
-                    for ticker in tickers:
-                        upsert("sector_tickers", ["sector", "ticker"], [sector, ticker])
+                upsert_many("sector_tickers", ["sector", "ticker"],
+                            [(sector, ticker) for sector, tickers in sectors.items() for ticker in tickers])
                 
                 logger.info(f"Loaded {len(sectors)} sectors with {sum(len(tickers) for tickers in sectors.values())} tickers from JSON")
             except Exception as e:
@@ -205,19 +250,15 @@ def load_sectors():
 
 def save_sectors(sectors):
     """Save sector to tickers mapping to database"""
-    # Clear existing mappings
-    db = get_db()
-    db.execute("DELETE FROM sector_tickers")
-    db.commit()
-    db.close()
-    
-    # Insert new mappings
     values_list = []
     for sector, tickers in sectors.items():
         for ticker in tickers:
             values_list.append((sector, ticker))
     
-    upsert_many("sector_tickers", ["sector", "ticker"], values_list)
+    # Replace the mappings in one transaction so readers never see an empty table
+    with transaction() as db:
+        db.execute("DELETE FROM sector_tickers")
+        db.executemany(_upsert_sql("sector_tickers", ("sector", "ticker")), values_list)
     logger.info(f"Saved {len(sectors)} sectors with {len(values_list)} ticker mappings")
 
 # --- Share Count Management ---
@@ -237,6 +278,8 @@ def load_share_counts():
                 data = json.load(f)
             
             # Process and normalize the data
+            now = datetime.now().isoformat()
+            values_list = []
             for ticker, share_count in data.items():
                 # Handle different formats
                 if isinstance(share_count, dict) and 'value' in share_count:
@@ -248,11 +291,10 @@ def load_share_counts():
                     continue
                 
                 share_counts[ticker] = count
-                
-                # Add to database
-                now = datetime.now().isoformat()
-                upsert("share_counts", ["ticker", "count", "updated_at"], [ticker, count, now])
+                values_list.append((ticker, count, now))
             
+            # Add to database
+            upsert_many("share_counts", ["ticker", "count", "updated_at"], values_list)
             logger.info(f"Loaded {len(share_counts)} share counts from cache file")
         except Exception as e:
             logger.error(f"Failed to load share counts from cache file: {e}")
@@ -264,6 +306,24 @@ def update_share_count(ticker, count):
     now = datetime.now().isoformat()
     upsert("share_counts", ["ticker", "count", "updated_at"], [ticker, count, now])
 
+# --- Polygon HTTP client ---
+def polygon_get(url):
+    """GET a Polygon URL through the shared Polygon client (rate-limited, retried, pooled)"""
+    return http_client.get_client("polygon").get_sync(url)
+
+def fetch_concurrently(func, items, max_workers=POLYGON_MAX_WORKERS):
+    """
+    Call func(item) for every item on a bounded worker pool.
+
+    Returns:
+        dict: {item: result}
+    """
+    items = list(items)
+    if not items:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return dict(zip(items, executor.map(func, items)))
+
 # --- Data Collection ---
 def get_polygon_fully_diluted_shares(ticker):
     """Get fully diluted shares outstanding from Polygon API"""
@@ -271,10 +331,10 @@ def get_polygon_fully_diluted_shares(ticker):
         logger.error("POLYGON_API_KEY environment variable not set")
         return None
     
-    url = f"https://api.polygon.io/v3/reference/tickers/{ticker}?apiKey={POLYGON_API_KEY}"
+    url = f"{POLYGON_BASE_URL}/v3/reference/tickers/{ticker}?apiKey={POLYGON_API_KEY}"
     
     try:
-        response = requests.get(url)
+        response = polygon_get(url)
         if response.status_code != 200:
             logger.warning(f"Failed to get data for {ticker}: {response.status_code}")
             return None
@@ -306,10 +366,10 @@ def get_polygon_price(ticker, date_str):
         logger.error("POLYGON_API_KEY environment variable not set")
         return None
     
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{date_str}/{date_str}?apiKey={POLYGON_API_KEY}"
+    url = f"{POLYGON_BASE_URL}/v2/aggs/ticker/{ticker}/range/1/day/{date_str}/{date_str}?apiKey={POLYGON_API_KEY}"
     
     try:
-        response = requests.get(url)
+        response = polygon_get(url)
         if response.status_code != 200:
             logger.warning(f"Failed to get price for {ticker} on {date_str}: {response.status_code}")
             return None
@@ -327,6 +387,62 @@ def get_polygon_price(ticker, date_str):
         logger.error(f"Error fetching price for {ticker} on {date_str}: {e}")
         return None
 
+def get_polygon_grouped_daily(date_str):
+    """Get closing prices for every US stock on a date from one grouped-daily request
+
+    Returns:
+        dict: {ticker: close}, empty for market holidays, or None if the request failed
+    """
+    if not POLYGON_API_KEY:
+        logger.error("POLYGON_API_KEY environment variable not set")
+        return None
+    
+    url = f"{POLYGON_BASE_URL}/v2/aggs/grouped/locale/us/market/stocks/{date_str}?adjusted=true&apiKey={POLYGON_API_KEY}"
+    
+    try:
+        response = polygon_get(url)
+        if response.status_code != 200:
+            logger.warning(f"Failed to get grouped daily prices for {date_str}: {response.status_code}")
+            return None
+        
+        data = response.json()
+        return {bar['T']: bar['c'] for bar in data.get('results') or [] if 'T' in bar and 'c' in bar}
+    
+    except Exception as e:
+        logger.error(f"Error fetching grouped daily prices for {date_str}: {e}")
+        return None
+
+def get_polygon_price_range(ticker, start_date, end_date):
+    """Get daily closing prices for a ticker over a date range from one request
+
+    Returns:
+        dict: {date_str: close}, or None if the request failed
+    """
+    if not POLYGON_API_KEY:
+        logger.error("POLYGON_API_KEY environment variable not set")
+        return None
+    
+    url = (f"{POLYGON_BASE_URL}/v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}"
+           f"?adjusted=true&sort=asc&limit=50000&apiKey={POLYGON_API_KEY}")
+    
+    try:
+        response = polygon_get(url)
+        if response.status_code != 200:
+            logger.warning(f"Failed to get prices for {ticker} from {start_date} to {end_date}: {response.status_code}")
+            return None
+        
+        data = response.json()
+        prices = {}
+        for bar in data.get('results') or []:
+            # Bar timestamps are the start of the (US Eastern) trading day in UTC milliseconds
+            day = datetime.utcfromtimestamp(bar['t'] / 1000).date().isoformat()
+            prices[day] = bar['c']
+        return prices
+    
+    except Exception as e:
+        logger.error(f"Error fetching prices for {ticker} from {start_date} to {end_date}: {e}")
+        return None
+
 def ensure_share_counts(tickers, share_counts):
     """Ensure we have share counts for all tickers, fetching as needed"""
     missing_tickers = [t for t in tickers if t not in share_counts or share_counts[t] <= 0]
@@ -334,17 +450,21 @@ def ensure_share_counts(tickers, share_counts):
     if missing_tickers:
         logger.info(f"Fetching share counts for {len(missing_tickers)} tickers")
         
-        for ticker in missing_tickers:
-            # Add rate limiting to avoid API throttling
-            time.sleep(0.2)
-            
-            count = get_polygon_fully_diluted_shares(ticker)
+        # Fetch concurrently; the shared rate limiter keeps us within the API quota
+        fetched = fetch_concurrently(get_polygon_fully_diluted_shares, missing_tickers)
+        
+        now = datetime.now().isoformat()
+        values_list = []
+        for ticker, count in fetched.items():
             if count is not None and count > 0:
                 share_counts[ticker] = count
-                update_share_count(ticker, count)
+                values_list.append((ticker, count, now))
                 logger.info(f"Updated share count for {ticker}: {count:,}")
             else:
                 logger.warning(f"Failed to get share count for {ticker}")
+        
+        if values_list:
+            upsert_many("share_counts", ["ticker", "count", "updated_at"], values_list)
     
     return share_counts
 
@@ -368,14 +488,9 @@ def collect_prices(tickers, date_str):
     
     logger.info(f"Fetching prices for {len(missing_tickers)} tickers")
     
-    values_list = []
-    for ticker in missing_tickers:
-        # Add rate limiting to avoid API throttling
-        time.sleep(0.2)
-        
-        price = get_polygon_price(ticker, date_str)
-        if price is not None:
-            values_list.append((ticker, date_str, price))
+    # Fetch concurrently; the shared rate limiter keeps us within the API quota
+    prices = fetch_concurrently(lambda ticker: get_polygon_price(ticker, date_str), missing_tickers)
+    values_list = [(ticker, date_str, price) for ticker, price in prices.items() if price is not None]
     
     # Batch insert all prices
     if values_list:
@@ -434,40 +549,36 @@ def calculate_sector_market_caps(date_str):
     # Convert to dict for easier lookup
     ticker_market_caps = {row['ticker']: row['market_cap'] for row in market_caps}
     
-    # Calculate sector market caps
-    values_list = []
+    # Sum market caps and count covered tickers for every sector at once
+    universe = get_universe(sectors)
+    sector_totals = universe.aggregate(ticker_market_caps)
+    coverage = universe.coverage(ticker_market_caps)
+    values_list = [(sector, date_str, float(total)) for sector, total in sector_totals.items()]
     coverage_stats = {
-        "total_tickers": 0,
-        "covered_tickers": 0
+        "total_tickers": int(coverage["total"].sum()),
+        "covered_tickers": int(coverage["covered"].sum())
     }
     
-    for sector, tickers in sectors.items():
-        coverage_stats["total_tickers"] += len(tickers)
-        
-        # Sum market caps for all tickers in the sector
-        sector_tickers = [t for t in tickers if t in ticker_market_caps]
-        coverage_stats["covered_tickers"] += len(sector_tickers)
-        
-        sector_market_cap = sum(ticker_market_caps.get(t, 0) for t in tickers)
-        values_list.append((sector, date_str, sector_market_cap))
-        
-        # Log coverage for the sector
-        coverage_pct = len(sector_tickers) / len(tickers) * 100 if tickers else 0
-        logger.info(f"Sector {sector}: {len(sector_tickers)}/{len(tickers)} tickers ({coverage_pct:.1f}%), Market Cap: ${sector_market_cap/1e12:.2f}T")
-    
-    # Batch insert all sector market caps
-    if values_list:
-        upsert_many("sector_market_caps", ["sector", "date", "market_cap"], values_list)
-        logger.info(f"Calculated {len(values_list)} sector market caps for {date_str}")
+    # Log coverage for each sector
+    # itertuples keeps the integer counts (iterrows would upcast the row to float)
+    for row in coverage.itertuples():
+        logger.info(f"Sector {row.Index}: {row.covered}/{row.total} tickers ({row.coverage_pct:.1f}%), Market Cap: ${sector_totals[row.Index]/1e12:.2f}T")
     
     # Record data quality metrics
     coverage_pct = coverage_stats["covered_tickers"] / coverage_stats["total_tickers"] * 100 if coverage_stats["total_tickers"] > 0 else 0
     status = "OK" if coverage_pct >= 95 else "WARNING" if coverage_pct >= 80 else "ERROR"
     message = f"Coverage: {coverage_pct:.1f}% ({coverage_stats['covered_tickers']}/{coverage_stats['total_tickers']} tickers)"
     
-    upsert("data_quality", 
-           ["date", "total_tickers", "covered_tickers", "coverage_pct", "status", "message"],
-           [date_str, coverage_stats["total_tickers"], coverage_stats["covered_tickers"], coverage_pct, status, message])
+    # Write the sector market caps and the quality record in one transaction
+    with transaction() as db:
+        if values_list:
+            db.executemany(_upsert_sql("sector_market_caps", ("sector", "date", "market_cap")), values_list)
+        db.execute(_upsert_sql("data_quality", ("date", "total_tickers", "covered_tickers",
+                                                "coverage_pct", "status", "message")),
+                   (date_str, coverage_stats["total_tickers"], coverage_stats["covered_tickers"],
+                    coverage_pct, status, message))
+    if values_list:
+        logger.info(f"Calculated {len(values_list)} sector market caps for {date_str}")
 
 def export_to_csv():
     """Export sector market caps to CSV for compatibility with the dashboard"""
@@ -535,21 +646,105 @@ def collect_market_data(date_str=None):
     
     logger.info(f"Market data collection completed for {date_str}")
 
-def backfill_historical_data(days=30):
-    """Backfill historical market data for a specified number of days"""
+def missing_price_dates(tickers, business_days):
+    """Return {date_str: set of tickers without a stored price} for dates with gaps"""
+    if not business_days:
+        return {}
+    have = {}
+    for row in query(
+        "SELECT date, ticker FROM ticker_prices WHERE date BETWEEN ? AND ?",
+        (min(business_days), max(business_days))
+    ):
+        have.setdefault(row['date'], set()).add(row['ticker'])
+    
+    tickers = set(tickers)
+    missing = {}
+    for date_str in business_days:
+        gap = tickers - have.get(date_str, set())
+        if gap:
+            missing[date_str] = gap
+    return missing
+
+def backfill_prices(tickers, business_days, mode="grouped"):
+    """
+    Fill in missing prices for a set of tickers over many dates.
+
+    Args:
+        tickers (iterable): Tickers to collect
+        business_days (list): Dates (YYYY-MM-DD) to fill
+        mode (str): "grouped" makes one grouped-daily request per date for the
+            whole universe; "range" makes one range request per ticker covering
+            every date
+
+    Returns:
+        int: Number of prices stored
+    """
+    missing = missing_price_dates(tickers, business_days)
+    if not missing:
+        logger.info("Already have all prices for the backfill range")
+        return 0
+    
+    values_list = []
+    if mode == "grouped":
+        logger.info(f"Fetching grouped daily prices for {len(missing)} dates")
+        by_date = fetch_concurrently(get_polygon_grouped_daily, sorted(missing))
+        for date_str, prices in by_date.items():
+            if prices is None:
+                continue
+            values_list.extend((ticker, date_str, prices[ticker])
+                               for ticker in missing[date_str] if ticker in prices)
+    elif mode == "range":
+        gap_tickers = sorted(set().union(*missing.values()))
+        start_date, end_date = min(missing), max(missing)
+        logger.info(f"Fetching {start_date} to {end_date} prices for {len(gap_tickers)} tickers")
+        by_ticker = fetch_concurrently(
+            lambda ticker: get_polygon_price_range(ticker, start_date, end_date), gap_tickers)
+        for ticker, prices in by_ticker.items():
+            if prices is None:
+                continue
+            values_list.extend((ticker, date_str, price) for date_str, price in prices.items()
+                               if ticker in missing.get(date_str, ()))
+    else:
+        raise ValueError(f"Unknown backfill mode: {mode}")
+    
+    if values_list:
+        upsert_many("ticker_prices", ["ticker", "date", "price"], values_list)
+    logger.info(f"Backfilled {len(values_list)} prices across {len(missing)} dates")
+    return len(values_list)
+
+def backfill_historical_data(days=30, mode="grouped"):
+    """Backfill historical market data for a specified number of days
+
+    Args:
+        days (int): Number of calendar days to cover, ending today
+        mode (str): "grouped" (one request per date), "range" (one request per
+            ticker) or "daily" (the per-ticker, per-date collect_market_data path)
+    """
     end_date = date.today().isoformat()
     start_date = (date.today() - timedelta(days=days)).isoformat()
     
-    logger.info(f"Backfilling historical market data from {start_date} to {end_date}")
+    logger.info(f"Backfilling historical market data from {start_date} to {end_date} ({mode} mode)")
     
     # Get business days in the range
     business_days = get_business_days(start_date, end_date)
     
-    # Process each date
-    for date_str in business_days:
-        collect_market_data(date_str)
-        # Add a small delay between dates
-        time.sleep(1)
+    if mode == "daily":
+        # Process each date (request pacing is handled by the Polygon rate limiter)
+        for date_str in business_days:
+            collect_market_data(date_str)
+    else:
+        sectors = load_sectors()
+        all_tickers = set()
+        for tickers in sectors.values():
+            all_tickers.update(tickers)
+        
+        ensure_share_counts(all_tickers, load_share_counts())
+        backfill_prices(all_tickers, business_days, mode)
+        
+        for date_str in business_days:
+            calculate_market_caps(date_str)
+            calculate_sector_market_caps(date_str)
+        export_to_csv()
     
     logger.info(f"Historical backfill completed for {len(business_days)} days")
 
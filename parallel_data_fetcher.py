@@ -4,6 +4,10 @@ import pandas as pd
 import os
 import json
 
+import asof_index
+import data_cache
+import release_calendar
+
 # Import the individual data fetching functions
 from app import (
     fetch_fred_data,
@@ -15,19 +19,8 @@ from app import (
     save_data_to_csv
 )
 
-# Define update frequencies for different data types
-UPDATE_FREQUENCIES = {
-    "gdp": "quarterly",          # GDP updates quarterly
-    "unemployment": "monthly",   # Unemployment updates monthly
-    "cpi": "monthly",           # CPI updates monthly
-    "pcepi": "monthly",         # PCEPI updates monthly
-    "interest_rate": "monthly", # Interest rate updates when Fed meets
-    "pce": "monthly",           # PCE updates monthly
-    "treasury_yield": "daily",  # Treasury yield updates daily
-    "vix": "daily",             # VIX updates daily
-    "nasdaq": "daily",          # NASDAQ updates daily
-    "consumer_sentiment": "monthly"  # Consumer sentiment updates monthly
-}
+# Update frequencies for different data types (shared with data_cache TTLs)
+from config import UPDATE_FREQUENCIES
 
 # Define series IDs for FRED data
 FRED_SERIES = {
@@ -54,13 +47,28 @@ DATA_FILES = {
     "consumer_sentiment": "data/consumer_sentiment_data.csv"
 }
 
-# Function to determine if data needs to be refreshed based on frequency
+# Indicator names (as used by sentiment_engine) for each data type, so that
+# refreshed frames are published to the shared as-of index under those keys
+DATASET_INDICATORS = {
+    "gdp": "Real_GDP_Growth_%_SAAR",
+    "unemployment": "Unemployment_%",
+    "cpi": "CPI_YoY_%",
+    "pcepi": "PCEPI_YoY_%",
+    "interest_rate": "Fed_Funds_Rate_%",
+    "pce": "Real_PCE_YoY_%",
+    "treasury_yield": "10Y_Treasury_Yield_%",
+    "vix": "VIX",
+    "nasdaq": "NASDAQ_20d_gap_%",
+    "consumer_sentiment": "Consumer_Sentiment"
+}
+
+# Function to determine if data needs to be refreshed based on the release calendar
 def needs_refresh(data_type, df=None):
-    """Determine if a dataset needs to be refreshed based on its frequency and last update"""
-    # Always refresh daily data to ensure latest values
-    if UPDATE_FREQUENCIES[data_type] == "daily":
-        return True
-    
+    """
+    Determine if a dataset needs to be refreshed: only once its next release can
+    have been published (see release_calendar.py), and for FRED series only if
+    FRED reports the series as updated since the last refresh
+    """
     # If we don't have the dataframe, try to load it
     if df is None:
         try:
@@ -69,27 +77,11 @@ def needs_refresh(data_type, df=None):
             # If we can't load the file, we definitely need to refresh
             return True
     
-    # If dataframe is empty, refresh
-    if df is None or df.empty:
-        return True
-    
-    # Get current date and latest data date
-    today = pd.Timestamp.now().normalize()
-    try:
-        latest_date = pd.to_datetime(df['date'].iloc[0])
-    except Exception:
-        return True
-    
-    # Calculate days since last update
-    days_since_update = (today - latest_date).days
-    
-    # Determine refresh need based on update frequency
-    if UPDATE_FREQUENCIES[data_type] == "monthly" and days_since_update < 25:
-        return False
-    elif UPDATE_FREQUENCIES[data_type] == "quarterly" and days_since_update < 80:
-        return False
-    
-    return True
+    return release_calendar.get_scheduler().needs_refresh(data_type, df)
+
+def record_refresh(data_type, df):
+    """Record a successful refresh so the scheduler knows what is already held"""
+    release_calendar.get_scheduler().record_refresh(data_type, df)
 
 # Wrapper functions for each data type to handle loading and refreshing
 def fetch_gdp_data():
@@ -107,6 +99,7 @@ def fetch_gdp_data():
             df = fetch_fred_data(FRED_SERIES["gdp"])
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["gdp"])
+                record_refresh("gdp", df)
                 print(f"GDP data updated with {len(df)} observations")
         else:
             print("Using cached GDP data (still current)")
@@ -134,6 +127,7 @@ def fetch_unemployment_data():
             df = fetch_fred_data(FRED_SERIES["unemployment"])
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["unemployment"])
+                record_refresh("unemployment", df)
                 print(f"Unemployment data updated with {len(df)} observations")
         else:
             print("Using cached unemployment data (still current)")
@@ -161,6 +155,7 @@ def fetch_cpi_data():
             df = fetch_fred_data(FRED_SERIES["cpi"])
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["cpi"])
+                record_refresh("cpi", df)
                 print(f"CPI data updated with {len(df)} observations")
         else:
             print("Using cached CPI data (still current)")
@@ -188,6 +183,7 @@ def fetch_pcepi_data():
             df = fetch_fred_data(FRED_SERIES["pcepi"])
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["pcepi"])
+                record_refresh("pcepi", df)
                 print(f"PCEPI data updated with {len(df)} observations")
         else:
             print("Using cached PCEPI data (still current)")
@@ -215,6 +211,7 @@ def fetch_interest_rate_data():
             df = fetch_fred_data(FRED_SERIES["interest_rate"])
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["interest_rate"])
+                record_refresh("interest_rate", df)
                 print(f"Interest rate data updated with {len(df)} observations")
         else:
             print("Using cached interest rate data (still current)")
@@ -242,6 +239,7 @@ def fetch_pce_data():
             df = fetch_fred_data(FRED_SERIES["pce"])
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["pce"])
+                record_refresh("pce", df)
                 print(f"PCE data updated with {len(df)} observations")
         else:
             print("Using cached PCE data (still current)")
@@ -255,28 +253,33 @@ def fetch_pce_data():
     return df
 
 def fetch_treasury_data():
-    """Fetch Treasury Yield data - always refresh for latest"""
+    """Fetch Treasury Yield data once a new close can exist"""
     print("Processing Treasury Yield data...")
     start_time = time.time()
     
     try:
-        # Treasury yield updates daily so we always want fresh data
-        df = fetch_treasury_yield_data()
+        # Treasury Yield updates daily; only fetch once a new close can exist
+        df = load_data_from_csv(DATA_FILES["treasury_yield"])
+        if needs_refresh("treasury_yield", df):
+            df = fetch_treasury_yield_data()
         
-        if not df.empty:
-            # Load historical data to merge if available
-            try:
-                historical_df = load_data_from_csv(DATA_FILES["treasury_yield"])
-                # Merge with historical data, keeping the newer values when dates overlap
-                if not historical_df.empty:
-                    combined_df = pd.concat([df, historical_df])
-                    combined_df = combined_df.drop_duplicates(subset=['date'], keep='first')
-                    df = combined_df.sort_values('date', ascending=False).reset_index(drop=True)
-            except Exception as e:
-                print(f"Could not merge with historical Treasury data: {str(e)}")
+            if not df.empty:
+                # Load historical data to merge if available
+                try:
+                    historical_df = load_data_from_csv(DATA_FILES["treasury_yield"])
+                    # Merge with historical data, keeping the newer values when dates overlap
+                    if not historical_df.empty:
+                        combined_df = pd.concat([df, historical_df])
+                        combined_df = combined_df.drop_duplicates(subset=['date'], keep='first')
+                        df = combined_df.sort_values('date', ascending=False).reset_index(drop=True)
+                except Exception as e:
+                    print(f"Could not merge with historical Treasury data: {str(e)}")
             
-            save_data_to_csv(df, DATA_FILES["treasury_yield"])
-            print(f"Treasury Yield data updated with {len(df)} observations")
+                save_data_to_csv(df, DATA_FILES["treasury_yield"])
+                record_refresh("treasury_yield", df)
+                print(f"Treasury Yield data updated with {len(df)} observations")
+        else:
+            print("Using cached Treasury Yield data (no new close yet)")
     except Exception as e:
         print(f"Error fetching Treasury Yield data: {str(e)}")
         # Try to use cached data if available
@@ -287,28 +290,33 @@ def fetch_treasury_data():
     return df
 
 def fetch_vix_data():
-    """Fetch VIX data - always refresh for latest"""
+    """Fetch VIX data once a new close can exist"""
     print("Processing VIX data...")
     start_time = time.time()
     
     try:
-        # VIX updates daily so we always want fresh data
-        df = fetch_vix_from_yahoo()
+        # VIX updates daily; only fetch once a new close can exist
+        df = load_data_from_csv(DATA_FILES["vix"])
+        if needs_refresh("vix", df):
+            df = fetch_vix_from_yahoo()
         
-        if not df.empty:
-            # Load historical data to merge if available
-            try:
-                historical_df = load_data_from_csv(DATA_FILES["vix"])
-                # Merge with historical data, keeping the newer values when dates overlap
-                if not historical_df.empty:
-                    combined_df = pd.concat([df, historical_df])
-                    combined_df = combined_df.drop_duplicates(subset=['date'], keep='first')
-                    df = combined_df.sort_values('date', ascending=False).reset_index(drop=True)
-            except Exception as e:
-                print(f"Could not merge with historical VIX data: {str(e)}")
+            if not df.empty:
+                # Load historical data to merge if available
+                try:
+                    historical_df = load_data_from_csv(DATA_FILES["vix"])
+                    # Merge with historical data, keeping the newer values when dates overlap
+                    if not historical_df.empty:
+                        combined_df = pd.concat([df, historical_df])
+                        combined_df = combined_df.drop_duplicates(subset=['date'], keep='first')
+                        df = combined_df.sort_values('date', ascending=False).reset_index(drop=True)
+                except Exception as e:
+                    print(f"Could not merge with historical VIX data: {str(e)}")
             
-            save_data_to_csv(df, DATA_FILES["vix"])
-            print(f"VIX data updated with {len(df)} observations")
+                save_data_to_csv(df, DATA_FILES["vix"])
+                record_refresh("vix", df)
+                print(f"VIX data updated with {len(df)} observations")
+        else:
+            print("Using cached VIX data (no new close yet)")
     except Exception as e:
         print(f"Error fetching VIX data: {str(e)}")
         # Try to use cached data if available
@@ -319,18 +327,23 @@ def fetch_vix_data():
     return df
 
 def fetch_nasdaq_data():
-    """Fetch NASDAQ data - always refresh for latest"""
+    """Fetch NASDAQ data once a new close can exist"""
     print("Processing NASDAQ data...")
     start_time = time.time()
     
     try:
-        # NASDAQ updates daily so we always want fresh data
-        df = fetch_nasdaq_with_ema()
-        
-        if not df.empty:
-            # Save data to CSV
-            save_data_to_csv(df, DATA_FILES["nasdaq"])
-            print(f"NASDAQ data updated with {len(df)} observations")
+        # NASDAQ updates daily; only fetch once a new close can exist
+        df = load_data_from_csv(DATA_FILES["nasdaq"])
+        if needs_refresh("nasdaq", df):
+            df = fetch_nasdaq_with_ema()
+            
+            if not df.empty:
+                # Save data to CSV
+                save_data_to_csv(df, DATA_FILES["nasdaq"])
+                record_refresh("nasdaq", df)
+                print(f"NASDAQ data updated with {len(df)} observations")
+        else:
+            print("Using cached NASDAQ data (no new close yet)")
     except Exception as e:
         print(f"Error fetching NASDAQ data: {str(e)}")
         # Try to use cached data if available
@@ -355,6 +368,7 @@ def fetch_consumer_sentiment():
             df = fetch_consumer_sentiment_data()
             if not df.empty:
                 save_data_to_csv(df, DATA_FILES["consumer_sentiment"])
+                record_refresh("consumer_sentiment", df)
                 print(f"Consumer Sentiment data updated with {len(df)} observations")
         else:
             print("Using cached Consumer Sentiment data (still current)")
@@ -367,33 +381,33 @@ def fetch_consumer_sentiment():
     print(f"Consumer Sentiment data processing completed in {elapsed:.2f} seconds")
     return df
 
+# Fetching function for each data type (also the macro nodes of daily_pipeline.py)
+FETCH_FUNCTIONS = {
+    "gdp": fetch_gdp_data,
+    "unemployment": fetch_unemployment_data,
+    "cpi": fetch_cpi_data,
+    "pcepi": fetch_pcepi_data,
+    "interest_rate": fetch_interest_rate_data,
+    "pce": fetch_pce_data,
+    "treasury_yield": fetch_treasury_data,
+    "vix": fetch_vix_data,
+    "nasdaq": fetch_nasdaq_data,
+    "consumer_sentiment": fetch_consumer_sentiment
+}
+
 # Main function to fetch all data in parallel
 def fetch_all_data_parallel():
     """Fetch all economic data in parallel using thread pool"""
     start_time = time.time()
     print("Starting parallel data fetching...")
     
-    # Create a mapping of data types to their fetching functions
-    fetch_functions = {
-        "gdp": fetch_gdp_data,
-        "unemployment": fetch_unemployment_data,
-        "cpi": fetch_cpi_data,
-        "pcepi": fetch_pcepi_data,
-        "interest_rate": fetch_interest_rate_data,
-        "pce": fetch_pce_data,
-        "treasury_yield": fetch_treasury_data,
-        "vix": fetch_vix_data,
-        "nasdaq": fetch_nasdaq_data,
-        "consumer_sentiment": fetch_consumer_sentiment
-    }
-    
     # Results dictionary to store all data
     results = {}
     
     # Use ThreadPoolExecutor to run fetch operations in parallel
     with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
         # Submit all fetch tasks
-        future_to_data = {executor.submit(func): data_type for data_type, func in fetch_functions.items()}
+        future_to_data = {executor.submit(func): data_type for data_type, func in FETCH_FUNCTIONS.items()}
         
         # Process completed tasks as they complete
         for future in concurrent.futures.as_completed(future_to_data):
@@ -412,6 +426,10 @@ def fetch_all_data_parallel():
     elapsed = time.time() - start_time
     print(f"All data fetching completed in {elapsed:.2f} seconds")
     
+    # Publish the refreshed data to the shared cache and point-in-time index
+    data_cache.update_cache(results)
+    asof_index.update_many(results, names=DATASET_INDICATORS, paths=DATA_FILES)
+    
     # Save metadata about the fetch operation
     metadata = {
         "fetch_time": pd.Timestamp.now().isoformat(),
@@ -427,22 +445,25 @@ def fetch_all_data_parallel():
     
     return results
 
-# Function to check if full data refresh is needed
+# Function to check if any non-daily series may have a new release
 def check_refresh_needed():
-    """Check if a complete data refresh is needed based on elapsed time"""
-    try:
-        with open("data/fetch_metadata.json", "r") as f:
-            metadata = json.load(f)
-            
-        last_fetch = pd.to_datetime(metadata.get("fetch_time", "2000-01-01"))
-        now = pd.Timestamp.now()
-        hours_since_fetch = (now - last_fetch).total_seconds() / 3600
-        
-        # Refresh if more than 6 hours have passed
-        return hours_since_fetch > 6
-    except Exception:
-        # If metadata doesn't exist or can't be read, refresh is needed
-        return True
+    """
+    Check if a full refresh is needed: true when any monthly or quarterly series
+    has a release due (from the release calendar alone, without API calls)
+    """
+    scheduler = release_calendar.get_scheduler()
+    for data_type, frequency in UPDATE_FREQUENCIES.items():
+        if frequency == "daily":
+            continue
+        try:
+            df = load_data_from_csv(DATA_FILES[data_type])
+        except Exception:
+            return True
+        due, reason = scheduler.status(data_type, df)
+        if due:
+            print(f"Full data refresh needed: {data_type} {reason}")
+            return True
+    return False
 
 # Function to fetch only daily updated data
 def fetch_daily_data_parallel():
@@ -453,12 +474,7 @@ def fetch_daily_data_parallel():
     # Only fetch data that updates daily
     daily_data_types = [data_type for data_type, freq in UPDATE_FREQUENCIES.items() if freq == "daily"]
     
-    # Create a mapping of data types to their fetching functions
-    fetch_functions = {
-        "treasury_yield": fetch_treasury_data,
-        "vix": fetch_vix_data,
-        "nasdaq": fetch_nasdaq_data,
-    }
+    fetch_functions = {data_type: FETCH_FUNCTIONS[data_type] for data_type in daily_data_types}
     
     # Results dictionary to store daily data
     results = {}
@@ -485,6 +501,10 @@ def fetch_daily_data_parallel():
     elapsed = time.time() - start_time
     print(f"Daily data fetching completed in {elapsed:.2f} seconds")
     
+    # Publish the refreshed data to the shared cache and point-in-time index
+    data_cache.update_cache(results)
+    asof_index.update_many(results, names=DATASET_INDICATORS, paths=DATA_FILES)
+    
     return results
 
 # Main function to intelligently fetch all data
@@ -0,0 +1,343 @@
+# pipeline.py
+# -----------------------------------------------------------
+# Dependency-graph runner with input-hash caching
+# -----------------------------------------------------------
+#
+# A Pipeline is a set of named nodes. Each node is a function whose keyword
+# arguments are the outputs of the nodes it depends on (plus fixed params).
+# Pipeline.run() executes the graph on a thread pool: a node starts as soon
+# as everything it depends on has finished, so independent branches run in
+# parallel.
+#
+# Every node has an input hash built from its version, its params, the
+# output hashes of its dependencies and the contents of the files it
+# declares as inputs. After a successful run the output is pickled under the
+# cache directory together with that hash. On the next run a node whose
+# input hash is unchanged (and whose declared output files still exist) is
+# not executed; its cached output is handed downstream instead. So only the
+# nodes downstream of an input that actually changed run again.
+#
+# Source nodes that read the outside world (APIs, databases) are declared
+# always=True: they run every time, and their output hash decides whether
+# anything downstream has to rerun.
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# Outcome of one node in a run. status is "ran", "cached", "failed" or
+# "skipped" (a dependency failed).
+NodeResult = namedtuple('NodeResult', ['status', 'output', 'input_hash', 'output_hash', 'seconds', 'error'])
+
+def _update_hash(h, value):
+    """Feed a node output (frames, arrays, containers, scalars) into a hash"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        labels = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        h.update(repr([str(label) for label in labels]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"ndarray{value.shape}{value.dtype}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, value[key])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        h.update(b"[")
+        for item in (sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value):
+            _update_hash(h, item)
+        h.update(b"]")
+    else:
+        h.update(repr(value).encode())
+
+def fingerprint(value):
+    """Stable hash of a node output"""
+    h = hashlib.sha1()
+    _update_hash(h, value)
+    return h.hexdigest()
+
+def file_digest(path):
+    """sha1 of a file's contents, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class Node:
+    """One step of a pipeline"""
+
+    def __init__(self, name, func, deps=(), files=(), outputs=(), params=None, version="1", always=False):
+        """
+        Args:
+            name (str): Unique node name
+            func (callable): Called with one keyword argument per dependency
+                (its output) plus `params`
+            deps (iterable): Names of the nodes whose outputs func takes
+            files (iterable): Input files whose contents are part of the input hash
+            outputs (iterable): Files the node writes; their contents are part of
+                its output hash, and a missing one forces a rerun
+            params (dict): Fixed keyword arguments, part of the input hash
+            version (str): Bump to invalidate cached outputs after changing func
+            always (bool): Run on every pipeline run (source nodes)
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.files = tuple(files)
+        self.outputs = tuple(outputs)
+        self.params = dict(params or {})
+        self.version = version
+        self.always = always
+
+    def input_hash(self, dep_hashes):
+        """Hash of everything the node's output depends on"""
+        return fingerprint({
+            "version": self.version,
+            "params": self.params,
+            "deps": {dep: dep_hashes[dep] for dep in self.deps},
+            "files": {path: file_digest(path) for path in self.files},
+        })
+
+    def output_hash(self, output):
+        """Hash of the node's return value and the files it wrote"""
+        return fingerprint({
+            "output": fingerprint(output),
+            "files": {path: file_digest(path) for path in self.outputs},
+        })
+
+class Pipeline:
+    """A dependency graph of nodes with cached outputs"""
+
+    def __init__(self, name, cache_dir=None, max_workers=None):
+        """
+        Args:
+            name (str): Pipeline name (cached outputs live under cache_dir/name)
+            cache_dir (str): Cache root (default config.PIPELINE_CACHE_DIR; a
+                false value disables caching)
+            max_workers (int): Nodes run at once (default config.PIPELINE_MAX_WORKERS)
+        """
+        self.name = name
+        root = config.PIPELINE_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache_dir = os.path.join(root, name) if root else None
+        self.max_workers = max_workers or config.PIPELINE_MAX_WORKERS
+        self.nodes = {}
+        self.state = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def add(self, name, func, **options):
+        """Add a node (see Node for the options) and return it"""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node: {name}")
+        node = Node(name, func, **options)
+        self.nodes[name] = node
+        return node
+
+    # --- Graph ---
+
+    def order(self, names=None):
+        """
+        Nodes in dependency order.
+
+        Raises:
+            ValueError: On an unknown dependency or a cycle
+        """
+        names = list(self.nodes) if names is None else list(names)
+        ordered, visiting, done = [], set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name not in self.nodes:
+                raise ValueError(f"Unknown pipeline node: {name}" + (f" (needed by {path[-1]})" if path else ""))
+            if name in visiting:
+                raise ValueError(f"Pipeline cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+            ordered.append(name)
+
+        for name in names:
+            visit(name, [])
+        return ordered
+
+    def downstream(self, names):
+        """The given nodes and every node that depends on them, directly or not"""
+        selected = set(names)
+        for name in self.order():
+            if any(dep in selected for dep in self.nodes[name].deps):
+                selected.add(name)
+        return selected
+
+    # --- Cache ---
+
+    def _state_path(self):
+        return os.path.join(self.cache_dir, "state.json")
+
+    def _output_path(self, name):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        return os.path.join(self.cache_dir, f"{safe}.pkl")
+
+    def load(self):
+        """Load the cache state (an unreadable file starts fresh)"""
+        self.state = {}
+        if not self.cache_dir or not os.path.exists(self._state_path()):
+            return
+        try:
+            with open(self._state_path(), "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable pipeline state {self._state_path()}: {e}")
+
+    def _save_state(self):
+        tmp_path = f"{self._state_path()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._state_path())
+
+    def _load_cached(self, node, input_hash):
+        """The cached output for this input hash, or raise KeyError"""
+        entry = self.state.get(node.name)
+        if not self.cache_dir or not entry or entry.get("input_hash") != input_hash:
+            raise KeyError(node.name)
+        if not all(os.path.exists(path) for path in node.outputs):
+            raise KeyError(node.name)
+        try:
+            with open(self._output_path(node.name), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            raise KeyError(node.name)
+
+    def _store(self, node, input_hash, output_hash, output, seconds):
+        """Cache a node's output under its input hash"""
+        if not self.cache_dir:
+            return
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._output_path(node.name)
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+                # Unpicklable outputs are simply not cached: the node reruns next time
+                print(f"Not caching output of {node.name}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                self.state.pop(node.name, None)
+            else:
+                self.state[node.name] = {
+                    "input_hash": input_hash,
+                    "output_hash": output_hash,
+                    "finished_at": pd.Timestamp.now().isoformat(),
+                    "seconds": round(seconds, 3),
+                }
+            self._save_state()
+
+    # --- Execution ---
+
+    def _execute(self, node, inputs):
+        started = time.monotonic()
+        output = node.func(**inputs, **node.params)
+        return output, time.monotonic() - started
+
+    def run(self, targets=None, force=(), max_workers=None):
+        """
+        Run the nodes needed for `targets` (default: all of them).
+
+        Args:
+            targets (iterable): Node names to bring up to date, with their dependencies
+            force (iterable): Node names to run even if their inputs are unchanged
+            max_workers (int): Override the number of nodes run at once
+
+        Returns:
+            dict: {node name: NodeResult}, in dependency order
+        """
+        names = self.order(targets)
+        force = set(force)
+        unknown = force - set(self.nodes)
+        if unknown:
+            raise ValueError(f"Unknown pipeline node: {', '.join(sorted(unknown))}")
+
+        results = {}
+        pending = list(names)
+        running = {}
+        started = time.monotonic()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            while pending or running:
+                # Start (or resolve from the cache) every node whose dependencies are done
+                for name in list(pending):
+                    node = self.nodes[name]
+                    if any(dep not in results for dep in node.deps):
+                        continue
+                    pending.remove(name)
+
+                    failed = [dep for dep in node.deps if results[dep].status in ("failed", "skipped")]
+                    if failed:
+                        print(f"Skipping {name}: {', '.join(failed)} did not complete")
+                        results[name] = NodeResult("skipped", None, None, None, 0.0, None)
+                        continue
+
+                    input_hash = node.input_hash({dep: results[dep].output_hash for dep in node.deps})
+                    if not node.always and name not in force:
+                        try:
+                            output = self._load_cached(node, input_hash)
+                        except KeyError:
+                            pass
+                        else:
+                            print(f"{name}: inputs unchanged, using cached output")
+                            results[name] = NodeResult("cached", output, input_hash,
+                                                       node.output_hash(output), 0.0, None)
+                            continue
+
+                    inputs = {dep: results[dep].output for dep in node.deps}
+                    print(f"{name}: running")
+                    running[executor.submit(self._execute, node, inputs)] = (name, input_hash)
+
+                if not running:
+                    # Everything left was resolved from the cache or skipped
+                    continue
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name, input_hash = running.pop(future)
+                    node = self.nodes[name]
+                    try:
+                        output, seconds = future.result()
+                    except Exception as e:
+                        print(f"{name}: failed: {e}")
+                        traceback.print_exc()
+                        results[name] = NodeResult("failed", None, input_hash, None, 0.0, e)
+                        continue
+                    output_hash = node.output_hash(output)
+                    self._store(node, input_hash, output_hash, output, seconds)
+                    print(f"{name}: completed in {seconds:.2f} seconds")
+                    results[name] = NodeResult("ran", output, input_hash, output_hash, seconds, None)
+
+        counts = {}
+        for result in results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        print(f"Pipeline {self.name} finished in {time.monotonic() - started:.2f} seconds ({summary})")
+        return {name: results[name] for name in names}
@@ -186,6 +186,63 @@ def get_fully_diluted_share_count(ticker, use_cache=True, update_cache=True):
     
     return shares
 
+def get_fully_diluted_share_counts(tickers, use_cache=True, update_cache=True):
+    """
+    Get fully diluted share counts for many tickers with one cache read and write
+
+    Same rules as get_fully_diluted_share_count (overrides first, then cache
+    entries less than 7 days old, then the API), but the cache file is loaded
+    once and saved once for the whole list.
+
+    Args:
+        tickers (list): Ticker symbols
+        use_cache (bool): Whether to use cached data if available
+        update_cache (bool): Whether to update the cache with new data
+
+    Returns:
+        dict: Ticker -> fully diluted shares outstanding (None if unavailable)
+    """
+    cache = load_shares_cache() if use_cache or update_cache else {}
+    counts = {}
+    to_fetch = []
+
+    for ticker in dict.fromkeys(tickers):
+        if ticker in SHARE_COUNT_OVERRIDES:
+            counts[ticker] = SHARE_COUNT_OVERRIDES[ticker]
+            continue
+
+        cache_entry = cache.get(ticker) if use_cache else None
+        if isinstance(cache_entry, dict):
+            cached_date = datetime.fromisoformat(cache_entry.get("date", "2000-01-01"))
+            if datetime.now() - cached_date < timedelta(days=7) and cache_entry.get("shares"):
+                counts[ticker] = cache_entry["shares"]
+                continue
+        elif isinstance(cache_entry, (int, float)) and cache_entry > 0:
+            counts[ticker] = cache_entry
+            continue
+        to_fetch.append(ticker)
+
+    if to_fetch:
+        api_key = get_api_key()
+        fetched = 0
+        for ticker in to_fetch:
+            shares, name, market_cap = fetch_fully_diluted_shares(ticker, api_key) if api_key else (None, None, None)
+            counts[ticker] = shares
+            if shares is not None:
+                fetched += 1
+                cache[ticker] = {
+                    "shares": shares,
+                    "name": name,
+                    "date": datetime.now().isoformat(),
+                    "market_cap": market_cap
+                }
+        if update_cache and fetched:
+            save_shares_cache(cache)
+
+    logging.info(f"Resolved share counts for {sum(1 for s in counts.values() if s)}/{len(counts)} tickers "
+                 f"({len(to_fetch)} looked up via API)")
+    return counts
+
 def ensure_fully_diluted_shares():
     """
     Ensure that fully diluted shares are being used for all market cap calculations
@@ -27,9 +27,11 @@ from typing import Dict, List, Optional
 
 import pandas as pd
 import numpy as np
-import requests
 from tqdm import tqdm
 
+import http_client
+from sector_universe import get_universe
+
 # Manual overrides for stocks with known share count discrepancies
 # These values come from the most authoritative sources (SEC filings)
 # BUSINESS RULE: Always use fully diluted share counts for all market cap calculations
@@ -101,12 +103,12 @@ class PolygonClient:
         """
         self.api_key = api_key
         self.headers = {"Authorization": f"Bearer {api_key}"}
-        self.request_count = 0
-        self.rate_limit = 5  # requests per second for premium tier
+        self.http = http_client.get_client("polygon")
     
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+    async def _request_async(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
-        Make a request to the Polygon API with rate limiting
+        Make a request to the Polygon API through the shared client
+        (rate limiting, retries and connection pooling happen there)
         
         Args:
             endpoint (str): API endpoint
@@ -115,18 +117,7 @@ class PolygonClient:
         Returns:
             dict: API response
         """
-        # Add API key to params
-        if params is None:
-            params = {}
-        
-        # Rate limiting: ensure we don't exceed the rate limit
-        self.request_count += 1
-        if self.request_count % self.rate_limit == 0:
-            time.sleep(1.1)  # Wait a bit more than 1 second every few requests
-            
-        # Make request
-        url = f"{self.BASE_URL}/{endpoint}"
-        response = requests.get(url, params=params, headers=self.headers)
+        response = await self.http.get(endpoint, params=params, headers=self.headers)
         
         # Check response
         if response.status_code != 200:
@@ -135,6 +126,31 @@ class PolygonClient:
         
         return response.json()
     
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        """Make a single request to the Polygon API (see _request_async)"""
+        return http_client.run(self._request_async(endpoint, params))
+    
+    def _make_requests(self, requests_by_key: Dict[str, tuple]) -> Dict[str, Dict]:
+        """
+        Make many requests to the Polygon API concurrently
+        
+        Args:
+            requests_by_key (dict): Key -> (endpoint, params)
+            
+        Returns:
+            dict: Key -> API response (failed requests are left out and logged)
+        """
+        keys = list(requests_by_key)
+        responses = http_client.run(http_client.gather(
+            *(self._request_async(endpoint, params) for endpoint, params in requests_by_key.values())))
+        results = {}
+        for key, response in zip(keys, responses):
+            if isinstance(response, Exception):
+                logging.error(f"Error requesting {key}: {response}")
+            else:
+                results[key] = response
+        return results
+    
     def get_ticker_details(self, ticker: str) -> Dict:
         """
         Get details for a ticker, including shares outstanding
@@ -160,17 +176,33 @@ class PolygonClient:
         Returns:
             list: List of price data dictionaries
         """
+        response = self._make_request(*self._historical_prices_request(ticker, start_date, end_date, adjusted))
+        return self._price_results(response, ticker, start_date, end_date)
+    
+    def get_many_ticker_details(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Get details for many tickers concurrently (ticker -> details)"""
+        return self._make_requests({ticker: (f"v3/reference/tickers/{ticker}", None) for ticker in tickers})
+    
+    def get_many_historical_prices(self, tickers: List[str], start_date: str, end_date: str,
+                                   adjusted: bool = True) -> Dict[str, List[Dict]]:
+        """Get historical daily closing prices for many tickers concurrently (ticker -> price data)"""
+        responses = self._make_requests({
+            ticker: self._historical_prices_request(ticker, start_date, end_date, adjusted) for ticker in tickers
+        })
+        return {ticker: self._price_results(response, ticker, start_date, end_date)
+                for ticker, response in responses.items()}
+    
+    @staticmethod
+    def _historical_prices_request(ticker: str, start_date: str, end_date: str, adjusted: bool) -> tuple:
         params = {
             "adjusted": "true" if adjusted else "false",
             "sort": "asc",
             "limit": 120,  # Should be enough for ~30 days of market data
         }
-        
-        response = self._make_request(
-            f"v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}", 
-            params
-        )
-        
+        return f"v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}", params
+    
+    @staticmethod
+    def _price_results(response: Dict, ticker: str, start_date: str, end_date: str) -> List[Dict]:
         if "results" not in response:
             logging.warning(f"No historical price data for {ticker} from {start_date} to {end_date}")
             return []
@@ -234,9 +266,11 @@ def get_shares_outstanding(client: PolygonClient, tickers: List[str], verbose: b
                 if ticker in remaining_tickers:
                     remaining_tickers.remove(ticker)
 
+        # Request every missing ticker at once; the shared client paces them
+        fetched = client.get_many_ticker_details(missing_tickers)
         for ticker in ticker_iter:
             try:
-                details = client.get_ticker_details(ticker)
+                details = fetched.get(ticker, {})
                 
                 if "results" in details and details["results"]:
                     # Get weighted shares outstanding (fully diluted) if available, otherwise use share class shares
@@ -312,9 +346,11 @@ def get_shares_outstanding(client: PolygonClient, tickers: List[str], verbose: b
         else:
             ticker_iter = missing_tickers
             
+        # Request every missing ticker at once; the shared client paces them
+        fetched = client.get_many_ticker_details(missing_tickers)
         for ticker in ticker_iter:
             try:
-                details = client.get_ticker_details(ticker)
+                details = fetched.get(ticker, {})
                 
                 if "results" in details and details["results"]:
                     shares = details["results"].get("share_class_shares_outstanding")
@@ -380,9 +416,11 @@ def get_historical_prices(client: PolygonClient, tickers: List[str], start_date:
         else:
             ticker_iter = missing_tickers
             
+        # Request every missing ticker at once; the shared client paces them
+        fetched = client.get_many_historical_prices(missing_tickers, start_date, end_date)
         for ticker in ticker_iter:
             try:
-                prices = client.get_historical_prices(ticker, start_date, end_date)
+                prices = fetched.get(ticker, [])
                 
                 if prices:
                     # Extract dates and closing prices
@@ -488,41 +526,31 @@ def calculate_sector_market_caps(market_caps: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame: Sector market caps
     """
-    sector_caps = pd.DataFrame(index=market_caps.index)
+    # Sum every sector for every date in one matrix product
+    universe = get_universe(SECTOR_TICKERS)
+    available = [t for t in universe.tickers if t in market_caps.columns]
+    sector_caps = universe.aggregate_frame(market_caps)
+    coverage = universe.coverage(available)
+    missing = universe.missing(available)
+    
+    # Sectors without any ticker data have no total
+    sector_caps.loc[:, (coverage['covered'] == 0).to_numpy()] = np.nan
     
     # Dictionary to track coverage for each sector
     sector_coverage = {}
-    
-    for sector, tickers in SECTOR_TICKERS.items():
-        # Get tickers with data
-        available_tickers = [t for t in tickers if t in market_caps.columns]
+    for sector, row in coverage.iterrows():
+        sector_coverage[sector] = {
+            'tickers_available': int(row['covered']),
+            'tickers_total': int(row['total']),
+            'coverage_pct': float(row['coverage_pct']),
+            'tickers_missing': missing.get(sector, [])
+        }
         
-        if available_tickers:
-            # Sum market caps
-            sector_caps[sector] = market_caps[available_tickers].sum(axis=1)
-            
-            # Track coverage percentage
-            coverage_pct = len(available_tickers) / len(tickers) * 100
-            sector_coverage[sector] = {
-                'tickers_available': len(available_tickers),
-                'tickers_total': len(tickers),
-                'coverage_pct': coverage_pct,
-                'tickers_missing': [t for t in tickers if t not in available_tickers]
-            }
-            
-            # Log warning if coverage is less than 100%
-            if coverage_pct < 100:
-                missing_tickers = [t for t in tickers if t not in available_tickers]
-                logging.warning(f"Sector {sector} has {coverage_pct:.1f}% coverage ({len(available_tickers)}/{len(tickers)} tickers). Missing: {missing_tickers}")
-        else:
+        # Log warning if coverage is less than 100%
+        if row['covered'] == 0:
             logging.warning(f"No data available for sector {sector}")
-            sector_caps[sector] = np.nan
-            sector_coverage[sector] = {
-                'tickers_available': 0,
-                'tickers_total': len(tickers),
-                'coverage_pct': 0,
-                'tickers_missing': tickers
-            }
+        elif row['coverage_pct'] < 100:
+            logging.warning(f"Sector {sector} has {row['coverage_pct']:.1f}% coverage ({row['covered']}/{row['total']} tickers). Missing: {missing.get(sector, [])}")
     
     # Save coverage report
     try:
@@ -534,15 +562,12 @@ def calculate_sector_market_caps(market_caps: pd.DataFrame) -> pd.DataFrame:
         logging.error(f"Error saving sector coverage report: {e}")
     
     # Calculate total market cap for all sectors
-    sector_caps['Total'] = sector_caps.sum(axis=1)
+    sector_caps['Total'] = sector_caps[universe.sectors].sum(axis=1)
     
     # Calculate sector weights (% of total market cap)
-    weight_cols = []
-    for sector in SECTOR_TICKERS.keys():
-        if sector in sector_caps.columns:
-            weight_col = f"{sector}_weight_pct"
-            weight_cols.append(weight_col)
-            sector_caps[weight_col] = (sector_caps[sector] / sector_caps['Total'] * 100).round(2)
+    weight_cols = [f"{sector}_weight_pct" for sector in universe.sectors]
+    weights = (sector_caps[universe.sectors].div(sector_caps['Total'], axis=0) * 100).round(2)
+    sector_caps[weight_cols] = weights.to_numpy()
     
     # Also calculate and save the most recent weights (latest date)
     try:
@@ -51,7 +51,18 @@ ESSENTIAL_FILES = [
     "data_cache.py",
     "ema_calculator.py",
     "sentiment_engine.py",
-    "check_ticker_coverage.py"
+    "asof_index.py",
+    "incremental_scorer.py",
+    "figure_cache.py",
+    "dashboard_snapshot.py",
+    "lazy_import.py",
+    "bulk_ingest.py",
+    "ticker_dataset.py",
+    "check_ticker_coverage.py",
+    "ema_kernel.py",
+    "http_client.py",
+    "http_replay.py",
+    "fred_store.py"
 ]
 
 # Files to explicitly exclude
@@ -0,0 +1,223 @@
+# release_calendar.py
+# -----------------------------------------------------------
+# Release-calendar-aware refresh decisions for the macro series
+# -----------------------------------------------------------
+#
+# A monthly series gets one new observation a month, on a predictable
+# schedule, so polling it on a timer mostly re-downloads unchanged data.
+# ReleaseScheduler decides per series whether a request can pay off:
+#
+#   1. Calendar: from the latest observation, the series' cadence
+#      (config.UPDATE_FREQUENCIES) and its publication lag
+#      (config.RELEASE_SCHEDULES) it works out when the next observation can
+#      first appear. Before then nothing is requested.
+#   2. Poll interval: once due, a series is polled at most every
+#      config.RELEASE_POLL_HOURS[cadence] hours until the new value arrives.
+#   3. FRED metadata: for FRED series one small /fred/series request returns
+#      the series' last_updated time. If it matches the one recorded at the
+#      last refresh, the observations are not downloaded again.
+#
+# The last check, last refresh and FRED last_updated per series are kept in
+# config.RELEASE_STATE_FILE.
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+import config
+import http_client
+
+EASTERN = "US/Eastern"
+CADENCE_MONTHS = {"monthly": 1, "quarterly": 3}
+
+def _eastern(now=None):
+    """`now` (default: the current time) as a US/Eastern timestamp; naive times are taken as Eastern"""
+    if now is None:
+        return pd.Timestamp.now(tz=EASTERN)
+    now = pd.Timestamp(now)
+    return now.tz_localize(EASTERN) if now.tzinfo is None else now.tz_convert(EASTERN)
+
+def latest_observation(df):
+    """Latest observation date in a dataset, or None if it has none"""
+    if df is None or df.empty or "date" not in df.columns:
+        return None
+    dates = pd.to_datetime(df["date"], errors="coerce").dropna()
+    return dates.max().normalize() if not dates.empty else None
+
+def next_release(data_type, latest_date):
+    """
+    Earliest time the observation after `latest_date` can be published.
+
+    Args:
+        data_type (str): Key of config.UPDATE_FREQUENCIES
+        latest_date: Date of the latest observation held
+
+    Returns:
+        pd.Timestamp: US/Eastern release time
+    """
+    schedule = config.RELEASE_SCHEDULES.get(data_type, {})
+    cadence = config.UPDATE_FREQUENCIES[data_type]
+    latest = pd.Timestamp(latest_date).normalize()
+    if cadence == "daily":
+        release_day = latest + pd.offsets.BDay(1)
+    else:
+        # The next observation covers the period after the latest one
+        months = CADENCE_MONTHS[cadence]
+        period_end = latest + pd.DateOffset(months=2 * months) - pd.Timedelta(days=1)
+        release_day = period_end + pd.Timedelta(days=schedule.get("lag_days", 0))
+    return (release_day + pd.Timedelta(hours=schedule.get("release_hour", 0))).tz_localize(EASTERN)
+
+def revision_window_end(data_type, latest_date):
+    """End of the period in which the latest observation may still be revised, or None"""
+    schedule = config.RELEASE_SCHEDULES.get(data_type, {})
+    cadence = config.UPDATE_FREQUENCIES[data_type]
+    if not schedule.get("revision_days") or cadence not in CADENCE_MONTHS:
+        return None
+    period_end = pd.Timestamp(latest_date).normalize() + pd.DateOffset(months=CADENCE_MONTHS[cadence])
+    return (period_end + pd.Timedelta(days=schedule["revision_days"])).tz_localize(EASTERN)
+
+def fred_last_updated(series_id):
+    """
+    FRED's last_updated time for a series (e.g. "2025-04-30 07:52:03-05").
+
+    Raises:
+        RuntimeError: If FRED does not return the series metadata
+    """
+    response = http_client.get_client("fred").get_sync("/fred/series", params={
+        "series_id": series_id,
+        "api_key": os.environ.get("FRED_API_KEY", ""),
+        "file_type": "json",
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"FRED series metadata request for {series_id} failed: {response.status_code}")
+    return response.json()["seriess"][0]["last_updated"]
+
+class ReleaseScheduler:
+    """Per-series refresh decisions from the release calendar and FRED metadata"""
+
+    def __init__(self, path=config.RELEASE_STATE_FILE, fetch_last_updated=fred_last_updated):
+        """
+        Args:
+            path (str): JSON state file (None keeps the state in memory only)
+            fetch_last_updated (callable): FRED series ID -> last_updated string
+        """
+        self.path = path
+        self.fetch_last_updated = fetch_last_updated
+        self.state = {}
+        self._pending = {}  # FRED last_updated seen by needs_refresh, recorded once the refresh succeeds
+        self._lock = threading.Lock()  # Fetchers run on a thread pool
+        self.load()
+
+    def load(self):
+        """Load the saved state (an unreadable file starts fresh)"""
+        self.state = {}
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable release state {self.path}: {e}")
+
+    def save(self):
+        """Atomically write the state"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _poll_interval(self, data_type):
+        cadence = config.UPDATE_FREQUENCIES.get(data_type)
+        return pd.Timedelta(hours=config.RELEASE_POLL_HOURS.get(cadence, 1))
+
+    def status(self, data_type, df, now=None):
+        """
+        Whether a series is due for a check, from the calendar alone (no requests).
+
+        Returns:
+            tuple: (due, reason)
+        """
+        now = _eastern(now)
+        if data_type not in config.UPDATE_FREQUENCIES:
+            return True, "no release schedule"
+        latest = latest_observation(df)
+        if latest is None:
+            return True, "no data yet"
+
+        release = next_release(data_type, latest)
+        revisions_until = revision_window_end(data_type, latest)
+        if now < release and (revisions_until is None or now >= revisions_until):
+            return False, f"next release not before {release:%Y-%m-%d %H:%M} ET"
+
+        last_checked = self.state.get(data_type, {}).get("last_checked")
+        if last_checked and now - _eastern(last_checked) < self._poll_interval(data_type):
+            return False, f"checked at {_eastern(last_checked):%Y-%m-%d %H:%M} ET, polling again later"
+        if now < release:
+            return True, f"latest value may be revised until {revisions_until:%Y-%m-%d}"
+        return True, f"release due since {release:%Y-%m-%d %H:%M} ET"
+
+    def needs_refresh(self, data_type, df, now=None):
+        """
+        Whether a series should be downloaded now.
+
+        Due FRED series are first checked against FRED's last_updated time and
+        skipped when it has not changed since the last refresh.
+        """
+        now = _eastern(now)
+        due, reason = self.status(data_type, df, now)
+        if not due:
+            print(f"Skipping {data_type}: {reason}")
+            return False
+
+        series_id = config.RELEASE_SCHEDULES.get(data_type, {}).get("fred_series")
+        last_updated = None
+        if series_id and latest_observation(df) is not None:
+            try:
+                last_updated = self.fetch_last_updated(series_id)
+            except Exception as e:
+                print(f"Could not check FRED metadata for {series_id}: {e}")
+
+        with self._lock:
+            entry = self.state.setdefault(data_type, {})
+            entry["last_checked"] = now.isoformat()
+            unchanged = last_updated is not None and last_updated == entry.get("last_updated")
+            if last_updated is not None and not unchanged:
+                self._pending[data_type] = last_updated
+            self.save()
+
+        if unchanged:
+            print(f"Skipping {data_type}: FRED series {series_id} unchanged since {last_updated}")
+            return False
+        print(f"Refreshing {data_type}: {reason}")
+        return True
+
+    def record_refresh(self, data_type, df, now=None):
+        """Record a successful download of a series"""
+        now = _eastern(now)
+        latest = latest_observation(df)
+        with self._lock:
+            entry = self.state.setdefault(data_type, {})
+            entry["last_checked"] = entry["last_refreshed"] = now.isoformat()
+            if latest is not None:
+                entry["latest_date"] = latest.strftime("%Y-%m-%d")
+            if data_type in self._pending:
+                entry["last_updated"] = self._pending.pop(data_type)
+            self.save()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Return the shared ReleaseScheduler (state in config.RELEASE_STATE_FILE)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ReleaseScheduler()
+        return _scheduler
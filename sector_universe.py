@@ -0,0 +1,169 @@
+# sector_universe.py
+# -----------------------------------------------------------
+# Sector × ticker weight matrix shared by the market cap collectors
+# -----------------------------------------------------------
+#
+# Several tickers (GOOGL, META, AMZN, MSFT, NVDA, ORCL, IBM, ...) belong to
+# more than one sector. A SectorUniverse is built once per sector mapping and
+# turns every sector aggregate into a matrix product:
+#
+#   sector totals   = W @ ticker values          (one mat-vec per date)
+#   sector coverage = M @ ticker has-data flags
+#
+# M is the 0/1 membership matrix. W equals M with the default "full"
+# allocation (a multi-sector ticker counts fully in each of its sectors, as the
+# collectors always have); with "fractional" allocation a ticker in k sectors
+# contributes 1/k of its value to each, so sector totals add up to the
+# universe total. The matrices use scipy.sparse when it is installed and
+# plain NumPy arrays otherwise (the universe is small enough either way).
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+import config
+
+ALLOCATIONS = ("full", "fractional")
+
+class SectorUniverse:
+    """Sectors, tickers and the sector × ticker matrices linking them"""
+
+    def __init__(self, sectors, allocation="full"):
+        """
+        Args:
+            sectors (dict): Sector name -> list of tickers
+            allocation (str): "full" or "fractional" (see module docs)
+        """
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Unknown sector allocation {allocation!r} (expected one of {ALLOCATIONS})")
+
+        self.allocation = allocation
+        self.sectors = list(sectors)
+        self.tickers = sorted({ticker for tickers in sectors.values() for ticker in tickers})
+        self.members = {sector: list(dict.fromkeys(tickers)) for sector, tickers in sectors.items()}
+        column = {ticker: j for j, ticker in enumerate(self.tickers)}
+
+        rows, cols = [], []
+        for i, tickers in enumerate(self.members.values()):
+            rows.extend([i] * len(tickers))
+            cols.extend(column[ticker] for ticker in tickers)
+        shape = (len(self.sectors), len(self.tickers))
+        membership = np.zeros(shape)
+        membership[rows, cols] = 1.0
+
+        self.sector_sizes = membership.sum(axis=1)
+        self.sector_counts = membership.sum(axis=0)  # Sectors each ticker belongs to
+        weights = membership / self.sector_counts if allocation == "fractional" else membership
+
+        self.membership = self._to_matrix(membership)
+        self.weights = self._to_matrix(weights)
+
+    @staticmethod
+    def _to_matrix(array):
+        return sparse.csr_matrix(array) if sparse is not None else array
+
+    def vector(self, values):
+        """
+        Align ticker values (dict or Series) to self.tickers.
+
+        Returns:
+            np.ndarray: Values in ticker order, NaN where missing
+        """
+        series = pd.Series(values, dtype=float) if not isinstance(values, pd.Series) else values.astype(float)
+        return series.reindex(self.tickers).to_numpy(dtype=float)
+
+    def aggregate(self, values):
+        """
+        Sum ticker values into sectors (missing values count as 0).
+
+        Args:
+            values (dict or pd.Series): Ticker -> value
+
+        Returns:
+            pd.Series: Sector -> total
+        """
+        vector = np.nan_to_num(self.vector(values))
+        return pd.Series(self.weights @ vector, index=self.sectors)
+
+    def aggregate_frame(self, frame):
+        """
+        Sum a dates × tickers frame into a dates × sectors frame (missing values count as 0).
+
+        Args:
+            frame (pd.DataFrame): One column per ticker
+
+        Returns:
+            pd.DataFrame: One column per sector, same index
+        """
+        values = frame.reindex(columns=self.tickers).apply(pd.to_numeric, errors="coerce").fillna(0.0).to_numpy()
+        totals = (self.weights @ values.T).T
+        return pd.DataFrame(np.asarray(totals), index=frame.index, columns=self.sectors)
+
+    def coverage(self, available):
+        """
+        Count the tickers with data in each sector.
+
+        Args:
+            available: Tickers that have data (iterable), or a dict/Series of
+                ticker values where NaN means missing
+
+        Returns:
+            pd.DataFrame: covered, total and coverage_pct per sector
+        """
+        if isinstance(available, (dict, pd.Series)):
+            has_data = ~np.isnan(self.vector(available))
+        else:
+            available = set(available)
+            has_data = np.array([ticker in available for ticker in self.tickers])
+        covered = self.membership @ has_data.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coverage_pct = np.where(self.sector_sizes > 0, covered / self.sector_sizes * 100, 0.0)
+        return pd.DataFrame({
+            "covered": covered.astype(int),
+            "total": self.sector_sizes.astype(int),
+            "coverage_pct": coverage_pct,
+        }, index=self.sectors)
+
+    def missing(self, available):
+        """Return {sector: [tickers without data]} for sectors that have gaps"""
+        if isinstance(available, (dict, pd.Series)):
+            values = self.vector(available)
+            available = {ticker for ticker, value in zip(self.tickers, values) if not np.isnan(value)}
+        else:
+            available = set(available)
+        gaps = {}
+        for sector, tickers in self.members.items():
+            absent = [ticker for ticker in tickers if ticker not in available]
+            if absent:
+                gaps[sector] = absent
+        return gaps
+
+    @staticmethod
+    def sector_weights(totals):
+        """Each sector's share of the summed sector totals (0-1)"""
+        totals = pd.Series(totals, dtype=float)
+        grand_total = totals.sum()
+        return totals / grand_total if grand_total else totals * 0.0
+
+@lru_cache(maxsize=16)
+def _cached_universe(frozen_sectors, allocation):
+    return SectorUniverse({sector: list(tickers) for sector, tickers in frozen_sectors}, allocation)
+
+def get_universe(sectors=None, allocation=None):
+    """
+    Return the (cached) SectorUniverse for a sector mapping.
+
+    Args:
+        sectors (dict, optional): Sector name -> tickers (default config.SECTORS)
+        allocation (str, optional): "full" or "fractional" (default config.SECTOR_ALLOCATION)
+    """
+    sectors = config.SECTORS if sectors is None else sectors
+    allocation = allocation or config.SECTOR_ALLOCATION
+    frozen = tuple((sector, tuple(tickers)) for sector, tickers in sectors.items())
+    return _cached_universe(frozen, allocation)
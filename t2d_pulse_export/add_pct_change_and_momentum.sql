@@ -1,42 +1,76 @@
--- 1) Add pct_change column
+-- Daily % change and streak momentum for sector_market_cap_history
+--
+-- Run with psql:
+--   psql "$DATABASE_URL" -f add_pct_change_and_momentum.sql
+--   psql "$DATABASE_URL" -v streak_length=5 -f add_pct_change_and_momentum.sql
+--
+-- momentum is +1 when sector_cap rose on each of the last streak_length days
+-- (default 3), -1 when it fell on each of them, 0 otherwise. streak_length
+-- counts day-over-day changes, as --streak-length does in compute_weighted_pulse.py.
+--
+-- Only rows whose momentum is still NULL (i.e. new dates) are computed and
+-- written, in a single window-function pass over those rows plus the
+-- streak_length rows before them. To recompute everything, e.g. after changing
+-- streak_length, first run:
+--   UPDATE sector_market_cap_history SET momentum = NULL;
+
+\if :{?streak_length}
+\else
+  \set streak_length 3
+\endif
+
+-- 1) Add pct_change and momentum columns
 ALTER TABLE sector_market_cap_history
   ADD COLUMN IF NOT EXISTS pct_change DOUBLE PRECISION;
 
--- 2) Compute daily % change for each sector
-UPDATE sector_market_cap_history AS t
-SET pct_change = 100.0 * (t.sector_cap - lag(t.sector_cap) OVER w) / lag(t.sector_cap) OVER w
-FROM (
-  SELECT date, sector,
-         lag(sector_cap) OVER w AS prev_cap
-  FROM sector_market_cap_history
-  WINDOW w AS (PARTITION BY sector ORDER BY date)
-) prev
-WHERE t.sector = prev.sector
-  AND t.date   = prev.date;
-
--- 3) Add momentum flag column: +1 for 3-day up, -1 for 3-day down
 ALTER TABLE sector_market_cap_history
   ADD COLUMN IF NOT EXISTS momentum SMALLINT;
 
--- 4) Compute 3-day streak momentum
-WITH streaks AS (
-  SELECT
-    date,
-    sector,
-    CASE
-      WHEN pct_change > 0
-        AND lag(pct_change, 1) OVER w > 0
-        AND lag(pct_change, 2) OVER w > 0 THEN  1
-      WHEN pct_change < 0
-        AND lag(pct_change, 1) OVER w < 0
-        AND lag(pct_change, 2) OVER w < 0 THEN -1
-      ELSE 0
-    END AS m
+-- 2) Compute both for new dates
+WITH pending AS (
+  -- First date without momentum per sector
+  SELECT sector, MIN(date) AS first_date
   FROM sector_market_cap_history
+  WHERE momentum IS NULL
+  GROUP BY sector
+),
+scope AS (
+  -- New rows plus the streak_length rows before them as context
+  SELECT h.date, h.sector, h.sector_cap, h.date >= p.first_date AS is_new
+  FROM pending p
+  JOIN sector_market_cap_history h
+    ON h.sector = p.sector
+   AND h.date >= COALESCE((
+         SELECT c.date
+         FROM sector_market_cap_history c
+         WHERE c.sector = p.sector
+           AND c.date < p.first_date
+         ORDER BY c.date DESC
+         OFFSET :streak_length - 1 LIMIT 1
+       ), '-infinity'::date)
+),
+changes AS (
+  SELECT date, sector, is_new,
+         100.0 * (sector_cap - lag(sector_cap) OVER w) / NULLIF(lag(sector_cap) OVER w, 0) AS pct_change
+  FROM scope
   WINDOW w AS (PARTITION BY sector ORDER BY date)
+),
+streaks AS (
+  SELECT date, sector, is_new, pct_change,
+         CASE
+           WHEN count(pct_change) OVER s = :streak_length
+            AND min(sign(pct_change)) OVER s = max(sign(pct_change)) OVER s
+           THEN max(sign(pct_change)) OVER s
+           ELSE 0
+         END AS m
+  FROM changes
+  WINDOW s AS (PARTITION BY sector ORDER BY date
+               ROWS BETWEEN :streak_length - 1 PRECEDING AND CURRENT ROW)
 )
 UPDATE sector_market_cap_history AS t
-SET momentum = s.m
+SET pct_change = s.pct_change,
+    momentum   = s.m
 FROM streaks s
-WHERE t.sector = s.sector
+WHERE s.is_new
+  AND t.sector = s.sector
   AND t.date   = s.date;
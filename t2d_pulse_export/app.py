@@ -1,11 +1,11 @@
 import os
 import pandas as pd
 import numpy as np
-import requests
 import base64
 import io
 import json
 import time
+import threading
 from datetime import datetime, timedelta, timezone
 import pytz  # For timezone handling
 import dash
@@ -16,7 +16,10 @@ from dash.exceptions import PreventUpdate
 import flask
 import plotly.graph_objs as go
 import plotly.express as px
-import yfinance as yf
+
+# Heavy modules that only a few callbacks need are imported on first use
+from lazy_import import lazy_import
+yf = lazy_import("yfinance")
 
 import logging
 logger = logging.getLogger(__name__)
@@ -56,10 +59,11 @@ from functools import lru_cache
 from api_keys import FRED_API_KEY, BEA_API_KEY, BLS_API_KEY
 
 # Import document analysis functionality
-import document_analysis
+document_analysis = lazy_import("document_analysis")
 
 # Import sector sentiment scoring
 import sentiment_engine
+from incremental_scorer import IncrementalSectorScorer
 
 # Import efficient data reading functionality
 from data_reader import read_data_file, read_sector_data, read_pulse_score, read_market_data
@@ -77,13 +81,29 @@ import sector_trend_chart
 from sector_trend_chart import create_mini_trend_chart
 
 # Import data cache for fast data access
-from data_cache import get_data, get_all_data
+from data_cache import get_data, get_all_data, update_cache, stale_data_types
+
+# Memoize chart callbacks on the version of their input data
+from figure_cache import memoize_on_data
+
+# Precomputed startup snapshot (series, sector scores, Pulse history)
+import dashboard_snapshot
+
+# Shared HTTP client (FRED, BLS and BEA requests)
+import http_client
+
+# Incremental FRED fetches into the per-series observation store
+import fred_store
+from config import FRED_INCREMENTAL, FRED_HISTORY_YEARS
+
+# Shared EMA kernel (NASDAQ ema20, VIX ema14)
+from ema_kernel import ema_series
 
 # Import historical sector score generation
-import historical_sector_scores
+historical_sector_scores = lazy_import("historical_sector_scores")
 
 # Import authentic sector history for trend charts
-import authentic_sector_history
+authentic_sector_history = lazy_import("authentic_sector_history")
 import predefined_sector_data
 
 # Data reader for efficient file operations is already imported
@@ -96,12 +116,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Global data caching for expensive operations
+# Memory-map the dashboard snapshot, if a recent one exists, so that worker
+# start-up needs no database queries or file parsing
+STARTUP_SNAPSHOT = dashboard_snapshot.load_snapshot()
+if STARTUP_SNAPSHOT is not None:
+    logger.info(f"Loaded dashboard snapshot built at {datetime.fromtimestamp(STARTUP_SNAPSHOT.built_at)}")
+
 # Load T2D Pulse history exclusively from Parquet
 T2D_PULSE_HISTORY = None
 try:
-    parquet_file = os.path.join("data", "t2d_pulse_history.parquet")
-    logger.info(f"Loading T2D Pulse history from Parquet: {parquet_file}")
-    T2D_PULSE_HISTORY = pd.read_parquet(parquet_file)
+    if STARTUP_SNAPSHOT is not None and STARTUP_SNAPSHOT.pulse_history is not None:
+        logger.info("Using T2D Pulse history from the dashboard snapshot")
+        T2D_PULSE_HISTORY = STARTUP_SNAPSHOT.pulse_history
+    else:
+        parquet_file = os.path.join("data", "t2d_pulse_history.parquet")
+        logger.info(f"Loading T2D Pulse history from Parquet: {parquet_file}")
+        T2D_PULSE_HISTORY = pd.read_parquet(parquet_file)
 
     # Ensure we have a proper datetime index
     if "date" in T2D_PULSE_HISTORY.columns:
@@ -177,8 +207,49 @@ server = app.server
 app.title = "T2D Pulse"
 
 # Function to fetch data from FRED
-def fetch_fred_data(series_id, start_date=None, end_date=None):
+def fetch_fred_data(series_id, start_date=None, end_date=None, incremental=None):
     """Fetch data from FRED API for a given series"""
+    return http_client.run(fetch_fred_data_async(series_id, start_date, end_date, incremental))
+
+def fetch_fred_series(series_ids, start_date=None, end_date=None, incremental=None):
+    """Fetch several FRED series concurrently, returning {series_id: DataFrame}"""
+    results = http_client.run(http_client.gather(
+        *(fetch_fred_data_async(series_id, start_date, end_date, incremental) for series_id in series_ids)))
+    return {series_id: result if isinstance(result, pd.DataFrame) else pd.DataFrame()
+            for series_id, result in zip(series_ids, results)}
+
+async def fetch_fred_data_async(series_id, start_date=None, end_date=None, incremental=None):
+    """
+    Fetch data from FRED API for a given series (through the shared FRED client).
+
+    Without explicit dates, and unless incremental is False (default
+    config.FRED_INCREMENTAL), only the observations from the last few stored
+    ones onwards are requested and merged into the series' store (see
+    fred_store.py). The last FRED_HISTORY_YEARS years are then returned from
+    the store, in the same shape as a full download.
+    """
+    incremental = FRED_INCREMENTAL if incremental is None else incremental
+    if not incremental or start_date or end_date:
+        return await _fetch_fred_observations(series_id, start_date, end_date)
+
+    # Nothing stored yet: the first fetch downloads the full history
+    observation_start = fred_store.incremental_start(series_id)
+    # The store is the fallback here, so a failed request must not return the cached CSV
+    df = await _fetch_fred_observations(series_id, observation_start, use_cached_csv=False)
+    if df.empty:
+        if observation_start is None:
+            return df
+        print(f"No new FRED data for {series_id}, using stored observations")
+    else:
+        counts = fred_store.merge_observations(series_id, df)
+        print(f"FRED {series_id}: {counts['added']} new and {counts['revised']} revised observations stored")
+
+    today = datetime.now(pytz.timezone('US/Eastern')).date()
+    history_start = today - timedelta(days=FRED_HISTORY_YEARS * 365)
+    return fred_store.to_fred_frame(fred_store.read_series(series_id, start=history_start))
+
+async def _fetch_fred_observations(series_id, start_date=None, end_date=None, use_cached_csv=True):
+    """Download FRED observations for a series (default: the last 5 years)"""
     logger.info(f"Fetching FRED data for series {series_id}")
     
     if not FRED_API_KEY:
@@ -200,8 +271,8 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d') if isinstance(end_date, str) else end_date
         start_date = (end_date_obj - timedelta(days=5*365)).strftime('%Y-%m-%d')
     
-    # Build API URL
-    url = f"https://api.stlouisfed.org/fred/series/observations"
+    # API path (the shared client adds the base URL, rate limit and retries)
+    url = "/fred/series/observations"
     
     # Use current dates for most recent data
     params = {
@@ -217,7 +288,7 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
     
     try:
         # Make API request with current dates
-        response = requests.get(url, params=params)
+        response = await http_client.get_client("fred").get(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -251,7 +322,7 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
             
             try:
                 # Make second API request with simplified parameters
-                response = requests.get(url, params=params)
+                response = await http_client.get_client("fred").get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -284,7 +355,7 @@ def fetch_fred_data(series_id, start_date=None, end_date=None):
                             filename = fname
                             break
                     
-                    if filename and os.path.exists(filename):
+                    if use_cached_csv and filename and os.path.exists(filename):
                         print(f"Loading cached data from {filename} as fallback")
                         cached_df = pd.read_csv(filename)
                         cached_df['date'] = pd.to_datetime(cached_df['date'])
@@ -306,7 +377,7 @@ def fetch_bea_data(table_name, frequency, start_year, end_year):
         print("Cannot fetch BEA data: No API key provided")
         return pd.DataFrame()
     
-    url = "https://apps.bea.gov/api/data"
+    url = "/api/data"
     params = {
         "UserID": BEA_API_KEY,
         "method": "GetData",
@@ -318,7 +389,7 @@ def fetch_bea_data(table_name, frequency, start_year, end_year):
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get_client("bea").get_sync(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -440,7 +511,7 @@ def fetch_nasdaq_with_ema():
             return pd.DataFrame()
         
         # Calculate 20-day EMA
-        data['ema20'] = data['Close'].ewm(span=20, adjust=False).mean()
+        data['ema20'] = ema_series(data['Close'], span=20)
         
         # Calculate gap percentage (current price vs EMA)
         data['gap_pct'] = (data['Close'] / data['ema20'] - 1) * 100
@@ -620,7 +691,7 @@ def fetch_bls_data(series_id, start_year, end_year):
         logger.error("Cannot fetch BLS data: No API key provided")
         return pd.DataFrame()
     
-    url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+    url = "/publicAPI/v2/timeseries/data/"
     headers = {'Content-Type': 'application/json'}
     data = {
         "seriesid": [series_id],
@@ -630,7 +701,7 @@ def fetch_bls_data(series_id, start_year, end_year):
     }
     
     try:
-        response = requests.post(url, json=data, headers=headers)
+        response = http_client.get_client("bls").post_sync(url, json=data, headers=headers)
         
         if response.status_code == 200:
             result = response.json()
@@ -746,6 +817,9 @@ def generate_sector_tickers():
         "Hardware / Devices": ["AAPL", "DELL", "SMCI"]
     }
 
+# Incremental sector scorer, seeded by the first calculate_sector_sentiment() call
+sector_scorer = None
+
 def calculate_sector_sentiment():
     """Calculate sentiment scores for each technology sector using the latest data"""
     logger.info("Starting calculate_sector_sentiment function")
@@ -863,29 +937,26 @@ def calculate_sector_sentiment():
         return []
     
     try:
-        # Calculate sector scores - each sector using its own EMA factor
-        all_sector_scores = []
-        
-        for sector in sentiment_engine.SECTORS:
-            # Create a copy of the base macros to customize for this sector
-            sector_macros = macros.copy()
-            
-            # Use the sector-specific EMA factor if available, otherwise use default
-            if ema_factors and sector in ema_factors:
-                sector_macros["Sector_EMA_Factor"] = ema_factors[sector]
-                logger.info(f"Using sector-specific EMA factor for {sector}: {ema_factors[sector]:.3f}")
-            
-            # Calculate scores using this sector's own EMA factor
-            sector_result = sentiment_engine.score_sectors(sector_macros)
-            
-            # Find this specific sector's score
-            for data in sector_result:
-                if data["sector"] == sector:
-                    all_sector_scores.append(data)
-                    break
-        
-        # Use these sector-specific scores
-        sector_scores = all_sector_scores
+        # Calculate sector scores - each sector using its own EMA factor.
+        # The EMA factor is passed per sector, so all 14 sectors are scored together.
+        sector_macros = macros.copy()
+        if "Sector_EMA_Factor" in macros:
+            default_factor = macros["Sector_EMA_Factor"]
+            sector_macros["Sector_EMA_Factor"] = {
+                sector: ema_factors.get(sector, default_factor) for sector in sentiment_engine.SECTORS
+            }
+            for sector in sentiment_engine.SECTORS:
+                if sector in ema_factors:
+                    logger.info(f"Using sector-specific EMA factor for {sector}: {ema_factors[sector]:.3f}")
+        
+        # Only indicators whose latest value moved since the last call are re-scored
+        global sector_scorer
+        if sector_scorer is None:
+            sector_scorer = IncrementalSectorScorer(sector_macros)
+        else:
+            changed = sector_scorer.update_many(sector_macros, replace=True)
+            logger.info(f"Re-scored sectors for {len(changed)} changed indicators: {changed}")
+        sector_scores = sector_scorer.scores()
         logger.info(f"Successfully calculated sentiment scores for {len(sector_scores)} sectors with sector-specific EMA factors")
         
         # Get driver factors and tickers for each sector
@@ -969,17 +1040,12 @@ def calculate_t2d_pulse_from_sectors(sector_scores, sector_weights=None):
             sector_dict.update(item)
         sector_scores = sector_dict
     
-    # Try to get authentic market cap weights
-    try:
-        from authentic_marketcap_reader import get_sector_weightings
-        authentic_weights = get_sector_weightings()
-        
-        # If we have authentic weights and no custom weights specified, use the authentic weights
-        if authentic_weights and not sector_weights:
+    # If no custom weights are specified, use the authentic market cap weights
+    if not sector_weights:
+        authentic_weights = get_authentic_sector_weights()
+        if authentic_weights:
             logging.info("Using authentic market cap weights for T2D Pulse calculation")
             sector_weights = authentic_weights
-    except (ImportError, Exception) as e:
-        logging.warning(f"Could not load authentic market cap weights: {e}")
     
     # If no weights are provided, use equal weighting
     if not sector_weights:
@@ -1009,6 +1075,43 @@ def calculate_t2d_pulse_from_sectors(sector_scores, sector_weights=None):
     pulse_score = weighted_sum / total_applied_weight
     return round(pulse_score, 1)
 
+def get_authentic_sector_weights():
+    """Return the authentic market cap weights by sector, or None if they can't be loaded"""
+    try:
+        from authentic_marketcap_reader import get_sector_weightings
+        return get_sector_weightings() or None
+    except (ImportError, Exception) as e:
+        logging.warning(f"Could not load authentic market cap weights: {e}")
+        return None
+
+# Pulse weights last set on sector_scorer (None = equal weights)
+_scorer_pulse_weights = None
+
+def calculate_t2d_pulse_from_scorer(sector_weights=None):
+    """Calculate the T2D Pulse score from the incremental sector scorer
+    
+    The same weighted average as calculate_t2d_pulse_from_sectors, over the sector
+    scores from the last calculate_sector_sentiment() call. The scorer keeps the
+    weighted sum up to date as indicators move, so only a change of weights
+    re-averages every sector.
+    
+    Args:
+        sector_weights (dict, optional): Dictionary with custom weights for each sector
+        
+    Returns:
+        float: The weighted average T2D Pulse score (0-100 scale), or None if no
+            sectors have been scored yet
+    """
+    global _scorer_pulse_weights
+    if sector_scorer is None:
+        return None
+    if not sector_weights:
+        sector_weights = get_authentic_sector_weights()
+    if sector_weights != _scorer_pulse_weights:
+        sector_scorer.set_sector_weights(sector_weights)
+        _scorer_pulse_weights = dict(sector_weights) if sector_weights else None
+    return sector_scorer.pulse
+
 def calculate_sentiment_index(custom_weights=None, proprietary_data=None, document_data=None):
     """Calculate economic sentiment index from available indicators
     
@@ -1458,45 +1561,133 @@ def parse_uploaded_data(contents, filename):
         print(f"Error parsing uploaded file: {e}")
         return None
 
-# Pre-load all data at startup
+# Pre-load all data at startup, from the snapshot when it holds every series
+STARTUP_FROM_SNAPSHOT = (STARTUP_SNAPSHOT is not None and
+                         STARTUP_SNAPSHOT.has_series(dashboard_snapshot.SERIES_FILES))
+
+def load_startup_series(data_type, series_id):
+    """Load a series at startup from the snapshot, or from Postgres"""
+    if STARTUP_FROM_SNAPSHOT:
+        return STARTUP_SNAPSHOT.series[data_type]
+    return load_macro_series(series_id)
+
 print("Loading economic data…")
-gdp_data = load_macro_series("GDPC1")
+gdp_data = load_startup_series("gdp", "GDPC1")
 
 # --- PCE: load directly from Postgres ---
-pce_data = load_macro_series("PCE")
+pce_data = load_startup_series("pce", "PCE")
 
 # --- Unemployment Rate: load directly from Postgres ---
-unemployment_data = load_macro_series("UNRATE")
+unemployment_data = load_startup_series("unemployment", "UNRATE")
 
 # --- Inflation (CPI): load directly from Postgres ---
-inflation_data = load_macro_series("CPIAUCSL")
+inflation_data = load_startup_series("cpi", "CPIAUCSL")
 
 # --- Fed Funds Rate: load directly from Postgres ---
-interest_rate_data = load_macro_series("FEDFUNDS")
+interest_rate_data = load_startup_series("interest_rate", "FEDFUNDS")
     
 # --- Treasury Yield (10Y): load directly from Postgres ---
-treasury_yield_data = load_macro_series("DGS10")
+treasury_yield_data = load_startup_series("treasury_yield", "DGS10")
 
 # --- NASDAQ Index: load directly from Postgres ---
-nasdaq_data = load_macro_series("NASDAQCOM")
+nasdaq_data = load_startup_series("nasdaq", "NASDAQCOM")
 
 # --- Consumer Sentiment: load directly from Postgres ---
-consumer_sentiment_data = load_macro_series("USACSCICP02STSAM")
+consumer_sentiment_data = load_startup_series("consumer_sentiment", "USACSCICP02STSAM")
 
 # --- Software Job Postings: load directly from Postgres ---
-job_postings_data = load_macro_series("IHLIDXUSTPSOFTDEVE")
+job_postings_data = load_startup_series("job_postings", "IHLIDXUSTPSOFTDEVE")
 
 # --- Software PPI: load directly from Postgres ---
-software_ppi_data = load_macro_series("PCU511210511210")
+software_ppi_data = load_startup_series("software_ppi", "PCU511210511210")
     
 # --- Data-Processing PPI: load directly from Postgres ---
-data_processing_ppi_data = load_macro_series("PCU5112105112105")
+data_processing_ppi_data = load_startup_series("data_ppi", "PCU5112105112105")
 
 # --- PCEPI: load directly from Postgres ---
-pcepi_data = load_macro_series("PCEPI")
+pcepi_data = load_startup_series("pcepi", "PCEPI")
 
 # --- VIX Index: load directly from Postgres ---
-vix_data = load_macro_series("VIXCLS")
+vix_data = load_startup_series("vix", "VIXCLS")
+
+# Publish the dashboard's data to the shared cache so chart callbacks can be
+# memoized on each dataset's version (republishing an unchanged frame is a no-op)
+def publish_dashboard_data():
+    """Push the current module-level data frames into data_cache"""
+    update_cache({
+        "gdp": gdp_data,
+        "pce": pce_data,
+        "unemployment": unemployment_data,
+        "job_postings": job_postings_data,
+        "cpi": inflation_data,
+        "pcepi": pcepi_data,
+        "nasdaq": nasdaq_data,
+        "software_ppi": software_ppi_data,
+        "data_ppi": data_processing_ppi_data,
+        "interest_rate": interest_rate_data,
+        "treasury_yield": treasury_yield_data,
+        "vix": vix_data,
+        "consumer_sentiment": consumer_sentiment_data
+    })
+
+# Rewrite the startup snapshot from the current frames so the next worker
+# can start from it
+def save_dashboard_snapshot():
+    """Write the module-level data frames, sector scores and Pulse history to the snapshot"""
+    series = {data_type: get_data(data_type) for data_type in dashboard_snapshot.SERIES_FILES}
+    sector_scores = sector_scorer.normalized_scores() if sector_scorer is not None else None
+    return dashboard_snapshot.write_snapshot(series, T2D_PULSE_HISTORY, sector_scores)
+
+# Module-level frame and Postgres series for each startup data type
+STARTUP_SERIES = {
+    "gdp": ("gdp_data", "GDPC1"),
+    "pce": ("pce_data", "PCE"),
+    "unemployment": ("unemployment_data", "UNRATE"),
+    "cpi": ("inflation_data", "CPIAUCSL"),
+    "interest_rate": ("interest_rate_data", "FEDFUNDS"),
+    "treasury_yield": ("treasury_yield_data", "DGS10"),
+    "nasdaq": ("nasdaq_data", "NASDAQCOM"),
+    "consumer_sentiment": ("consumer_sentiment_data", "USACSCICP02STSAM"),
+    "job_postings": ("job_postings_data", "IHLIDXUSTPSOFTDEVE"),
+    "software_ppi": ("software_ppi_data", "PCU511210511210"),
+    "data_ppi": ("data_processing_ppi_data", "PCU5112105112105"),
+    "pcepi": ("pcepi_data", "PCEPI"),
+    "vix": ("vix_data", "VIXCLS"),
+}
+
+def reload_stale_series():
+    """Re-read from Postgres the startup series whose cache entries have outlived their TTL"""
+    for data_type in stale_data_types():
+        if data_type not in STARTUP_SERIES:
+            continue
+        name, series_id = STARTUP_SERIES[data_type]
+        try:
+            globals()[name] = load_macro_series(series_id)
+        except Exception as e:
+            logger.error(f"Error reloading {series_id}: {e}")
+    # Series that failed to load are republished as they are and retried after their TTL
+    publish_dashboard_data()
+
+_stale_reload_lock = threading.Lock()
+
+def _run_stale_reload():
+    try:
+        reload_stale_series()
+    finally:
+        _stale_reload_lock.release()
+
+def start_stale_reload():
+    """Reload stale series in the background (at most one reload at a time)"""
+    if not stale_data_types():
+        return
+    if not _stale_reload_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_run_stale_reload, daemon=True).start()
+
+publish_dashboard_data()
+if not STARTUP_FROM_SNAPSHOT:
+    save_dashboard_snapshot()
+server.before_request(start_stale_reload)
 
 # Calculate initial sentiment index
 sentiment_index = calculate_sentiment_index()
@@ -2818,6 +3009,7 @@ def update_indicator_trends(n):
 
 # Update GDP Graph function (generates figure only)
 
+@memoize_on_data("gdp")
 def update_gdp_graph(n):
     """Generate the GDP chart figure"""
     if gdp_data.empty or 'yoy_growth' not in gdp_data.columns:
@@ -2928,6 +3120,7 @@ def update_gdp_graph(n):
     Output("gdp-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("gdp")
 def update_gdp_container(n):
     """Update the GDP container to include both the graph and insights panel"""
     # Get the chart figure
@@ -2952,6 +3145,7 @@ def update_gdp_graph_callback(n):
 
 # Update PCE Graph (generates figure only)
 
+@memoize_on_data("pce")
 def update_pce_graph(n):
     """Generate the PCE chart figure"""
     if pce_data.empty or 'yoy_growth' not in pce_data.columns:
@@ -3055,6 +3249,7 @@ def update_pce_graph(n):
     Output("pce-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("pce")
 def update_pce_container(n):
     """Update the PCE container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3078,6 +3273,7 @@ def update_pce_graph_callback(n):
     return update_pce_graph(n)
 
 # Update Unemployment Graph (Figure only function)
+@memoize_on_data("unemployment")
 def update_unemployment_graph(n):
     """Generate the Unemployment Rate chart figure"""
     if unemployment_data.empty:
@@ -3146,6 +3342,7 @@ def update_unemployment_graph(n):
     Output("unemployment-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("unemployment")
 def update_unemployment_container(n):
     """Update the Unemployment container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3188,6 +3385,7 @@ def update_unemployment_container(n):
 
 # Software Job Postings Graph (Figure only function)
 
+@memoize_on_data("job_postings")
 def update_job_postings_graph(n):
     """Generate the Software Job Postings chart figure"""
     if job_postings_data.empty or 'yoy_growth' not in job_postings_data.columns:
@@ -3337,6 +3535,7 @@ def update_job_postings_graph(n):
     Output("job-postings-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("job_postings")
 def update_job_postings_container(n):
     """Update the Job Postings container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3378,6 +3577,7 @@ def update_job_postings_container(n):
         return [dcc.Graph(id="job-postings-graph", figure=figure)]
 
 # Update Inflation Graph (generates figure only)
+@memoize_on_data("cpi")
 def update_inflation_graph(n):
     """Generate the CPI inflation chart figure"""
     if inflation_data.empty or 'inflation' not in inflation_data.columns:
@@ -3469,6 +3669,7 @@ def update_inflation_graph(n):
     Output("inflation-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("cpi")
 def update_inflation_container(n):
     """Update the inflation container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3510,6 +3711,7 @@ def update_inflation_container(n):
         return [dcc.Graph(id="inflation-graph", figure=figure)]
 
 # Update PCEPI Graph (generates figure only)
+@memoize_on_data("pcepi")
 def update_pcepi_graph(n):
     """Generate the PCEPI inflation chart figure"""
     if pcepi_data.empty or 'yoy_growth' not in pcepi_data.columns:
@@ -3601,6 +3803,7 @@ def update_pcepi_graph(n):
     Output("pcepi-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("pcepi")
 def update_pcepi_container(n):
     """Update the PCEPI container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3642,6 +3845,7 @@ def update_pcepi_container(n):
         return [dcc.Graph(id="pcepi-graph", figure=figure)]
 
 # Update NASDAQ Graph (This function now only generates the figure)
+@memoize_on_data("nasdaq")
 def update_nasdaq_graph(n):
     """Generate the NASDAQ Composite chart figure"""
     if nasdaq_data.empty:
@@ -3752,6 +3956,7 @@ def update_nasdaq_graph(n):
     Output("nasdaq-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("nasdaq")
 def update_nasdaq_container(n):
     """Update the NASDAQ container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3793,6 +3998,7 @@ def update_nasdaq_container(n):
         return [dcc.Graph(id="nasdaq-graph", figure=figure)]
 
 # Update Software PPI Graph (Figure only function)
+@memoize_on_data("software_ppi")
 def update_software_ppi_graph(n):
     """Generate the Software Publishers PPI chart figure"""
     if software_ppi_data.empty or 'yoy_pct_change' not in software_ppi_data.columns:
@@ -3861,6 +4067,7 @@ def update_software_ppi_graph(n):
     Output("software-ppi-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("software_ppi")
 def update_software_ppi_container(n):
     """Update the Software PPI container to include both the graph and insights panel"""
     # Get the chart figure
@@ -3902,6 +4109,7 @@ def update_software_ppi_container(n):
         return [dcc.Graph(id="software-ppi-graph", figure=figure)]
 
 # Update Data Processing PPI Graph (Figure only function)
+@memoize_on_data("data_ppi")
 def update_data_ppi_graph(n):
     """Generate the Data Processing Services PPI chart figure"""
     if data_processing_ppi_data.empty or 'yoy_pct_change' not in data_processing_ppi_data.columns:
@@ -3970,6 +4178,7 @@ def update_data_ppi_graph(n):
     Output("data-ppi-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("data_ppi")
 def update_data_ppi_container(n):
     """Update the Data Processing PPI container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4013,6 +4222,7 @@ def update_data_ppi_container(n):
         return [dcc.Graph(id="data-ppi-graph", figure=figure)]
 
 # Update Interest Rate Graph (generates figure only)
+@memoize_on_data("interest_rate")
 def update_interest_rate_graph(n):
     """Generate the Federal Funds Rate chart figure"""
     if interest_rate_data.empty:
@@ -4116,6 +4326,7 @@ def update_interest_rate_graph(n):
     Output("interest-rate-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("interest_rate")
 def update_interest_rate_container(n):
     """Update the Federal Funds Rate container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4161,6 +4372,7 @@ def update_interest_rate_container(n):
     Output("treasury-yield-graph", "figure"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("treasury_yield")
 def update_treasury_yield_graph(n):
     if treasury_yield_data.empty:
         return go.Figure().update_layout(
@@ -4320,6 +4532,7 @@ def update_treasury_yield_graph(n):
     Output("treasury-yield-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("treasury_yield")
 def update_treasury_yield_container(n):
     """Update the Treasury Yield container to include both the graph and insights panel"""
     # Get the chart figure
@@ -4576,6 +4789,7 @@ def apply_proprietary_data(n_clicks, weight, value, custom_weights, document_dat
     Output("consumer-sentiment-graph", "figure"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("consumer_sentiment")
 def update_consumer_sentiment_graph(n):
     """Generate the Consumer Sentiment chart figure"""
     return create_consumer_sentiment_graph(consumer_sentiment_data)
@@ -4585,6 +4799,7 @@ def update_consumer_sentiment_graph(n):
     Output("consumer-sentiment-container", "children"),
     [Input("interval-component", "n_intervals")]
 )
+@memoize_on_data("consumer_sentiment")
 def update_consumer_sentiment_container(n):
     """Update the Consumer Sentiment container to include both the graph and insights panel"""
     global consumer_sentiment_data
@@ -4723,6 +4938,23 @@ def initialize_sentiment_index(_, custom_weights, document_data):
         else:
             category = "Bearish"
         return f"{authentic_score:.1f}", category
+
+    # PRIORITY 2: Until this worker has scored the sectors itself, use the
+    # latest sector scores saved in the startup snapshot
+    if sector_scorer is None and STARTUP_SNAPSHOT is not None and STARTUP_SNAPSHOT.sector_scores:
+        sector_scores_dict = STARTUP_SNAPSHOT.sector_scores
+        # Equal weights, as for freshly calculated sector scores below
+        equal_weight = 100.0 / len(sector_scores_dict)
+        sector_weights = {sector: equal_weight for sector in sector_scores_dict}
+        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, sector_weights)
+        print(f"INITIALIZATION: USING {len(sector_scores_dict)} SECTOR SCORES FROM THE STARTUP SNAPSHOT: {pulse_score}")
+        if pulse_score >= 60:
+            category = "Bullish"
+        elif pulse_score >= 30:
+            category = "Neutral"
+        else:
+            category = "Bearish"
+        return f"{pulse_score:.1f}", category
         
     # Regular weekday calculation or fallback if weekend methods fail
     sector_scores = calculate_sector_sentiment()
@@ -4739,7 +4971,7 @@ def initialize_sentiment_index(_, custom_weights, document_data):
             sector_weights = {s['sector']: equal_weight for s in sector_scores}
         
         # Calculate the T2D Pulse score as weighted average of sector scores
-        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, sector_weights)
+        pulse_score = calculate_t2d_pulse_from_scorer(sector_weights)
         
         # Log what's happening
         print(f"Calculating T2D Pulse score from {len(sector_scores)} sector scores")
@@ -5227,6 +5459,7 @@ def apply_document_analysis(n_clicks, weight, contents, filename, custom_weights
         return None, error_message, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
 # Update VIX Graph (This function now only generates the figure)
+@memoize_on_data("vix")
 def update_vix_graph(n):
     """Generate the VIX chart figure"""
     if vix_data.empty:
@@ -5738,11 +5971,8 @@ def update_t2d_pulse_score(weights_json):
         if not sector_scores:
             return update_sentiment_gauge(50.0)
         
-        # Create a dictionary of sector scores for the pulse calculation
-        sector_scores_dict = {s['sector']: s['normalized_score'] for s in sector_scores}
-        
         # Calculate the T2D Pulse score 
-        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, weights)
+        pulse_score = calculate_t2d_pulse_from_scorer(weights)
         
         print(f"Updated T2D Pulse score to {pulse_score} based on weight changes")
         
@@ -5949,11 +6179,8 @@ def reset_weights(n_clicks):
     # Regular calculation for weekdays or as fallback
     sector_scores = calculate_sector_sentiment()
     if sector_scores:
-        # Create a dictionary of sector scores for the pulse calculation
-        sector_scores_dict = {s['sector']: s['normalized_score'] for s in sector_scores}
-        
         # Calculate the fresh T2D Pulse score with equal weights
-        pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict, equal_weights)
+        pulse_score = calculate_t2d_pulse_from_scorer(equal_weights)
         print(f"Reset T2D Pulse score to {pulse_score} with equal weights")
     else:
         # Default score if sector data isn't available
@@ -6588,16 +6815,19 @@ def auto_refresh_data():
             global interest_rate_data, pce_data, consumer_sentiment_data
             global software_ppi_data, data_ppi_data
             
-            # Get data from FRED API
-            gdp_data = fetch_fred_data(FRED_SERIES["gdp"])
-            unemployment_data = fetch_fred_data(FRED_SERIES["unemployment"])
-            inflation_data = fetch_fred_data(FRED_SERIES["cpi"])
-            pcepi_data = fetch_fred_data(FRED_SERIES["pcepi"])
-            interest_rate_data = fetch_fred_data(FRED_SERIES["interest_rate"])
-            pce_data = fetch_fred_data(FRED_SERIES["pce"])
-            software_ppi_data = fetch_fred_data(FRED_SERIES["software_ppi"])
-            data_ppi_data = fetch_fred_data(FRED_SERIES["data_ppi"])
-            consumer_sentiment_data = fetch_fred_data(FRED_SERIES["consumer_sentiment"])
+            # Get data from FRED API (all series requested concurrently)
+            fred = fetch_fred_series([FRED_SERIES[key] for key in (
+                "gdp", "unemployment", "cpi", "pcepi", "interest_rate", "pce",
+                "software_ppi", "data_ppi", "consumer_sentiment")])
+            gdp_data = fred[FRED_SERIES["gdp"]]
+            unemployment_data = fred[FRED_SERIES["unemployment"]]
+            inflation_data = fred[FRED_SERIES["cpi"]]
+            pcepi_data = fred[FRED_SERIES["pcepi"]]
+            interest_rate_data = fred[FRED_SERIES["interest_rate"]]
+            pce_data = fred[FRED_SERIES["pce"]]
+            software_ppi_data = fred[FRED_SERIES["software_ppi"]]
+            data_ppi_data = fred[FRED_SERIES["data_ppi"]]
+            consumer_sentiment_data = fred[FRED_SERIES["consumer_sentiment"]]
             
             # Get data from Yahoo Finance
             global treasury_yield_data, vix_data, nasdaq_data
@@ -6607,6 +6837,8 @@ def auto_refresh_data():
         
         # Fetch economic data from APIs
         fetch_economic_data()
+        publish_dashboard_data()
+        save_dashboard_snapshot()
         
         # Run daily sector data collection using Finnhub API
         try:
@@ -6626,8 +6858,7 @@ def auto_refresh_data():
         # Update T2D Pulse score
         if sector_scores:
             # Calculate the pulse score with current weights
-            sector_scores_dict = {s['sector']: s['normalized_score'] for s in sector_scores}
-            pulse_score = calculate_t2d_pulse_from_sectors(sector_scores_dict)
+            pulse_score = calculate_t2d_pulse_from_scorer()
             logger.info(f"Auto-refresh: Updated T2D Pulse score to {pulse_score} on {eastern_date}")
             
             # Save the authentic pulse score to a file for future reference
@@ -13,11 +13,12 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 import datetime
+import random
+import shutil
 import pytz
 from pathlib import Path
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-import pyarrow as pa
-import pyarrow.parquet as pq
+
+import ticker_dataset
 
 # Configure logging
 logging.basicConfig(
@@ -37,6 +38,17 @@ PRICE_HISTORY_CSV = DATA_DIR / "historical_ticker_prices.csv"
 MCAP_HISTORY_CSV = DATA_DIR / "historical_ticker_marketcap.csv"
 METADATA_FILE = MARKET_DIR / "metadata.json"
 
+# Chunked download (see download_chunks)
+CHECKPOINT_DIR = MARKET_DIR / "download_checkpoints"
+CHECKPOINT_PROGRESS_FILE = "progress.json"
+DOWNLOAD_COLUMNS = ["date", "ticker", "close", "volume"]
+INITIAL_BATCH_SIZE = 10
+MIN_BATCH_SIZE = 1
+MAX_BATCH_SIZE = 50
+MAX_TICKER_ATTEMPTS = 3  # Give up on a ticker after this many failed chunks
+CHUNK_PAUSE_SECONDS = 1  # Pause between chunks
+MAX_BACKOFF_SECONDS = 60
+
 # Make sure directories exist
 DATA_DIR.mkdir(exist_ok=True)
 MARKET_DIR.mkdir(exist_ok=True)
@@ -133,15 +145,12 @@ def update_metadata(last_updated):
     except Exception as e:
         logging.error(f"Error updating metadata: {e}")
 
-@retry(
-    stop=stop_after_attempt(5),
-    wait=wait_exponential(multiplier=1, min=4, max=60),
-    retry=retry_if_exception_type((Exception))
-)
 def fetch_batch_data(tickers, start_date, end_date=None):
     """
-    Fetch batch data for multiple tickers using yfinance.
-    Uses retry decorator for robust API access.
+    Fetch batch data for multiple tickers using yfinance (a single attempt).
+    
+    Retries, backoff and batch sizing are handled by download_chunks, which
+    retries only the tickers that failed rather than the whole universe.
     """
     if not tickers:
         return None
@@ -156,128 +165,236 @@ def fetch_batch_data(tickers, start_date, end_date=None):
     elif isinstance(end_date, datetime.datetime) or isinstance(end_date, datetime.date):
         end_date = end_date.strftime("%Y-%m-%d")
     
-    try:
-        # Add extra delay to respect rate limits
-        time.sleep(2)
-        
-        # Use yfinance to download data for all tickers at once
-        data = yf.download(
-            tickers=tickers,
-            start=start_date,
-            end=end_date,
-            group_by='ticker',
-            auto_adjust=True,
-            progress=False
-        )
-        
-        if data is None or data.empty:
-            logging.error(f"No data returned for any tickers in batch of {len(tickers)} tickers")
-            return None
-        
-        # Return the raw data for processing
-        return data
-    except Exception as e:
-        if "Rate limited" in str(e):
-            logging.warning(f"Rate limited. Waiting longer before retry...")
-            # Add extra delay for rate limiting
-            time.sleep(10)
-        logging.error(f"Error fetching batch data: {e}")
-        raise  # Re-raise for retry
+    # Use yfinance to download data for all tickers in the chunk at once
+    data = yf.download(
+        tickers=list(tickers),
+        start=start_date,
+        end=end_date,
+        group_by='ticker',
+        auto_adjust=True,
+        progress=False
+    )
+    
+    if data is None or data.empty:
+        logging.error(f"No data returned for any tickers in batch of {len(tickers)} tickers")
+        return None
+    
+    # Return the raw data for processing
+    return data
 
-def process_yf_data(data):
-    """Process the multi-level DataFrame returned by yfinance"""
+def extract_ticker_rows(data, tickers):
+    """
+    Convert a yfinance download into long rows (date, ticker, close, volume).
+    
+    Args:
+        data (pd.DataFrame): Result of yf.download (ticker-level columns, or
+            plain OHLCV columns when a single ticker was requested)
+        tickers (list): The tickers that were requested
+        
+    Returns:
+        pd.DataFrame: One row per ticker and date that has a close price
+    """
     if data is None or data.empty:
-        return None, None
+        return pd.DataFrame(columns=DOWNLOAD_COLUMNS)
+    
+    if isinstance(data.columns, pd.MultiIndex):
+        frames = data
+    else:
+        # Single ticker case (no multi-index)
+        frames = pd.concat({tickers[0]: data}, axis=1)
     
-    # Check if it's a multi-ticker or single-ticker result
-    is_single_ticker = not isinstance(data.columns, pd.MultiIndex)
+    fields = {}
+    for field, column in (("Close", "close"), ("Volume", "volume")):
+        if field in frames.columns.get_level_values(1):
+            fields[column] = frames.xs(field, axis=1, level=1).stack(future_stack=True)
+    if "close" not in fields:
+        return pd.DataFrame(columns=DOWNLOAD_COLUMNS)
     
-    price_data = {}
-    mcap_data = {}
+    rows = pd.DataFrame(fields)
+    rows.index.names = ["date", "ticker"]
+    rows = rows.reset_index().dropna(subset=["close"])
+    dates = pd.to_datetime(rows["date"])
+    rows["date"] = dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+    return rows.reindex(columns=DOWNLOAD_COLUMNS)
+
+def checkpoint_dir(start_date, end_date):
+    """Checkpoint directory for one download range"""
+    return CHECKPOINT_DIR / f"{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+
+def load_checkpoint(directory):
+    """Load the progress of an interrupted download, or start a new one"""
+    progress_file = directory / CHECKPOINT_PROGRESS_FILE
+    if progress_file.exists():
+        try:
+            with open(progress_file, 'r') as f:
+                progress = json.load(f)
+            logging.info(f"Resuming download from {directory}: {len(progress['completed'])} tickers done, "
+                         f"{len(progress['failed'])} failed")
+            return progress
+        except Exception as e:
+            logging.error(f"Error reading download checkpoint {progress_file}, starting over: {e}")
+            shutil.rmtree(directory, ignore_errors=True)
+    return {"completed": [], "failed": [], "chunks": 0, "batch_size": None}
+
+def save_checkpoint(directory, progress, rows=None):
+    """
+    Write a completed chunk's rows (if any), then record it in the progress file.
     
-    # Get the dates from the index
-    dates = data.index
+    Both writes are atomic, and the chunk file lands before the progress file
+    that refers to it, so an interrupted run never loses or double-counts a chunk.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    if rows is not None and not rows.empty:
+        progress["chunks"] += 1
+        chunk_file = directory / f"chunk-{progress['chunks']:05d}.parquet"
+        tmp_file = chunk_file.with_name(f".{chunk_file.name}.tmp")
+        rows.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, chunk_file)
     
-    if is_single_ticker:
-        # Single ticker case (no multi-index)
-        ticker = data.columns[0].split('.')[0]  # Extract ticker from column name
-        
-        # Extract close prices
-        if 'Close' in data.columns:
-            price_data[ticker] = data['Close']
+    progress_file = directory / CHECKPOINT_PROGRESS_FILE
+    tmp_file = progress_file.with_name(f".{progress_file.name}.tmp")
+    with open(tmp_file, 'w') as f:
+        json.dump(progress, f, indent=2)
+    os.replace(tmp_file, progress_file)
+
+def read_checkpoint_rows(directory):
+    """Read every checkpointed chunk of a download"""
+    files = sorted(directory.glob("chunk-*.parquet"))
+    if not files:
+        return pd.DataFrame(columns=DOWNLOAD_COLUMNS)
+    return pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+
+def clear_checkpoints(keep=None):
+    """Remove checkpoint directories (except `keep`)"""
+    if not CHECKPOINT_DIR.exists():
+        return
+    for directory in CHECKPOINT_DIR.iterdir():
+        if directory.is_dir() and directory != keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+def download_chunks(tickers, start_date, end_date, batch_size=INITIAL_BATCH_SIZE, resume=True):
+    """
+    Download prices for all tickers in adaptively sized chunks, checkpointing each chunk.
+    
+    A chunk that comes back complete grows the next one (up to MAX_BATCH_SIZE);
+    a chunk whose request fails is halved and retried after an exponential
+    backoff, so a bad ticker or a rate limit only costs the tickers involved.
+    Tickers missing from an otherwise good response are retried on their own,
+    up to MAX_TICKER_ATTEMPTS. Finished chunks are
+    written to disk as they arrive, and a rerun for the same date range picks
+    up after the last one.
+    
+    Args:
+        tickers (list): Tickers to download
+        start_date (date): First date
+        end_date (date): Last date (exclusive, as in yf.download)
+        batch_size (int): Initial chunk size (a resumed run keeps its last size)
+        resume (bool): Continue from an existing checkpoint for this range
+        
+    Returns:
+        tuple: (rows DataFrame with date, ticker, close, volume; list of failed tickers)
+    """
+    directory = checkpoint_dir(start_date, end_date)
+    clear_checkpoints(keep=directory if resume else None)
+    progress = load_checkpoint(directory)
+    batch_size = progress.get("batch_size") or batch_size
+    
+    finished = set(progress["completed"]) | set(progress["failed"])
+    pending = [ticker for ticker in tickers if ticker not in finished]
+    attempts = {}
+    backoff = 0
+    
+    while pending:
+        chunk = pending[:batch_size]
+        pending = pending[batch_size:]
+        logging.info(f"Downloading {len(chunk)} tickers ({len(pending)} queued, batch size {batch_size})")
+        
+        try:
+            rows = extract_ticker_rows(fetch_batch_data(chunk, start_date, end_date), chunk)
+            error = None
+        except Exception as e:
+            rows = pd.DataFrame(columns=DOWNLOAD_COLUMNS)
+            error = e
+            logging.error(f"Error fetching batch data: {e}")
+        
+        received = set(rows["ticker"])
+        done = [ticker for ticker in chunk if ticker in received]
+        missing = [ticker for ticker in chunk if ticker not in received]
+        
+        retry = []
+        if error is None and not done:
+            # The request worked but nothing traded in the range (e.g. a weekend);
+            # asking again won't change that
+            logging.warning(f"No data returned for {', '.join(chunk)}")
+            progress["failed"].extend(chunk)
+            missing = []
+        
+        # When a whole multi-ticker chunk errors the culprit isn't known yet, so
+        # only count an attempt against tickers that failed on their own
+        isolated = len(chunk) == 1 or bool(done)
+        for ticker in missing:
+            attempts[ticker] = attempts.get(ticker, 0) + (1 if isolated else 0)
+            if attempts[ticker] >= MAX_TICKER_ATTEMPTS:
+                logging.warning(f"Giving up on {ticker} after {attempts[ticker]} attempts")
+                progress["failed"].append(ticker)
+            else:
+                retry.append(ticker)
+        
+        if error is not None:
+            # Shrink the chunks until the failures are isolated and back off
+            batch_size = max(MIN_BATCH_SIZE, batch_size // 2)
+            backoff = min(MAX_BACKOFF_SECONDS, max(1, backoff * 2))
+            if "Rate limited" in str(error):
+                logging.warning("Rate limited. Waiting longer before retry...")
+                backoff = MAX_BACKOFF_SECONDS
+        elif not missing:
+            batch_size = min(MAX_BATCH_SIZE, batch_size * 2)
+            backoff = 0
+        
+        progress["completed"].extend(done)
+        progress["batch_size"] = batch_size
+        save_checkpoint(directory, progress, rows[rows["ticker"].isin(done)])
+        pending = retry + pending
+        
+        if pending:
+            time.sleep(CHUNK_PAUSE_SECONDS + backoff * random.uniform(0.5, 1.5))
+    
+    return read_checkpoint_rows(directory), progress["failed"]
+
+def process_yf_data(rows):
+    """
+    Turn downloaded rows into wide price and market cap DataFrames.
+    
+    Args:
+        rows (pd.DataFrame): date, ticker, close, volume rows from download_chunks
         
-        # Calculate market cap if we have both Close and Volume
-        if 'Close' in data.columns and 'Volume' in data.columns:
-            # Market cap = price * outstanding shares (approximated by volume)
-            mcap_data[ticker] = data['Close'] * data['Volume']
-    else:
-        # Multi-ticker case
-        for ticker in data.columns.levels[0]:
-            try:
-                # Extract close prices
-                if ('Close' in data[ticker].columns) and (not data[ticker]['Close'].empty):
-                    price_data[ticker] = data[ticker]['Close']
-                
-                # Calculate market cap if we have both Close and Volume
-                if ('Close' in data[ticker].columns and 'Volume' in data[ticker].columns and 
-                    not data[ticker]['Close'].empty and not data[ticker]['Volume'].empty):
-                    # Market cap = price * outstanding shares (approximated by volume)
-                    mcap_data[ticker] = data[ticker]['Close'] * data[ticker]['Volume']
-            except Exception as e:
-                logging.error(f"Error processing ticker {ticker}: {e}")
-    
-    # Convert to DataFrame
-    price_df = pd.DataFrame(price_data, index=dates)
-    mcap_df = pd.DataFrame(mcap_data, index=dates)
+    Returns:
+        tuple: (price_df, mcap_df), dates × tickers
+    """
+    if rows is None or rows.empty:
+        return None, None
+    
+    price_df = rows.pivot_table(index="date", columns="ticker", values="close", aggfunc="last")
+    volume_df = rows.pivot_table(index="date", columns="ticker", values="volume", aggfunc="last")
+    price_df.columns.name = None
+    
+    # Market cap = price * outstanding shares (approximated by volume)
+    mcap_df = (price_df * volume_df.reindex_like(price_df)).dropna(axis=1, how="all")
     
     return price_df, mcap_df
 
 def append_to_parquet_dataset(new_data):
-    """Append new data to the existing Parquet dataset"""
+    """Append new long-format data (date, ticker, price, market_cap) to the Parquet dataset
+    
+    Partitions that have accumulated too many small files are compacted by ticker_dataset.
+    """
     if new_data is None or new_data.empty:
         logging.warning("No new data to append")
         return
     
     try:
-        # Convert to long format
-        long_df = new_data.reset_index().melt(
-            id_vars=['date'], 
-            var_name='ticker',
-            value_name='value'
-        )
-        
-        # Add is_latest flag
-        # First get the last date for each ticker
-        latest_dates = long_df.groupby('ticker')['date'].max().reset_index()
-        latest_dates = latest_dates.rename(columns={'date': 'latest_date'})
-        
-        # Merge with the main dataframe
-        long_df = pd.merge(long_df, latest_dates, on='ticker', how='left')
-        
-        # Set is_latest flag
-        long_df['is_latest'] = long_df['date'] == long_df['latest_date']
-        
-        # Remove the latest_date column as it's no longer needed
-        long_df = long_df.drop(columns=['latest_date'])
-        
-        # Convert to PyArrow table
-        table = pa.Table.from_pandas(long_df)
-        
-        # Add schema metadata
-        metadata = {
-            "schema_version": "1.0",
-            "created_at": datetime.datetime.now().isoformat()
-        }
-        table = table.replace_schema_metadata({**table.schema.metadata, **metadata})
-        
-        # Write to partitioned dataset
-        pq.write_to_dataset(
-            table,
-            root_path=TICKER_DATA_DIR,
-            partition_cols=['ticker']
-        )
-        
-        logging.info(f"Successfully appended {len(long_df)} rows to Parquet dataset")
+        rows = ticker_dataset.append_rows(new_data, root=str(TICKER_DATA_DIR))
+        logging.info(f"Successfully appended {rows} rows to Parquet dataset")
     except Exception as e:
         logging.error(f"Error appending to Parquet dataset: {e}")
         logging.exception("Exception details:")
@@ -358,8 +475,13 @@ def update_csv_files(price_df, mcap_df):
         logging.error(f"Error updating CSV files: {e}")
         logging.exception("Exception details:")
 
-def run_batch_collection():
-    """Run the batch ticker collection process"""
+def run_batch_collection(resume=True):
+    """
+    Run the batch ticker collection process
+    
+    Args:
+        resume (bool): Continue an interrupted download for the same date range
+    """
     logging.info("Starting batch ticker collection process")
     
     try:
@@ -386,114 +508,36 @@ def run_batch_collection():
         
         logging.info(f"Fetching data from {start_date} to {end_date} for {len(all_tickers)} tickers")
         
-        # Split tickers into smaller batches to reduce rate limiting issues
-        # Smaller batch size is more likely to succeed with rate limits
-        batch_size = 5
-        ticker_batches = [all_tickers[i:i+batch_size] for i in range(0, len(all_tickers), batch_size)]
-        
-        # Process each batch
-        all_price_data = []
-        all_mcap_data = []
-        
-        for i, batch in enumerate(ticker_batches):
-            logging.info(f"Processing batch {i+1}/{len(ticker_batches)} with {len(batch)} tickers")
-            
-            try:
-                # Fetch batch data
-                batch_data = fetch_batch_data(batch, start_date, end_date)
-                
-                # Process into price and market cap data
-                price_df, mcap_df = process_yf_data(batch_data)
-                
-                if price_df is not None and not price_df.empty:
-                    all_price_data.append(price_df)
-                
-                if mcap_df is not None and not mcap_df.empty:
-                    all_mcap_data.append(mcap_df)
-                
-                # Sleep to avoid rate limiting
-                # Use a longer sleep between batches (5 seconds)
-                time.sleep(5)
-            except Exception as e:
-                logging.error(f"Error processing batch {i+1}: {e}")
-                logging.exception("Exception details:")
-        
-        # Combine all batches
-        if all_price_data:
-            # Get a list of unique indices across all DataFrames
-            all_indices = sorted(list(set().union(*[df.index for df in all_price_data])))
-            
-            # Create a new DataFrame with all indices
-            combined_price_df = pd.DataFrame(index=all_indices)
-            
-            # Merge all DataFrames
-            for df in all_price_data:
-                for col in df.columns:
-                    combined_price_df[col] = df[col]
-        else:
-            combined_price_df = pd.DataFrame()
+        # Download in adaptive, checkpointed chunks
+        rows, failed = download_chunks(all_tickers, start_date, end_date, resume=resume)
+        if failed:
+            logging.warning(f"No data for {len(failed)} tickers: {', '.join(failed)}")
         
-        if all_mcap_data:
-            # Get a list of unique indices across all DataFrames
-            all_indices = sorted(list(set().union(*[df.index for df in all_mcap_data])))
-            
-            # Create a new DataFrame with all indices
-            combined_mcap_df = pd.DataFrame(index=all_indices)
-            
-            # Merge all DataFrames
-            for df in all_mcap_data:
-                for col in df.columns:
-                    combined_mcap_df[col] = df[col]
-        else:
-            combined_mcap_df = pd.DataFrame()
+        # Build prices and market caps from the downloaded rows
+        combined_price_df, combined_mcap_df = process_yf_data(rows)
+        if combined_price_df is None:
+            combined_price_df, combined_mcap_df = pd.DataFrame(), pd.DataFrame()
         
         # Update CSV files
         if not combined_price_df.empty and not combined_mcap_df.empty:
             update_csv_files(combined_price_df, combined_mcap_df)
         
-        # Convert price data to format for Parquet
+        # Convert to long format for Parquet
         if not combined_price_df.empty:
-            # Reset index to make date a column
-            combined_price_df = combined_price_df.reset_index()
-            combined_price_df = combined_price_df.rename(columns={'index': 'date'})
-            
-            # Convert to long format
-            price_long = combined_price_df.melt(
-                id_vars=['date'],
-                var_name='ticker',
-                value_name='price'
-            )
-            
-            # Add corresponding market cap data
-            if not combined_mcap_df.empty:
-                # Reset index to make date a column
-                combined_mcap_df = combined_mcap_df.reset_index()
-                combined_mcap_df = combined_mcap_df.rename(columns={'index': 'date'})
-                
-                # Convert to long format
-                mcap_long = combined_mcap_df.melt(
-                    id_vars=['date'],
-                    var_name='ticker',
-                    value_name='market_cap'
-                )
-                
-                # Merge the two datasets
-                merged_df = pd.merge(
-                    price_long,
-                    mcap_long,
-                    on=['date', 'ticker'],
-                    how='outer'
-                )
-            else:
-                merged_df = price_long
-                merged_df['market_cap'] = np.nan
+            price_long = combined_price_df.stack().rename('price')
+            mcap_long = combined_mcap_df.stack().rename('market_cap')
+            merged_df = pd.concat([price_long, mcap_long], axis=1)
+            merged_df.index.names = ['date', 'ticker']
             
             # Append to Parquet dataset
-            append_to_parquet_dataset(merged_df)
+            append_to_parquet_dataset(merged_df.reset_index())
         
         # Update metadata with the latest date
         update_metadata(end_date)
         
+        # The download is stored; the next run starts from the new latest date
+        clear_checkpoints()
+        
         logging.info(f"Batch collection complete")
         return True
     
@@ -503,8 +547,8 @@ def run_batch_collection():
         return False
 
 if __name__ == "__main__":
-    # Run the batch collection process
-    success = run_batch_collection()
+    # Run the batch collection process (--fresh ignores an interrupted download's checkpoint)
+    success = run_batch_collection(resume="--fresh" not in sys.argv[1:])
     
     if success:
         logging.info("Batch ticker collection completed successfully")
@@ -1,77 +1,170 @@
 # compute_stock_sentiment.py
 # -------------------------------------------
-# Compute full historical stock-level sentiment as the 3-day EMA of daily market-cap returns,
+# Compute stock-level sentiment as the 3-day EMA of daily market-cap returns,
 # normalize to a 0–100 scale, dedupe one row per ticker-date, and populate stock_sentiment_history table.
 # Then display the most recent 20 trading-day history of the 3-day EMA sentiment for GOOGL.
+#
+# By default only dates newer than each ticker's last processed date are computed: the last
+# market cap and EMA per ticker are kept in stock_sentiment_state, so the EMA continues from
+# there and the new rows are appended. Pass --full to rebuild the whole history (this also
+# happens automatically on the first run); the rebuilt table is swapped in, never dropped first.
 
 #!/usr/bin/env python3
+import argparse
 import os
 import pandas as pd
 from sqlalchemy import create_engine, text
 
-# 1) Connect to Postgres
-db_url = os.getenv("DATABASE_URL")
-if not db_url:
-    raise RuntimeError("DATABASE_URL is not set")
-engine = create_engine(db_url)
+from bulk_ingest import copy_upsert
+from incremental_history import load_state, replace_table, save_state, seeded_ewm, table_exists
 
-# 2) Load deduplicated market-cap history as price proxy
-#    Use MAX(market_cap) per ticker-date to collapse duplicates across sectors
-df = pd.read_sql(
-    """
-    SELECT date, ticker, MAX(market_cap) AS market_cap
-      FROM market_cap_history
-     GROUP BY date, ticker
-     ORDER BY ticker, date
-    """,
-    engine
+EMA_SPAN = 3  # α = 2/(span+1)
+
+HISTORY_TABLE = "stock_sentiment_history"
+HISTORY_TABLE_SQL = (
+    "CREATE TABLE {table} ("
+    "date DATE, ticker TEXT, sentiment_score DOUBLE PRECISION, raw_sentiment_score DOUBLE PRECISION, "
+    "PRIMARY KEY (date, ticker))"
 )
 
-# 3) Convert to datetime and sort
-df['date'] = pd.to_datetime(df['date'])
-df = df.sort_values(['ticker', 'date']).reset_index(drop=True)
+STATE_TABLE = "stock_sentiment_state"
+STATE_TABLE_SQL = (
+    "CREATE TABLE {table} ("
+    "ticker TEXT PRIMARY KEY, last_date DATE, last_market_cap DOUBLE PRECISION, last_ema DOUBLE PRECISION)"
+)
 
-# 4) Compute daily returns per ticker
-df['daily_return'] = df.groupby('ticker')['market_cap'].pct_change()
+def load_market_caps(engine, incremental):
+    """
+    Load deduplicated market-cap history as price proxy.
 
-# 5) Compute raw 3-day EMA of returns for sentiment proxy
-#    α = 2/(span+1) with span=3
-df['raw_sentiment_score'] = (
-    df.groupby('ticker')['daily_return']
-      .transform(lambda x: x.ewm(span=3, adjust=False).mean())
-)
+    MAX(market_cap) per ticker-date collapses duplicates across sectors. In incremental
+    mode only dates after each ticker's last processed date are loaded.
+    """
+    if incremental:
+        query = f"""
+            SELECT m.date, m.ticker, MAX(m.market_cap) AS market_cap
+              FROM market_cap_history m
+              LEFT JOIN {STATE_TABLE} s ON s.ticker = m.ticker
+             WHERE s.last_date IS NULL OR m.date > s.last_date
+             GROUP BY m.date, m.ticker
+             ORDER BY m.ticker, m.date
+        """
+    else:
+        query = """
+            SELECT date, ticker, MAX(market_cap) AS market_cap
+              FROM market_cap_history
+             GROUP BY date, ticker
+             ORDER BY ticker, date
+        """
+    df = pd.read_sql(query, engine)
+    df['date'] = pd.to_datetime(df['date'])
+    return df.sort_values(['ticker', 'date']).reset_index(drop=True)
+
+def compute_sentiment(df, state=None):
+    """
+    Compute sentiment rows for `df` and the updated per-ticker state.
+
+    Args:
+        df (pd.DataFrame): date, ticker, market_cap rows sorted by ticker and date
+        state (pd.DataFrame, optional): stock_sentiment_state indexed by ticker
+
+    Returns:
+        tuple: (sentiment rows, state rows for the tickers in df)
+    """
+    df = df.copy()
+    df['_new'] = True
+    if state is not None and not state.empty:
+        # Each ticker's last market cap gives the first new row its daily return
+        previous = state[state.index.isin(df['ticker'].unique())]
+        previous = pd.DataFrame({
+            'date': previous['last_date'].to_numpy(),
+            'ticker': previous.index,
+            'market_cap': previous['last_market_cap'].to_numpy(),
+            '_new': False,
+        })
+        df = pd.concat([previous, df], ignore_index=True).sort_values(['ticker', 'date'], kind='mergesort')
+
+    # Compute daily returns per ticker
+    df['daily_return'] = df.groupby('ticker')['market_cap'].pct_change()
+    df = df[df['_new']].reset_index(drop=True)
+
+    # Compute raw 3-day EMA of returns for sentiment proxy, continuing from the saved EMA
+    seeds = state['last_ema'] if state is not None else None
+    df['raw_sentiment_score'] = seeded_ewm(df, 'ticker', 'daily_return', EMA_SPAN, seeds)
+
+    # Normalize to 0–100 scale: percentage ×100 then +50 shift
+    df['sentiment_score'] = df['raw_sentiment_score'] * 100 + 50
+
+    # Carry forward the last market cap and EMA per ticker
+    last = df.groupby('ticker').agg(
+        last_date=('date', 'max'),
+        last_market_cap=('market_cap', 'last'),
+        last_ema=('raw_sentiment_score', 'last'),
+    ).reset_index()
+    if state is not None and not state.empty:
+        # Tickers whose new rows had no usable value keep their saved value
+        saved = state.reindex(last['ticker'])
+        last['last_market_cap'] = last['last_market_cap'].fillna(pd.Series(saved['last_market_cap'].to_numpy()))
+        last['last_ema'] = last['last_ema'].fillna(pd.Series(saved['last_ema'].to_numpy()))
+    last['last_date'] = last['last_date'].dt.date
+
+    # Prepare final DataFrame: drop NaN, convert date to date-only, and dedupe
+    df_final = df[['date','ticker','sentiment_score','raw_sentiment_score']].dropna().copy()
+    df_final['date'] = df_final['date'].dt.date  # convert datetime to date
+    # ensure one entry per ticker-date
+    df_final = df_final.drop_duplicates(subset=['date','ticker'])
+    return df_final, last
+
+def rebuild_history(engine):
+    """Recompute the full history and swap it in"""
+    df = load_market_caps(engine, incremental=False)
+    df_final, state = compute_sentiment(df)
+    replace_table(engine, HISTORY_TABLE, HISTORY_TABLE_SQL, df_final, key_columns=['date','ticker'])
+    replace_table(engine, STATE_TABLE, STATE_TABLE_SQL, state, key_columns=['ticker'])
+    print(f"Computed {len(df_final)} rows into {HISTORY_TABLE}.")
+    return df_final
+
+def update_history(engine):
+    """Append rows for dates after each ticker's saved state"""
+    state = load_state(engine, STATE_TABLE, 'ticker')
+    df = load_market_caps(engine, incremental=True)
+    df_final, new_state = compute_sentiment(df, state)
+
+    # New rows and the state they leave behind are committed together
+    with engine.begin() as conn:
+        copy_upsert(conn, df_final, HISTORY_TABLE, key_columns=['date','ticker'])
+        save_state(conn, new_state, STATE_TABLE, 'ticker', STATE_TABLE_SQL)
+
+    print(f"Appended {len(df_final)} rows to {HISTORY_TABLE}.")
+    return df_final
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute stock-level sentiment history")
+    parser.add_argument("--full", action="store_true", help="Rebuild the whole history instead of appending new dates")
+    args = parser.parse_args()
+
+    # Connect to Postgres
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set")
+    engine = create_engine(db_url)
+
+    if args.full or not (table_exists(engine, HISTORY_TABLE) and table_exists(engine, STATE_TABLE)):
+        rebuild_history(engine)
+    else:
+        update_history(engine)
+
+    # Display the most recent 20 trading-day history of 3-day EMA sentiment for GOOGL
+    try:
+        googl = pd.read_sql(
+            text(f"SELECT date, sentiment_score FROM {HISTORY_TABLE} "
+                 "WHERE ticker = :ticker ORDER BY date DESC LIMIT 20"),
+            engine, params={"ticker": "GOOGL"}
+        )
+        print("\nLast 20 Trading-Day Sentiment History (3-day EMA) for GOOGL:")
+        print(googl.to_string(index=False))
+    except Exception as e:
+        print(f"Could not display GOOGL history: {e}")
 
-# 6) Normalize to 0–100 scale: percentage ×100 then +50 shift
-df['sentiment_score'] = df['raw_sentiment_score'] * 100 + 50
-
-# 7) Prepare final DataFrame: drop NaN, convert date to date-only, and dedupe
-df_final = df[['date','ticker','sentiment_score','raw_sentiment_score']].dropna().copy()
-df_final['date'] = df_final['date'].dt.date  # convert datetime to date
-# ensure one entry per ticker-date
-df_final = df_final.drop_duplicates(subset=['date','ticker'])
-
-# 8) Persist into stock_sentiment_history table
-with engine.begin() as conn:
-    # Recreate the table\    
-    conn.execute(text("DROP TABLE IF EXISTS stock_sentiment_history;"))
-    conn.execute(text(
-        "CREATE TABLE stock_sentiment_history ("
-        "date DATE, ticker TEXT, sentiment_score DOUBLE PRECISION, raw_sentiment_score DOUBLE PRECISION)"
-    ))
-    # Bulk insert
-    insert_sql = text(
-        "INSERT INTO stock_sentiment_history(date, ticker, sentiment_score, raw_sentiment_score) "
-        "VALUES(:date, :ticker, :sentiment_score, :raw_sentiment_score)"
-    )
-    conn.execute(insert_sql, df_final.to_dict(orient='records'))
-
-print(f"Computed {len(df_final)} rows into stock_sentiment_history.")
-
-# 9) Display the most recent 20 trading-day history of 3-day EMA sentiment for GOOGL
-try:
-    googl = df_final[df_final['ticker'] == 'GOOGL']
-    googl = googl.sort_values('date', ascending=False).head(20)
-    print("\nLast 20 Trading-Day Sentiment History (3-day EMA) for GOOGL:")
-    print(googl[['date','sentiment_score']].to_string(index=False))
-except Exception as e:
-    print(f"Could not display GOOGL history: {e}")
+if __name__ == "__main__":
+    main()
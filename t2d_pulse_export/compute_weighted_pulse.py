@@ -3,93 +3,224 @@
 # Rebuild sector and overall T2D Pulse history using a 3-day EMA for sector sentiment
 # calculated via equal-weighted average of stock sentiments, and then compute the Pulse as the
 # simple daily average of the 14 sector scores (equal-weight sectors).
-# Add a 3-day momentum flag for each sector when sentiment increases/decreases consecutively.
+# Add a momentum flag for each sector when sentiment increases/decreases on consecutive days
+# (2 day-over-day moves in a row by default, i.e. 3 rising/falling scores; see --streak-length).
 # All data flows through Postgres—no CSVs.
+#
+# By default only dates newer than each sector's last processed date are computed: the last
+# EMA value and current up/down streak per sector are kept in sector_sentiment_state, so the EMA
+# and momentum continue from there and the new rows are appended. Pass --full to rebuild the whole
+# history (this also happens automatically on the first run); rebuilt tables are swapped in, never
+# dropped first.
 
 #!/usr/bin/env python3
+import argparse
 import os
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 
-# 1) Connect to Postgres
-db_url = os.getenv("DATABASE_URL")
-if not db_url:
-    raise RuntimeError("DATABASE_URL is not set")
-engine = create_engine(db_url)
+from bulk_ingest import copy_upsert
+from incremental_history import load_state, replace_table, save_state, seeded_ewm, table_exists
 
-# 2) Load stock-level sentiment (3-day EMA) and sector assignments
-df_stock = pd.read_sql(
-    "SELECT date, ticker, sentiment_score AS stock_sentiment FROM stock_sentiment_history",
-    engine
-)
-df_stock['date'] = pd.to_datetime(df_stock['date']).dt.date
+EMA_SPAN = 3
+# ↗/↘ after this many consecutive day-over-day rises/falls (counted like streak_length in
+# add_pct_change_and_momentum.sql; 2 = score above the previous day's, which is above the day before)
+MOMENTUM_STREAK_LENGTH = 2
 
-df_sector = pd.read_sql(
-    "SELECT DISTINCT ticker, sector FROM market_cap_history",
-    engine
+SECTOR_TABLE = "sector_sentiment_history"
+SECTOR_TABLE_SQL = (
+    "CREATE TABLE {table} ("
+    "date DATE, sector TEXT, sector_sentiment_score DOUBLE PRECISION, momentum TEXT, "
+    "PRIMARY KEY (date, sector))"
 )
 
-# 3) Merge and calculate raw sector sentiment (equal-weighted)
-df = df_stock.merge(df_sector, on='ticker')
-sector_raw = (
-    df.groupby(['date','sector'])['stock_sentiment']
-      .mean()
-      .reset_index(name='sector_sentiment_raw')
-)
+PULSE_TABLE = "pulse_history"
+PULSE_TABLE_SQL = "CREATE TABLE {table} (date DATE PRIMARY KEY, pulse_score DOUBLE PRECISION)"
 
-# 4) Smooth sector sentiment with a 3-day EMA
-sector_raw['sector_sentiment_score'] = (
-    sector_raw.groupby('sector')['sector_sentiment_raw']
-      .transform(lambda x: x.ewm(span=3, adjust=False).mean())
+STATE_TABLE = "sector_sentiment_state"
+STATE_TABLE_SQL = (
+    "CREATE TABLE {table} ("
+    "sector TEXT PRIMARY KEY, last_date DATE, last_ema DOUBLE PRECISION, streak INTEGER)"
 )
 
-# 5) Compute 3-day momentum flag: ↗ if 3-day up, ↘ if 3-day down, — otherwise
-sector_raw = sector_raw.sort_values(['sector','date'])
-sector_raw['lag1'] = sector_raw.groupby('sector')['sector_sentiment_score'].shift(1)
-sector_raw['lag2'] = sector_raw.groupby('sector')['sector_sentiment_score'].shift(2)
+def load_stock_sentiment(engine, since=None):
+    """
+    Load stock-level sentiment (3-day EMA) and sector assignments.
 
-def momentum_flag(row):
-    if pd.isna(row['lag1']) or pd.isna(row['lag2']):
-        return '—'
-    if row['sector_sentiment_score'] > row['lag1'] > row['lag2']:
-        return '↗'
-    if row['sector_sentiment_score'] < row['lag1'] < row['lag2']:
-        return '↘'
-    return '—'
+    Args:
+        engine: SQLAlchemy engine
+        since (date, optional): Only load dates after this one
+    """
+    where, params = "", {}
+    if since is not None:
+        where, params = "WHERE date > :since", {"since": since}
 
-sector_raw['momentum'] = sector_raw.apply(momentum_flag, axis=1)
+    df_stock = pd.read_sql(
+        text(f"SELECT date, ticker, sentiment_score AS stock_sentiment FROM stock_sentiment_history {where}"),
+        engine, params=params
+    )
+    df_stock['date'] = pd.to_datetime(df_stock['date']).dt.date
 
-# 6) Persist sector_sentiment_history with momentum
-def persist_sector_history(df_sect):
-    with engine.begin() as conn:
-        conn.execute(text("DROP TABLE IF EXISTS sector_sentiment_history;"))
-        conn.execute(text(
-            "CREATE TABLE sector_sentiment_history ("
-            "date DATE, sector TEXT, sector_sentiment_score DOUBLE PRECISION, momentum TEXT)"
-        ))
-        df_sect[['date','sector','sector_sentiment_score','momentum']].to_sql(
-            'sector_sentiment_history', conn, if_exists='append', index=False
-        )
-
-persist_sector_history(sector_raw)
-print(f"Computed {len(sector_raw)} rows into sector_sentiment_history (with momentum).")
-
-# 7) Compute overall Pulse: equal-weighted average of 14 sectors per day
-pulse_df = (
-    sector_raw.groupby('date')['sector_sentiment_score']
-      .mean()
-      .reset_index(name='pulse_score')
-)
+    df_sector = pd.read_sql(
+        text(f"SELECT DISTINCT ticker, sector FROM market_cap_history {where}"),
+        engine, params=params
+    )
+    return df_stock.merge(df_sector, on='ticker')
+
+def signed_streaks(values, groups, seed_last=None, seed_streak=None):
+    """
+    Signed length of the current run of rises (+) or falls (-) at each row, vectorized.
+
+    Args:
+        values (np.ndarray): Scores sorted by date within each group, groups contiguous
+        groups (np.ndarray): Group label per row
+        seed_last (np.ndarray, optional): Per row, the group's last score before these rows
+        seed_streak (np.ndarray, optional): Per row, the group's streak before these rows
+
+    Returns:
+        np.ndarray: Streak per row (e.g. 2 = up on each of the last 2 days, 0 = flat/unknown)
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    values = np.asarray(values, dtype=float)
+    group_start = np.r_[True, groups[1:] != groups[:-1]]
+
+    previous = np.r_[np.nan, values[:-1]]
+    previous[group_start] = np.nan if seed_last is None else np.asarray(seed_last, dtype=float)[group_start]
+    direction = np.sign(values - previous)
+    direction[np.isnan(direction)] = 0
+
+    # Runs of equal direction within a group; count positions within each run
+    run_start = group_start | np.r_[True, direction[1:] != direction[:-1]]
+    run_id = np.cumsum(run_start) - 1
+    index = np.arange(n)
+    length = index - np.maximum.accumulate(np.where(run_start, index, 0)) + 1
+
+    if seed_streak is not None:
+        # A run that continues the saved streak extends it
+        seed = np.nan_to_num(np.asarray(seed_streak, dtype=float)).astype(int)
+        carried = np.where(group_start & (np.sign(seed) == direction), np.abs(seed), 0)
+        length = length + carried[run_start][run_id]
+
+    return (direction * length).astype(int)
+
+def momentum_flags(streaks, streak_length=MOMENTUM_STREAK_LENGTH):
+    """Map signed streaks to ↗ (risen on streak_length days in a row), ↘ (fallen) or —"""
+    return np.select([streaks >= streak_length, streaks <= -streak_length], ['↗', '↘'], default='—')
+
+def compute_sector_sentiment(df, state=None, streak_length=MOMENTUM_STREAK_LENGTH):
+    """
+    Compute sector sentiment rows (with momentum) and the updated per-sector state.
+
+    Args:
+        df (pd.DataFrame): date, ticker, stock_sentiment, sector rows
+        state (pd.DataFrame, optional): sector_sentiment_state indexed by sector
+        streak_length (int): Consecutive day-over-day rises/falls needed for a momentum flag
+
+    Returns:
+        tuple: (sector rows, state rows for the sectors in df)
+    """
+    # Calculate raw sector sentiment (equal-weighted)
+    sector_raw = (
+        df.groupby(['date','sector'])['stock_sentiment']
+          .mean()
+          .reset_index(name='sector_sentiment_raw')
+    )
+    sector_raw = sector_raw.sort_values(['sector','date']).reset_index(drop=True)
+
+    if state is not None and not state.empty:
+        # Skip dates a sector already has
+        last_date = sector_raw['sector'].map(state['last_date'].dt.date)
+        sector_raw = sector_raw[last_date.isna() | (sector_raw['date'] > last_date)].reset_index(drop=True)
+
+    # Smooth sector sentiment with a 3-day EMA, continuing from the saved EMA
+    seeds = state['last_ema'] if state is not None else None
+    sector_raw['sector_sentiment_score'] = seeded_ewm(
+        sector_raw, 'sector', 'sector_sentiment_raw', EMA_SPAN, seeds)
+
+    # Compute momentum flag: ↗ if risen on streak_length days in a row, ↘ if fallen, — otherwise
+    seed_last = seed_streak = None
+    if state is not None and not state.empty:
+        seed_last = sector_raw['sector'].map(state['last_ema']).to_numpy()
+        seed_streak = sector_raw['sector'].map(state['streak']).to_numpy()
+    sector_raw['streak'] = signed_streaks(
+        sector_raw['sector_sentiment_score'].to_numpy(), sector_raw['sector'].to_numpy(),
+        seed_last, seed_streak)
+    sector_raw['momentum'] = momentum_flags(sector_raw['streak'].to_numpy(), streak_length)
+
+    last = sector_raw.groupby('sector').agg(
+        last_date=('date', 'last'),
+        last_ema=('sector_sentiment_score', 'last'),
+        streak=('streak', 'last'),
+    ).reset_index()
+    return sector_raw, last
+
+def compute_pulse(sector_df):
+    """Compute overall Pulse: equal-weighted average of 14 sectors per day"""
+    return (
+        sector_df.groupby('date')['sector_sentiment_score']
+          .mean()
+          .reset_index(name='pulse_score')
+    )
+
+def rebuild_history(engine, streak_length=MOMENTUM_STREAK_LENGTH):
+    """Recompute the full sector and pulse history and swap it in"""
+    sector_raw, state = compute_sector_sentiment(load_stock_sentiment(engine), streak_length=streak_length)
+    pulse_df = compute_pulse(sector_raw)
+
+    replace_table(engine, SECTOR_TABLE, SECTOR_TABLE_SQL,
+                  sector_raw[['date','sector','sector_sentiment_score','momentum']], key_columns=['date','sector'])
+    print(f"Computed {len(sector_raw)} rows into {SECTOR_TABLE} (with momentum).")
+    replace_table(engine, PULSE_TABLE, PULSE_TABLE_SQL, pulse_df[['date','pulse_score']], key_columns=['date'])
+    print(f"Rebuilt {PULSE_TABLE} with {len(pulse_df)} dates (equal-weight sectors).")
+    replace_table(engine, STATE_TABLE, STATE_TABLE_SQL, state, key_columns=['sector'])
+
+def update_history(engine, streak_length=MOMENTUM_STREAK_LENGTH):
+    """Append sector and pulse rows for dates after each sector's saved state"""
+    state = load_state(engine, STATE_TABLE, 'sector')
+    if 'streak' not in state.columns:
+        print(f"{STATE_TABLE} predates momentum streaks; rebuilding the full history.")
+        return rebuild_history(engine, streak_length)
+    since = state['last_date'].min().date() if not state.empty else None
+    sector_raw, new_state = compute_sector_sentiment(
+        load_stock_sentiment(engine, since), state, streak_length)
 
-# 8) Persist pulse_history
-def persist_pulse_history(df_pulse):
     with engine.begin() as conn:
-        conn.execute(text("DROP TABLE IF EXISTS pulse_history;"))
-        conn.execute(text(
-            "CREATE TABLE pulse_history ("
-            "date DATE, pulse_score DOUBLE PRECISION)"
-        ))
-        df_pulse.to_sql('pulse_history', conn, if_exists='append', index=False)
-
-persist_pulse_history(pulse_df)
-print(f"Rebuilt pulse_history with {len(pulse_df)} dates (equal-weight sectors).")
+        copy_upsert(conn, sector_raw[['date','sector','sector_sentiment_score','momentum']],
+                    SECTOR_TABLE, key_columns=['date','sector'])
+        # A date's pulse covers every sector, including ones that already had that date
+        if not sector_raw.empty:
+            sector_df = pd.read_sql(
+                text(f"SELECT date, sector_sentiment_score FROM {SECTOR_TABLE} WHERE date >= :first"),
+                conn, params={"first": sector_raw['date'].min()}
+            )
+            pulse_df = compute_pulse(sector_df)
+            copy_upsert(conn, pulse_df[['date','pulse_score']], PULSE_TABLE, key_columns=['date'])
+        save_state(conn, new_state, STATE_TABLE, 'sector', STATE_TABLE_SQL)
+
+    print(f"Appended {len(sector_raw)} rows to {SECTOR_TABLE} "
+          f"covering {sector_raw['date'].nunique()} dates.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute sector sentiment and T2D Pulse history")
+    parser.add_argument("--full", action="store_true", help="Rebuild the whole history instead of appending new dates")
+    parser.add_argument("--streak-length", type=int, default=MOMENTUM_STREAK_LENGTH,
+                        help="Consecutive day-over-day rises/falls needed for a momentum flag")
+    args = parser.parse_args()
+
+    # Connect to Postgres
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set")
+    engine = create_engine(db_url)
+
+    tables = (SECTOR_TABLE, PULSE_TABLE, STATE_TABLE)
+    if args.full or not all(table_exists(engine, table) for table in tables):
+        rebuild_history(engine, args.streak_length)
+    else:
+        update_history(engine, args.streak_length)
+
+if __name__ == "__main__":
+    main()
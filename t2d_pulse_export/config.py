@@ -42,4 +42,91 @@ SECTOR_NAME_MAP = {
 # EMA configuration
 EMA_SPAN = 20  # Days for EMA calculation
 EMA_WEIGHT = 0.2  # Weight of EMA factor in sector sentiment (20%)
-EMA_NORMALIZATION_FACTOR = 5.0  # +/- 5% change is normalized to +/- 1.0 signal
\ No newline at end of file
+EMA_NORMALIZATION_FACTOR = 5.0  # +/- 5% change is normalized to +/- 1.0 signal
+EMA_STATE_DIR = "data/ema_state"  # Last EMA per series, so new rows are O(1) updates (see ema_kernel.py)
+# Macro data refresh configuration
+UPDATE_FREQUENCIES = {
+    "gdp": "quarterly",          # GDP updates quarterly
+    "unemployment": "monthly",   # Unemployment updates monthly
+    "cpi": "monthly",           # CPI updates monthly
+    "pcepi": "monthly",         # PCEPI updates monthly
+    "interest_rate": "monthly", # Interest rate updates when Fed meets
+    "pce": "monthly",           # PCE updates monthly
+    "treasury_yield": "daily",  # Treasury yield updates daily
+    "vix": "daily",             # VIX updates daily
+    "nasdaq": "daily",          # NASDAQ updates daily
+    "consumer_sentiment": "monthly"  # Consumer sentiment updates monthly
+}
+
+# Release calendar (see release_calendar.py): when the next observation of each series can first
+# appear. Observations are dated at the start of their period (FRED convention); the next one is due
+# lag_days after that period ends, at release_hour US/Eastern. Daily series are due after the next
+# weekday's close. revision_days keeps polling for revised values that long after the period ends.
+RELEASE_SCHEDULES = {
+    "gdp": {"fred_series": "GDPC1", "lag_days": 25, "release_hour": 8.5, "revision_days": 95},  # Advance, second and third estimates
+    "unemployment": {"fred_series": "UNRATE", "lag_days": 1, "release_hour": 8.5},              # First Friday of the month
+    "cpi": {"fred_series": "CPIAUCSL", "lag_days": 9, "release_hour": 8.5},                     # Mid-month
+    "pcepi": {"fred_series": "PCEPI", "lag_days": 24, "release_hour": 8.5},                     # End of the following month
+    "interest_rate": {"fred_series": "FEDFUNDS", "lag_days": 0, "release_hour": 15.5},          # First business day of the month
+    "pce": {"fred_series": "PCE", "lag_days": 24, "release_hour": 8.5},
+    "consumer_sentiment": {"fred_series": "USACSCICP02STSAM", "lag_days": 7, "release_hour": 0},  # OECD monthly update
+    "treasury_yield": {"release_hour": 16.5},  # Market close
+    "vix": {"release_hour": 16.5},
+    "nasdaq": {"release_hour": 16.5},
+}
+RELEASE_POLL_HOURS = {"daily": 1, "monthly": 6, "quarterly": 12}  # Once due, how often to poll until it appears
+RELEASE_STATE_FILE = "data/release_state.json"  # Last check and FRED last_updated per series
+
+# Incremental FRED fetches (see fred_store.py): observations are kept per series in a columnar
+# store, and refreshes request only the last FRED_REVISION_LOOKBACK stored observations onwards
+FRED_INCREMENTAL = True
+FRED_STORE_DIR = "data/fred_store"
+FRED_REVISION_LOOKBACK = 3  # Re-requested so their revisions are seen (0: only dates after the last one)
+FRED_HISTORY_YEARS = 5  # History returned by fetch_fred_data
+
+# In-process data cache configuration
+CACHE_TTL_SECONDS = {
+    "daily": 6 * 3600,        # Daily series go stale after 6 hours
+    "monthly": 24 * 3600,     # Monthly/quarterly series are re-checked once a day
+    "quarterly": 24 * 3600,
+}
+CACHE_DEFAULT_TTL_SECONDS = 3600  # Datasets without a known frequency
+CACHE_MEMORY_BUDGET_MB = 256      # Least recently used datasets are evicted above this
+CACHE_PINNED_DATA_TYPES = (      # Primary dashboard series: never evicted, refreshed when stale
+    "gdp", "pce", "unemployment", "cpi", "interest_rate", "treasury_yield", "nasdaq",
+    "consumer_sentiment", "job_postings", "software_ppi", "data_ppi", "pcepi", "vix",
+)
+
+# Dashboard startup snapshot (see dashboard_snapshot.py)
+DASHBOARD_SNAPSHOT_PATH = "data/dashboard_snapshot.arrow"
+DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS = 36 * 3600  # Older snapshots are ignored at startup
+STARTUP_REFRESH_INTERVAL_SECONDS = 3600  # Workers adopt a snapshot refreshed more recently than this
+STARTUP_REFRESH_LOCK_FILE = "data/.startup_refresh.lock"
+
+# Columnar ticker price / market cap store (see ticker_store.py)
+TICKER_STORE_DIR = "data/ticker_history"
+HISTORICAL_CSV_EXPORT = False  # Rewrite the full legacy historical_ticker_*.csv files on every save (for older readers)
+
+# How tickers listed in several sectors count towards sector totals (see sector_universe.py):
+# "full" adds the whole market cap to each sector, "fractional" splits it evenly between them
+SECTOR_ALLOCATION = "full"
+
+# Shared HTTP client (see http_client.py): base URL, rate limit (requests per second), burst,
+# concurrent connections and timeout (seconds) per provider. Each setting can be overridden with
+# <PROVIDER>_BASE_URL, <PROVIDER>_RATE_LIMIT, <PROVIDER>_BURST and <PROVIDER>_MAX_WORKERS.
+HTTP_PROVIDERS = {
+    "fred": {"base_url": "https://api.stlouisfed.org", "rate": 2.0, "burst": 5, "max_connections": 4, "timeout": 30},
+    "bls": {"base_url": "https://api.bls.gov", "rate": 0.5, "burst": 2, "max_connections": 2, "timeout": 30},
+    "bea": {"base_url": "https://apps.bea.gov", "rate": 1.0, "burst": 2, "max_connections": 2, "timeout": 60},
+    "polygon": {"base_url": "https://api.polygon.io", "rate": 5.0, "burst": 5, "max_connections": 8, "timeout": 15},  # Paid tiers; a free key allows 5/minute
+    "finnhub": {"base_url": "https://finnhub.io", "rate": 1.0, "burst": 5, "max_connections": 4, "timeout": 15},
+    "alphavantage": {"base_url": "https://www.alphavantage.co", "rate": 5 / 60, "burst": 1, "max_connections": 1, "timeout": 30},
+}
+HTTP_MAX_RETRIES = 3  # Retries after a 429/5xx response or a connection error
+HTTP_RETRY_BASE_DELAY = 1.0  # Seconds before the first retry; doubled per attempt, with ±50% jitter
+HTTP_RETRY_MAX_DELAY = 60
+HTTP_CACHE_DIR = "data/cache/http"  # ETag / Last-Modified validators for conditional GETs
+
+# Daily refresh pipeline (see pipeline.py and daily_pipeline.py)
+PIPELINE_CACHE_DIR = "data/cache/pipeline"  # Node outputs, keyed by the hash of their inputs
+PIPELINE_MAX_WORKERS = 8  # Nodes run at once (provider rate limits still apply per request)
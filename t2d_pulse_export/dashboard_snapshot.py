@@ -0,0 +1,256 @@
+# dashboard_snapshot.py
+# -----------------------------------------------------------
+# Precomputed startup snapshot for the dashboard
+# -----------------------------------------------------------
+#
+# Every series the dashboard loads at import, the latest sector scores and the
+# T2D Pulse history are written to a single Arrow IPC file. Each dataset is a
+# contiguous block of rows in one table (columns are the union of all
+# datasets); the schema metadata records where each block starts and which
+# columns and dtypes it had. Workers memory-map the file at import instead of
+# parsing a dozen CSVs and hitting FRED/Yahoo, then refresh in the background.
+#
+# Build it with `python dashboard_snapshot.py`; the app also rewrites it after
+# each data refresh.
+
+import json
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from config import DASHBOARD_SNAPSHOT_PATH, DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS
+
+SNAPSHOT_VERSION = 1
+_METADATA_KEY = b"t2d_snapshot"
+
+# data_cache key -> CSV file in the data directory
+SERIES_FILES = {
+    "gdp": "gdp_data.csv",
+    "pce": "pce_data.csv",
+    "unemployment": "unemployment_data.csv",
+    "cpi": "inflation_data.csv",
+    "interest_rate": "interest_rate_data.csv",
+    "treasury_yield": "treasury_yield_data.csv",
+    "nasdaq": "nasdaq_data.csv",
+    "consumer_sentiment": "consumer_sentiment_data.csv",
+    "job_postings": "job_postings_data.csv",
+    "software_ppi": "software_ppi_data.csv",
+    "data_ppi": "data_processing_ppi_data.csv",
+    "pcepi": "pcepi_data.csv",
+    "vix": "vix_data.csv",
+}
+
+# Reserved dataset names for the non-series parts of the snapshot
+PULSE_HISTORY = "__pulse_history__"
+SECTOR_SCORES = "__sector_scores__"
+
+class DashboardSnapshot:
+    """Frames restored from a snapshot file"""
+
+    def __init__(self, series, pulse_history=None, sector_scores=None, built_at=None):
+        self.series = series                # {data_type: DataFrame}
+        self.pulse_history = pulse_history  # DataFrame or None
+        self.sector_scores = sector_scores  # {sector: score} or None
+        self.built_at = built_at            # epoch seconds
+
+    def has_series(self, data_types):
+        """Check that every data type in `data_types` is present and non-empty"""
+        return all(t in self.series and not self.series[t].empty for t in data_types)
+
+# ---------- Writing ----------
+def _merge_types(types):
+    """Arrow type able to hold every column type in `types`"""
+    types = set(types)
+    if len(types) == 1:
+        return types.pop()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_boolean(t)
+           or pa.types.is_null(t) for t in types):
+        return pa.float64()
+    return pa.string()
+
+def _prepare(df):
+    """Return (frame with the index as columns, index column names or None)"""
+    if isinstance(df.index, pd.RangeIndex):
+        return df, None
+    index_names = [name if name is not None else "index" for name in df.index.names]
+    return df.reset_index(), index_names
+
+def write_snapshot(series, pulse_history=None, sector_scores=None, path=DASHBOARD_SNAPSHOT_PATH):
+    """
+    Write the dashboard's startup data to a single Arrow IPC file.
+
+    Args:
+        series (dict): {data_type: DataFrame} for every dashboard series
+        pulse_history (pd.DataFrame, optional): T2D Pulse history
+        sector_scores (dict, optional): Latest {sector: score}
+        path (str): Output file (replaced atomically)
+
+    Returns:
+        bool: True if the snapshot was written
+    """
+    datasets = {name: df for name, df in series.items()
+                if isinstance(df, pd.DataFrame) and not df.empty}
+    if pulse_history is not None and not pulse_history.empty:
+        datasets[PULSE_HISTORY] = pulse_history
+    if sector_scores:
+        datasets[SECTOR_SCORES] = pd.DataFrame({"sector": list(sector_scores.keys()),
+                                                "score": [float(s) for s in sector_scores.values()]})
+    if not datasets:
+        print("No data to write to the dashboard snapshot")
+        return False
+
+    try:
+        frames, blocks, column_types = {}, {}, {}
+        offset = 0
+        for name, df in datasets.items():
+            frame, index_names = _prepare(df)
+            frame.columns = [str(col) for col in frame.columns]
+            schema = pa.Schema.from_pandas(frame, preserve_index=False)
+            for field in schema:
+                column_types.setdefault(field.name, []).append(field.type)
+            frames[name] = frame
+            blocks[name] = {
+                "offset": offset,
+                "length": len(frame),
+                "columns": list(frame.columns),
+                "dtypes": {col: str(dtype) for col, dtype in frame.dtypes.items()},
+                "index": index_names,
+            }
+            offset += len(frame)
+
+        schema = pa.schema([(col, _merge_types(types)) for col, types in column_types.items()])
+        metadata = {
+            "version": SNAPSHOT_VERSION,
+            "built_at": time.time(),
+            "datasets": blocks,
+        }
+        schema = schema.with_metadata({_METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+
+        tables = []
+        for name, frame in frames.items():
+            arrays = []
+            for field in schema:
+                if field.name in frame.columns:
+                    column = frame[field.name]
+                    if pa.types.is_string(field.type) and column.dtype != object:
+                        column = column.astype(str).where(column.notna(), None)
+                    arrays.append(pa.array(column, type=field.type, from_pandas=True))
+                else:
+                    arrays.append(pa.nulls(len(frame), type=field.type))
+            tables.append(pa.Table.from_arrays(arrays, schema=schema))
+        table = pa.concat_tables(tables)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        print(f"Wrote dashboard snapshot with {len(datasets)} datasets to {path}")
+        return True
+    except Exception as e:
+        print(f"Error writing dashboard snapshot: {e}")
+        return False
+
+# ---------- Reading ----------
+def _restore(table, block):
+    """Rebuild one dataset's DataFrame from its block of rows"""
+    frame = table.slice(block["offset"], block["length"]).select(block["columns"]).to_pandas()
+    for col, dtype in block["dtypes"].items():
+        if str(frame[col].dtype) == dtype:
+            continue
+        try:
+            if dtype == "object":
+                frame[col] = frame[col].astype(object)
+            elif not (dtype.startswith(("int", "uint", "bool")) and frame[col].isna().any()):
+                frame[col] = frame[col].astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    if block.get("index"):
+        frame = frame.set_index(block["index"])
+    return frame
+
+def load_snapshot(path=DASHBOARD_SNAPSHOT_PATH, max_age=DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS):
+    """
+    Memory-map a snapshot file and restore its frames.
+
+    Args:
+        path (str): Snapshot file
+        max_age (float, optional): Ignore snapshots built more than this many
+            seconds ago (None to accept any age)
+
+    Returns:
+        DashboardSnapshot or None: None if the file is missing, stale or unreadable
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+            metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+            if metadata.get("version") != SNAPSHOT_VERSION:
+                print(f"Ignoring dashboard snapshot with version {metadata.get('version')}")
+                return None
+            built_at = metadata.get("built_at", 0)
+            if max_age is not None and time.time() - built_at > max_age:
+                print(f"Ignoring stale dashboard snapshot built at {time.ctime(built_at)}")
+                return None
+
+            frames = {name: _restore(table, block) for name, block in metadata["datasets"].items()}
+    except Exception as e:
+        print(f"Error loading dashboard snapshot: {e}")
+        return None
+
+    pulse_history = frames.pop(PULSE_HISTORY, None)
+    sector_frame = frames.pop(SECTOR_SCORES, None)
+    sector_scores = None
+    if sector_frame is not None:
+        sector_scores = dict(zip(sector_frame["sector"], sector_frame["score"]))
+    return DashboardSnapshot(frames, pulse_history, sector_scores, built_at)
+
+# ---------- Build step ----------
+def _read_csv(path):
+    """Read a data CSV the way app.load_data_from_csv does"""
+    df = pd.read_csv(path)
+    date_columns = [col for col in df.columns if col.lower() == 'date']
+    if date_columns:
+        df[date_columns[0]] = pd.to_datetime(df[date_columns[0]])
+        if date_columns[0] != 'date':
+            df = df.rename(columns={date_columns[0]: 'date'})
+    return df
+
+def _latest_sector_scores(data_dir):
+    """Latest row of authentic_sector_history.csv as {sector: score}"""
+    path = os.path.join(data_dir, "authentic_sector_history.csv")
+    if not os.path.exists(path):
+        return None
+    df = _read_csv(path)
+    if df.empty or 'date' not in df.columns:
+        return None
+    latest = df.sort_values('date').iloc[-1].drop('date')
+    return {sector: float(score) for sector, score in latest.items() if pd.notna(score)}
+
+def build_snapshot(data_dir="data", path=DASHBOARD_SNAPSHOT_PATH):
+    """Build the snapshot from the CSV/Parquet files in `data_dir`"""
+    series = {}
+    for data_type, filename in SERIES_FILES.items():
+        file_path = os.path.join(data_dir, filename)
+        if os.path.exists(file_path):
+            series[data_type] = _read_csv(file_path)
+        else:
+            print(f"Snapshot: {file_path} does not exist, skipping {data_type}")
+
+    pulse_history = None
+    parquet_history_file = os.path.join(data_dir, "t2d_pulse_history.parquet")
+    history_file = os.path.join(data_dir, "t2d_pulse_history.csv")
+    if os.path.exists(parquet_history_file):
+        pulse_history = pd.read_parquet(parquet_history_file)
+    elif os.path.exists(history_file):
+        pulse_history = _read_csv(history_file)
+
+    return write_snapshot(series, pulse_history, _latest_sector_scores(data_dir), path)
+
+if __name__ == "__main__":
+    build_snapshot()
@@ -1,12 +1,14 @@
+import io
 import pandas as pd
-import numpy as np
 import os
-from config import SECTORS, EMA_SPAN
-from fetcher import fetch_market_cap
+from config import SECTORS, EMA_SPAN, EMA_STATE_DIR
+from ema_kernel import EmaTracker, ema_filter
+from fetcher import fetch_market_caps
 
 def compute_sector_value(sector_tickers):
     """
     Compute total market capitalization for a sector based on its tickers
+    (fetched concurrently)
     
     Args:
         sector_tickers (list): List of stock ticker symbols
@@ -15,9 +17,8 @@ def compute_sector_value(sector_tickers):
         float: Total market capitalization in billions USD
     """
     total = 0
-    for ticker in sector_tickers:
+    for ticker, market_cap in fetch_market_caps(sector_tickers).items():
         try:
-            market_cap = fetch_market_cap(ticker)
             if market_cap:
                 total += market_cap
         except Exception as e:
@@ -36,29 +37,70 @@ def calculate_ema(values, span=EMA_SPAN):
     Returns:
         list: List of EMA values
     """
-    if not values or len(values) == 0:
+    if values is None or len(values) == 0:
         return []
         
-    ema_values = []
-    alpha = 2 / (span + 1)
+    return ema_filter(values, span).tolist()
+
+def _read_new_sector_rows(filepath, tracker):
+    """
+    Read the rows of the sector values CSV that the tracker hasn't seen yet.
     
-    for i, val in enumerate(values):
-        if i == 0:
-            ema_values.append(val)
-        else:
-            ema = alpha * val + (1 - alpha) * ema_values[-1]
-            ema_values.append(ema)
-            
-    return ema_values
+    The file is normally only appended to, so the tracker remembers the byte
+    offset it has read up to (and the last line before it), and only the bytes
+    after that offset are read. If the header or that line no longer match, the
+    file was rewritten and the tracker is reset so the whole file is read again.
+    
+    Returns:
+        pd.DataFrame: New rows (empty if there are none)
+    """
+    with open(filepath, "rb") as f:
+        header = f.readline().rstrip(b"\n")
+        header_text = header.decode("utf-8").strip()
+        if not header_text:
+            return pd.DataFrame()
+        body_start = len(header) + 1
+        size = os.fstat(f.fileno()).st_size
+
+        meta = tracker.meta
+        offset = meta.get("offset", 0)
+        tail = meta.get("tail", "").encode("utf-8")
+        unchanged = meta.get("header") == header_text and body_start + len(tail) <= offset <= size
+        if unchanged and tail:
+            # Only the last line read before is compared, not the whole file
+            f.seek(offset - len(tail))
+            unchanged = f.read(len(tail)) == tail
+        if not unchanged:
+            tracker.reset()
+            offset = body_start
 
-def load_sector_emas(filepath="data/sector_values.csv", days=EMA_SPAN, include_raw=False):
+        f.seek(offset)
+        content = f.read()
+
+    # Only consume complete lines; a partly written last row is read next time
+    new_rows = content[:content.rfind(b"\n") + 1]
+    if new_rows.strip():
+        last_line = new_rows.rstrip(b"\n").rsplit(b"\n", 1)[-1] + b"\n"
+        tracker.meta.update({"header": header_text, "offset": offset + len(new_rows),
+                             "tail": last_line.decode("utf-8")})
+        return pd.read_csv(io.BytesIO(header + b"\n" + new_rows))
+    tracker.meta.update({"header": header_text, "offset": offset})
+    tracker.meta.setdefault("tail", "")
+    return pd.DataFrame(columns=pd.read_csv(io.BytesIO(header + b"\n")).columns)
+
+def load_sector_emas(filepath="data/sector_values.csv", days=EMA_SPAN, include_raw=False,
+                     state_dir=EMA_STATE_DIR):
     """
     Load sector values and calculate EMAs
     
+    The EMA state per sector is kept under `state_dir`, so each call only reads
+    and applies the rows appended to the CSV since the previous call.
+    
     Args:
         filepath (str): Path to the CSV file with sector values
         days (int): Number of days for EMA calculation
         include_raw (bool): Whether to include raw values in results
+        state_dir (str): Directory for the saved EMA state (None recomputes from the full file)
         
     Returns:
         dict: Dictionary with sector EMAs {sector: (latest_ema, percent_change)}
@@ -67,36 +109,48 @@ def load_sector_emas(filepath="data/sector_values.csv", days=EMA_SPAN, include_r
         print(f"No sector EMA data file found at {filepath}")
         return {}
         
-    # Load data from CSV
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    state_path = os.path.join(state_dir, f"{name}_ema{days}.json") if state_dir else None
+    tracker = EmaTracker(state_path, days)
+        
+    # Load new rows from the CSV
     try:
-        df = pd.read_csv(filepath)
-        if df.empty:
+        df = _read_new_sector_rows(filepath, tracker)
+        if df.empty and not tracker.series:
             print("Sector values CSV file is empty")
             return {}
     except Exception as e:
         print(f"Error loading sector values CSV: {str(e)}")
         return {}
         
+    # Advance the EMAs of every sector by the new rows
+    sectors = list(df.columns[1:])  # Skip the Date column
+    if not df.empty:
+        tracker.update(df[sectors])
+        try:
+            tracker.save()
+        except OSError as e:
+            print(f"Error saving sector EMA state: {str(e)}")
+    
     # Calculate EMAs and percent changes for each sector
     results = {}
     
-    for sector in df.columns[1:]:  # Skip the Date column
-        values = df[sector].dropna().values
-        if len(values) > 1:  # Need at least 2 values for EMA
-            if len(values) >= days:
-                emas = calculate_ema(values, span=days)
-                latest_ema = emas[-1]
-                prev_ema = emas[-2] if len(emas) > 1 else latest_ema
+    for sector in sectors:
+        state = tracker.latest(sector)
+        if state and state["count"] > 1:  # Need at least 2 values for EMA
+            if state["count"] >= days:
+                latest_ema = state["ema"]
+                prev_ema = state["prev_ema"]
             else:
                 # If we don't have enough data, use simple average
-                latest_ema = np.mean(values)
-                prev_ema = np.mean(values[:-1]) if len(values) > 1 else latest_ema
+                latest_ema = state["total"] / state["count"]
+                prev_ema = (state["total"] - state["value"]) / (state["count"] - 1)
                 
             percent_change = (latest_ema - prev_ema) / prev_ema * 100 if prev_ema > 0 else 0
             
             if include_raw:
-                results[sector] = (latest_ema, percent_change, values[-1])
+                results[sector] = (latest_ema, percent_change, state["value"])
             else:
                 results[sector] = (latest_ema, percent_change)
                 
-    return results
\ No newline at end of file
+    return results
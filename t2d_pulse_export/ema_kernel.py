@@ -0,0 +1,252 @@
+# ema_kernel.py
+# -----------------------------------------------------------
+# Single-pass EMA kernel shared by the sector, VIX, NASDAQ and stock EMAs
+# -----------------------------------------------------------
+#
+# All EMAs in the dashboard use pandas' adjust=False recursion
+#
+#   ema[t] = alpha * x[t] + (1 - alpha) * ema[t-1],   alpha = 2 / (span + 1)
+#
+# seeded with the first observation. ema_filter() runs that recursion over a
+# whole dates × series array at once: one step per date, vectorized across the
+# series (or a single scipy.signal.lfilter call when scipy is installed and the
+# block has no gaps). Results match Series.ewm(span=span, adjust=False).mean()
+# column by column, gaps included (with pandas' special case for span 3; see
+# ema_filter).
+#
+# Because the recursion only needs the previous value, the last EMA per series
+# is all the state a new day needs. EmaTracker keeps that state (plus a running
+# count and sum for the short-history fallback) in a small JSON file, so a
+# new row costs O(1) per series instead of a pass over the full history.
+
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+EMA_STATE_VERSION = 1
+
+def ema_alpha(span):
+    """Smoothing factor for an EMA span"""
+    if span < 1:
+        raise ValueError(f"EMA span must be >= 1 (got {span})")
+    return 2.0 / (span + 1.0)
+
+def ema_filter(values, span, seed=None, ignore_na=False):
+    """
+    EMA (adjust=False) down the first axis of a 1-D or 2-D (dates × series) array.
+
+    Args:
+        values (array-like): Observations, NaN where a series has no value
+        span (int): EMA span
+        seed (float or array-like, optional): EMA per series before the first
+            row, as if it were a preceding observation. NaN seeds start fresh.
+        ignore_na (bool): As in pandas; when False a gap decays the old EMA's
+            weight, when True gaps are skipped entirely
+
+    Returns:
+        np.ndarray: EMA values, same shape as `values`. Rows after a gap carry
+        the last EMA; rows before a series' first value are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    block = values.reshape(len(values), -1)
+    n_rows, n_series = block.shape
+    alpha = ema_alpha(span)
+    decay = 1.0 - alpha
+
+    weighted = np.full(n_series, np.nan)
+    if seed is not None:
+        weighted = np.broadcast_to(np.asarray(seed, dtype=float), (n_series,)).copy()
+    result = np.empty_like(block)
+    if n_rows == 0:
+        return result.reshape(values.shape)
+
+    observed = ~np.isnan(block)
+    if lfilter is not None and n_series and observed.all():
+        # No gaps: the recursion is a first-order IIR filter
+        start = np.where(np.isnan(weighted), block[0], weighted)
+        zi = (decay * start)[np.newaxis, :]
+        result, _ = lfilter([alpha], [1.0, -decay], block, axis=0, zi=zi)
+        return result.reshape(values.shape)
+
+    old_weight = np.ones(n_series)
+    for i in range(n_rows):
+        row, is_obs = block[i], observed[i]
+        started = ~np.isnan(weighted)
+        decays = started & (is_obs if ignore_na else True)
+        old_weight = np.where(decays, old_weight * decay, old_weight)
+        update = started & is_obs
+        # After a gap of k rows the old EMA and the new value are weighted
+        # (1 - alpha) ** k and alpha, as documented for pandas' ignore_na=False.
+        # pandas special-cases com == 1 (span 3, alpha 0.5): the new value gets
+        # the remaining 1 - (1 - alpha) ** k instead, so follow it there too.
+        new_weight = 1.0 - old_weight if alpha == 0.5 else alpha
+        weighted = np.where(update, (old_weight * weighted + new_weight * row) / (old_weight + new_weight), weighted)
+        old_weight = np.where(update, 1.0, old_weight)
+        # Series seeing their first value start from it
+        first = ~started & is_obs
+        weighted = np.where(first, row, weighted)
+        old_weight = np.where(first, 1.0, old_weight)
+        result[i] = weighted
+    return result.reshape(values.shape)
+
+def ema_series(series, span, seed=None, ignore_na=False):
+    """EMA of a pandas Series (equivalent to series.ewm(span=span, adjust=False).mean())"""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    return pd.Series(ema_filter(values, span, seed, ignore_na), index=series.index, name=series.name)
+
+def ema_frame(frame, span, seeds=None, ignore_na=False):
+    """
+    EMA of every column of a dates × series frame in one pass.
+
+    Args:
+        frame (pd.DataFrame): Rows sorted by date, one column per series
+        span (int): EMA span
+        seeds (dict or pd.Series, optional): EMA per column before the first row
+
+    Returns:
+        pd.DataFrame: EMA values, same shape and labels as `frame`
+    """
+    values = frame.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    seed = None if seeds is None else pd.Series(seeds, dtype=float).reindex(frame.columns).to_numpy()
+    return pd.DataFrame(ema_filter(values, span, seed, ignore_na), index=frame.index, columns=frame.columns)
+
+def grouped_ema(values, groups, span, seeds=None):
+    """
+    EMA within each group of long-form rows, computed as one dates × groups block.
+
+    Each group's rows are laid out in a column of their own (position within the
+    group as the row), so every group is filtered in the same pass.
+
+    Args:
+        values (array-like): Values sorted by date within each group
+        groups (array-like): Group label per row (rows of a group need not be contiguous)
+        span (int): EMA span
+        seeds (pd.Series, optional): EMA per group before its first row, indexed by group
+
+    Returns:
+        np.ndarray: EMA per row, in the order of `values`
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.zeros(0)
+    codes, labels = pd.factorize(pd.Series(groups), sort=False)
+    position = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+
+    block = np.full((position.max() + 1, len(labels)), np.nan)
+    block[position, codes] = values
+    seed = None
+    if seeds is not None and not seeds.empty:
+        seed = pd.Series(seeds, dtype=float).reindex(labels).to_numpy()
+    # Padding after a group's last row only follows its real rows, so it never
+    # affects them; gaps inside a group keep pandas' ignore_na=False weighting
+    return ema_filter(block, span, seed)[position, codes]
+
+class EmaTracker:
+    """
+    Last EMA state per series, persisted to JSON so new rows are O(1) updates.
+
+    Rows are applied with ignore_na=True semantics (each series' missing values
+    are skipped, as if the series had been dropna()'d), which is what the
+    sector EMAs have always used.
+    """
+
+    def __init__(self, path, span):
+        """
+        Args:
+            path (str): JSON file holding the state (None keeps it in memory only)
+            span (int): EMA span; a saved state for another span is discarded
+        """
+        self.path = path
+        self.span = span
+        self.series = {}
+        self.meta = {}
+        self.load()
+
+    def load(self):
+        """Load the saved state (an unreadable or mismatched file starts fresh)"""
+        self.series, self.meta = {}, {}
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable EMA state {self.path}: {e}")
+            return
+        if saved.get("version") == EMA_STATE_VERSION and saved.get("span") == self.span:
+            self.series = saved.get("series", {})
+            self.meta = saved.get("meta", {})
+
+    def save(self):
+        """Atomically write the state"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {
+            "version": EMA_STATE_VERSION,
+            "span": self.span,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "meta": self.meta,
+            "series": self.series,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def reset(self):
+        """Forget every series"""
+        self.series, self.meta = {}, {}
+
+    def update(self, frame):
+        """
+        Apply new rows and return their EMAs.
+
+        Args:
+            frame (pd.DataFrame): Rows in date order, one column per series.
+                Every row is treated as new; callers pass only unseen rows.
+
+        Returns:
+            pd.DataFrame: EMA after each row (NaN before a series' first value)
+        """
+        frame = frame.apply(pd.to_numeric, errors="coerce")
+        columns = [str(column) for column in frame.columns]
+        seeds = np.array([self.series.get(column, {}).get("ema", np.nan) for column in columns], dtype=float)
+        values = frame.to_numpy(dtype=float)
+        emas = ema_filter(values, self.span, seeds, ignore_na=True)
+
+        observed = ~np.isnan(values)
+        counts = observed.sum(axis=0)
+        totals = np.where(observed, values, 0.0).sum(axis=0)
+        for j, column in enumerate(columns):
+            if not counts[j]:
+                continue
+            rows = np.flatnonzero(observed[:, j])
+            state = self.series.get(column, {"count": 0, "total": 0.0, "ema": None, "prev_ema": None})
+            # Previous EMA: the one before this block's last value
+            if len(rows) > 1:
+                prev_ema = emas[rows[-2], j]
+            else:
+                prev_ema = state["ema"]
+            self.series[column] = {
+                "count": int(state["count"] + counts[j]),
+                "total": float(state["total"] + totals[j]),
+                "value": float(values[rows[-1], j]),
+                "ema": float(emas[rows[-1], j]),
+                "prev_ema": None if prev_ema is None else float(prev_ema),
+            }
+        return pd.DataFrame(emas, index=frame.index, columns=frame.columns)
+
+    def latest(self, column):
+        """Saved state for one series (count, total, value, ema, prev_ema), or None"""
+        return self.series.get(str(column))
@@ -1,51 +1,59 @@
-import requests
-import os
+import http_client
 from config import FINNHUB_API_KEY
 
-BASE_URL = "https://finnhub.io/api/v1"
+# Finnhub API paths (the shared client adds the base URL, rate limit and retries)
+QUOTE_PATH = "/api/v1/quote"
+PROFILE_PATH = "/api/v1/stock/profile2"
+
+async def _fetch_field(path, ticker, field, label):
+    """Fetch one field of a Finnhub response for a ticker, or None"""
+    try:
+        response = await http_client.get_client("finnhub").get(
+            path, params={"symbol": ticker, "token": FINNHUB_API_KEY})
+        if response.status_code == 200:
+            return response.json().get(field)
+        else:
+            print(f"Failed to fetch {label} for {ticker}: {response.status_code}")
+            return None
+    except Exception as e:
+        print(f"Error fetching {label} for {ticker}: {str(e)}")
+        return None
 
 def fetch_eod_price(ticker):
     """
     Fetch end-of-day price for a stock ticker from Finnhub
-    
+
     Args:
         ticker (str): Stock ticker symbol
-        
+
     Returns:
         float: Current price or None if not available
     """
-    try:
-        url = f"{BASE_URL}/quote?symbol={ticker}&token={FINNHUB_API_KEY}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            res = response.json()
-            return res.get("c")  # Current price
-        else:
-            print(f"Failed to fetch price for {ticker}: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error fetching price for {ticker}: {str(e)}")
-        return None
+    return http_client.run(_fetch_field(QUOTE_PATH, ticker, "c", "price"))  # Current price
 
 def fetch_market_cap(ticker):
     """
     Fetch market capitalization for a stock ticker from Finnhub
-    
+
     Args:
         ticker (str): Stock ticker symbol
-        
+
     Returns:
         float: Market capitalization in USD or None if not available
     """
-    try:
-        url = f"{BASE_URL}/stock/profile2?symbol={ticker}&token={FINNHUB_API_KEY}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            res = response.json()
-            return res.get("marketCapitalization")
-        else:
-            print(f"Failed to fetch market cap for {ticker}: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error fetching market cap for {ticker}: {str(e)}")
-        return None
+    return http_client.run(_fetch_field(PROFILE_PATH, ticker, "marketCapitalization", "market cap"))
+
+def fetch_market_caps(tickers):
+    """
+    Fetch market capitalizations for many tickers concurrently
+
+    Args:
+        tickers (list): Stock ticker symbols
+
+    Returns:
+        dict: Ticker -> market capitalization in USD (None if not available)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    caps = http_client.run(http_client.gather(
+        *(_fetch_field(PROFILE_PATH, ticker, "marketCapitalization", "market cap") for ticker in tickers)))
+    return {ticker: None if isinstance(cap, Exception) else cap for ticker, cap in zip(tickers, caps)}
@@ -0,0 +1,55 @@
+# figure_cache.py
+# -----------------------------------------------------------
+# Memoize Dash chart callbacks on the version of their input data
+# -----------------------------------------------------------
+#
+# Chart callbacks fire on every interval-component tick and in every browser
+# session, but their output only changes when the underlying dataset does.
+# memoize_on_data() keys each callback's result on the data_cache versions of
+# the datasets it reads (plus the calendar date, since charts use a rolling
+# "last N years" window), and returns the stored result until one changes.
+
+import functools
+import threading
+from datetime import date
+
+import data_cache
+
+_results = {}  # callback name -> (key, result)
+_results_lock = threading.Lock()
+
+def _freeze(result):
+    """Store Plotly figures as their JSON dict so repeated ticks skip serialisation"""
+    to_dict = getattr(result, 'to_dict', None)
+    if callable(to_dict) and hasattr(result, 'layout'):
+        return to_dict()
+    return result
+
+def memoize_on_data(*data_types):
+    """
+    Decorator for Dash callbacks whose output depends only on `data_types`.
+
+    Callback arguments (e.g. n_intervals) are ignored when building the key.
+    """
+    def decorator(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (tuple(data_cache.get_version(t) for t in data_types), date.today())
+            cached = _results.get(name)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+            result = _freeze(func(*args, **kwargs))
+            with _results_lock:
+                _results[name] = (key, result)
+            return result
+
+        return wrapper
+    return decorator
+
+def clear():
+    """Drop every memoized result"""
+    with _results_lock:
+        _results.clear()
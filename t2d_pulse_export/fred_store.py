@@ -0,0 +1,179 @@
+# fred_store.py
+# -----------------------------------------------------------
+# Columnar per-series store for FRED observations, with a revision log
+# -----------------------------------------------------------
+#
+# Each series is one Parquet file (date, value, realtime_start) under
+# config.FRED_STORE_DIR, sorted by date. app.fetch_fred_data keeps it up to
+# date incrementally: instead of five years of observations it requests only
+# the last config.FRED_REVISION_LOOKBACK stored observations onwards, and
+# merge_observations() folds the response in:
+#
+#   - dates after the last stored one are appended
+#   - re-sent dates whose value changed are updated, and the change is
+#     appended to the series' revision log (revisions/<series>.parquet)
+#
+# realtime_start is the vintage the stored value was first seen in, so it
+# moves forward only when a value is revised.
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import config
+
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("value", pa.float64()),
+    ("realtime_start", pa.date32()),
+])
+REVISION_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("old_value", pa.float64()),
+    ("new_value", pa.float64()),
+    ("old_realtime_start", pa.date32()),
+    ("new_realtime_start", pa.date32()),
+    ("recorded_at", pa.timestamp("s")),
+])
+
+def _store_dir(store_dir=None):
+    return store_dir or config.FRED_STORE_DIR
+
+def _series_path(series_id, store_dir=None):
+    return os.path.join(_store_dir(store_dir), f"{series_id}.parquet")
+
+def _revisions_path(series_id, store_dir=None):
+    return os.path.join(_store_dir(store_dir), "revisions", f"{series_id}.parquet")
+
+def _write(frame, schema, path):
+    """Atomically write a frame as Parquet"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(frame[schema.names], schema=schema, preserve_index=False)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _is_temporal(dtype):
+    return pa.types.is_date32(dtype) or pa.types.is_timestamp(dtype)
+
+def _read(schema, path):
+    if not os.path.exists(path):
+        return pd.DataFrame({name: pd.Series(dtype="datetime64[ns]" if _is_temporal(dtype) else float)
+                             for name, dtype in zip(schema.names, schema.types)})
+    frame = pq.read_table(path).to_pandas()
+    for name, dtype in zip(schema.names, schema.types):
+        if _is_temporal(dtype):
+            frame[name] = pd.to_datetime(frame[name])
+    return frame
+
+def read_series(series_id, start=None, store_dir=None):
+    """
+    Stored observations for a series.
+
+    Args:
+        series_id (str): FRED series ID
+        start (optional): First date to return (inclusive)
+
+    Returns:
+        pd.DataFrame: date, value, realtime_start (datetime64), oldest first
+    """
+    frame = _read(SCHEMA, _series_path(series_id, store_dir))
+    if start is not None:
+        frame = frame[frame["date"] >= pd.Timestamp(start)]
+    return frame.reset_index(drop=True)
+
+def read_revisions(series_id, store_dir=None):
+    """Revision log for a series: date, old/new value and vintage, recorded_at"""
+    return _read(REVISION_SCHEMA, _revisions_path(series_id, store_dir))
+
+def incremental_start(series_id, lookback=None, store_dir=None):
+    """
+    observation_start for an incremental request, or None if nothing is stored.
+
+    Args:
+        lookback (int, optional): Stored observations to request again so their
+            revisions are seen (default config.FRED_REVISION_LOOKBACK). With 0,
+            only dates after the last stored one are requested.
+
+    Returns:
+        str: 'YYYY-MM-DD' or None
+    """
+    lookback = config.FRED_REVISION_LOOKBACK if lookback is None else lookback
+    dates = read_series(series_id, store_dir=store_dir)["date"]
+    if dates.empty:
+        return None
+    if lookback <= 0:
+        return (dates.iloc[-1] + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    return dates.iloc[-min(lookback, len(dates))].strftime("%Y-%m-%d")
+
+def merge_observations(series_id, observations, store_dir=None):
+    """
+    Merge fetched observations into the stored series.
+
+    Args:
+        series_id (str): FRED series ID
+        observations (pd.DataFrame): date and value columns (realtime_start optional),
+            as returned by the FRED observations endpoint
+
+    Returns:
+        dict: Counts of 'added' and 'revised' observations
+    """
+    new = pd.DataFrame({
+        "date": pd.to_datetime(observations["date"]).dt.normalize(),
+        "value": pd.to_numeric(observations["value"], errors="coerce"),
+        "realtime_start": pd.to_datetime(observations.get("realtime_start", pd.Timestamp.now().normalize())),
+    }).dropna(subset=["date", "value"]).drop_duplicates("date", keep="last")
+
+    stored = read_series(series_id, store_dir=store_dir)
+    joined = new.merge(stored, on="date", how="left", suffixes=("", "_stored"))
+    is_new = joined["value_stored"].isna()
+    revised = ~is_new & ~np.isclose(joined["value"], joined["value_stored"], rtol=0, atol=1e-9)
+
+    # Values that did not change keep the vintage they were first seen in
+    unchanged = ~is_new & ~revised
+    joined.loc[unchanged, "realtime_start"] = joined.loc[unchanged, "realtime_start_stored"]
+
+    if revised.any():
+        log = read_revisions(series_id, store_dir)
+        changes = pd.DataFrame({
+            "date": joined.loc[revised, "date"],
+            "old_value": joined.loc[revised, "value_stored"],
+            "new_value": joined.loc[revised, "value"],
+            "old_realtime_start": joined.loc[revised, "realtime_start_stored"],
+            "new_realtime_start": joined.loc[revised, "realtime_start"],
+            "recorded_at": pd.Timestamp.now().floor("s"),
+        })
+        log = changes if log.empty else pd.concat([log, changes], ignore_index=True)
+        _write(log, REVISION_SCHEMA, _revisions_path(series_id, store_dir))
+
+    if is_new.any() or revised.any():
+        merged = pd.concat([stored[~stored["date"].isin(joined["date"])], joined[SCHEMA.names]], ignore_index=True)
+        _write(merged.sort_values("date"), SCHEMA, _series_path(series_id, store_dir))
+    return {"added": int(is_new.sum()), "revised": int(revised.sum())}
+
+def to_fred_frame(series, realtime=None):
+    """
+    Stored observations in the shape fetch_fred_data returns: realtime_start,
+    realtime_end, date, value, newest first.
+
+    Args:
+        series (pd.DataFrame): As returned by read_series
+        realtime (str, optional): realtime_start/realtime_end to report (default: each value's vintage)
+    """
+    frame = pd.DataFrame({
+        "realtime_start": realtime or series["realtime_start"].dt.strftime("%Y-%m-%d"),
+        "realtime_end": realtime or series["realtime_start"].dt.strftime("%Y-%m-%d"),
+        "date": series["date"],
+        "value": series["value"],
+    })
+    return frame.sort_values("date", ascending=False).reset_index(drop=True)
@@ -4,7 +4,6 @@
 # Generate historical sector sentiment scores using past data
 
 import os
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, date
 import json
@@ -12,12 +11,13 @@ import time
 
 # Import data helpers
 from data_cache import get_data
+import asof_index
 from sentiment_engine import SECTORS, IMPACT, IMPORTANCE, score_sectors
 import sector_sentiment_history
 
 def get_indicator_value_for_date(indicator_name, target_date):
     """
-    Get the closest available value for an economic indicator on a specific date
+    Get the latest available value for an economic indicator on or before a specific date
     
     Args:
         indicator_name (str): Name of the indicator (matching data file names)
@@ -55,21 +55,18 @@ def get_indicator_value_for_date(indicator_name, target_date):
         print(f"No data available for indicator: {indicator_name}")
         return None
     
-    # Get the data point closest to target_date
+    # Get the latest data point on or before target_date
     if 'date' not in df.columns:
         print(f"Date column missing for indicator: {indicator_name}")
         return None
     
-    # Get timestamp for target date to make comparison easier
-    target_timestamp = pd.Timestamp(target_date)
-    
-    # Convert dates to timestamps if needed
-    if not pd.api.types.is_datetime64_any_dtype(df['date']):
-        df['date'] = pd.to_datetime(df['date'])
-    
-    # Find the closest date to the target date
-    df['date_diff'] = abs(df['date'] - target_timestamp)
-    closest_row = df.loc[df['date_diff'].idxmin()]
+    # The as-of index is rebuilt only when the cached DataFrame changes
+    table = asof_index.from_frame(indicator_name, df)
+    closest_row = table.row(target_date) if table is not None else None
+    if closest_row is None:
+        print(f"No data on or before {target_date.strftime('%Y-%m-%d')} for indicator: {indicator_name}")
+        return None
+    df = table.frame
     
     # Get the appropriate value column
     if indicator_name == "NASDAQ_20d_gap_%":
@@ -0,0 +1,400 @@
+# http_client.py
+# -----------------------------------------------------------
+# Shared async HTTP client for FRED, BLS, BEA, Polygon, Finnhub and AlphaVantage
+# -----------------------------------------------------------
+#
+# Every provider gets one ProviderClient (see get_client) with:
+#   - a pooled requests.Session and a worker pool sized to the provider's
+#     max_connections, so at most that many requests are in flight
+#   - a token bucket pacing requests to the provider's rate limit and burst
+#   - retries on 429/5xx responses and connection errors, with exponential,
+#     jittered backoff (a Retry-After header wins when present)
+#   - conditional GETs: responses carrying an ETag or Last-Modified header are
+#     kept under config.HTTP_CACHE_DIR, later requests send If-None-Match /
+#     If-Modified-Since, and a 304 is answered from the cached body
+#
+# The API is asyncio-based: `await client.get(...)` inside a coroutine, and
+# gather() to run many requests at once. Synchronous callers use run(), or
+# the get_sync()/post_sync() shortcuts for a single request. Requests are sent
+# by requests on the worker pool, so no async HTTP library is required.
+#
+# Base URLs can be pointed elsewhere (e.g. the replay server in http_replay.py)
+# with <PROVIDER>_BASE_URL or configure().
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Credentials are never part of a cache key or a recorded fixture
+SECRET_PARAMS = {"api_key", "apikey", "apiKey", "token", "UserID", "registrationkey"}
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token now, borrowing against future refills if necessary.
+
+        Returns:
+            float: Seconds to wait before using the token (0 if one was available)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a token is available, then take it"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class HttpResponse:
+    """The parts of a response callers use (mirrors requests.Response)"""
+
+    def __init__(self, status_code, headers, content, url, from_cache=False):
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.url = url
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+def _public_params(params):
+    """Query parameters without credentials, in a stable order"""
+    return sorted((key, str(value)) for key, value in (params or {}).items() if key not in SECRET_PARAMS)
+
+def _public_json(body):
+    """A JSON request body without credentials (top-level keys, as BLS sends them)"""
+    if not isinstance(body, dict):
+        return body
+    return {key: value for key, value in body.items() if key not in SECRET_PARAMS}
+
+class ResponseCache:
+    """ETag / Last-Modified validators and bodies for one provider's GET responses"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, url, params):
+        key = hashlib.sha1(f"{url}?{urlencode(_public_params(params))}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, url, params):
+        """Return the cached entry for a request, or None"""
+        path = self._path(url, params)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url, params, response):
+        """Keep a 200 response that carries a validator"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "body": response.text,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(url, params)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache response for {url}: {e}")
+
+class ProviderClient:
+    """Rate-limited, retrying, conditionally caching client for one provider"""
+
+    def __init__(self, name, base_url, rate, burst, max_connections, timeout,
+                 max_retries=None, cache_dir=None):
+        """
+        Args:
+            name (str): Provider name (used in logs and the cache path)
+            base_url (str): Prepended to relative request paths
+            rate (float): Requests per second
+            burst (int): Requests allowed back to back
+            max_connections (int): Concurrent requests (connection pool size)
+            timeout (float): Seconds per request
+            max_retries (int, optional): Default config.HTTP_MAX_RETRIES
+            cache_dir (str, optional): Conditional GET cache (None disables it)
+        """
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.bucket = TokenBucket(rate, burst)
+        self.cache = ResponseCache(os.path.join(cache_dir, name)) if cache_dir else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix=f"http-{name}")
+
+    def url_for(self, path, params=None):
+        """
+        Absolute URL and query parameters for a request.
+
+        Absolute URLs are used as they are, except that a query string is moved
+        into the parameters (so credentials in it stay out of cache keys).
+        """
+        url = path if path.startswith(("http://", "https://")) else f"{self.base_url}/{path.lstrip('/')}"
+        parts = urlsplit(url)
+        if not parts.query:
+            return url, params
+        merged = dict(parse_qsl(parts.query, keep_blank_values=True))
+        merged.update(params or {})
+        return urlunsplit(parts._replace(query="")), merged
+
+    def _send(self, method, url, params, json_body, headers):
+        """Blocking request on a worker thread"""
+        response = self.session.request(method, url, params=params, json=json_body,
+                                        headers=headers, timeout=self.timeout)
+        return HttpResponse(response.status_code, response.headers, response.content, response.url)
+
+    def _retry_delay(self, attempt, response=None):
+        """Exponential backoff with ±50% jitter, or the server's Retry-After"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), config.HTTP_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        delay = min(config.HTTP_RETRY_MAX_DELAY, config.HTTP_RETRY_BASE_DELAY * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+
+    async def request(self, method, path, params=None, json=None, headers=None, retries=None, conditional=True):
+        """
+        Send a request, waiting for the rate limit and retrying transient failures.
+
+        Args:
+            method (str): "GET" or "POST"
+            path (str): Path relative to the base URL, or an absolute URL
+            params (dict, optional): Query parameters
+            json (optional): JSON body
+            headers (dict, optional): Extra headers
+            retries (int, optional): Override the provider's retry count
+            conditional (bool): Use and refresh the ETag / Last-Modified cache (GET only)
+
+        Returns:
+            HttpResponse: The final response (possibly a non-2xx one once retries run out)
+
+        Raises:
+            requests.RequestException: If the last attempt failed to connect
+        """
+        url, params = self.url_for(path, params)
+        retries = self.max_retries if retries is None else retries
+        headers = dict(headers or {})
+
+        cached = None
+        use_cache = conditional and self.cache is not None and method == "GET"
+        if use_cache:
+            cached = self.cache.load(url, params)
+            if cached and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached and cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            await self.bucket.acquire_async()
+            try:
+                response = await loop.run_in_executor(
+                    self.executor, self._send, method, url, params, json, headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"{self.name}: {e} ({attempt + 1}/{retries + 1}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"{self.name}: HTTP {response.status_code} for {path} "
+                               f"({attempt + 1}/{retries + 1}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            break
+
+        if response.status_code == 304 and cached:
+            return HttpResponse(200, cached.get("headers", {}), cached["body"].encode("utf-8"), url, from_cache=True)
+        if use_cache:
+            self.cache.store(url, params, response)
+        _record(self.name, method, url, params, json, response)
+        return response
+
+    async def get(self, path, params=None, **kwargs):
+        """GET a path (see request)"""
+        return await self.request("GET", path, params=params, **kwargs)
+
+    async def post(self, path, json=None, **kwargs):
+        """POST a JSON body to a path (see request)"""
+        return await self.request("POST", path, json=json, **kwargs)
+
+    def get_sync(self, path, params=None, **kwargs):
+        """Blocking GET for synchronous callers"""
+        return run(self.get(path, params=params, **kwargs))
+
+    def post_sync(self, path, json=None, **kwargs):
+        """Blocking POST for synchronous callers"""
+        return run(self.post(path, json=json, **kwargs))
+
+def _record(provider, method, url, params, json_body, response):
+    """Save a response as a replay fixture when HTTP_RECORD_DIR is set (see http_replay.py)"""
+    record_dir = os.environ.get("HTTP_RECORD_DIR")
+    if not record_dir:
+        return
+    try:
+        from http_replay import save_fixture
+        save_fixture(record_dir, provider, method, url, dict(_public_params(params)),
+                     _public_json(json_body), response)
+    except Exception as e:
+        logger.warning(f"Could not record {provider} response for {url}: {e}")
+
+_clients = {}
+_overrides = {}
+_clients_lock = threading.Lock()
+
+def _provider_settings(name):
+    """config.HTTP_PROVIDERS entry with environment and configure() overrides applied"""
+    if name not in config.HTTP_PROVIDERS:
+        raise ValueError(f"Unknown HTTP provider {name!r} (expected one of {sorted(config.HTTP_PROVIDERS)})")
+    settings = dict(config.HTTP_PROVIDERS[name])
+    prefix = name.upper()
+    for key, env, cast in (("base_url", "BASE_URL", str), ("rate", "RATE_LIMIT", float),
+                           ("burst", "BURST", int), ("max_connections", "MAX_WORKERS", int)):
+        if os.environ.get(f"{prefix}_{env}"):
+            settings[key] = cast(os.environ[f"{prefix}_{env}"])
+    settings.update(_overrides.get(name, {}))
+    return settings
+
+def get_client(name):
+    """Return the shared client for a provider ("fred", "bls", "bea", "polygon", "finnhub", "alphavantage")"""
+    with _clients_lock:
+        if name not in _clients:
+            settings = _provider_settings(name)
+            _clients[name] = ProviderClient(
+                name, settings["base_url"], settings["rate"], settings["burst"],
+                settings["max_connections"], settings["timeout"],
+                max_retries=settings.get("max_retries"),
+                cache_dir=settings.get("cache_dir", config.HTTP_CACHE_DIR),
+            )
+        return _clients[name]
+
+def configure(name, **settings):
+    """
+    Override a provider's settings (base_url, rate, burst, max_connections,
+    timeout, max_retries, cache_dir) and drop its current client.
+    """
+    _provider_settings(name)  # Validate the name
+    with _clients_lock:
+        _overrides.setdefault(name, {}).update(settings)
+        client = _clients.pop(name, None)
+    if client is not None:
+        client.executor.shutdown(wait=False)
+
+def reset(name=None):
+    """Forget overrides and clients (for one provider, or all)"""
+    names = [name] if name else list(set(_overrides) | set(_clients))
+    with _clients_lock:
+        for provider in names:
+            _overrides.pop(provider, None)
+            client = _clients.pop(provider, None)
+            if client is not None:
+                client.executor.shutdown(wait=False)
+
+async def gather(*coroutines):
+    """Run coroutines concurrently; failures are returned in place of results"""
+    return await asyncio.gather(*coroutines, return_exceptions=True)
+
+def run(coroutine):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Works whether or not the calling thread already has a running event loop
+    (in that case the coroutine runs on a separate thread).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    result = {}
+    def target():
+        try:
+            result["value"] = asyncio.run(coroutine)
+        except BaseException as e:
+            result["error"] = e
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+def fetch_all(name, calls):
+    """
+    Send many GET requests to one provider concurrently.
+
+    Args:
+        name (str): Provider name
+        calls (list): (path, params) tuples
+
+    Returns:
+        list: HttpResponse (or the exception raised) per call, in order
+    """
+    client = get_client(name)
+    return run(gather(*(client.get(path, params=params) for path, params in calls)))
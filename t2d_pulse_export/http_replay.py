@@ -0,0 +1,217 @@
+# http_replay.py
+# -----------------------------------------------------------
+# Local stand-in server that replays recorded provider responses
+# -----------------------------------------------------------
+#
+# Tests point http_client at a ReplayServer instead of the real FRED / BLS /
+# BEA / Polygon / Finnhub APIs, so no API keys or network access are needed:
+#
+#   with ReplayServer(fixtures) as server:
+#       server.install("fred", "finnhub")   # route those providers here
+#       ...                                 # code under test
+#       server.requests_seen                # [(method, path, query), ...]
+#
+# A fixture is a dict (or a JSON file in a fixture directory):
+#
+#   {"provider": "fred", "method": "GET", "path": "/fred/series/observations",
+#    "query": {"series_id": "UNRATE"},        # must all match (others ignored)
+#    "json": {...},                           # optional, must match a POST body
+#    "status": 200, "headers": {...}, "body": {... or "text"},
+#    "fail_first": [503, 429],                # optional statuses served first
+#    "delay": 0.5}                            # optional seconds before replying
+#
+# The most specific matching fixture wins. Every 200 response gets an ETag
+# (the fixture's, or a hash of the body), and a request whose If-None-Match
+# matches it gets a 304, so conditional requests can be tested too. Setting
+# HTTP_RECORD_DIR while running against the real APIs writes fixtures in this
+# format (see save_fixture).
+
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+def save_fixture(directory, provider, method, url, query, json_body, response):
+    """Write one response as a fixture file"""
+    parts = urlsplit(url)
+    query = {key: value for key, value in query.items()}
+    query.update({key: value for key, value in parse_qsl(parts.query) if key not in query})
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    fixture = {
+        "provider": provider,
+        "method": method,
+        "path": parts.path,
+        "query": query,
+        "status": response.status_code,
+        "headers": {key: value for key, value in response.headers.items()
+                    if key in ("Content-Type", "ETag", "Last-Modified")},
+        "body": body,
+    }
+    if json_body is not None:
+        fixture["json"] = json_body
+    key = hashlib.sha1(json.dumps([method, parts.path, sorted(query.items()), json_body],
+                                  sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{provider}-{key}.json"), "w") as f:
+        json.dump(fixture, f, indent=2, default=str)
+
+def load_fixtures(directory):
+    """Load every *.json fixture in a directory"""
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), "r") as f:
+                fixtures.append(json.load(f))
+    return fixtures
+
+def _subset(expected, actual):
+    """Check that every key in `expected` has the same value in `actual`"""
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and all(
+            key in actual and _subset(value, actual[key]) for key, value in expected.items())
+    return str(expected) == str(actual) if not isinstance(expected, list) else expected == actual
+
+class ReplayServer:
+    """Serve fixtures on a free local port"""
+
+    def __init__(self, fixtures=None, fixture_dir=None):
+        """
+        Args:
+            fixtures (list, optional): Fixture dicts
+            fixture_dir (str, optional): Directory of fixture JSON files
+        """
+        self.fixtures = list(fixtures or [])
+        if fixture_dir:
+            self.fixtures.extend(load_fixtures(fixture_dir))
+        self.requests_seen = []
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._installed = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        import http_client
+        for provider in self._installed:
+            http_client.reset(provider)
+        self._installed = []
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def install(self, *providers, **settings):
+        """
+        Route http_client providers to this server.
+
+        Extra settings (e.g. cache_dir=None, rate=1000) are applied as well.
+        """
+        import http_client
+        for provider in providers:
+            http_client.configure(provider, base_url=self.base_url, **settings)
+            self._installed.append(provider)
+
+    def match(self, method, path, query, body):
+        """Return the most specific fixture for a request, or None"""
+        best, best_score = None, -1
+        for index, fixture in enumerate(self.fixtures):
+            if fixture.get("method", "GET") != method or fixture.get("path") != path:
+                continue
+            if not _subset(fixture.get("query", {}), query):
+                continue
+            if "json" in fixture and not _subset(fixture["json"], body):
+                continue
+            score = len(fixture.get("query", {})) + (1 if "json" in fixture else 0)
+            if score > best_score:
+                best, best_score = (index, fixture), score
+        return best
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self, method):
+                parts = urlsplit(self.path)
+                query = dict(parse_qsl(parts.query))
+                body = None
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    raw = self.rfile.read(length)
+                    try:
+                        body = json.loads(raw)
+                    except ValueError:
+                        body = raw.decode("utf-8", errors="replace")
+                with server._lock:
+                    server.requests_seen.append((method, parts.path, query))
+
+                found = server.match(method, parts.path, query, body)
+                if found is None:
+                    return self._reply(404, {"Content-Type": "application/json"},
+                                       {"error": f"No recorded response for {method} {parts.path}"})
+                index, fixture = found
+                if fixture.get("delay"):
+                    time.sleep(fixture["delay"])
+
+                with server._lock:
+                    served = server._failures.get(index, 0)
+                    failures = fixture.get("fail_first", [])
+                    if served < len(failures):
+                        server._failures[index] = served + 1
+                        return self._reply(failures[served], {"Content-Type": "application/json"},
+                                           {"error": "replayed failure"})
+
+                status = fixture.get("status", 200)
+                headers = {"Content-Type": "application/json"}
+                headers.update(fixture.get("headers", {}))
+                payload = self._payload(fixture.get("body", ""))
+                if status == 200:
+                    headers.setdefault("ETag", f'"{hashlib.sha1(payload).hexdigest()}"')
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        return self._reply(304, {"ETag": headers["ETag"]}, b"")
+                self._reply(status, headers, payload)
+
+            def _payload(self, body):
+                if isinstance(body, bytes):
+                    return body
+                if isinstance(body, str):
+                    return body.encode("utf-8")
+                return json.dumps(body).encode("utf-8")
+
+            def _reply(self, status, headers, body):
+                payload = self._payload(body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
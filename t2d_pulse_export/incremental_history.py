@@ -0,0 +1,71 @@
+# incremental_history.py
+# -------------------------------------------
+# Shared helpers for the incremental (append-only) rebuilds of the Postgres
+# sentiment history tables in compute_stock_sentiment.py and
+# compute_weighted_pulse.py.
+#
+# EMAs are recursive, so each script persists the last EMA value per ticker /
+# sector in a small state table and only computes rows for new dates,
+# continuing the EMA from that state. Full rebuilds write into a side table and
+# swap it in, so readers never see a dropped or half-filled table.
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from bulk_ingest import copy_upsert
+from ema_kernel import grouped_ema
+
+def table_exists(engine, table):
+    """Check whether a table exists"""
+    return inspect(engine).has_table(table)
+
+def load_state(engine, table, key):
+    """Load a state table indexed by `key`, or None if it doesn't exist yet"""
+    if not table_exists(engine, table):
+        return None
+    state = pd.read_sql(f"SELECT * FROM {table}", engine)
+    if 'last_date' in state.columns:
+        state['last_date'] = pd.to_datetime(state['last_date'])
+    return state.set_index(key)
+
+def save_state(conn, state, table, key, create_sql):
+    """Create the state table if needed and upsert `state` (a frame with a `key` column)"""
+    conn.execute(text(create_sql.format(table=f"IF NOT EXISTS {table}")))
+    copy_upsert(conn, state, table, key_columns=[key])
+
+def seeded_ewm(df, by, column, span, seeds=None):
+    """
+    EMA (adjust=False) of df[column] within each `by` group, continuing from a saved state.
+
+    All groups are smoothed in a single pass (see ema_kernel.grouped_ema).
+
+    Args:
+        df (pd.DataFrame): Rows sorted by date within each group
+        by (str): Group column (ticker or sector)
+        column (str): Column to smooth
+        span (int): EMA span
+        seeds (pd.Series, optional): Last EMA value per group, indexed by group.
+            Groups without a seed (or with a NaN seed) start fresh.
+
+    Returns:
+        pd.Series: EMA values aligned with df.index
+    """
+    values = grouped_ema(df[column].to_numpy(dtype=float), df[by].to_numpy(), span, seeds)
+    return pd.Series(values, index=df.index)
+
+def replace_table(engine, table, create_sql, df, key_columns):
+    """
+    Rebuild `table` from `df` without readers ever seeing it missing or partial.
+
+    The rows are bulk-loaded into `<table>_rebuild`, then swapped in with a
+    drop-and-rename in one short transaction.
+    """
+    side = f"{table}_rebuild"
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {side}"))
+        conn.execute(text(create_sql.format(table=side)))
+        copy_upsert(conn, df, side, key_columns=key_columns)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(f"ALTER TABLE {side} RENAME TO {table}"))
+        conn.execute(text(f"ALTER INDEX IF EXISTS {side}_pkey RENAME TO {table}_pkey"))
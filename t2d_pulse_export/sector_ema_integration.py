@@ -6,6 +6,7 @@
 import os
 import pandas as pd
 import numpy as np
+import asof_index
 from ema_calculator import load_sector_emas
 from config import SECTOR_NAME_MAP, EMA_WEIGHT, EMA_NORMALIZATION_FACTOR
 
@@ -36,134 +37,99 @@ def get_sector_ema_factors():
         
     return factors
 
-def get_historical_ema_factors(date):
+HISTORICAL_INDICATOR_FILE = "attached_assets/Historical Indicator Data JM.csv"
+
+def _clamp(values, low, high):
+    """Element-wise max(low, min(high, value)), keeping its NaN behaviour (NaN -> high)"""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), high, np.clip(values, low, high))
+
+def get_historical_ema_factor_frame(dates):
     """
-    Get historical sector EMA factors for a specific date, prioritizing market data
-    to ensure daily variance.
+    Get historical sector EMA factors for many dates at once, prioritizing
+    market data to ensure daily variance.
+    
+    The market indicator file is read once and as-of joined onto `dates`
+    (latest row on or before each date). Dates before its first row get
+    factors based on the date itself.
     
     Args:
-        date (datetime): The date to get factors for
+        dates (iterable): The dates to get factors for
         
     Returns:
-        dict: Dictionary with sector factors {sector: factor}
-              where factor is a value between -1 and 1
+        pd.DataFrame: Factors between -1 and 1, indexed by date, one column per sector
     """
-    import os
     import math
     from sentiment_engine import SECTORS
     
-    # Priority 1: Use direct market indicators (NASDAQ, VIX) from historical data files
-    # This ensures each trading day has unique factors based on market conditions
+    index = pd.DatetimeIndex(pd.to_datetime(list(dates)))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    
+    # Small per-sector variation based on the sector name hash (-0.1 to 0.1), and a
+    # slight boost for growth tech / penalty for legacy tech
+    variation = np.array([(hash(sector) % 100 - 50) / 500.0 for sector in SECTORS])
+    boost = np.array([
+        0.05 if any(keyword in sector for keyword in ['SaaS', 'Cloud', 'AI', 'Analytics'])
+        else -0.05 if any(keyword in sector for keyword in ['Legacy', 'Hardware'])
+        else 0.0
+        for sector in SECTORS
+    ])
+    
+    # Priority 2: factors based on the date (sine over the month, -0.3 to 0.3, plus
+    # -0.1 to +0.1 by month), so dates without market data still differ
+    base_factor = (np.sin(index.day.to_numpy() / 31.0 * math.pi * 2) * 0.3
+                   + (index.month.to_numpy() / 12.0) * 0.2 - 0.1)
+    factors = _clamp(base_factor[:, None] + variation, -0.7, 0.7)
+    
+    # Priority 1: direct market indicators (NASDAQ, VIX, Treasury) as of each date
     try:
-        date_str = date.strftime('%Y-%m-%d')
-        print(f"Getting market-based EMA factors for {date_str}")
-        
-        # Try to get historical NASDAQ data - Primary market indicator
-        nasdaq_file = "attached_assets/Historical Indicator Data JM.csv"
-        if os.path.exists(nasdaq_file):
-            nasdaq_df = pd.read_csv(nasdaq_file)
-            nasdaq_df['date'] = pd.to_datetime(nasdaq_df['date'])
+        table = None
+        if os.path.exists(HISTORICAL_INDICATOR_FILE):
+            table = asof_index.from_csv("Historical_Indicator_Data_JM", HISTORICAL_INDICATOR_FILE)
+        if table is not None and len(index):
+            found = table.positions(index) >= 0
+            table.values(index, 'NASDAQ Raw Value')  # Required column
             
-            # Find the exact date or closest previous date
-            nasdaq_data = nasdaq_df[nasdaq_df['date'] <= date].sort_values('date', ascending=False)
+            def column(name, default):
+                if name in table.columns:
+                    return table.values(index, name)
+                return np.full(len(index), default)
             
-            if not nasdaq_data.empty:
-                # Get the closest date's NASDAQ data
-                row = nasdaq_data.iloc[0]
-                closest_date = row['date'].strftime('%Y-%m-%d') if isinstance(row['date'], pd.Timestamp) else row['date']
-                
-                # Calculate NASDAQ gap % if it's not already in the data
-                nasdaq_raw = float(row['NASDAQ Raw Value'])
-                
-                # Get VIX data (market volatility) to use as another factor
-                vix_value = float(row['VIX Raw Value']) if 'VIX Raw Value' in row else 25.0
-                
-                # Get 10-year Treasury yield as another factor
-                treasury_yield = float(row['10-Year Treasury Yield']) if '10-Year Treasury Yield' in row else 4.0
-                
-                # Calculate a base factor using these market indicators
-                # 1. NASDAQ contribution: Higher values are positive
-                nasdaq_factor = 0.0
-                
-                # If we have EMA data, calculate gap percentage
-                if 'NASDAQ Gap %' in row:
-                    nasdaq_gap = float(row['NASDAQ Gap %'])
-                    # Scale to appropriate range (-1 to 1)
-                    nasdaq_factor = max(-0.7, min(0.7, nasdaq_gap / 10.0))
-                    print(f"Using NASDAQ Gap {nasdaq_gap:.2f}% as primary factor: {nasdaq_factor:.3f}")
-                
-                # 2. VIX contribution: Higher VIX (fear) is negative
-                # Scale VIX so 15=0.2, 20=0, 25=-0.2, 30+=-0.4
-                vix_factor = max(-0.4, min(0.2, (20.0 - vix_value) / 25.0))
-                print(f"Using VIX {vix_value:.2f} as secondary factor: {vix_factor:.3f}")
-                
-                # 3. Treasury yield contribution: Lower yields generally better
-                # Scale so 3%=0.2, 4%=0, 5%=-0.2
-                treasury_factor = max(-0.2, min(0.2, (4.0 - treasury_yield) / 5.0))
-                print(f"Using Treasury {treasury_yield:.2f}% as tertiary factor: {treasury_factor:.3f}")
-                
-                # 4. Compute combined base factor with weights
-                # NASDAQ has highest weight, followed by VIX, then Treasury
-                base_factor = (nasdaq_factor * 0.6) + (vix_factor * 0.3) + (treasury_factor * 0.1)
-                print(f"Combined factor for {closest_date}: {base_factor:.3f}")
-                
-                # Create personalized factors for each sector with small variations
-                factors = {}
-                for sector in SECTORS:
-                    # Create variation based on sector name hash
-                    sector_hash = hash(sector) % 100
-                    variation = (sector_hash - 50) / 500.0  # Small variation between -0.1 and 0.1
-                    
-                    # Personalize based on sector type (more positive for tech/growth, less for legacy)
-                    sector_boost = 0.0
-                    if any(keyword in sector for keyword in ['SaaS', 'Cloud', 'AI', 'Analytics']):  
-                        sector_boost = 0.05  # Slight boost for growth tech
-                    elif any(keyword in sector for keyword in ['Legacy', 'Hardware']):  
-                        sector_boost = -0.05  # Slight penalty for legacy tech
-                        
-                    # Combine all factors with appropriate limits
-                    factor = max(-0.9, min(0.9, base_factor + variation + sector_boost))
-                    factors[sector] = factor
-                
-                return factors
-    
+            # NASDAQ gap: highest weight, scaled to -0.7..0.7
+            nasdaq_factor = np.zeros(len(index))
+            if 'NASDAQ Gap %' in table.columns:
+                nasdaq_factor = _clamp(table.values(index, 'NASDAQ Gap %') / 10.0, -0.7, 0.7)
+            # VIX: higher (fear) is negative, 15=0.2, 20=0, 25=-0.2, 30+=-0.4
+            vix_factor = _clamp((20.0 - column('VIX Raw Value', 25.0)) / 25.0, -0.4, 0.2)
+            # Treasury yield: lower is better, 3%=0.2, 4%=0, 5%=-0.2
+            treasury_factor = _clamp((4.0 - column('10-Year Treasury Yield', 4.0)) / 5.0, -0.2, 0.2)
+            
+            market_factor = (nasdaq_factor * 0.6) + (vix_factor * 0.3) + (treasury_factor * 0.1)
+            market = _clamp(market_factor[:, None] + variation + boost, -0.9, 0.9)
+            factors = np.where(found[:, None], market, factors)
+            print(f"Using market-based EMA factors for {int(found.sum())} of {len(index)} dates")
     except Exception as e:
         print(f"Error calculating market-based EMA factors: {e}")
-        import traceback
-        traceback.print_exc()
     
-    # Priority 2: If market data isn't available, create factors based on date
-    # This ensures different dates still have different values
-    try:
-        # Create variation based on the day of the month
-        day_of_month = date.day
-        month_value = date.month
-        
-        # Use sine wave pattern for smooth variation through the month
-        base_factor = math.sin((day_of_month / 31.0) * math.pi * 2) * 0.3  # Scale to -0.3 to 0.3 range
-        print(f"Using date-based variation for {date.strftime('%Y-%m-%d')}: base factor = {base_factor:.3f}")
-        
-        # Add month variation to avoid repetition month-to-month
-        month_variation = (month_value / 12.0) * 0.2 - 0.1  # -0.1 to +0.1 range based on month
-        base_factor += month_variation
-        
-        # Create factors for all sectors with variations
-        factors = {}
-        for sector in SECTORS:
-            # Add slight variations based on sector name
-            sector_hash = hash(sector) % 100
-            variation = (sector_hash - 50) / 500.0  # Small variation between -0.1 and 0.1
-            factors[sector] = max(-0.7, min(0.7, base_factor + variation))
-        
-        return factors
-        
-    except Exception as e:
-        print(f"Error creating date-based EMA factors: {e}")
+    return pd.DataFrame(factors, index=index, columns=list(SECTORS))
+
+def get_historical_ema_factors(date):
+    """
+    Get historical sector EMA factors for a specific date, prioritizing market data
+    to ensure daily variance.
     
-    # Ultimate fallback - use a small positive bias if all else fails
-    generic_factor = 0.1  # Small positive bias
-    print(f"Using generic EMA factor {generic_factor} for {date.strftime('%Y-%m-%d')}")
-    return {sector: generic_factor for sector in SECTORS}
+    Thin wrapper over get_historical_ema_factor_frame; prefer that when getting
+    factors for more than one date.
+    
+    Args:
+        date (datetime): The date to get factors for
+        
+    Returns:
+        dict: Dictionary with sector factors {sector: factor}
+              where factor is a value between -1 and 1
+    """
+    return get_historical_ema_factor_frame([date]).iloc[0].to_dict()
 
 def apply_ema_factors_to_sector_scores(sector_scores, ema_factors=None):
     """
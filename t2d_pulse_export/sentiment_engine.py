@@ -4,7 +4,11 @@
 # -----------------------------------------------------------
 
 from __future__ import annotations
-from typing import Dict, List, TypedDict
+from typing import Dict, List, Mapping, Optional, TypedDict
+
+import numpy as np
+
+import asof_index
 
 # ---------- 1) Sector universe ----------
 SECTORS = [
@@ -304,7 +308,140 @@ def score_sectors(macros: MacroDict, previous_scores=None, sector_data=None) ->
         for sec in SECTORS
     ]
 
-# ---------- 7) Historical scoring ----------
+# ---------- 7) Matrix scoring ----------
+# NumPy version of score_sectors for bulk work (historical rebuilds, weight
+# sweeps). Indicators are rows, sectors are columns, dates are the leading axis.
+INDICATORS: List[str] = list(IMPACT.keys())
+IMPACT_MATRIX = np.array([[IMPACT[ind][sec] for sec in SECTORS] for ind in INDICATORS],
+                         dtype=float)
+
+def weight_matrix(importance: Optional[Mapping[str, float]] = None) -> np.ndarray:
+    """Return the IMPACT×IMPORTANCE matrix, shape (indicators, sectors).
+
+    With no argument the precomputed module-level WEIGHT_MATRIX is returned.
+    Passing an importance mapping builds a fresh matrix for what-if sweeps;
+    indicators missing from it keep their default importance.
+    """
+    if importance is None:
+        return WEIGHT_MATRIX
+    imp = np.array([importance.get(ind, IMPORTANCE.get(ind, 1)) for ind in INDICATORS],
+                   dtype=float)
+    return IMPACT_MATRIX * imp[:, None]
+
+WEIGHT_MATRIX = IMPACT_MATRIX * np.array([IMPORTANCE.get(ind, 1) for ind in INDICATORS],
+                                         dtype=float)[:, None]
+
+def raw_signal_array(name: str, values) -> np.ndarray:
+    """Vectorised raw_signal: apply the BANDS transform for `name` element-wise.
+
+    NaN inputs stay NaN so callers can treat them as missing observations.
+    """
+    v = np.asarray(values, dtype=float)
+    dirn, fav_hi, unfav_lo = BANDS[name]
+
+    if dirn == "proportional":
+        if name == "NASDAQ_20d_gap_%":
+            return np.select(
+                [v >= fav_hi, v <= unfav_lo],
+                [np.minimum(1.0, 0.75 + (v - fav_hi) / (fav_hi * 4)),
+                 np.maximum(-1.0, -0.75 - (unfav_lo - v) / (abs(unfav_lo) * 4))],
+                default=((v - unfav_lo) / (fav_hi - unfav_lo) * 2) - 1)
+        if name == "10Y_Treasury_Yield_%":
+            return np.select(
+                [v <= fav_hi, v >= unfav_lo],
+                [np.minimum(1.0, 0.75 + (fav_hi - v) / (fav_hi / 4)),
+                 np.maximum(-1.0, -0.75 - (v - unfav_lo) / (unfav_lo / 4))],
+                default=((unfav_lo - v) / (unfav_lo - fav_hi) * 2) - 1)
+        if name == "Sector_EMA_Factor":
+            return np.where(np.abs(v) < 0.1, v * 5, v)
+        return np.select([v >= fav_hi, v <= unfav_lo], [1.0, -1.0],
+                         default=((v - unfav_lo) / (fav_hi - unfav_lo) * 2) - 1)
+
+    if dirn == "lower":
+        signal = np.select([v <= fav_hi, v >= unfav_lo], [1.0, -1.0], default=0.0)
+    else:  # "higher"
+        signal = np.select([v >= fav_hi, v <= unfav_lo], [1.0, -1.0], default=0.0)
+    return np.where(np.isnan(v), np.nan, signal)
+
+def score_sectors_matrix(macros: Mapping[str, object],
+                         importance: Optional[Mapping[str, float]] = None) -> np.ndarray:
+    """
+    Score every sector for every date in one pass.
+
+    Args:
+        macros: Mapping of indicator name to a scalar, a 1-D array over dates,
+                or (for per-sector inputs such as Sector_EMA_Factor) a 2-D
+                array of shape (dates, sectors) with columns in SECTORS order.
+        importance: Optional importance overrides, see weight_matrix().
+
+    Returns:
+        np.ndarray: Scores of shape (dates, sectors), rounded like score_sectors.
+                    A scalar-only input yields a single row.
+
+    Indicators that are absent or NaN on a date are left out of that date's
+    weight total, matching score_sectors when an indicator is not supplied.
+    """
+    weights = weight_matrix(importance)
+    n_sec = len(SECTORS)
+
+    arrays = {ind: np.asarray(val, dtype=float) for ind, val in macros.items()
+              if ind in BANDS and ind in IMPACT}
+    n_dates = max((a.shape[0] for a in arrays.values() if a.ndim > 0), default=1)
+
+    # signals[d, i, s]: per-date, per-indicator, per-sector signal (NaN = missing)
+    signals = np.full((n_dates, len(INDICATORS), n_sec), np.nan)
+    for i, ind in enumerate(INDICATORS):
+        if ind not in arrays:
+            continue
+        sig = raw_signal_array(ind, arrays[ind])
+        if sig.ndim == 0:
+            signals[:, i, :] = sig
+        elif sig.ndim == 1:
+            signals[:, i, :] = sig[:, None]
+        else:
+            signals[:, i, :] = sig
+
+    present = ~np.isnan(signals)
+    sector_sum = np.einsum('dis,is->ds', np.where(present, signals, 0.0), weights)
+    sector_weight = np.einsum('dis,is->ds', present, np.abs(weights))
+    return np.round(sector_sum / np.maximum(sector_weight, 1.0), 2)
+
+# ---------- 8) Historical scoring ----------
+# Map indicators to CSV files
+HISTORICAL_FILES = {
+    "10Y_Treasury_Yield_%": "data/treasury_yield_data.csv",
+    "VIX": "data/vix_data.csv",
+    "NASDAQ_20d_gap_%": "data/nasdaq_data.csv",
+    "Fed_Funds_Rate_%": "data/interest_rate_data.csv",
+    "CPI_YoY_%": "data/inflation_data.csv",
+    "PCEPI_YoY_%": "data/pcepi_data.csv",
+    "Real_GDP_Growth_%_SAAR": "data/gdp_data.csv",
+    "Real_PCE_YoY_%": "data/pce_data.csv",
+    "Unemployment_%": "data/unemployment_data.csv",
+    "Software_Dev_Job_Postings_YoY_%": "data/job_postings_data.csv",
+    "PPI_Data_Processing_YoY_%": "data/data_processing_ppi_data.csv",
+    "PPI_Software_Publishers_YoY_%": "data/software_ppi_data.csv",
+    "Consumer_Sentiment": "data/consumer_sentiment_data.csv"
+    # Sector_EMA_Factor is handled separately
+}
+
+# Map indicators to value column names (default is 'value')
+HISTORICAL_VALUE_COLUMNS = {
+    "NASDAQ_20d_gap_%": "gap_pct",
+    "CPI_YoY_%": "inflation",
+    "PCEPI_YoY_%": "yoy_growth",
+    "Software_Dev_Job_Postings_YoY_%": "yoy_growth",
+    "PPI_Data_Processing_YoY_%": "yoy_pct_change",
+    "PPI_Software_Publishers_YoY_%": "yoy_pct_change"
+}
+
+# Use Q1 2025 GDP (2.8%) and PCE (3.0%) for all historical calculations
+# so that historical charts stay consistent with each other
+HISTORICAL_FIXED_VALUES = {
+    "Real_GDP_Growth_%_SAAR": 2.8,
+    "Real_PCE_YoY_%": 3.0,
+}
+
 def get_historical_indicator_values(date):
     """
     Get historical indicator values for a specific date.
@@ -316,73 +453,35 @@ def get_historical_indicator_values(date):
     Returns:
         dict: Dictionary with indicator values
     """
-    import pandas as pd
     import os
-    from datetime import datetime, timedelta
     # No random imports - using only authentic market data
     
-    # Map indicators to CSV files
-    file_mapping = {
-        "10Y_Treasury_Yield_%": "data/treasury_yield_data.csv",
-        "VIX": "data/vix_data.csv",
-        "NASDAQ_20d_gap_%": "data/nasdaq_data.csv",
-        "Fed_Funds_Rate_%": "data/interest_rate_data.csv",
-        "CPI_YoY_%": "data/inflation_data.csv",
-        "PCEPI_YoY_%": "data/pcepi_data.csv",
-        "Real_GDP_Growth_%_SAAR": "data/gdp_data.csv",
-        "Real_PCE_YoY_%": "data/pce_data.csv",
-        "Unemployment_%": "data/unemployment_data.csv",
-        "Software_Dev_Job_Postings_YoY_%": "data/job_postings_data.csv",
-        "PPI_Data_Processing_YoY_%": "data/data_processing_ppi_data.csv",
-        "PPI_Software_Publishers_YoY_%": "data/software_ppi_data.csv",
-        "Consumer_Sentiment": "data/consumer_sentiment_data.csv"
-        # Sector_EMA_Factor is handled separately below
-    }
-    
-    # Map indicators to value column names
-    value_column_mapping = {
-        "NASDAQ_20d_gap_%": "gap_pct",
-        "CPI_YoY_%": "inflation",
-        "PCEPI_YoY_%": "yoy_growth",
-        "Software_Dev_Job_Postings_YoY_%": "yoy_growth",
-        "PPI_Data_Processing_YoY_%": "yoy_pct_change",
-        "PPI_Software_Publishers_YoY_%": "yoy_pct_change"
-    }
+    file_mapping = HISTORICAL_FILES
+    value_column_mapping = HISTORICAL_VALUE_COLUMNS
     
     # Get values for each indicator - using only authentic market data
     values = {}
     
-    # Process standard indicators from CSV files
+    # Process standard indicators from CSV files (indexed once, reloaded on change)
     for indicator, file_path in file_mapping.items():
         try:
             if os.path.exists(file_path):
-                # Load CSV file
-                df = pd.read_csv(file_path)
-                
-                # Convert date column to datetime
-                df['date'] = pd.to_datetime(df['date'])
+                table = asof_index.from_csv(indicator, file_path)
+                if table is None:
+                    continue
                 
-                # Get data on or before the target date
-                df = df[df['date'] <= date].sort_values(by='date', ascending=False)
+                # Get the latest row on or before the target date
+                row = table.row(date)
                 
-                if not df.empty:
+                if row is not None:
                     # Get value from appropriate column
                     value_col = value_column_mapping.get(indicator, 'value')
-                    if value_col in df.columns:
+                    if value_col in table.columns:
                         # Get the base value
-                        base_value = float(df.iloc[0][value_col])
+                        base_value = float(row[value_col])
                         
                         # Handle specific indicators that need special processing
-                        if indicator == "Real_GDP_Growth_%_SAAR":
-                            # Use Q1 2025 GDP data (2.8%) for all historical calculations
-                            # This provides consistency across all historical calculations
-                            base_value = 2.8  # Using the Q1 2025 GDP growth rate
-                        
-                        # For PCE, use Q1 2025 data consistently
-                        if indicator == "Real_PCE_YoY_%":
-                            # Use Q1 2025 PCE data (3.0%) for all historical calculations
-                            # This ensures consistency with the GDP data approach
-                            base_value = 3.0  # Using the Q1 2025 PCE growth rate
+                        base_value = HISTORICAL_FIXED_VALUES.get(indicator, base_value)
                         
                         # Store the value without random variation to preserve authentic data
                         values[indicator] = base_value
@@ -392,29 +491,133 @@ def get_historical_indicator_values(date):
             print(f"Error getting historical data for {indicator}: {e}")
     
     # Add EMA factor for historical calculations
+    ema_factor = get_historical_ema_factor(date)
+    if ema_factor is not None:
+        values["Sector_EMA_Factor"] = ema_factor
+    
+    return values
+
+def load_ema_factor_history(dates):
+    """
+    Load the representative Sector_EMA_Factor used for historical scoring, for
+    every date in one call.
+    
+    Args:
+        dates (iterable): The dates to get the factor for
+        
+    Returns:
+        pd.Series: EMA factor per date (NaN where there is none), or a small
+        positive bias for every date if the historical factors can't be loaded
+    """
+    import pandas as pd
     try:
         import sector_ema_integration
-        # Get historical EMA factors for this date
-        ema_factors = sector_ema_integration.get_historical_ema_factors(date)
-        if ema_factors:
-            # Just use one representative EMA factor for simplicity
-            # This ensures historical trend charts reflect EMA influences consistently
-            for sector, factor in ema_factors.items():
-                if sector in SECTORS:
-                    values["Sector_EMA_Factor"] = factor
-                    break
+        # Historical EMA factors for every date, as of the market data on each
+        ema_factors = sector_ema_integration.get_historical_ema_factor_frame(dates)
+        # Just use one representative EMA factor for simplicity
+        # This ensures historical trend charts reflect EMA influences consistently
+        for sector in ema_factors.columns:
+            if sector in SECTORS:
+                return ema_factors[sector]
+        return pd.Series(np.nan, index=ema_factors.index)
     except Exception as e:
         print(f"Error getting historical EMA factors: {str(e)}")
         # Use a small positive bias value if historical EMA factors aren't available
-        values["Sector_EMA_Factor"] = 0.05  # Small positive bias instead of neutral 0.0
         print(f"Using small positive bias (0.05) for Sector_EMA_Factor instead of neutral value")
+        return pd.Series(0.05, index=pd.DatetimeIndex([_naive_day(d) for d in dates]))
+
+def get_historical_ema_factor(date):
+    """
+    Get the representative Sector_EMA_Factor used for historical scoring.
     
-    return values
+    Args:
+        date (datetime): The date to get the factor for
+        
+    Returns:
+        float or None: EMA factor (see load_ema_factor_history), None if there is none
+    """
+    factor = load_ema_factor_history([date]).iloc[0]
+    return None if np.isnan(factor) else float(factor)
+
+def load_indicator_history():
+    """
+    Load every historical indicator series once.
+    
+    Returns:
+        dict: {indicator: pd.Series} indexed by date (sorted, one row per date)
+    """
+    import os
+    
+    series = {}
+    for indicator, file_path in HISTORICAL_FILES.items():
+        try:
+            if not os.path.exists(file_path):
+                continue
+            table = asof_index.from_csv(indicator, file_path)
+            if table is None:
+                continue
+            value_col = HISTORICAL_VALUE_COLUMNS.get(indicator, 'value')
+            if value_col not in table.columns:
+                print(f"Warning: Column '{value_col}' not found in {file_path}")
+                continue
+            series[indicator] = table.series(value_col)
+        except Exception as e:
+            print(f"Error getting historical data for {indicator}: {e}")
+    return series
+
+def score_history(start, end, freq="B", indicator_history=None):
+    """
+    Score every sector for every date between start and end in one pass.
+    
+    Each indicator series is loaded once and as-of joined onto the calendar
+    (latest observation on or before each date), then the whole date×sector
+    grid is scored with score_sectors_matrix.
+    
+    Args:
+        start (datetime): First calendar date (inclusive)
+        end (datetime): Last calendar date (inclusive)
+        freq (str): pandas calendar frequency, "B" for trading days
+        indicator_history (dict, optional): Preloaded load_indicator_history()
+        
+    Returns:
+        pd.DataFrame: Raw scores in range [-1, 1], indexed by date, one column per sector
+    """
+    import pandas as pd
+    
+    calendar = pd.date_range(_naive_day(start), _naive_day(end), freq=freq, name='date')
+    if len(calendar) == 0:
+        return pd.DataFrame(columns=SECTORS, index=calendar, dtype=float)
+    
+    if indicator_history is None:
+        indicator_history = load_indicator_history()
+    
+    macros = {}
+    for indicator, series in indicator_history.items():
+        # As-of join: the latest observation on or before each calendar date
+        aligned = series.reindex(calendar, method='ffill')
+        if indicator in HISTORICAL_FIXED_VALUES:
+            aligned = aligned.where(aligned.isna(), HISTORICAL_FIXED_VALUES[indicator])
+        macros[indicator] = aligned.values
+    
+    macros["Sector_EMA_Factor"] = load_ema_factor_history(calendar).to_numpy(dtype=float)
+    
+    return pd.DataFrame(score_sectors_matrix(macros), index=calendar, columns=SECTORS)
+
+def _naive_day(date):
+    """Normalise a date/datetime (optionally tz-aware) to a naive midnight Timestamp"""
+    import pandas as pd
+    ts = pd.Timestamp(date)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize()
 
 def score_sector_on_date(sector_name, date):
     """
     Score a specific sector based on historical data for a given date
     
+    Thin wrapper over score_history; prefer score_history when scoring more
+    than one date or sector.
+    
     Args:
         sector_name (str): The sector name
         date (datetime): The date to score for
@@ -423,36 +626,18 @@ def score_sector_on_date(sector_name, date):
         float: The raw sector score in range [-1, 1]
     """
     try:
-        # Get historical macro indicator values for this date
-        macro_values = get_historical_indicator_values(date)
-        
-        if not macro_values:
-            print(f"No historical indicator data available for {date.strftime('%Y-%m-%d')}")
+        if sector_name not in SECTORS:
+            print(f"Warning: Sector '{sector_name}' not found in scoring results")
             return 0.0
         
-        # Only print detailed debug info for one sector (AdTech) to reduce log spam
-        if sector_name == "AdTech":
-            print(f"\nScoring {sector_name} with {len(macro_values)} indicators for {date.strftime('%Y-%m-%d')}:")
-            for indicator, value in macro_values.items():
-                print(f"  {indicator}: {value}")
-        
-        # Score all sectors using the historical data
-        sector_scores = score_sectors(macro_values)
-        
-        # Find the score for the requested sector
-        for sector_data in sector_scores:
-            if sector_data['sector'] == sector_name:
-                return sector_data['score']
-        
-        # Default to 0 if sector not found
-        print(f"Warning: Sector '{sector_name}' not found in scoring results")
-        return 0.0
+        scores = score_history(date, date, freq="D")
+        return float(scores.iloc[0][sector_name])
     
     except Exception as e:
         print(f"Error scoring {sector_name} for {date.strftime('%Y-%m-%d')}: {e}")
         return 0.0
 
-# ---------- 8) Example run ----------
+# ---------- 9) Example run ----------
 if __name__ == "__main__":
     latest_macros: MacroDict = {
         "10Y_Treasury_Yield_%": 4.422,
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# test_app_import.py
+# -----------------------------------------------------------
+# Check that importing the dashboard the way gunicorn does (via wsgi.py)
+# stays within a time budget, makes no network calls and leaves the heavy
+# modules unloaded until they are used
+
+import json
+import os
+import subprocess
+import sys
+
+# Import-time budget for one gunicorn worker, in seconds
+IMPORT_BUDGET_SECONDS = 5.0
+
+# Modules that must not be executed at import
+DEFERRED_MODULES = ["yfinance", "document_analysis", "historical_sector_scores", "authentic_sector_history"]
+
+# Runs in a fresh interpreter: block all network access, import wsgi and report
+IMPORT_SCRIPT = """
+import json, socket, sys, time
+
+attempts = []
+def _blocked(*args, **kwargs):
+    attempts.append(repr(args[:2]))
+    raise OSError("network access during import")
+socket.socket.connect = _blocked
+socket.create_connection = _blocked
+socket.getaddrinfo = _blocked
+
+start = time.perf_counter()
+import wsgi
+elapsed = time.perf_counter() - start
+
+from lazy_import import is_loaded
+print(json.dumps({
+    "elapsed": elapsed,
+    "network_attempts": attempts,
+    "loaded": [name for name in %r if is_loaded(name)],
+}))
+"""
+
+def import_app():
+    """Import wsgi in a subprocess and return its report"""
+    env = dict(os.environ, T2D_LAZY_IMPORT="1")
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT % (DEFERRED_MODULES,)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing wsgi failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_app_import_budget():
+    """Importing wsgi is fast, offline and leaves heavy modules unloaded"""
+    report = import_app()
+    assert not report["network_attempts"], f"Network calls during import: {report['network_attempts']}"
+    assert not report["loaded"], f"Modules loaded eagerly: {report['loaded']}"
+    assert report["elapsed"] < IMPORT_BUDGET_SECONDS, \
+        f"Import took {report['elapsed']:.2f}s (budget {IMPORT_BUDGET_SECONDS}s)"
+
+def main():
+    """Run the import-time check and print the result"""
+    print("TEST: Importing wsgi with network access blocked...")
+    try:
+        report = import_app()
+    except Exception as e:
+        print(f"TEST: {e}")
+        return False
+
+    print(f"TEST: Import took {report['elapsed']:.2f}s (budget {IMPORT_BUDGET_SECONDS}s)")
+    ok = True
+    if report["network_attempts"]:
+        print(f"TEST: Network calls during import: {report['network_attempts']}")
+        ok = False
+    if report["loaded"]:
+        print(f"TEST: Modules loaded eagerly: {report['loaded']}")
+        ok = False
+    if report["elapsed"] >= IMPORT_BUDGET_SECONDS:
+        ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: App import is lazy, offline and within budget")
+    else:
+        print("❌ TEST: App import check failed")
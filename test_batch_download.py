@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# test_batch_download.py
+# -----------------------------------------------------------
+# Test the adaptive, checkpointed yfinance download in batch_ticker_collector
+# with a stand-in for fetch_batch_data, so no network access is needed
+
+import datetime
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+import batch_ticker_collector as btc
+
+START = datetime.date(2025, 5, 5)
+END = datetime.date(2025, 5, 7)
+
+class StandInYahoo:
+    """Answer fetch_batch_data like yf.download, failing on chosen tickers"""
+
+    def __init__(self, bad=(), missing=(), empty=False, stop_after=None):
+        self.bad = set(bad)          # Tickers that make the whole request raise
+        self.missing = set(missing)  # Tickers left out of an otherwise good response
+        self.empty = empty           # Nothing traded in the range
+        self.stop_after = stop_after # Simulate the process dying after this many calls
+        self.calls = []
+
+    def __call__(self, tickers, start_date, end_date=None):
+        if self.stop_after is not None and len(self.calls) >= self.stop_after:
+            raise KeyboardInterrupt
+        self.calls.append(list(tickers))
+        if self.bad & set(tickers):
+            raise ValueError("Failed to get ticker")
+        if self.empty:
+            return None
+        dates = pd.date_range(START, END, freq="B", inclusive="left")
+        returned = [ticker for ticker in tickers if ticker not in self.missing]
+        return pd.concat({ticker: pd.DataFrame({"Close": 100.0, "Volume": 1000}, index=dates)
+                          for ticker in returned}, axis=1)
+
+def run(fetch, tickers, **kwargs):
+    """download_chunks with the stand-in, no pauses and a scratch checkpoint directory"""
+    original = btc.fetch_batch_data
+    btc.fetch_batch_data = fetch
+    try:
+        return btc.download_chunks(tickers, START, END, **kwargs)
+    finally:
+        btc.fetch_batch_data = original
+
+def test_adaptive_split():
+    """A failing chunk is split in half until the bad ticker is isolated, then given up on"""
+    tickers = [f"T{i:02d}" for i in range(20)]
+    fetch = StandInYahoo(bad=["T09"])
+    rows, failed = run(fetch, tickers, batch_size=7, resume=False)
+
+    assert failed == ["T09"]
+    assert sorted(rows["ticker"].unique()) == sorted(set(tickers) - {"T09"})
+    # Each retry of a chunk holding the bad ticker is smaller than the last,
+    # down to single-ticker attempts
+    sizes = [len(chunk) for chunk in fetch.calls if "T09" in chunk]
+    single = sizes.index(1)
+    assert all(a > b for a, b in zip(sizes[:single + 1], sizes[1:single + 1])), sizes
+    assert sizes[single:] == [1] * btc.MAX_TICKER_ATTEMPTS, sizes
+    assert len(fetch.calls) <= 12, f"{len(fetch.calls)} requests"
+
+def test_resume():
+    """A rerun after an interruption picks up after the last checkpointed chunk"""
+    tickers = [f"T{i:02d}" for i in range(12)]
+    btc.clear_checkpoints()
+    try:
+        run(StandInYahoo(stop_after=2), tickers, batch_size=2)
+    except KeyboardInterrupt:
+        pass
+    else:
+        raise AssertionError("the stand-in did not interrupt the download")
+
+    fetch = StandInYahoo()
+    rows, failed = run(fetch, tickers, batch_size=2)
+    requested = [ticker for chunk in fetch.calls for ticker in chunk]
+    assert not set(requested) & {"T00", "T01", "T02", "T03", "T04", "T05"}, requested
+    assert sorted(rows["ticker"].unique()) == tickers and failed == []
+
+def test_give_up():
+    """Tickers with no data are not retried; tickers left out of a response are retried alone"""
+    rows, failed = run(StandInYahoo(empty=True), ["AAA", "BBB"], resume=False)
+    assert rows.empty and sorted(failed) == ["AAA", "BBB"]
+
+    fetch = StandInYahoo(missing=["BBB"])
+    rows, failed = run(fetch, ["AAA", "BBB", "CCC"], resume=False)
+    assert failed == ["BBB"]
+    assert fetch.calls[1:] == [["BBB"]] * (btc.MAX_TICKER_ATTEMPTS - 1)
+    assert sorted(rows["ticker"].unique()) == ["AAA", "CCC"]
+
+_saved = {}
+
+def setup_module(module=None):
+    """Scratch checkpoint directory and no pauses, for every test (pytest or main)"""
+    _saved.update(CHECKPOINT_DIR=btc.CHECKPOINT_DIR, CHUNK_PAUSE_SECONDS=btc.CHUNK_PAUSE_SECONDS,
+                  MAX_BACKOFF_SECONDS=btc.MAX_BACKOFF_SECONDS, scratch=tempfile.mkdtemp())
+    btc.CHECKPOINT_DIR = Path(_saved["scratch"]) / "download_checkpoints"
+    btc.CHUNK_PAUSE_SECONDS = btc.MAX_BACKOFF_SECONDS = 0
+
+def teardown_module(module=None):
+    """Restore the module settings and remove the scratch directory"""
+    shutil.rmtree(_saved.pop("scratch"), ignore_errors=True)
+    for name, value in _saved.items():
+        setattr(btc, name, value)
+    _saved.clear()
+
+def main():
+    """Run the chunked download tests"""
+    setup_module()
+    ok = True
+    try:
+        for test in (test_adaptive_split, test_resume, test_give_up):
+            try:
+                test()
+                print(f"TEST: {test.__name__} passed")
+            except Exception as e:
+                print(f"TEST: {test.__name__} failed: {e!r}")
+                ok = False
+    finally:
+        teardown_module()
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: Chunked download splits failures, resumes and gives up on bad tickers")
+    else:
+        print("❌ TEST: Chunked download tests failed")
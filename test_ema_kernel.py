@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# test_ema_kernel.py
+# -----------------------------------------------------------
+# Test that the shared EMA kernel matches pandas' ewm(adjust=False).mean(),
+# including series with gaps, and that EmaTracker updates match a full pass
+
+import numpy as np
+import pandas as pd
+
+from ema_kernel import EmaTracker, ema_filter
+
+SERIES = [
+    [1.0, np.nan, 3.0],
+    [1.0, np.nan, np.nan, 3.0, np.nan, 5.0],
+    [np.nan, 2.0, np.nan, 4.0, 5.0],
+    [100.0, 101.5, 99.0, 102.0, 104.5, 103.0],
+]
+
+def test_matches_pandas():
+    """Every span, with and without ignore_na, gives pandas' values"""
+    for span in (2, 3, 5, 20):
+        for ignore_na in (False, True):
+            for values in SERIES:
+                expected = pd.Series(values).ewm(span=span, adjust=False, ignore_na=ignore_na).mean()
+                got = ema_filter(values, span, ignore_na=ignore_na)
+                assert np.allclose(got, expected, equal_nan=True), (span, ignore_na, values, got.tolist())
+
+def test_span_3_gap():
+    """Span 3 weights the value after a gap like pandas (2.5, not 2.333)"""
+    assert np.isclose(ema_filter([1.0, np.nan, 3.0], 3)[-1], 2.5)
+
+def test_tracker_updates():
+    """Applying rows in two batches gives the same EMAs as one pass"""
+    frame = pd.DataFrame({"A": [1.0, 2.0, np.nan, 4.0, 5.0], "B": [np.nan, 3.0, 3.5, np.nan, 2.0]})
+    tracker = EmaTracker(None, 3)
+    tracker.update(frame.iloc[:2])
+    tracker.update(frame.iloc[2:])
+    for column in frame:
+        expected = frame[column].ewm(span=3, adjust=False, ignore_na=True).mean().iloc[-1]
+        assert np.isclose(tracker.latest(column)["ema"], expected), column
+
+def main():
+    """Run the EMA kernel tests"""
+    ok = True
+    for test in (test_matches_pandas, test_span_3_gap, test_tracker_updates):
+        try:
+            test()
+            print(f"TEST: {test.__name__} passed")
+        except Exception as e:
+            print(f"TEST: {test.__name__} failed: {e!r}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: EMA kernel matches pandas ewm(adjust=False)")
+    else:
+        print("❌ TEST: EMA kernel tests failed")
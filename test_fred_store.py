@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# test_fred_store.py
+# -----------------------------------------------------------
+# Test the incremental FRED observation store: appends, revision tracking and
+# the observation_start of incremental requests, in a scratch directory
+
+import shutil
+import tempfile
+
+import pandas as pd
+
+import fred_store
+
+def observations(values, vintage):
+    """FRED-style observations {date: value} first published in `vintage`"""
+    return pd.DataFrame({
+        "realtime_start": vintage,
+        "realtime_end": vintage,
+        "date": pd.to_datetime(list(values)),
+        "value": list(values.values()),
+    })
+
+def test_append_and_incremental_start():
+    """New dates are appended and incremental requests re-cover the last stored observations"""
+    store_dir = tempfile.mkdtemp()
+    try:
+        assert fred_store.incremental_start("UNRATE", store_dir=store_dir) is None
+        counts = fred_store.merge_observations("UNRATE", observations(
+            {"2025-01-01": 4.0, "2025-02-01": 4.1, "2025-03-01": 4.2}, "2025-04-04"), store_dir=store_dir)
+        assert counts == {"added": 3, "revised": 0}
+        assert fred_store.incremental_start("UNRATE", lookback=2, store_dir=store_dir) == "2025-02-01"
+        assert fred_store.incremental_start("UNRATE", lookback=0, store_dir=store_dir) == "2025-03-02"
+
+        # The incremental response repeats unchanged observations: only April is added
+        counts = fred_store.merge_observations("UNRATE", observations(
+            {"2025-02-01": 4.1, "2025-03-01": 4.2, "2025-04-01": 4.2}, "2025-05-02"), store_dir=store_dir)
+        assert counts == {"added": 1, "revised": 0}
+        series = fred_store.read_series("UNRATE", store_dir=store_dir)
+        assert list(series["value"]) == [4.0, 4.1, 4.2, 4.2]
+        # Unchanged values keep the vintage they were first published in
+        assert series["realtime_start"].iloc[2] == pd.Timestamp("2025-04-04")
+        assert series["realtime_start"].iloc[3] == pd.Timestamp("2025-05-02")
+        assert fred_store.read_revisions("UNRATE", store_dir=store_dir).empty
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+def test_revisions():
+    """Revised values replace the stored ones and are logged with both vintages"""
+    store_dir = tempfile.mkdtemp()
+    try:
+        fred_store.merge_observations("GDPC1", observations(
+            {"2024-10-01": 23500.0, "2025-01-01": 23600.0}, "2025-04-30"), store_dir=store_dir)
+        counts = fred_store.merge_observations("GDPC1", observations(
+            {"2024-10-01": 23500.0, "2025-01-01": 23580.5}, "2025-05-29"), store_dir=store_dir)
+        assert counts == {"added": 0, "revised": 1}
+
+        series = fred_store.read_series("GDPC1", store_dir=store_dir)
+        assert series["value"].iloc[-1] == 23580.5
+        assert series["realtime_start"].iloc[-1] == pd.Timestamp("2025-05-29")
+
+        revisions = fred_store.read_revisions("GDPC1", store_dir=store_dir)
+        assert len(revisions) == 1
+        revision = revisions.iloc[0]
+        assert revision["date"] == pd.Timestamp("2025-01-01")
+        assert (revision["old_value"], revision["new_value"]) == (23600.0, 23580.5)
+        assert revision["old_realtime_start"] == pd.Timestamp("2025-04-30")
+        assert revision["new_realtime_start"] == pd.Timestamp("2025-05-29")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+def test_fred_frame():
+    """Stored observations are returned newest first, like a full download"""
+    store_dir = tempfile.mkdtemp()
+    try:
+        fred_store.merge_observations("CPIAUCSL", observations(
+            {"2025-01-01": 317.6, "2025-02-01": 318.5, "2025-03-01": 319.1}, "2025-04-10"), store_dir=store_dir)
+        frame = fred_store.to_fred_frame(fred_store.read_series("CPIAUCSL", start="2025-02-01", store_dir=store_dir))
+        assert list(frame.columns) == ["realtime_start", "realtime_end", "date", "value"]
+        assert list(frame["value"]) == [319.1, 318.5]
+        assert frame["realtime_start"].iloc[0] == "2025-04-10"
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+def main():
+    """Run the FRED store tests"""
+    ok = True
+    for test in (test_append_and_incremental_start, test_revisions, test_fred_frame):
+        try:
+            test()
+            print(f"TEST: {test.__name__} passed")
+        except Exception as e:
+            print(f"TEST: {test.__name__} failed: {e!r}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: FRED store appends new observations and tracks revisions")
+    else:
+        print("❌ TEST: FRED store tests failed")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# test_http_client.py
+# -----------------------------------------------------------
+# Test the shared HTTP client (rate limits, retries, conditional requests,
+# concurrency and fixture recording) against the local replay server, so no
+# API keys or network access are needed
+
+import os
+import shutil
+import tempfile
+import time
+
+import config
+import http_client
+from http_replay import ReplayServer
+
+OBSERVATIONS = {
+    "observations": [
+        {"date": "2025-04-01", "value": "4.2"},
+        {"date": "2025-03-01", "value": "4.1"},
+    ]
+}
+
+FIXTURES = [
+    {"provider": "fred", "method": "GET", "path": "/fred/series/observations",
+     "query": {"series_id": "UNRATE"}, "body": OBSERVATIONS},
+    {"provider": "fred", "method": "GET", "path": "/fred/series/observations",
+     "query": {"series_id": "FEDFUNDS"}, "body": {"observations": []}, "fail_first": [503, 429]},
+    {"provider": "bls", "method": "POST", "path": "/publicAPI/v2/timeseries/data/",
+     "json": {"seriesid": ["CUUR0000SA0"]}, "body": {"status": "REQUEST_SUCCEEDED"}},
+    {"provider": "finnhub", "method": "GET", "path": "/api/v1/stock/profile2",
+     "body": {"marketCapitalization": 1000.0}, "delay": 0.3},
+]
+
+def start(**settings):
+    """Start a replay server and route the providers to it with a scratch cache"""
+    cache_dir = tempfile.mkdtemp()
+    server = ReplayServer(FIXTURES).start()
+    server.install("fred", "bls", "finnhub", rate=1000, burst=100, cache_dir=cache_dir, **settings)
+    return server, cache_dir
+
+def stop(server, cache_dir):
+    server.stop()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+def test_conditional_get():
+    """A repeated GET revalidates with If-None-Match and is answered from the cache"""
+    server, cache_dir = start()
+    try:
+        fred = http_client.get_client("fred")
+        params = {"series_id": "UNRATE", "api_key": "secret"}
+        first = fred.get_sync("/fred/series/observations", params=params)
+        assert first.status_code == 200 and not first.from_cache
+        second = fred.get_sync("/fred/series/observations", params=dict(params, api_key="rotated"))
+        assert second.status_code == 200 and second.from_cache
+        assert second.json() == OBSERVATIONS
+        assert len(server.requests_seen) == 2
+        # Credentials never reach the cache
+        for name in os.listdir(os.path.join(cache_dir, "fred")):
+            with open(os.path.join(cache_dir, "fred", name)) as f:
+                assert "secret" not in f.read()
+    finally:
+        stop(server, cache_dir)
+
+def test_retries():
+    """503 and 429 responses are retried until the request succeeds"""
+    base_delay = config.HTTP_RETRY_BASE_DELAY
+    config.HTTP_RETRY_BASE_DELAY = 0.01
+    server, cache_dir = start()
+    try:
+        response = http_client.get_client("fred").get_sync(
+            "/fred/series/observations", params={"series_id": "FEDFUNDS"})
+        assert response.status_code == 200
+        assert len(server.requests_seen) == 3
+    finally:
+        config.HTTP_RETRY_BASE_DELAY = base_delay
+        stop(server, cache_dir)
+
+def test_post_json():
+    """POST bodies are sent as JSON and matched against the fixture"""
+    server, cache_dir = start()
+    try:
+        response = http_client.get_client("bls").post_sync(
+            "/publicAPI/v2/timeseries/data/",
+            json={"seriesid": ["CUUR0000SA0"], "registrationkey": "secret"})
+        assert response.json()["status"] == "REQUEST_SUCCEEDED"
+    finally:
+        stop(server, cache_dir)
+
+def test_concurrency_and_rate_limit():
+    """Requests run concurrently up to max_connections, paced by the token bucket"""
+    server, cache_dir = start(max_connections=8)
+    try:
+        calls = [("/api/v1/stock/profile2", {"symbol": f"T{i}"}) for i in range(8)]
+        started = time.monotonic()
+        responses = http_client.fetch_all("finnhub", calls)
+        elapsed = time.monotonic() - started
+        assert all(response.json()["marketCapitalization"] == 1000.0 for response in responses)
+        assert elapsed < 8 * 0.3 / 2, f"8 requests of 0.3s took {elapsed:.2f}s"
+    finally:
+        stop(server, cache_dir)
+
+    # 2 requests/second with a burst of 1: the third request waits ~1s
+    server, cache_dir = start()
+    server.install("finnhub", rate=2, burst=1, max_connections=8, cache_dir=cache_dir)
+    try:
+        started = time.monotonic()
+        http_client.fetch_all("finnhub", [("/api/v1/stock/profile2", {"symbol": "X"})] * 3)
+        assert time.monotonic() - started >= 0.9
+    finally:
+        stop(server, cache_dir)
+
+def test_record_and_replay():
+    """Responses recorded with HTTP_RECORD_DIR replay from a fixture directory"""
+    record_dir = tempfile.mkdtemp()
+    server, cache_dir = start()
+    os.environ["HTTP_RECORD_DIR"] = record_dir
+    try:
+        http_client.get_client("fred").get_sync(
+            "/fred/series/observations", params={"series_id": "UNRATE", "api_key": "secret"})
+        http_client.get_client("bls").post_sync(
+            "/publicAPI/v2/timeseries/data/",
+            json={"seriesid": ["CUUR0000SA0"], "registrationkey": "secret"})
+    finally:
+        del os.environ["HTTP_RECORD_DIR"]
+        stop(server, cache_dir)
+
+    try:
+        names = os.listdir(record_dir)
+        assert any(name.startswith("bls-") for name in names)
+        for name in names:
+            with open(os.path.join(record_dir, name)) as f:
+                content = f.read()
+            assert "secret" not in content and "registrationkey" not in content, name
+        with ReplayServer(fixture_dir=record_dir) as replay:
+            replay.install("fred", "bls", cache_dir=None)
+            response = http_client.get_client("fred").get_sync(
+                "/fred/series/observations", params={"series_id": "UNRATE", "api_key": "other"})
+            assert response.json() == OBSERVATIONS
+            response = http_client.get_client("bls").post_sync(
+                "/publicAPI/v2/timeseries/data/",
+                json={"seriesid": ["CUUR0000SA0"], "registrationkey": "other"})
+            assert response.json()["status"] == "REQUEST_SUCCEEDED"
+    finally:
+        shutil.rmtree(record_dir, ignore_errors=True)
+
+def main():
+    """Run the HTTP client tests against the replay server"""
+    ok = True
+    for test in (test_conditional_get, test_retries, test_post_json,
+                 test_concurrency_and_rate_limit, test_record_and_replay):
+        try:
+            test()
+            print(f"TEST: {test.__name__} passed")
+        except Exception as e:
+            print(f"TEST: {test.__name__} failed: {e!r}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: Shared HTTP client works against replayed responses")
+    else:
+        print("❌ TEST: Shared HTTP client tests failed")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# test_pipeline.py
+# -----------------------------------------------------------
+# Test the dependency-graph runner: parallel branches, input-hash caching,
+# downstream-only reruns and failure handling, in a scratch cache directory
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from pipeline import Pipeline
+
+class Calls:
+    """Count node executions"""
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def node(self, name, func):
+        def run(**inputs):
+            with self._lock:
+                self.counts[name] = self.counts.get(name, 0) + 1
+            return func(**inputs)
+        return run
+
+def diamond(cache_dir, calls, source_values, delay=0.0):
+    """prices and macro (sources) -> caps -> scores <- macro; caps -> export"""
+    def source(key):
+        def fetch():
+            time.sleep(delay)
+            return source_values[key]
+        return fetch
+
+    pipeline = Pipeline("test", cache_dir=cache_dir, max_workers=4)
+    pipeline.add("prices", calls.node("prices", source("prices")), always=True)
+    pipeline.add("macro", calls.node("macro", source("macro")), always=True)
+    pipeline.add("caps", calls.node("caps", lambda prices: {t: p * 10 for t, p in prices.items()}), deps=["prices"])
+    pipeline.add("export", calls.node("export", lambda caps: sorted(caps)), deps=["caps"])
+    pipeline.add("scores", calls.node("scores", lambda caps, macro: sum(caps.values()) * macro),
+                 deps=["caps", "macro"])
+    return pipeline
+
+def test_parallel_branches():
+    """Independent nodes run at the same time"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        pipeline = diamond(cache_dir, Calls(), {"prices": {"A": 1.0}, "macro": 2.0}, delay=0.3)
+        started = time.monotonic()
+        results = pipeline.run()
+        assert time.monotonic() - started < 0.55, "the two 0.3s sources ran one after the other"
+        assert results["scores"].output == 20.0
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def test_downstream_only_reruns():
+    """Only nodes downstream of a changed output rerun; the rest come from the cache"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        values = {"prices": {"A": 1.0, "B": 2.0}, "macro": 1.0}
+        calls = Calls()
+        diamond(cache_dir, calls, values).run()
+        assert calls.counts == {"prices": 1, "macro": 1, "caps": 1, "export": 1, "scores": 1}
+
+        # Nothing changed: the sources run, everything else is cached (even after a restart)
+        results = diamond(cache_dir, calls, values).run()
+        assert calls.counts == {"prices": 2, "macro": 2, "caps": 1, "export": 1, "scores": 1}
+        assert results["scores"].status == "cached" and results["scores"].output == 30.0
+
+        # Only the macro source changed: scores reruns, the prices branch stays cached
+        values["macro"] = 2.0
+        results = diamond(cache_dir, calls, values).run()
+        assert calls.counts == {"prices": 3, "macro": 3, "caps": 1, "export": 1, "scores": 2}
+        assert results["scores"].output == 60.0
+
+        # A forced node reruns; unchanged output keeps its dependants cached
+        results = diamond(cache_dir, calls, values).run(force=["caps"])
+        assert calls.counts["caps"] == 2 and calls.counts["export"] == 1 and calls.counts["scores"] == 2
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def test_files_and_targets():
+    """Input file contents are part of the hash; targets run only what they need"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(cache_dir, "weights.csv")
+        with open(path, "w") as f:
+            f.write("a,1\n")
+        calls = Calls()
+
+        def build():
+            pipeline = diamond(cache_dir, calls, {"prices": {"A": 1.0}, "macro": 1.0})
+            pipeline.add("weights", calls.node("weights", lambda: open(path).read()), files=[path])
+            return pipeline
+
+        results = build().run(["weights"])
+        assert set(results) == {"weights"} and calls.counts == {"weights": 1}
+        build().run(["weights"])
+        assert calls.counts["weights"] == 1
+        with open(path, "w") as f:
+            f.write("a,2\n")
+        assert build().run(["weights"])["weights"].output == "a,2\n"
+        assert calls.counts["weights"] == 2
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def test_failures():
+    """A failed node skips its dependants, other branches finish, and nothing is cached"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        calls = Calls()
+
+        def broken(prices):
+            raise RuntimeError("no share counts")
+
+        def build(caps):
+            pipeline = Pipeline("test", cache_dir=cache_dir)
+            pipeline.add("prices", calls.node("prices", lambda: {"A": 1.0}), always=True)
+            pipeline.add("macro", calls.node("macro", lambda: 1.0), always=True)
+            pipeline.add("caps", calls.node("caps", caps), deps=["prices"])
+            pipeline.add("scores", calls.node("scores", lambda caps, macro: 0.0), deps=["caps", "macro"])
+            pipeline.add("macro_export", calls.node("macro_export", lambda macro: macro), deps=["macro"])
+            return pipeline
+
+        results = build(broken).run()
+        assert results["caps"].status == "failed" and isinstance(results["caps"].error, RuntimeError)
+        assert results["scores"].status == "skipped"
+        assert results["macro_export"].status == "ran"
+        assert "scores" not in calls.counts
+
+        results = build(lambda prices: prices).run()
+        assert results["caps"].status == "ran" and results["scores"].status == "ran"
+        assert results["macro_export"].status == "cached"
+
+        pipeline = build(broken)
+        pipeline.add("loop_a", lambda loop_b: None, deps=["loop_b"])
+        pipeline.add("loop_b", lambda loop_a: None, deps=["loop_a"])
+        try:
+            pipeline.run(["loop_a"])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("cycle not detected")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def main():
+    """Run the pipeline runner tests"""
+    ok = True
+    for test in (test_parallel_branches, test_downstream_only_reruns,
+                 test_files_and_targets, test_failures):
+        try:
+            test()
+            print(f"TEST: {test.__name__} passed")
+        except Exception as e:
+            print(f"TEST: {test.__name__} failed: {e!r}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: Pipeline runner reruns only what changed")
+    else:
+        print("❌ TEST: Pipeline runner tests failed")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# test_polygon_backfill.py
+# -----------------------------------------------------------
+# Test market_cap_ingest's bulk backfill modes against a local stand-in for
+# the Polygon API that replays recorded responses, so no API key or network
+# access is needed
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Recorded Polygon responses, keyed by request path (query strings are ignored)
+RECORDED_RESPONSES = {
+    "/v2/aggs/grouped/locale/us/market/stocks/2025-05-05": {
+        "queryCount": 3, "resultsCount": 3, "adjusted": True, "status": "OK", "count": 3,
+        "request_id": "6a7e466379af0a71039d60cc78e72282",
+        "results": [
+            {"T": "AAPL", "v": 69018452.0, "vw": 198.9, "o": 203.1, "c": 198.89, "h": 204.1, "l": 198.21, "t": 1746417600000, "n": 727032},
+            {"T": "MSFT", "v": 17211744.0, "vw": 436.6, "o": 432.87, "c": 436.17, "h": 439.5, "l": 432.11, "t": 1746417600000, "n": 281745},
+            {"T": "XOM", "v": 21510540.0, "vw": 106.3, "o": 106.5, "c": 106.45, "h": 107.2, "l": 105.6, "t": 1746417600000, "n": 190004},
+        ],
+    },
+    "/v2/aggs/grouped/locale/us/market/stocks/2025-05-06": {
+        "queryCount": 2, "resultsCount": 2, "adjusted": True, "status": "OK", "count": 2,
+        "request_id": "e4b6d8d3cbd14ad5a4e1b93a4aefc3c2",
+        "results": [
+            {"T": "AAPL", "v": 51216482.0, "vw": 198.3, "o": 197.2, "c": 198.51, "h": 200.65, "l": 197.02, "t": 1746504000000, "n": 598113},
+            {"T": "MSFT", "v": 15195251.0, "vw": 433.9, "o": 432.2, "c": 433.31, "h": 437.73, "l": 431.41, "t": 1746504000000, "n": 243190},
+        ],
+    },
+    # MSFT is missing from this day's grouped response
+    "/v2/aggs/grouped/locale/us/market/stocks/2025-05-07": {
+        "queryCount": 1, "resultsCount": 1, "adjusted": True, "status": "OK", "count": 1,
+        "request_id": "0e2f9b1e7a5c4a7f8d1c2b3a4e5f6a7b",
+        "results": [
+            {"T": "AAPL", "v": 68536655.0, "vw": 196.5, "o": 199.17, "c": 196.25, "h": 199.44, "l": 193.25, "t": 1746590400000, "n": 703211},
+        ],
+    },
+    "/v2/aggs/ticker/AAPL/range/1/day/2025-05-05/2025-05-07": {
+        "ticker": "AAPL", "queryCount": 3, "resultsCount": 3, "adjusted": True, "status": "OK", "count": 3,
+        "request_id": "3f9a2c1b7d8e4f6a9b0c1d2e3f4a5b6c",
+        "results": [
+            {"v": 69018452.0, "vw": 198.9, "o": 203.1, "c": 198.89, "h": 204.1, "l": 198.21, "t": 1746417600000, "n": 727032},
+            {"v": 51216482.0, "vw": 198.3, "o": 197.2, "c": 198.51, "h": 200.65, "l": 197.02, "t": 1746504000000, "n": 598113},
+            {"v": 68536655.0, "vw": 196.5, "o": 199.17, "c": 196.25, "h": 199.44, "l": 193.25, "t": 1746590400000, "n": 703211},
+        ],
+    },
+    "/v2/aggs/ticker/MSFT/range/1/day/2025-05-05/2025-05-07": {
+        "ticker": "MSFT", "queryCount": 3, "resultsCount": 3, "adjusted": True, "status": "OK", "count": 3,
+        "request_id": "9c8b7a6f5e4d3c2b1a0f9e8d7c6b5a4f",
+        "results": [
+            {"v": 17211744.0, "vw": 436.6, "o": 432.87, "c": 436.17, "h": 439.5, "l": 432.11, "t": 1746417600000, "n": 281745},
+            {"v": 15195251.0, "vw": 433.9, "o": 432.2, "c": 433.31, "h": 437.73, "l": 431.41, "t": 1746504000000, "n": 243190},
+            {"v": 17133480.0, "vw": 433.1, "o": 433.84, "c": 433.35, "h": 438.12, "l": 430.52, "t": 1746590400000, "n": 250871},
+        ],
+    },
+}
+
+BUSINESS_DAYS = ["2025-05-05", "2025-05-06", "2025-05-07"]
+TICKERS = ["AAPL", "MSFT"]
+
+class StandInPolygonHandler(BaseHTTPRequestHandler):
+    """Serve RECORDED_RESPONSES and count the requests made"""
+    requests_seen = []
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        StandInPolygonHandler.requests_seen.append(path)
+        body = RECORDED_RESPONSES.get(path)
+        if body is None:
+            self.send_response(404)
+            body = {"status": "NOT_FOUND", "request_id": "missing", "message": f"No recorded response for {path}"}
+        else:
+            self.send_response(200)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stand_in_server():
+    """Start the stand-in server on a free local port"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInPolygonHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def load_ingest(server, db_dir):
+    """Import market_cap_ingest pointed at the stand-in server and a scratch database"""
+    os.environ["POLYGON_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["POLYGON_API_KEY"] = "test-key"
+    os.environ["POLYGON_RATE_LIMIT"] = "1000"
+    os.environ["POLYGON_BURST"] = "100"
+    import market_cap_ingest
+    market_cap_ingest.POLYGON_BASE_URL = os.environ["POLYGON_BASE_URL"]
+    market_cap_ingest.POLYGON_API_KEY = os.environ["POLYGON_API_KEY"]
+    market_cap_ingest.DB_PATH = os.path.join(db_dir, "t2d_pulse.db")
+    market_cap_ingest.migrate()
+    return market_cap_ingest
+
+def stored_prices(ingest):
+    """Return {(ticker, date): price} from the scratch database"""
+    return {(row['ticker'], row['date']): row['price']
+            for row in ingest.query("SELECT ticker, date, price FROM ticker_prices")}
+
+def test_grouped_backfill():
+    """Grouped mode makes one request per date and only re-requests dates with gaps"""
+    server, db_dir = start_stand_in_server(), tempfile.mkdtemp()
+    try:
+        ingest = load_ingest(server, db_dir)
+        StandInPolygonHandler.requests_seen = []
+
+        assert ingest.backfill_prices(TICKERS, BUSINESS_DAYS, mode="grouped") == 5
+        assert len(StandInPolygonHandler.requests_seen) == len(BUSINESS_DAYS)
+        prices = stored_prices(ingest)
+        assert prices[("AAPL", "2025-05-07")] == 196.25
+        assert ("MSFT", "2025-05-07") not in prices
+
+        # Only 2025-05-07 still has a gap
+        StandInPolygonHandler.requests_seen = []
+        ingest.backfill_prices(TICKERS, BUSINESS_DAYS, mode="grouped")
+        assert StandInPolygonHandler.requests_seen == ["/v2/aggs/grouped/locale/us/market/stocks/2025-05-07"]
+    finally:
+        server.shutdown()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+def test_range_backfill():
+    """Range mode makes one request per ticker covering every missing date"""
+    server, db_dir = start_stand_in_server(), tempfile.mkdtemp()
+    try:
+        ingest = load_ingest(server, db_dir)
+        StandInPolygonHandler.requests_seen = []
+
+        assert ingest.backfill_prices(TICKERS, BUSINESS_DAYS, mode="range") == 6
+        assert len(StandInPolygonHandler.requests_seen) == len(TICKERS)
+        prices = stored_prices(ingest)
+        assert prices[("MSFT", "2025-05-07")] == 433.35
+        assert prices[("AAPL", "2025-05-05")] == 198.89
+
+        # Nothing left to fetch
+        StandInPolygonHandler.requests_seen = []
+        assert ingest.backfill_prices(TICKERS, BUSINESS_DAYS, mode="range") == 0
+        assert StandInPolygonHandler.requests_seen == []
+    finally:
+        server.shutdown()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+def main():
+    """Run the backfill tests against the stand-in server"""
+    ok = True
+    for test in (test_grouped_backfill, test_range_backfill):
+        try:
+            test()
+            print(f"TEST: {test.__name__} passed")
+        except Exception as e:
+            print(f"TEST: {test.__name__} failed: {e!r}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: Polygon bulk backfill works against recorded responses")
+    else:
+        print("❌ TEST: Polygon bulk backfill tests failed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# test_release_calendar.py
+# -----------------------------------------------------------
+# Test the release-calendar refresh decisions with a stand-in for FRED's
+# series metadata, so no API key or network access is needed
+
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from release_calendar import ReleaseScheduler, next_release
+
+def frame(*dates):
+    """A dataset holding observations on the given dates"""
+    return pd.DataFrame({"date": pd.to_datetime(list(dates)), "value": range(len(dates))})
+
+class StandInFred:
+    """Serve a fixed last_updated per series and count the requests"""
+
+    def __init__(self, last_updated):
+        self.last_updated = last_updated
+        self.requests = 0
+
+    def __call__(self, series_id):
+        self.requests += 1
+        return self.last_updated
+
+def test_release_times():
+    """Monthly, quarterly and daily releases land after the period plus its lag"""
+    # April unemployment (dated 2025-04-01) is followed by May's, released from June 1
+    assert next_release("unemployment", "2025-04-01") == pd.Timestamp("2025-06-01 08:30", tz="US/Eastern")
+    # Q1 GDP is followed by Q2's advance estimate, 25 days after the quarter
+    assert next_release("gdp", "2025-01-01") == pd.Timestamp("2025-07-25 08:30", tz="US/Eastern")
+    # A Friday close is followed by Monday's
+    assert next_release("vix", "2025-05-09") == pd.Timestamp("2025-05-12 16:30", tz="US/Eastern")
+
+def test_monthly_series():
+    """A monthly series is only checked once due, then gated by FRED's last_updated"""
+    fred = StandInFred("2025-05-02 07:51:02-05")
+    scheduler = ReleaseScheduler(path=None, fetch_last_updated=fred)
+    df = frame("2025-03-01", "2025-04-01")
+
+    # Before the release date: no requests at all
+    assert not scheduler.needs_refresh("unemployment", df, now="2025-05-20 12:00")
+    assert fred.requests == 0
+
+    # Due: FRED reports an update we have not seen
+    assert scheduler.needs_refresh("unemployment", df, now="2025-06-02 09:00")
+    scheduler.record_refresh("unemployment", df, now="2025-06-02 09:00")
+
+    # Polled again within the poll interval: skipped without a request
+    assert not scheduler.needs_refresh("unemployment", df, now="2025-06-02 12:00")
+    assert fred.requests == 1
+
+    # Still due (May not out yet) but FRED unchanged: metadata only
+    assert not scheduler.needs_refresh("unemployment", df, now="2025-06-03 09:00")
+    assert fred.requests == 2
+
+    # FRED publishes: refresh
+    fred.last_updated = "2025-06-06 07:50:03-05"
+    assert scheduler.needs_refresh("unemployment", df, now="2025-06-06 15:00")
+
+def test_daily_series():
+    """A daily series is only fetched after the next weekday's close"""
+    scheduler = ReleaseScheduler(path=None, fetch_last_updated=StandInFred(None))
+    df = frame("2025-05-08", "2025-05-09")
+    assert not scheduler.needs_refresh("vix", df, now="2025-05-10 18:00")  # Saturday
+    assert not scheduler.needs_refresh("vix", df, now="2025-05-12 10:00")  # Monday, before the close
+    assert scheduler.needs_refresh("vix", df, now="2025-05-12 17:00")
+    scheduler.record_refresh("vix", frame("2025-05-12"), now="2025-05-12 17:00")
+    assert not scheduler.needs_refresh("vix", frame("2025-05-12"), now="2025-05-12 20:00")
+
+def test_revision_window():
+    """GDP keeps being checked for revisions after its advance estimate"""
+    fred = StandInFred("2025-04-30 07:52:03-05")
+    scheduler = ReleaseScheduler(path=None, fetch_last_updated=fred)
+    df = frame("2024-10-01", "2025-01-01")
+    assert scheduler.needs_refresh("gdp", df, now="2025-05-29 09:00")
+    scheduler.record_refresh("gdp", df, now="2025-05-29 09:00")
+    assert not scheduler.needs_refresh("gdp", df, now="2025-05-30 09:00")  # Unchanged
+    # After the revision window, nothing until the next advance estimate
+    assert not scheduler.needs_refresh("gdp", df, now="2025-07-10 09:00")
+    assert fred.requests == 2
+
+def test_state_persists():
+    """Recorded refreshes survive a restart"""
+    state_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(state_dir, "release_state.json")
+        fred = StandInFred("2025-05-02 07:51:02-05")
+        df = frame("2025-04-01")
+        scheduler = ReleaseScheduler(path=path, fetch_last_updated=fred)
+        assert scheduler.needs_refresh("cpi", df, now="2025-06-12 09:00")
+        scheduler.record_refresh("cpi", df, now="2025-06-12 09:00")
+
+        restarted = ReleaseScheduler(path=path, fetch_last_updated=fred)
+        assert restarted.state["cpi"]["last_updated"] == "2025-05-02 07:51:02-05"
+        assert not restarted.needs_refresh("cpi", df, now="2025-06-13 09:00")
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+def main():
+    """Run the release calendar tests"""
+    ok = True
+    for test in (test_release_times, test_monthly_series, test_daily_series,
+                 test_revision_window, test_state_persists):
+        try:
+            test()
+            print(f"TEST: {test.__name__} passed")
+        except Exception as e:
+            print(f"TEST: {test.__name__} failed: {e!r}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print("✅ TEST: Release calendar only schedules refreshes that can find new data")
+    else:
+        print("❌ TEST: Release calendar tests failed")
@@ -0,0 +1,267 @@
+# ticker_dataset.py
+# -----------------------------------------------------------
+# Per-ticker Parquet dataset under data/market/ticker_data
+# -----------------------------------------------------------
+#
+# batch_ticker_collector and data_conversion append rows to a hive-partitioned
+# dataset (ticker=XYZ/...). Every append adds one small file per ticker, so
+# compact() periodically rewrites each partition as a single file:
+# duplicate dates are dropped (the most recently written value wins), rows are
+# sorted by date and is_latest is recomputed across the whole partition.
+#
+# A manifest (_manifest.json, ignored by pyarrow because of the leading
+# underscore) records each partition's file, row count and date range.
+# read_ticker_data() reads through a pyarrow dataset, so ticker filters prune
+# partitions and date filters are pushed down to the Parquet row groups.
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+TICKER_DATA_DIR = os.path.join("data", "market", "ticker_data")
+MANIFEST_FILE = "_manifest.json"
+COMPACTED_FILE = "part-compacted.parquet"
+COMPACT_MAX_FILES = 8  # Appends compact a partition once it has more files than this
+SCHEMA_VERSION = "1.0.0"
+
+# Columns stored in each partition file (ticker comes from the directory name)
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("price", pa.float64()),
+    ("market_cap", pa.float64()),
+    ("is_latest", pa.bool_()),
+])
+VALUE_COLUMNS = ["price", "market_cap"]
+
+def _partition_dir(ticker, root=TICKER_DATA_DIR):
+    return os.path.join(root, f"ticker={ticker}")
+
+def _data_files(directory):
+    """Parquet files in a partition, oldest first"""
+    files = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.endswith(".parquet") and not name.startswith(("_", "."))]
+    return sorted(files, key=lambda path: (os.path.getmtime(path), path))
+
+def list_partitions(root=TICKER_DATA_DIR):
+    """Return {ticker: [files]} for every partition in the dataset"""
+    if not os.path.isdir(root):
+        return {}
+    partitions = {}
+    for name in sorted(os.listdir(root)):
+        directory = os.path.join(root, name)
+        if name.startswith("ticker=") and os.path.isdir(directory):
+            partitions[name[len("ticker="):]] = _data_files(directory)
+    return partitions
+
+def load_manifest(root=TICKER_DATA_DIR):
+    """Load the manifest, or an empty one if it doesn't exist"""
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"schema_version": SCHEMA_VERSION, "partitions": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_manifest(manifest, root=TICKER_DATA_DIR):
+    """Atomically write the manifest"""
+    manifest["updated_at"] = datetime.datetime.now().isoformat()
+    path = os.path.join(root, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _normalize(df):
+    """Coerce rows to the dataset schema (plus ticker if present)"""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    for column in VALUE_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce") if column in df.columns else float("nan")
+    if "is_latest" not in df.columns:
+        df["is_latest"] = False
+    columns = SCHEMA.names + (["ticker"] if "ticker" in df.columns else [])
+    return df[columns]
+
+def _with_latest_flag(df):
+    """Recompute is_latest within each ticker"""
+    df = df.copy()
+    latest = df.groupby("ticker")["date"].transform("max") if "ticker" in df.columns else df["date"].max()
+    df["is_latest"] = df["date"] == latest
+    return df
+
+def append_rows(df, root=TICKER_DATA_DIR, compact_after=COMPACT_MAX_FILES):
+    """
+    Append long-form rows (date, ticker, price, market_cap) to the dataset.
+
+    Partitions that end up with more than `compact_after` files are compacted
+    straight away.
+
+    Returns:
+        int: Number of rows appended
+    """
+    if df is None or df.empty:
+        return 0
+
+    df = _normalize(df.dropna(subset=["ticker"])).dropna(subset=VALUE_COLUMNS, how="all")
+    if df.empty:
+        return 0
+    df = _with_latest_flag(df)
+    table = pa.Table.from_pandas(df, schema=SCHEMA.append(pa.field("ticker", pa.string())), preserve_index=False)
+    table = table.replace_schema_metadata({"schema_version": SCHEMA_VERSION})
+    os.makedirs(root, exist_ok=True)
+    pq.write_to_dataset(
+        table,
+        root_path=root,
+        partition_cols=["ticker"],
+        basename_template=f"part-{datetime.datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+    )
+    logger.info(f"Appended {len(df)} rows to {root}")
+
+    if compact_after is not None:
+        crowded = [ticker for ticker, files in list_partitions(root).items()
+                   if ticker in set(df["ticker"]) and len(files) > compact_after]
+        if crowded:
+            compact(root, tickers=crowded)
+    return len(df)
+
+def _read_partition_file(path):
+    """Read one partition file written by any version of the collectors"""
+    df = pq.read_table(path).to_pandas()
+    df = df.drop(columns=[col for col in ("ticker", "__index_level_0__") if col in df.columns])
+    return _normalize(df)
+
+def compact(root=TICKER_DATA_DIR, tickers=None, min_files=2):
+    """
+    Merge each partition's files into one, dedupe on (ticker, date) and recompute is_latest.
+
+    Args:
+        root (str): Dataset root
+        tickers (list, optional): Only these partitions (default: all)
+        min_files (int): Skip partitions with fewer files than this (unless the
+            manifest doesn't know them yet)
+
+    Returns:
+        dict: {ticker: rows} for the partitions that were rewritten
+    """
+    manifest = load_manifest(root)
+    compacted = {}
+    for ticker, files in list_partitions(root).items():
+        if tickers is not None and ticker not in tickers:
+            continue
+        if not files or (len(files) < min_files and ticker in manifest["partitions"]):
+            continue
+
+        try:
+            frames = [_read_partition_file(path) for path in files]
+            # Files are read oldest first, so for each date the newest non-null value wins
+            merged = pd.concat(frames, ignore_index=True).dropna(subset=VALUE_COLUMNS, how="all")
+            merged = merged.groupby("date", sort=True)[VALUE_COLUMNS].last().reset_index()
+            merged["ticker"] = ticker
+            merged = _with_latest_flag(merged)[SCHEMA.names]
+
+            directory = _partition_dir(ticker, root)
+            tmp_path = os.path.join(directory, f".{COMPACTED_FILE}.tmp")
+            target = os.path.join(directory, COMPACTED_FILE)
+            table = pa.Table.from_pandas(merged, schema=SCHEMA, preserve_index=False)
+            pq.write_table(table.replace_schema_metadata({"schema_version": SCHEMA_VERSION}), tmp_path)
+            os.replace(tmp_path, target)
+            for path in files:
+                if os.path.abspath(path) != os.path.abspath(target):
+                    os.remove(path)
+        except Exception as e:
+            logger.error(f"Error compacting partition {ticker}: {e}")
+            continue
+
+        manifest["partitions"][ticker] = {
+            "file": COMPACTED_FILE,
+            "rows": len(merged),
+            "min_date": merged["date"].min().isoformat() if len(merged) else None,
+            "max_date": merged["date"].max().isoformat() if len(merged) else None,
+            "compacted_at": datetime.datetime.now().isoformat(),
+        }
+        compacted[ticker] = len(merged)
+
+    if compacted:
+        save_manifest(manifest, root)
+        logger.info(f"Compacted {len(compacted)} partitions in {root}")
+    return compacted
+
+def _dedupe_latest(df, root):
+    """
+    Keep one row per ticker, at the newest of its is_latest dates.
+
+    Appends flag is_latest within their own batch, so until compact() runs a
+    partition can hold older flagged dates and the same date in several files.
+    As in compact(), files count oldest first and the newest non-null value wins.
+    """
+    order = {os.path.abspath(path): i for files in list_partitions(root).values()
+             for i, path in enumerate(files)}
+    df = df[df["date"] == df.groupby("ticker")["date"].transform("max")]
+    df = df.assign(_order=df["__filename"].map(lambda path: order.get(os.path.abspath(path), -1)))
+    value_columns = [col for col in df.columns if col not in ("date", "ticker", "__filename", "_order")]
+    df = df.sort_values("_order", kind="stable")
+    return df.groupby(["ticker", "date"], sort=False)[value_columns].last().reset_index()
+
+def read_ticker_data(tickers=None, start=None, end=None, columns=None, latest_only=False, root=TICKER_DATA_DIR):
+    """
+    Read rows from the dataset, pruning partitions by ticker and row groups by date.
+
+    Args:
+        tickers (list, optional): Only these tickers
+        start (str or date, optional): First date (inclusive)
+        end (str or date, optional): Last date (inclusive)
+        columns (list, optional): Value columns (default: price, market_cap, is_latest)
+        latest_only (bool): Only each ticker's latest row (one per ticker, even before compaction)
+        root (str): Dataset root
+
+    Returns:
+        pd.DataFrame: date (datetime64), ticker and the requested columns
+    """
+    columns = ["date", "ticker"] + list(columns or VALUE_COLUMNS + ["is_latest"])
+    if not list_partitions(root):
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(
+        root, format="parquet",
+        schema=SCHEMA.append(pa.field("ticker", pa.string())),
+        partitioning=ds.partitioning(pa.schema([("ticker", pa.string())]), flavor="hive"),
+    )
+    condition = None
+    filters = []
+    if tickers is not None:
+        filters.append(ds.field("ticker").isin(list(tickers)))
+    if start is not None:
+        filters.append(ds.field("date") >= pa.scalar(pd.Timestamp(start).date(), type=pa.date32()))
+    if end is not None:
+        filters.append(ds.field("date") <= pa.scalar(pd.Timestamp(end).date(), type=pa.date32()))
+    if latest_only:
+        filters.append(ds.field("is_latest") == True)  # noqa: E712 (dataset expression)
+    for expr in filters:
+        condition = expr if condition is None else condition & expr
+
+    scan_columns = columns + ["__filename"] if latest_only else columns
+    df = dataset.to_table(columns=scan_columns, filter=condition).to_pandas()
+    if latest_only:
+        df = _dedupe_latest(df, root)[columns]
+    df["date"] = pd.to_datetime(df["date"])
+    return df.sort_values(["ticker", "date"]).reset_index(drop=True)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Compact the per-ticker Parquet dataset")
+    parser.add_argument("--root", default=TICKER_DATA_DIR, help="Dataset root directory")
+    parser.add_argument("--ticker", action="append", help="Only compact this ticker (repeatable)")
+    parser.add_argument("--min-files", type=int, default=2, help="Skip partitions with fewer files")
+    args = parser.parse_args()
+
+    result = compact(args.root, tickers=args.ticker, min_files=args.min_files)
+    print(f"Compacted {len(result)} partitions ({sum(result.values())} rows)")
@@ -0,0 +1,195 @@
+# ticker_store.py
+# -----------------------------------------------------------
+# Columnar store for daily ticker prices and market caps
+# -----------------------------------------------------------
+#
+# Rows are kept in long form (date, ticker, price, market_cap) in one Parquet
+# file per month under config.TICKER_STORE_DIR, sorted by ticker then date.
+# A daily update only rewrites the current month's file; earlier months are
+# never touched. Reads go through a pyarrow dataset, so filtering on ticker or
+# date skips files and row groups instead of parsing a full wide CSV.
+#
+# historical_data_manager builds its dates × tickers frames from here with
+# read_wide().
+
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import config
+
+FIELDS = ["price", "market_cap"]
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("ticker", pa.string()),
+    ("price", pa.float64()),
+    ("market_cap", pa.float64()),
+])
+ROW_GROUP_SIZE = 1024  # Rows per row group; small groups keep per-ticker reads selective
+
+def _store_dir(store_dir=None):
+    return store_dir or config.TICKER_STORE_DIR
+
+def _month_path(month, store_dir=None):
+    return os.path.join(_store_dir(store_dir), f"{month}.parquet")
+
+def months(store_dir=None):
+    """Return the months (YYYY-MM) present in the store, oldest first"""
+    directory = _store_dir(store_dir)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".parquet")] for name in os.listdir(directory) if name.endswith(".parquet"))
+
+def is_empty(store_dir=None):
+    """Check whether the store has no data yet"""
+    return not months(store_dir)
+
+def clear(store_dir=None):
+    """Delete every month file in the store"""
+    shutil.rmtree(_store_dir(store_dir), ignore_errors=True)
+
+def _normalize(rows):
+    """Coerce a long DataFrame to the store schema, dropping rows without any value"""
+    rows = rows.reindex(columns=SCHEMA.names).copy()
+    rows["date"] = pd.to_datetime(rows["date"]).dt.normalize()
+    rows["ticker"] = rows["ticker"].astype(str)
+    for field in FIELDS:
+        rows[field] = pd.to_numeric(rows[field], errors="coerce")
+    return rows.dropna(subset=FIELDS, how="all")
+
+def _write_month(rows, path):
+    """Atomically write one month's rows"""
+    table = pa.Table.from_pandas(rows, schema=SCHEMA, preserve_index=False)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_rows(rows, store_dir=None):
+    """
+    Merge long-form rows into the store.
+
+    New values win over stored ones; a missing (NaN) value in `rows` leaves the
+    stored value in place. Only the months that `rows` touches are rewritten.
+
+    Args:
+        rows (pd.DataFrame): Columns date, ticker and any of price, market_cap
+        store_dir (str, optional): Store directory (default config.TICKER_STORE_DIR)
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = _normalize(rows)
+    if rows.empty:
+        return 0
+
+    os.makedirs(_store_dir(store_dir), exist_ok=True)
+    for month, month_rows in rows.groupby(rows["date"].dt.strftime("%Y-%m")):
+        path = _month_path(month, store_dir)
+        month_rows = month_rows.drop_duplicates(["date", "ticker"], keep="last").set_index(["date", "ticker"])
+        if os.path.exists(path):
+            existing = pq.read_table(path).to_pandas()
+            existing["date"] = pd.to_datetime(existing["date"])
+            month_rows = month_rows.combine_first(existing.set_index(["date", "ticker"]))
+        merged = month_rows.reset_index().sort_values(["ticker", "date"])
+        _write_month(merged[SCHEMA.names], path)
+    return len(rows)
+
+def wide_to_long(price_df=None, marketcap_df=None):
+    """
+    Convert dates × tickers frames (as used by historical_data_manager) to long rows.
+
+    Args:
+        price_df (pd.DataFrame, optional): Prices, date index, one column per ticker
+        marketcap_df (pd.DataFrame, optional): Market caps in the same layout
+
+    Returns:
+        pd.DataFrame: date, ticker, price, market_cap
+    """
+    parts = []
+    for field, frame in (("price", price_df), ("market_cap", marketcap_df)):
+        if frame is None or frame.empty:
+            continue
+        stacked = frame.apply(pd.to_numeric, errors="coerce").stack().rename(field)
+        stacked.index.names = ["date", "ticker"]
+        parts.append(stacked)
+    if not parts:
+        return pd.DataFrame(columns=SCHEMA.names)
+    return pd.concat(parts, axis=1).reset_index()
+
+def read(tickers=None, start=None, end=None, columns=None, store_dir=None):
+    """
+    Read long-form rows, pushing ticker/date filters down to the Parquet files.
+
+    Args:
+        tickers (list, optional): Only these tickers
+        start (str or date, optional): First date (inclusive)
+        end (str or date, optional): Last date (inclusive)
+        columns (list, optional): Value columns to read (default: price and market_cap)
+        store_dir (str, optional): Store directory
+
+    Returns:
+        pd.DataFrame: date (datetime64), ticker and the requested value columns
+    """
+    columns = ["date", "ticker"] + list(columns or FIELDS)
+    if is_empty(store_dir):
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(_store_dir(store_dir), format="parquet", schema=SCHEMA)
+    condition = None
+    if tickers is not None:
+        condition = ds.field("ticker").isin(list(tickers))
+    if start is not None:
+        expr = ds.field("date") >= pa.scalar(pd.Timestamp(start).date(), type=pa.date32())
+        condition = expr if condition is None else condition & expr
+    if end is not None:
+        expr = ds.field("date") <= pa.scalar(pd.Timestamp(end).date(), type=pa.date32())
+        condition = expr if condition is None else condition & expr
+
+    rows = dataset.to_table(columns=columns, filter=condition).to_pandas()
+    rows["date"] = pd.to_datetime(rows["date"])
+    return rows
+
+def read_wide(field, tickers=None, start=None, end=None, store_dir=None):
+    """
+    Read one field as a dates × tickers frame with 'YYYY-MM-DD' string dates as index.
+
+    Args:
+        field (str): 'price' or 'market_cap'
+        tickers (list, optional): Columns to return (missing tickers come back as NaN)
+        start, end (optional): Inclusive date bounds
+
+    Returns:
+        pd.DataFrame: Wide frame indexed by date
+    """
+    rows = read(tickers, start, end, columns=[field], store_dir=store_dir)
+    wide = rows.pivot(index="date", columns="ticker", values=field)
+    wide.index = pd.DatetimeIndex(wide.index).strftime("%Y-%m-%d")
+    wide.index.name = "date"
+    wide.columns.name = None
+    if tickers is not None:
+        wide = wide.reindex(columns=list(tickers))
+    return wide.astype(float)
+
+def import_wide_csvs(price_csv, marketcap_csv, store_dir=None):
+    """
+    Load legacy wide CSVs (date column + one column per ticker) into the store.
+
+    Returns:
+        int: Number of rows imported
+    """
+    frames = []
+    for path in (price_csv, marketcap_csv):
+        frame = pd.read_csv(path, index_col="date") if os.path.exists(path) else None
+        frames.append(frame)
+    return write_rows(wide_to_long(*frames), store_dir)
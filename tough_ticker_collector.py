@@ -4,6 +4,7 @@
 # A specialized collector for difficult-to-get tickers
 # Uses more aggressive retry logic and custom handling for problematic tickers
 
+import asyncio
 import os
 import sys
 import time
@@ -13,9 +14,10 @@ import numpy as np
 import datetime
 import pytz
 import logging
-import requests
 import yfinance as yf
 
+import http_client
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -82,58 +84,64 @@ def get_missing_tickers():
         logging.error(f"Error getting missing data: {e}")
         return None
 
-def get_ticker_data_finnhub(ticker, api_key, retries=5, initial_delay=1):
-    """Get both price and market cap data from Finnhub with exponential backoff retries"""
+async def get_ticker_data_finnhub_async(ticker, api_key, retries=5):
+    """
+    Get both price and market cap data from Finnhub, re-requesting when either is missing.
+    Both requests go out together; the shared Finnhub client paces and retries them.
+    """
+    client = http_client.get_client("finnhub")
+    params = {"symbol": ticker, "token": api_key}
     price = None
     market_cap = None
     
-    delay = initial_delay
-    
     for attempt in range(retries):
         try:
+            price_response, profile_response = await asyncio.gather(
+                client.get("/api/v1/quote", params=params),
+                client.get("/api/v1/stock/profile2", params=params))
+            
             # Get price from Finnhub
-            price_url = f"https://finnhub.io/api/v1/quote?symbol={ticker}&token={api_key}"
-            price_response = requests.get(price_url)
             price_data = price_response.json()
-            
-            if 'c' in price_data and price_data['c'] > 0:
+            if 'c' in price_data and price_data['c'] and price_data['c'] > 0:
                 price = price_data['c']
-                logging.info(f"  ✓ Got price from Finnhub: {price}")
+                logging.info(f"  ✓ Got {ticker} price from Finnhub: {price}")
             else:
-                logging.warning(f"  ✗ Failed to get price from Finnhub")
-            
-            # Add jitter to avoid rate limiting
-            jitter = random.uniform(0.5, 1.5)
-            time.sleep(delay * jitter)  
+                logging.warning(f"  ✗ Failed to get {ticker} price from Finnhub")
             
             # Get market cap from Finnhub
-            profile_url = f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker}&token={api_key}"
-            profile_response = requests.get(profile_url)
             profile_data = profile_response.json()
-            
-            if 'marketCapitalization' in profile_data and profile_data['marketCapitalization'] > 0:
+            if 'marketCapitalization' in profile_data and profile_data['marketCapitalization'] and profile_data['marketCapitalization'] > 0:
                 # Convert from millions to actual value
                 market_cap = profile_data['marketCapitalization'] * 1000000
-                logging.info(f"  ✓ Got market cap from Finnhub: {market_cap:,.2f}")
+                logging.info(f"  ✓ Got {ticker} market cap from Finnhub: {market_cap:,.2f}")
             else:
-                logging.warning(f"  ✗ Failed to get market cap from Finnhub")
+                logging.warning(f"  ✗ Failed to get {ticker} market cap from Finnhub")
             
             # If we got both price and market cap, return them
             if price is not None and market_cap is not None:
                 return price, market_cap
-            
-            # Add jitter to avoid rate limiting
-            jitter = random.uniform(0.5, 1.5)
-            time.sleep(delay * jitter)
         
         except Exception as e:
             logging.warning(f"Finnhub error for {ticker} (attempt {attempt+1}/{retries}): {e}")
-        
-        # Exponential backoff
-        delay = initial_delay * (2 ** attempt)
     
     return price, market_cap
 
+def get_ticker_data_finnhub(ticker, api_key, retries=5):
+    """Get both price and market cap data from Finnhub with aggressive retries"""
+    return http_client.run(get_ticker_data_finnhub_async(ticker, api_key, retries))
+
+def fetch_ticker_data_concurrently(fetch_async, tickers, api_key, retries):
+    """
+    Run an async per-ticker fetch (Finnhub or AlphaVantage) for all tickers at once
+    
+    Returns:
+        dict: {ticker: (price, market_cap)}
+    """
+    results = http_client.run(http_client.gather(
+        *(fetch_async(ticker, api_key, retries) for ticker in tickers)))
+    return {ticker: (None, None) if isinstance(result, Exception) else result
+            for ticker, result in zip(tickers, results)}
+
 def get_ticker_data_yahoo(ticker, retries=5, initial_delay=2):
     """Get both price and market cap data from Yahoo Finance with exponential backoff retries"""
     price = None
@@ -193,60 +201,59 @@ def get_ticker_data_yahoo(ticker, retries=5, initial_delay=2):
     
     return price, market_cap
 
-def get_ticker_data_alphavantage(ticker, api_key, retries=2, delay=5):
-    """Get both price and market cap data from AlphaVantage with retries"""
+async def get_ticker_data_alphavantage_async(ticker, api_key, retries=2):
+    """
+    Get both price and market cap data from AlphaVantage, re-requesting when either is missing.
+    Both requests go out together; the shared AlphaVantage client paces and retries them.
+    """
+    client = http_client.get_client("alphavantage")
     price = None
     market_cap = None
     
     for attempt in range(retries):
         try:
+            price_response, overview_response = await asyncio.gather(
+                client.get("/query", params={"function": "GLOBAL_QUOTE", "symbol": ticker, "apikey": api_key}),
+                client.get("/query", params={"function": "OVERVIEW", "symbol": ticker, "apikey": api_key}))
+            
             # Get price from AlphaVantage
-            price_url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={ticker}&apikey={api_key}"
-            price_response = requests.get(price_url)
             price_data = price_response.json()
-            
             if 'Global Quote' in price_data and '05. price' in price_data['Global Quote']:
                 price_str = price_data['Global Quote']['05. price']
                 price = float(price_str)
-                logging.info(f"  ✓ Got price from AlphaVantage: {price}")
+                logging.info(f"  ✓ Got {ticker} price from AlphaVantage: {price}")
             else:
-                logging.warning(f"  ✗ Failed to get price from AlphaVantage")
+                logging.warning(f"  ✗ Failed to get {ticker} price from AlphaVantage")
                 if 'Information' in price_data:
                     logging.warning(f"  AlphaVantage API unexpected response (quote) for {ticker}: {price_data}")
             
-            # Add significant delay to avoid rate limiting
-            time.sleep(delay)
-            
             # Get market cap from AlphaVantage OVERVIEW endpoint
-            overview_url = f"https://www.alphavantage.co/query?function=OVERVIEW&symbol={ticker}&apikey={api_key}"
-            overview_response = requests.get(overview_url)
             overview_data = overview_response.json()
-            
             if 'MarketCapitalization' in overview_data:
                 market_cap_str = overview_data['MarketCapitalization']
                 try:
                     market_cap = float(market_cap_str)
-                    logging.info(f"  ✓ Got market cap from AlphaVantage: {market_cap:,.2f}")
+                    logging.info(f"  ✓ Got {ticker} market cap from AlphaVantage: {market_cap:,.2f}")
                 except (ValueError, TypeError):
                     logging.warning(f"  ✗ Failed to convert AlphaVantage market cap: {market_cap_str}")
             else:
-                logging.warning(f"  ✗ Failed to get market cap from AlphaVantage")
+                logging.warning(f"  ✗ Failed to get {ticker} market cap from AlphaVantage")
                 if 'Information' in overview_data:
                     logging.warning(f"  AlphaVantage API unexpected response (overview) for {ticker}: {overview_data}")
             
             # If we got both price and market cap, return them
             if price is not None and market_cap is not None:
                 return price, market_cap
-            
-            # Add significant delay to avoid rate limiting
-            time.sleep(delay)
         
         except Exception as e:
             logging.warning(f"AlphaVantage error for {ticker} (attempt {attempt+1}/{retries}): {e}")
-            time.sleep(delay)
     
     return price, market_cap
 
+def get_ticker_data_alphavantage(ticker, api_key, retries=2):
+    """Get both price and market cap data from AlphaVantage with retries"""
+    return http_client.run(get_ticker_data_alphavantage_async(ticker, api_key, retries))
+
 def get_manual_ticker_data(ticker):
     """Get price and market cap by searching multiple sources with specialized handling"""
     price = None
@@ -321,14 +328,21 @@ def update_historical_data(data, ticker, price, market_cap):
     
     return updates_made
 
-def process_tough_ticker(ticker, data, api_keys, max_retries=5):
-    """Process a single tough ticker using all available methods"""
+def process_tough_ticker(ticker, data, api_keys, max_retries=5, finnhub_data=None):
+    """
+    Process a single tough ticker using all available methods
+    
+    finnhub_data is the ticker's (price, market_cap) when Finnhub was already queried
+    (see collect_tough_tickers); otherwise Finnhub is queried here.
+    """
     logging.info(f"Processing tough ticker: {ticker}...")
     
     # Try Finnhub with more aggressive retry logic
     if api_keys['finnhub']:
-        logging.info(f"  Trying Finnhub for {ticker} with aggressive retry...")
-        price, market_cap = get_ticker_data_finnhub(ticker, api_keys['finnhub'], retries=max_retries, initial_delay=2)
+        if finnhub_data is None:
+            logging.info(f"  Trying Finnhub for {ticker} with aggressive retry...")
+            finnhub_data = get_ticker_data_finnhub(ticker, api_keys['finnhub'], retries=max_retries)
+        price, market_cap = finnhub_data
         
         # If we got complete data from Finnhub, update and return
         if price is not None and market_cap is not None:
@@ -353,7 +367,7 @@ def process_tough_ticker(ticker, data, api_keys, max_retries=5):
     # Try AlphaVantage if we still need data
     if api_keys['alphavantage'] and (price is None or market_cap is None):
         logging.info(f"  Trying AlphaVantage for {ticker}...")
-        price_av, market_cap_av = get_ticker_data_alphavantage(ticker, api_keys['alphavantage'], retries=2, delay=10)
+        price_av, market_cap_av = get_ticker_data_alphavantage(ticker, api_keys['alphavantage'], retries=2)
         
         # Fill in any missing parts
         if price is None:
@@ -406,11 +420,19 @@ def collect_tough_tickers(tickers=None, max_tickers=None, delay_between=15):
     
     logging.info(f"Processing {len(missing_tickers)} tough tickers out of {data['missing_count']} missing")
     
+    # Query Finnhub for every ticker at once; the shared client keeps within its rate limit
+    finnhub_results = {}
+    if api_keys['finnhub']:
+        logging.info(f"Fetching data for {len(missing_tickers)} tickers from Finnhub...")
+        finnhub_results = fetch_ticker_data_concurrently(
+            get_ticker_data_finnhub_async, missing_tickers, api_keys['finnhub'], retries=5)
+    
     # Process each ticker
     success_count = 0
     for i, ticker in enumerate(missing_tickers):
         logging.info(f"[{i+1}/{len(missing_tickers)}] Processing {ticker}...")
-        success = process_tough_ticker(ticker, data, api_keys)
+        finnhub_data = finnhub_results.get(ticker)
+        success = process_tough_ticker(ticker, data, api_keys, finnhub_data=finnhub_data)
         
         if success:
             success_count += 1
@@ -418,8 +440,8 @@ def collect_tough_tickers(tickers=None, max_tickers=None, delay_between=15):
         else:
             logging.warning(f"WARNING: Could not get complete data for {ticker}")
         
-        # Sleep between tickers to avoid rate limits
-        if i < len(missing_tickers) - 1:
+        # Sleep between tickers that fell back to Yahoo to avoid its rate limits
+        if i < len(missing_tickers) - 1 and None in (finnhub_data or (None,)):
             sleep_time = delay_between + random.uniform(1, 5)  # Add randomness
             logging.info(f"Sleeping for {sleep_time:.1f} seconds to avoid rate limits...")
             time.sleep(sleep_time)
@@ -265,7 +265,7 @@ def update_authentic_sector_history(scores, force_date=None):
             df = pd.read_csv(history_path)
             df['date'] = pd.to_datetime(df['date'])
         else:
-            df = pd.DataFrame(columns=['date'])
+            df = pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]')})
         
         # Get today's date in Eastern time
         eastern = pytz.timezone('US/Eastern')
@@ -6,6 +6,11 @@ This is the production entry point for the T2D Pulse application.
 """
 
 import os
+
+# Import the app lazily: heavy modules and network fetches are deferred until
+# first use, so gunicorn workers start quickly and don't all hit upstream APIs
+os.environ.setdefault("T2D_LAZY_IMPORT", "1")
+
 from app import app as application
 
 if __name__ == "__main__":